@@ -1,14 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, Path, File, UploadFile, Form, Query, UploadFile
+from fastapi import APIRouter, HTTPException, Depends, Path, File, UploadFile, Form, Query, UploadFile, Response
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
 from ....schemas.schemas import AssignmentCreate, AssignmentData
-from ....crud.assignments import create_questions_and_options, create_assignment, get_assignments_for_module, create_assignment_and_questions_from_csv, delete_assignment_and_related_questions
-from ....db.connection import get_db_connection
+from ....crud.assignments import create_assignment, get_assignments_for_module, create_assignment_and_questions_from_csv, delete_assignment_and_related_questions
+from ....db.connection import get_db_connection, get_read_connection
 from ....core.auth import AuthenticatedActor, require_authenticated_user, require_staff_actor
 from ....core.rbac import get_course_id_for_module, require_course_read_access, require_course_staff_access
-import pandas as pd
-from io import BytesIO
+from ....services.jobs import submit_job
+from ....services.job_handlers import DELETE_MODULE_ASSIGNMENTS, IMPORT_ASSIGNMENT_CSV, import_assignment_csv
 
 import logging
 logging.basicConfig(level=logging.INFO)
@@ -16,10 +16,14 @@ logging.basicConfig(level=logging.INFO)
 router = APIRouter()
 MAX_CSV_UPLOAD_BYTES = 2 * 1024 * 1024
 
+# With ?async=true the import runs as a background job: the response is 202
+# with the job id, and GET /jobs/{job_id} reports progress and the result.
 @router.post("/upload_csv/")
 async def upload_csv(
+    response: Response,
     file: UploadFile = File(...),
     module_id=None,
+    run_async: bool = Query(False, alias="async"),
     actor: AuthenticatedActor = Depends(require_staff_actor),
     conn= Depends(get_db_connection),
 ):
@@ -34,21 +38,22 @@ async def upload_csv(
         if not (file.filename or "").lower().endswith(".csv"):
             raise HTTPException(status_code=400, detail="Only CSV files are supported")
         logging.info("Received CSV upload: %s (%d bytes)", file.filename, len(contents))
-        df = pd.read_csv(BytesIO(contents))
-        duedate = datetime.now().date() + timedelta(days=90)
+        if run_async:
+            try:
+                csv_text = contents.decode("utf-8")
+            except UnicodeDecodeError:
+                raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+            job = await submit_job(
+                conn,
+                IMPORT_ASSIGNMENT_CSV,
+                {"module_id": str(module_id), "csv": csv_text},
+                course_id=course_id,
+                created_by=actor.subject,
+            )
+            response.status_code = 202
+            return job
 
-        async with conn.transaction():
-            # assignment_id = await create_assignment(conn, data.module_id, data.assignment_title, data.due_date)
-            assignment_id = await create_assignment(conn, module_id=module_id, assignment_title="Default Assignment", description="Basic questions to demonstrate fundamental understanding of the topic", due_date=duedate)
-            await create_questions_and_options(conn, assignment_id, df)
-
-        return {
-            "assignment_id": assignment_id,
-            "module_id": module_id,
-            "title": "Default Assignment",
-            "due_date": duedate.strftime('%Y-%m-%d'),
-            "message": "Assignment and questions created successfully"
-        }
+        return await import_assignment_csv(conn, module_id, contents)
     except HTTPException:
         raise
     except Exception as e:
@@ -79,13 +84,18 @@ async def upload_csv(
 
 @router.delete("/modules/{module_id}/assignments/", response_model=dict)
 async def delete_assignment_endpoint(
+    response: Response,
     module_id: UUID = Path(..., title="The UUID of the module"),
+    run_async: bool = Query(False, alias="async"),
     actor: AuthenticatedActor = Depends(require_staff_actor),
     conn = Depends(get_db_connection),
 ):
     try:
         course_id = await get_course_id_for_module(conn, module_id)
         await require_course_staff_access(conn, actor, course_id)
+        if run_async:
+            response.status_code = 202
+            return await submit_job(conn, DELETE_MODULE_ASSIGNMENTS, {"module_id": str(module_id)}, course_id=course_id, created_by=actor.subject)
         result = await delete_assignment_and_related_questions(conn, module_id)
         return result
     except HTTPException:
@@ -128,7 +138,7 @@ async def create_assignment_endpoint(
 async def list_assignments_for_module(
     module_id: UUID,
     actor: AuthenticatedActor = Depends(require_authenticated_user),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     try:
         course_id = await get_course_id_for_module(conn, module_id)
@@ -2,7 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict
 from ....crud.courses import create_course, get_enrolled_students, get_courses, get_course_by_internal_url
 from ....schemas.schemas import CourseCreate
-from ....db.connection import get_db_connection
+from ....db.connection import get_db_connection, get_read_connection
+from ....core.responses import FastJSONResponse
 from ....core.auth import AuthenticatedActor, require_authenticated_user, require_staff_actor
 from ....core.rbac import require_course_read_access, require_course_staff_access
 
@@ -21,30 +22,30 @@ async def add_new_course(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error creating course: {str(e)}")
 
-@router.get("/courses/{course_id}/students", response_model=List[Dict])
+@router.get("/courses/{course_id}/students", response_model=None, response_class=FastJSONResponse)
 async def list_enrolled_students(
     course_id: int,
     actor: AuthenticatedActor = Depends(require_staff_actor),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     try:
         await require_course_staff_access(conn, actor, course_id)
         students = await get_enrolled_students(conn, course_id)
-        return students
+        return FastJSONResponse(students)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # List all the courses
-@router.get("/courses", response_model=List[Dict])
+@router.get("/courses", response_model=None, response_class=FastJSONResponse)
 async def list_courses(
     _actor: AuthenticatedActor = Depends(require_staff_actor),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     try:
         courses = await get_courses(conn)
-        return courses
+        return FastJSONResponse(courses)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
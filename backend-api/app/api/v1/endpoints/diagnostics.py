@@ -0,0 +1,44 @@
+import threading
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from ....core.auth import AuthenticatedActor, require_admin_or_service_actor
+from ....core.profiling import (
+    PROFILE_MAX_SECONDS,
+    ProfilerBusyError,
+    loop_watchdog,
+    render_folded,
+    sample_stacks,
+)
+
+router = APIRouter()
+
+# Sample stacks of this worker for a time window; output is folded stacks for flamegraph.pl / speedscope
+@router.get("/diagnostics/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    all_threads: bool = Query(False, description="Sample every thread, not only the event loop"),
+    actor: AuthenticatedActor = Depends(require_admin_or_service_actor),
+):
+    # Handlers run on the event loop thread, which is what we usually want to see.
+    thread_ids = None if all_threads else {threading.get_ident()}
+    try:
+        folded, samples = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000, thread_ids)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    return PlainTextResponse(render_folded(folded), headers={"X-Profile-Samples": str(samples)})
+
+# Most recent event loop stalls caught by the watchdog, newest first
+@router.get("/diagnostics/loop-stalls")
+async def get_loop_stalls(
+    actor: AuthenticatedActor = Depends(require_admin_or_service_actor),
+):
+    return {
+        "enabled": loop_watchdog.enabled,
+        "threshold_ms": loop_watchdog.threshold_seconds * 1000,
+        "total": loop_watchdog.stalls,
+        "recent": loop_watchdog.recent_stalls(),
+    }
@@ -0,0 +1,70 @@
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Depends, Path, Query
+from fastapi.responses import JSONResponse
+from typing import List, Dict, Any
+from uuid import UUID
+from ....schemas.schemas import ExperimentRunCreate
+from ....crud.experiment_runs import get_experiment_runs_for_module
+from ....db.connection import get_db_connection, get_read_connection
+from ....services.run_logger import experiment_run_logger
+from ....services.simulation import simulation_cache, simulation_cache_key
+from ....core.responses import FastJSONResponse
+from ....core.auth import AuthenticatedActor, require_authenticated_user, require_staff_actor
+from ....core.rbac import get_course_id_for_module, get_student_id_for_actor, require_course_read_access, require_course_staff_access
+
+router = APIRouter()
+
+# Record an experiment run; the write is buffered and batched off the request path
+@router.post("/modules/{module_id}/experiment-runs", status_code=202)
+async def record_experiment_run(
+    run: ExperimentRunCreate,
+    module_id: UUID = Path(..., title="The ID of the module"),
+    actor: AuthenticatedActor = Depends(require_authenticated_user),
+    conn = Depends(get_db_connection),
+):
+    try:
+        course_id = await get_course_id_for_module(conn, module_id)
+        await require_course_read_access(conn, actor, course_id)
+        student_id = await get_student_id_for_actor(conn, actor) if actor.is_student else None
+        metrics = run.metrics
+        if metrics is None and run.model:
+            # Reuse server-side metrics only if the run was already simulated here.
+            cached = simulation_cache.get(simulation_cache_key(run.model, run.parameters))
+            metrics = cached.metrics if cached is not None else None
+        accepted = experiment_run_logger.record((
+            module_id,
+            student_id,
+            run.model,
+            json.dumps(run.parameters),
+            json.dumps(metrics) if metrics is not None else None,
+            datetime.now(timezone.utc),
+        ))
+        if not accepted:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Experiment run log is busy, try again later"},
+                headers={"Retry-After": "5"},
+            )
+        return {"status": "accepted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+# List recent experiment runs for a module (staff only)
+@router.get("/modules/{module_id}/experiment-runs", response_model=None, response_class=FastJSONResponse)
+async def list_experiment_runs(
+    module_id: UUID = Path(..., title="The ID of the module"),
+    limit: int = Query(500, ge=1, le=5000),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_read_connection),
+):
+    try:
+        course_id = await get_course_id_for_module(conn, module_id)
+        await require_course_staff_access(conn, actor, course_id)
+        return FastJSONResponse(await get_experiment_runs_for_module(conn, module_id, limit))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Depends, Path
+from typing import Dict, Any
+from ....crud.jobs import get_job
+from ....db.connection import get_db_connection
+from ....core.auth import AuthenticatedActor, require_staff_actor
+from ....core.rbac import require_course_staff_access
+
+router = APIRouter()
+
+# Status, progress and result of a background job started with ?async=true.
+# Read from the primary: a job's progress changes every few seconds.
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def read_job(
+    job_id: int = Path(..., title="The ID of the job"),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_db_connection),
+):
+    try:
+        job = await get_job(conn, job_id)
+        if job["course_id"] is not None:
+            await require_course_staff_access(conn, actor, job["course_id"])
+        elif not (actor.is_admin or actor.is_service or job["created_by"] == actor.subject):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        return job
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
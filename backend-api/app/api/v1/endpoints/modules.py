@@ -1,51 +1,48 @@
-from fastapi import APIRouter, HTTPException, Depends, Path, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Path, UploadFile, File, Form
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
-import openai
-from openai import AsyncOpenAI
 import asyncio
-from typing import List, Dict
+import json
+import logging
+from typing import List, Dict, Optional
 from ....schemas.schemas import ModuleCreate, ModuleInDBBase
-from ....crud.modules import create_module, get_modules_for_course, get_module_by_id, get_module_assignments, update_module, delete_module, get_questions_and_options_by_module
-from ....db.connection import get_db_connection
+from ....crud.modules import create_module, get_modules_for_course, get_module_by_id, get_module_assignments, update_module, delete_module, get_questions_and_options_by_module, get_module_config_version, get_module_experiment_config, set_module_experiment_config, refresh_experiment_config_for_path
+from ....db.connection import get_db_connection, get_read_connection
 from ....storage.local_storage import get_local_storage
+from ....services.experiment_config import (
+    ExperimentConfigError,
+    experiment_config_cache,
+    is_experiment_config,
+    load_experiment_config,
+    normalize_experiment_config,
+    serialize_experiment_config,
+)
+from ....services.generation import GenerationBusyError, GenerationTimeoutError, generate, prefill_module, stream_generation
+from ....core.responses import FastJSONResponse
 from ....core.auth import AuthenticatedActor, require_authenticated_user, require_staff_actor
 from ....core.rbac import get_course_id_for_module, require_course_read_access, require_course_staff_access
-import random
 import os
 from pathlib import PurePosixPath
 
 router = APIRouter()
+logger = logging.getLogger("myapp")
 MAX_CONTENT_UPLOAD_BYTES = int(os.getenv("MAX_CONTENT_UPLOAD_BYTES", "26214400"))
 ALLOWED_CONTENT_EXTENSIONS = {".md", ".json", ".js", ".glb", ".gltf", ".png", ".jpg", ".jpeg", ".pdf", ".csv"}
 
-# Initialize the asynchronous OpenAI client from environment variable
-async_openai_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY", ""))
-
-async def rephrase_text_with_openai(text: str) -> str:
-    list_of_prompts = ["analogy", "example", "metaphor", "simile"]
-    chat_completion = await async_openai_client.chat.completions.create(
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": f"Add some {random.choice(list_of_prompts)} related to every day world that a young person living in Singapore can relate to, and then rewrite this in a different way: \"{text}\". Keep it between 500-700 characters max."}
-        ],
-        model="gpt-3.5-turbo",  # Use an appropriate model
-    )
-    # Assuming the response structure, adjust if necessary based on the actual response
-    response_message = chat_completion.choices[0].message.content.strip() if chat_completion.choices else "Could not generate alternative text."
-    return response_message
-
-async def fun_fact_finding_with_openai(text: str) -> str:
-    list_of_prompts = ["Who invented discovered the concept", "The origin story", "Make it relevant to Singapore and tell something ", "Do you something about the worlds largest or smallest example", "Tell something interesting", "From when did people start using"]
-    chat_completion = await async_openai_client.chat.completions.create(
-        messages=[
-            {"role": "system", "content": "You are a professor teaching undergraduate electrical engineering students."},
-            {"role": "user", "content": f"{random.choice(list_of_prompts)} about \"{text}\". Keep it under 600 characters."}
-        ],
-        model="gpt-3.5-turbo",  # Use an appropriate model
-    )
-    # Assuming the response structure, adjust if necessary based on the actual response
-    response_message = chat_completion.choices[0].message.content.strip() if chat_completion.choices else "Could not generate fun fact."
-    return response_message
+
+def _storage_bucket_name() -> str:
+    return os.environ.get("STORAGE_BUCKET_NAME", "align-hvl-2024-release1")
+
+
+async def _validated_experiment_config(config_path: Optional[str]) -> Optional[str]:
+    """Validate the module's experiment config and return its compact normalized JSON."""
+    if not config_path:
+        return None
+    # Reads the config and stats its compute script: keep the file I/O off the event loop.
+    config = await run_in_threadpool(load_experiment_config, get_local_storage(), _storage_bucket_name(), config_path)
+    return serialize_experiment_config(config)
 
 @router.post("/rephrase/")
 async def rephrase(
@@ -53,9 +50,12 @@ async def rephrase(
     _actor: AuthenticatedActor = Depends(require_authenticated_user),
 ):
     try:
-        # Since FastAPI supports asynchronous functions, you can await the rephrasing function directly
-        rephrased_text = await rephrase_text_with_openai(text)
+        rephrased_text = await generate("rephrase", text)
         return {"rephrased_text": rephrased_text}
+    except GenerationBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except GenerationTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -66,9 +66,85 @@ async def funfact(
     _actor: AuthenticatedActor = Depends(require_authenticated_user),
 ):
     try:
-        # Since FastAPI supports asynchronous functions, you can await the fun fact function directly
-        fun_fact = await fun_fact_finding_with_openai(text)
+        fun_fact = await generate("funfact", text)
         return {"fun_fact": fun_fact}
+    except GenerationBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except GenerationTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _generation_event_stream(template_name: str, text: str) -> StreamingResponse:
+    """Server-sent events relaying generated text as it arrives.
+
+    Each ``data`` event carries ``{"text": piece}``; the stream ends with a
+    ``done`` event, or an ``error`` event if the upstream call fails midway.
+    The first piece is awaited here so a full queue is still reported as 503
+    and an upstream timeout before the first token as 504.
+    """
+    pieces = stream_generation(template_name, text)
+    try:
+        first = await pieces.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except GenerationBusyError as e:
+        await pieces.aclose()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except GenerationTimeoutError as e:
+        await pieces.aclose()
+        raise HTTPException(status_code=504, detail=str(e))
+
+    async def relay():
+        try:
+            if first is not None:
+                yield _sse_event({"text": first})
+            async for piece in pieces:
+                yield _sse_event({"text": piece})
+            yield _sse_event({}, event="done")
+        except Exception:
+            logger.exception("Streaming %s generation failed", template_name)
+            yield _sse_event({"detail": "Generation failed"}, event="error")
+        finally:
+            await pieces.aclose()
+
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Closes the upstream stream even if the response never starts iterating.
+        background=BackgroundTask(pieces.aclose),
+    )
+
+
+@router.post("/rephrase/stream")
+async def rephrase_stream(
+    text: str,
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    try:
+        return await _generation_event_stream("rephrase", text)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/funfact/stream")
+async def funfact_stream(
+    text: str,
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    try:
+        return await _generation_event_stream("funfact", text)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -78,28 +154,34 @@ async def funfact(
 async def add_new_module(
     course_id: int,
     module: ModuleCreate,
+    background_tasks: BackgroundTasks,
     actor: AuthenticatedActor = Depends(require_staff_actor),
     conn = Depends(get_db_connection),
 ):
     try:
         await require_course_staff_access(conn, actor, course_id)
-        return await create_module(conn, course_id, module)
+        experiment_config = await _validated_experiment_config(module.plottingexperimentconfig)
+        created_module = await create_module(conn, course_id, module, experiment_config)
+        background_tasks.add_task(prefill_module, module)
+        return created_module
     except HTTPException:
         raise
+    except ExperimentConfigError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid experiment config: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error creating module: {str(e)}")
 
 # Endpoint to list all the modules for a course
-@router.get("/courses/{course_id}/modules", response_model=List[Dict])
+@router.get("/courses/{course_id}/modules", response_model=None, response_class=FastJSONResponse)
 async def list_modules_for_course(
     course_id: int,
     actor: AuthenticatedActor = Depends(require_authenticated_user),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     try:
         await require_course_read_access(conn, actor, course_id)
         modules = await get_modules_for_course(conn, course_id)
-        return modules
+        return FastJSONResponse(modules)
     except HTTPException:
         raise
     except Exception as e:
@@ -129,16 +211,21 @@ async def read_module(
 async def update_module_endpoint(
     module_id: UUID,
     module: ModuleCreate,
+    background_tasks: BackgroundTasks,
     actor: AuthenticatedActor = Depends(require_staff_actor),
     conn = Depends(get_db_connection),
 ):
     try:
         course_id = await get_course_id_for_module(conn, module_id)
         await require_course_staff_access(conn, actor, course_id)
-        updated_module = await update_module(conn, module_id, module)
+        experiment_config = await _validated_experiment_config(module.plottingexperimentconfig)
+        updated_module = await update_module(conn, module_id, module, experiment_config)
+        background_tasks.add_task(prefill_module, module)
         return updated_module
     except HTTPException:
         raise
+    except ExperimentConfigError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid experiment config: {str(e)}")
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -163,8 +250,41 @@ async def delete_module_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+# Endpoint to get the validated experiment config for a module
+@router.get("/modules/{module_id}/experiment-config")
+async def read_module_experiment_config(
+    module_id: UUID = Path(..., title="The ID of the module"),
+    actor: AuthenticatedActor = Depends(require_authenticated_user),
+    conn = Depends(get_db_connection),
+):
+    try:
+        module = await get_module_config_version(conn, module_id)
+        await require_course_read_access(conn, actor, module["course_id"])
+        cache_key = (str(module_id), module["version"])
+        config_json = experiment_config_cache.get(cache_key)
+        if config_json is None:
+            row = await get_module_experiment_config(conn, module_id)
+            config_json = row["experiment_config"] if row else None
+            if config_json is None and row and row["plottingexperimentconfig"]:
+                # Modules saved before configs were validated are checked once
+                # and backfilled on first read.
+                config_json = await _validated_experiment_config(row["plottingexperimentconfig"])
+                await set_module_experiment_config(conn, module_id, config_json)
+            if config_json is None:
+                raise HTTPException(status_code=404, detail="Module has no experiment config")
+            experiment_config_cache.set(cache_key, config_json)
+        return Response(content=config_json, media_type="application/json")
+    except HTTPException:
+        raise
+    except ExperimentConfigError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid experiment config: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
 # Endpoint to get all the assignments and their Q&A for a module
-@router.get("/modules/{module_id}/assignments", response_model=List[Dict])
+@router.get("/modules/{module_id}/assignments", response_model=None, response_class=FastJSONResponse)
 async def get_questions_endpoint(
     module_id: UUID = Path(..., title="The UUID of the module to retrieve questions for"),
     actor: AuthenticatedActor = Depends(require_authenticated_user),
@@ -174,7 +294,7 @@ async def get_questions_endpoint(
         course_id = await get_course_id_for_module(conn, module_id)
         await require_course_read_access(conn, actor, course_id)
         questions_and_options = await get_questions_and_options_by_module(conn, module_id)
-        return questions_and_options
+        return FastJSONResponse(questions_and_options)
     except HTTPException:
         raise
     except Exception as e:
@@ -187,6 +307,7 @@ async def upload_content_file(
     file: UploadFile = File(...),
     folder: str = Form(...),
     _actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_db_connection),
 ):
     try:
         safe_folder = PurePosixPath(folder.replace("\\", "/"))
@@ -197,14 +318,28 @@ async def upload_content_file(
         if not safe_name or suffix not in ALLOWED_CONTENT_EXTENSIONS:
             raise HTTPException(status_code=400, detail="Unsupported file type")
         storage = get_local_storage()
-        bucket_name = os.environ.get("STORAGE_BUCKET_NAME", "align-hvl-2024-release1")
+        bucket_name = _storage_bucket_name()
         file_data = await file.read()
         if len(file_data) > MAX_CONTENT_UPLOAD_BYTES:
             raise HTTPException(status_code=413, detail="File too large")
         blob_name = f"{safe_folder.as_posix().strip('/')}/{safe_name}"
+        config_json = None
+        if is_experiment_config(safe_name):
+            config = await run_in_threadpool(
+                normalize_experiment_config,
+                file_data,
+                lambda compute: storage.file_exists(bucket_name, compute),
+            )
+            config_json = serialize_experiment_config(config)
         storage.upload_file(bucket_name, blob_name, file_data)
+        if config_json is not None:
+            # Keep modules that already point at this config in step with the
+            # new file; the update bumps their row version and so their cache key.
+            await refresh_experiment_config_for_path(conn, blob_name, config_json)
         return {"path": blob_name, "filename": file.filename}
     except HTTPException:
         raise
+    except ExperimentConfigError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid experiment config: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
@@ -1,16 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends, Path, Body
-from typing import List, Dict, Any, Optional
-from ....schemas.schemas import QuestionCreate
-from ....crud.questions import create_question, get_questions_for_assignment
+from typing import List, Dict, Any
+from ....schemas.schemas import QuestionCreate, QuestionBatchCreate
+from ....crud.questions import create_question, create_questions, get_questions_for_assignment
+from ....db.connection import get_db_connection
 from ....core.auth import AuthenticatedActor, require_staff_actor
+from ....core.rbac import get_course_id_for_assignment, require_course_staff_access
 
 router = APIRouter()
 
-@router.post("/assignments/{assignment_id}/questions", response_model=dict)
-def create_question_endpoint(
+@router.post("/assignments/{assignment_id}/questions", response_model=Dict[str, Any])
+async def create_question_endpoint(
     assignment_id: int = Path(..., description="The ID of the assignment"),
     question_data: QuestionCreate = Body(...),
-    _actor: AuthenticatedActor = Depends(require_staff_actor),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_db_connection),
 ):
     if question_data.assignment_id != assignment_id:
         raise HTTPException(
@@ -18,7 +21,51 @@ def create_question_endpoint(
             detail=f"Mismatched assignment_id: {question_data.assignment_id} in body, {assignment_id} in path"
         )
     try:
-        # Pass the `question_data` to your `create_question` function
-        return create_question(question=question_data)
+        course_id = await get_course_id_for_assignment(conn, assignment_id)
+        await require_course_staff_access(conn, actor, course_id)
+        question = await create_question(conn, question_data)
+        return question
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating question: {str(e)}")
+
+
+# Create all questions of a quiz in one request, as saved by the module editor
+@router.post("/assignments/{assignment_id}/questions/batch", response_model=List[Dict[str, Any]])
+async def create_questions_batch_endpoint(
+    assignment_id: int = Path(..., description="The ID of the assignment"),
+    batch: QuestionBatchCreate = Body(...),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_db_connection),
+):
+    try:
+        course_id = await get_course_id_for_assignment(conn, assignment_id)
+        await require_course_staff_access(conn, actor, course_id)
+        questions = await create_questions(conn, assignment_id, batch.questions)
+        return questions
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating questions: {str(e)}")
+
+
+# Questions with their options and correct answers, for authoring
+@router.get("/assignments/{assignment_id}/questions", response_model=List[Dict[str, Any]])
+async def read_assignment_questions(
+    assignment_id: int = Path(..., description="The ID of the assignment"),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_db_connection),
+):
+    try:
+        course_id = await get_course_id_for_assignment(conn, assignment_id)
+        await require_course_staff_access(conn, actor, course_id)
+        return await get_questions_for_assignment(conn, assignment_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,11 +1,27 @@
-from fastapi import APIRouter, HTTPException, Path, Body, Depends
+from fastapi import APIRouter, HTTPException, Path, Body, Depends, Query, Response, WebSocket
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect, WebSocketState
 from typing import List, Dict, Any, Optional
 from ....schemas.schemas import ResponseCreate
-from ....crud.responses import create_student_response, get_student_assignments_responses, get_course_student_results
+from ....crud.grading import get_course_gradebook
+from ....crud.responses import (
+    get_assignment_analysis_version,
+    get_assignment_item_bank,
+    get_assignment_response_arrays,
+    get_course_student_results,
+    get_student_assignments_responses,
+)
+from ....services.grading import save_graded_response
+from ....services.job_handlers import REGRADE_ASSIGNMENT, regrade_and_notify
+from ....services.jobs import submit_job
+from ....services.item_analysis import compute_item_analysis, item_analysis_cache
+from ....services.live_results import receive_auth_token, results_hub
+from ....core.responses import FastJSONResponse
 from uuid import UUID
-from ....db.connection import get_db_connection
-from ....core.auth import AuthenticatedActor, require_authenticated_user, require_staff_actor
+from ....db.connection import DBConnection, get_db_connection, get_read_connection
+from ....core.auth import AuthenticatedActor, get_authenticated_actor, require_authenticated_user, require_staff_actor
 from ....core.rbac import (
+    get_course_id_for_assignment,
     get_course_id_for_question,
     require_course_staff_access,
     require_student_id_access,
@@ -32,7 +48,7 @@ async def save_student_response(
             student_id,
             course_id,
         )
-        response = await create_student_response(conn, resolved_student_id, question_id, response_text)
+        response = await save_graded_response(conn, resolved_student_id, question_id, response_text, course_id)
         return response
     except HTTPException:
         raise
@@ -40,16 +56,16 @@ async def save_student_response(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     
 
-@router.get("/courses/{course_id}/student-results", response_model=List[Dict[str, Any]])
+@router.get("/courses/{course_id}/student-results", response_model=None, response_class=FastJSONResponse)
 async def read_course_student_results(
     course_id: int = Path(..., title="The ID of the course"),
     actor: AuthenticatedActor = Depends(require_staff_actor),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     try:
         await require_course_staff_access(conn, actor, course_id)
         results = await get_course_student_results(conn, course_id)
-        return results
+        return FastJSONResponse(results)
     except HTTPException:
         raise
     except Exception as e:
@@ -60,7 +76,7 @@ async def read_course_student_results(
 async def read_student_assignments_responses(
     student_id: int = Path(..., title="The ID of the student"),
     actor: AuthenticatedActor = Depends(require_authenticated_user),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     try:
         await require_student_id_access(conn, actor, student_id)
@@ -72,3 +88,116 @@ async def read_student_assignments_responses(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+# Difficulty, discrimination, distractor and reliability statistics for an assignment's quiz
+@router.get("/assignments/{assignment_id}/item-analysis", response_model=None, response_class=FastJSONResponse)
+async def read_assignment_item_analysis(
+    assignment_id: int = Path(..., title="The ID of the assignment"),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_read_connection),
+):
+    try:
+        assignment = await get_assignment_analysis_version(conn, assignment_id)
+        await require_course_staff_access(conn, actor, assignment["course_id"])
+        cache_key = (assignment_id, assignment["version"])
+        report = item_analysis_cache.get(cache_key)
+        if report is None:
+            item_bank = await get_assignment_item_bank(conn, assignment_id)
+            arrays = await get_assignment_response_arrays(conn, assignment_id)
+            report = await run_in_threadpool(
+                compute_item_analysis,
+                assignment_id,
+                item_bank,
+                arrays["student_ids"],
+                arrays["question_ids"],
+                arrays["option_ids"],
+            )
+            item_analysis_cache.set(cache_key, report)
+        return FastJSONResponse(report)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+# Per-assignment totals of every student, maintained as responses are graded
+@router.get("/courses/{course_id}/gradebook", response_model=None, response_class=FastJSONResponse)
+async def read_course_gradebook(
+    course_id: int = Path(..., title="The ID of the course"),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_read_connection),
+):
+    try:
+        await require_course_staff_access(conn, actor, course_id)
+        gradebook = await get_course_gradebook(conn, course_id)
+        return FastJSONResponse(gradebook)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+# Re-score every response of an assignment under its current keys
+@router.post("/assignments/{assignment_id}/regrade", response_model=Dict[str, Any])
+async def regrade_assignment_endpoint(
+    response: Response,
+    assignment_id: int = Path(..., title="The ID of the assignment"),
+    run_async: bool = Query(False, alias="async"),
+    actor: AuthenticatedActor = Depends(require_staff_actor),
+    conn = Depends(get_db_connection),
+):
+    try:
+        course_id = await get_course_id_for_assignment(conn, assignment_id)
+        await require_course_staff_access(conn, actor, course_id)
+        if run_async:
+            response.status_code = 202
+            return await submit_job(
+                conn,
+                REGRADE_ASSIGNMENT,
+                {"assignment_id": assignment_id, "course_id": course_id},
+                course_id=course_id,
+                created_by=actor.subject,
+            )
+        return await regrade_and_notify(conn, assignment_id, course_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+# Browsers cannot set headers on a WebSocket handshake, and a token in the
+# query string ends up in access logs, so the client sends the bearer token as
+# its first message (see receive_auth_token). The course check borrows a pool
+# connection only while authenticating; the open socket holds none.
+@router.websocket("/courses/{course_id}/results/live")
+async def live_course_results(
+    websocket: WebSocket,
+    course_id: int = Path(..., title="The ID of the course"),
+):
+    await websocket.accept()
+    try:
+        token = await receive_auth_token(websocket)
+        if token is None:
+            raise HTTPException(status_code=401, detail="Missing auth message")
+        actor = await get_authenticated_actor(authorization=f"Bearer {token}", x_service_token=None)
+        if not actor.has_any_role("teacher", "admin", "service"):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        async with DBConnection() as conn:
+            await require_course_staff_access(conn, actor, course_id)
+    except WebSocketDisconnect:
+        return
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    except Exception:
+        await websocket.close(code=1011)
+        return
+    try:
+        await results_hub.serve(websocket, course_id)
+    except Exception:
+        # Typically the LISTEN connection could not be opened.
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=1011)
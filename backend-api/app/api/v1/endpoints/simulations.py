@@ -0,0 +1,98 @@
+import json
+from fastapi import APIRouter, HTTPException, Depends, Path, Body
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from typing import Dict
+from ....schemas.schemas import SimulationRequest
+from ....services.simulation import (
+    SIMULATION_MODELS,
+    SimulationError,
+    SimulationResult,
+    simulate,
+    simulation_cache,
+    simulation_cache_key,
+)
+from ....services.downsampling import FLOAT32_LAYOUT, FLOAT32_MEDIA_TYPE, encode_float32, lttb
+from ....core.auth import AuthenticatedActor, require_authenticated_user
+
+router = APIRouter()
+
+
+async def _cached_simulation(model_name: str, parameters: Dict[str, float]) -> SimulationResult:
+    if model_name not in SIMULATION_MODELS:
+        raise HTTPException(status_code=404, detail="Simulation model not found")
+    key = simulation_cache_key(model_name, parameters)
+    result = simulation_cache.get(key)
+    if result is None:
+        try:
+            result = await run_in_threadpool(simulate, model_name, parameters)
+        except SimulationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        simulation_cache.set(key, result)
+    return result
+
+
+# List the experiment models that can be simulated server-side
+@router.get("/simulations")
+async def list_simulation_models(
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    return [{"model": model.name, "compute": model.compute} for model in SIMULATION_MODELS.values()]
+
+
+# Run an experiment model, optionally downsampled and/or as packed float32
+@router.post("/simulations/{model_name}")
+async def run_simulation_endpoint(
+    request: SimulationRequest,
+    model_name: str = Path(..., title="The simulation model to run"),
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    try:
+        result = await _cached_simulation(model_name, request.parameters)
+        x, y = result.x, result.y
+        if request.max_points:
+            x, y = await run_in_threadpool(lttb, x, y, request.max_points)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    if request.format == "float32":
+        try:
+            content = encode_float32(x, y)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Response(
+            content=content,
+            media_type=FLOAT32_MEDIA_TYPE,
+            headers={
+                "X-Simulation-Points": str(len(x)),
+                "X-Simulation-Original-Points": str(len(result.x)),
+                "X-Simulation-Layout": FLOAT32_LAYOUT,
+                "X-Simulation-Metrics": json.dumps(result.metrics),
+            },
+        )
+    return {
+        "model": model_name,
+        "points": len(x),
+        "original_points": len(result.x),
+        "metrics": result.metrics,
+        "x": x.tolist(),
+        "y": y.tolist(),
+    }
+
+
+# Derived waveform metrics only, e.g. for checking lab answers
+@router.post("/simulations/{model_name}/metrics")
+async def read_simulation_metrics(
+    model_name: str = Path(..., title="The simulation model to run"),
+    parameters: Dict[str, float] = Body(..., embed=True),
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    try:
+        result = await _cached_simulation(model_name, parameters)
+        return {"model": model_name, "metrics": result.metrics}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException, Body, Depends, Path, Query
+from fastapi import APIRouter, HTTPException, Body, Depends, Path, Query, Response
 from fastapi.responses import FileResponse
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from asyncpg import Connection
 from datetime import timedelta
 import os
@@ -9,7 +9,9 @@ from ....storage.local_storage import get_local_storage
 from ....crud.students import get_students, create_student, get_number_of_logins_by_email, delete_student_by_email, enroll_students_in_course,  get_courses_for_student, unenroll_students_from_course, update_student_login_info, get_student_by_email, get_student_id_by_email
 from ....core.auth import AuthenticatedActor, get_optional_authenticated_actor, require_authenticated_user, require_service_token, require_staff_actor
 from ....core.rbac import require_student_email_access
-from ....db.connection import get_db_connection
+from ....db.connection import get_db_connection, get_read_connection
+from ....services.jobs import submit_job
+from ....services.job_handlers import ENROLL_STUDENTS
 router = APIRouter()
 
 # Test CORS endpoint
@@ -80,7 +82,7 @@ def user_has_role(token_payload: dict, roles: list) -> bool:
 @router.get("/students/", response_model=List[Dict[str, Any]])
 async def read_students(
     _actor: AuthenticatedActor = Depends(require_staff_actor),
-    conn = Depends(get_db_connection),
+    conn = Depends(get_read_connection),
 ):
     students = await get_students(conn)
     if not students:
@@ -166,15 +168,21 @@ async def unenroll_students_from_course_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-# Enroll students in a course by their email address
-@router.post("/enroll-in-course/{course_id}/enroll/", response_model=List[Dict[str, Any]])
+# Enroll students in a course by their email address. With ?async=true a long
+# roster is enrolled by a background job: the response is 202 with the job.
+@router.post("/enroll-in-course/{course_id}/enroll/", response_model=Union[List[Dict[str, Any]], Dict[str, Any]])
 async def enroll_students_in_course_endpoint(
     course_id: int,
     emails: List[str],
+    response: Response,
+    run_async: bool = Query(False, alias="async"),
     conn: Connection = Depends(get_db_connection),
     _service=Depends(require_service_token),
 ):
     try:
+        if run_async:
+            response.status_code = 202
+            return await submit_job(conn, ENROLL_STUDENTS, {"course_id": course_id, "emails": emails}, course_id=course_id, created_by=_service["sub"])
         enrolled_students = await enroll_students_in_course(conn, course_id, emails)
         return enrolled_students
     except Exception as e:
@@ -185,7 +193,7 @@ async def enroll_students_in_course_endpoint(
 async def get_courses_for_student_endpoint(
     email: str,
     actor: AuthenticatedActor = Depends(require_authenticated_user),
-    conn: Connection = Depends(get_db_connection),
+    conn: Connection = Depends(get_read_connection),
 ):
     await require_student_email_access(conn, actor, email)
     try:
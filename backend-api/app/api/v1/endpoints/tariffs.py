@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from ....schemas.schemas import TariffBillRequest
+from ....services.tariffs import TariffTable, get_tariff_table
+from ....core.auth import AuthenticatedActor, require_authenticated_user
+from ....core.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+def _table() -> TariffTable:
+    table = get_tariff_table()
+    if table is None:
+        raise HTTPException(status_code=503, detail="Tariff data is not loaded")
+    return table
+
+
+# List DISCOM tariffs, filtered by state, DISCOM and/or sector (case-insensitive)
+@router.get("/tariffs")
+async def list_tariffs(
+    state: Optional[str] = Query(None),
+    discom: Optional[str] = Query(None),
+    sector: Optional[str] = Query(None),
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    table = _table()
+    return FastJSONResponse(table.records(table.find(state, discom, sector)))
+
+
+# States, DISCOMs and sectors present in the tariff table, for lab pickers
+@router.get("/tariffs/facets")
+async def list_tariff_facets(
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    table = _table()
+    return FastJSONResponse({column: table.values(column) for column in ("state", "discom", "sector")})
+
+
+# Price many consumption profiles in one call; the response is columnar, one
+# entry per profile in each array.
+@router.post("/tariffs/bills")
+async def calculate_tariff_bills(
+    request: TariffBillRequest,
+    _actor: AuthenticatedActor = Depends(require_authenticated_user),
+):
+    table = _table()
+    try:
+        bills = table.bills(
+            request.tariff_ids,
+            request.energy_kwh,
+            request.load_kw if request.load_kw is not None else 0.0,
+            months=request.months,
+            power_factor=request.power_factor,
+        )
+        return FastJSONResponse({"count": len(bills["total"]), **bills})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -6,11 +6,8 @@ from typing import Any
 from fastapi import Depends, Header, HTTPException, Security
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt, jwk
-import requests
 from jose.utils import base64url_decode
 from starlette.status import HTTP_403_FORBIDDEN
-from cryptography.x509 import load_pem_x509_certificate
-from cryptography.hazmat.backends import default_backend
 
 # Optional Auth0 compatibility. Prefer environment configuration in all deployments.
 AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN", "")
@@ -225,6 +222,8 @@ def fetch_auth0_public_key(auth0_domain):
     if not auth0_domain:
         raise HTTPException(status_code=HTTP_403_FORBIDDEN, detail="Auth0 domain is not configured")
     jwks_uri = f"https://{auth0_domain}/.well-known/jwks.json"
+    import requests
+
     jwks = requests.get(jwks_uri).json()
     key_data = jwks['keys'][0]  # Assuming you want the first key
 
@@ -267,6 +266,8 @@ def get_rsa_key(token):
         raise Exception('Auth0 domain is not configured')
     # Obtain the JWKS from Auth0's endpoint
     jwks_url = f'https://{AUTH0_DOMAIN}/.well-known/jwks.json'
+    import requests
+
     jwks = requests.get(jwks_url).json()
 
     # Decode the JWT header
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_named_caches: "weakref.WeakValueDictionary[str, TTLCache]" = weakref.WeakValueDictionary()
+
+
+def named_caches() -> dict[str, "TTLCache"]:
+    """Caches created with a ``name``, for metrics."""
+    return dict(_named_caches)
+
+
+class TTLCache:
+    """Small in-process LRU cache with a per-entry time-to-live.
+
+    Each gunicorn worker holds its own instance, so entries must be safe to
+    serve slightly stale until ``ttl_seconds`` elapses or the owning code
+    path invalidates them.
+
+    With ``maxbytes`` (and a ``sizeof`` callable) the cache is also bounded by
+    the total size of its values; a value larger than ``maxbytes`` is not
+    cached at all.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: float = 300.0,
+        name: str | None = None,
+        maxbytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ):
+        if maxbytes is not None and sizeof is None:
+            raise ValueError("maxbytes needs a sizeof callable")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        if name is not None:
+            _named_caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self.pop(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        self.pop(key)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value, size)
+        self.bytes += size
+        while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+
+    def pop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,316 @@
+"""Request, database and runtime metrics rendered in Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request under its route template
+(``/api/v1/modules/{module_id}``, never the concrete path) and adds a
+``Server-Timing`` header with total and database time. Database time comes
+from ``app.db.instrumentation.InstrumentedConnection``, which reports every
+query to ``record_query`` and logs the normalized SQL of queries slower than
+``SLOW_QUERY_THRESHOLD_MS``.
+
+Metrics live in process memory, so with several gunicorn workers each
+``/metrics`` scrape describes the worker that answered it.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import named_caches
+
+logger = logging.getLogger("myapp")
+
+ENABLE_METRICS = os.getenv("ENABLE_METRICS", "false").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: Iterable[float] = REQUEST_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_number(cumulative)}")
+        return lines
+
+
+@dataclass
+class GaugeCallback:
+    """A metric whose samples are read from live objects when ``/metrics`` is scraped."""
+    name: str
+    documentation: str
+    collect: Callable[[], Iterable[tuple[dict[str, str], float]]]
+    kind: str = "gauge"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.collect():
+            names = tuple(labels)
+            lines.append(f"{self.name}{_labels(names, tuple(labels[n] for n in names))} {_number(value)}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request duration by route template.", ("method", "route", "status")
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request.", ("route",), QUERY_COUNT_BUCKETS
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Database query duration by statement type.", ("operation",), QUERY_BUCKETS
+)
+db_slow_queries = Counter("db_slow_queries_total", "Queries slower than SLOW_QUERY_THRESHOLD_MS.", ("operation",))
+event_loop_lag = Histogram("event_loop_lag_seconds", "Event loop scheduling delay.", (), LAG_BUCKETS)
+
+_gauges: list[GaugeCallback] = []
+
+
+def register_gauge(
+    name: str,
+    documentation: str,
+    collect: Callable[[], Iterable[tuple[dict[str, str], float]]],
+    kind: str = "gauge",
+) -> None:
+    _gauges.append(GaugeCallback(name, documentation, collect, kind))
+
+
+# ---------------------------------------------------------------------------
+# Per-request database accounting
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+
+_SQL_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_SQL_SPACE = re.compile(r"\s+")
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[RequestStats]:
+    """Count queries issued in this context, e.g. by a benchmark outside any request."""
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def normalize_sql(query: str, limit: int = 1000) -> str:
+    """Collapse whitespace and replace literals with ``?`` so similar queries group together."""
+    query = _SQL_COMMENT.sub(" ", query)
+    query = _SQL_STRING.sub("?", query)
+    query = _SQL_NUMBER.sub("?", query)
+    query = _SQL_SPACE.sub(" ", query).strip()
+    return query if len(query) <= limit else query[:limit] + "..."
+
+
+def _operation(query: str) -> str:
+    match = re.match(r"\s*(?:--[^\n]*\s*)*(\w+)", query)
+    return match.group(1).upper() if match else "UNKNOWN"
+
+
+def record_query(query: str, seconds: float) -> None:
+    operation = _operation(query)
+    db_query_duration.observe(seconds, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+    if seconds * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        db_slow_queries.inc(1, operation)
+        logger.warning("Slow query (%.1f ms): %s", seconds * 1000, normalize_sql(query))
+
+
+# ---------------------------------------------------------------------------
+# HTTP middleware
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'app;dur={elapsed_ms:.1f}, '
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = _route_label(scope)
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            http_request_db_queries.observe(stats.queries, route)
+            _request_stats.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# Event loop lag
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up; sustained lag means blocking code on the loop."""
+
+    def __init__(self, interval_seconds: float = 0.5):
+        self.interval_seconds = interval_seconds
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(loop.time() - started - self.interval_seconds, 0.0)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            event_loop_lag.observe(lag)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor(float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5")))
+
+register_gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample.", lambda: [({}, loop_lag_monitor.last_lag)])
+register_gauge("event_loop_lag_max_seconds", "Largest event loop lag seen by this worker.", lambda: [({}, loop_lag_monitor.max_lag)])
+
+
+def _cache_samples(attribute: str) -> list[tuple[dict[str, str], float]]:
+    return [({"cache": name}, float(getattr(cache, attribute))) for name, cache in sorted(named_caches().items())]
+
+
+def _cache_hit_ratio() -> list[tuple[dict[str, str], float]]:
+    samples = []
+    for name, cache in sorted(named_caches().items()):
+        lookups = cache.hits + cache.misses
+        samples.append(({"cache": name}, cache.hits / lookups if lookups else 0.0))
+    return samples
+
+
+register_gauge("cache_hits_total", "In-process cache hits.", lambda: _cache_samples("hits"), kind="counter")
+register_gauge("cache_misses_total", "In-process cache misses.", lambda: _cache_samples("misses"), kind="counter")
+register_gauge("cache_entries", "Entries currently held by each in-process cache.", lambda: [
+    ({"cache": name}, float(len(cache))) for name, cache in sorted(named_caches().items())
+])
+register_gauge("cache_bytes", "Size of the values held by each byte-bounded in-process cache.", lambda: [
+    ({"cache": name}, float(cache.bytes)) for name, cache in sorted(named_caches().items()) if cache.maxbytes is not None
+])
+register_gauge("cache_hit_ratio", "Hits over lookups for each in-process cache.", _cache_hit_ratio)
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in (http_request_duration, http_request_db_queries, db_query_duration, db_slow_queries, event_loop_lag):
+        lines.extend(metric.render())
+    for gauge in _gauges:
+        lines.extend(gauge.render())
+    return "\n".join(lines) + "\n"
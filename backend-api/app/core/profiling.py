@@ -0,0 +1,193 @@
+"""Event-loop stall watchdog and an on-demand sampling profiler.
+
+Both work from a plain thread reading ``sys._current_frames()``, so they see
+the loop thread even while it is stuck in synchronous code and add nothing
+to the request path. The watchdog's only cost on the loop is a heartbeat
+callback every ``threshold / 2``.
+
+``LoopWatchdog`` logs the loop thread's stack once per stall longer than
+``LOOP_WATCHDOG_THRESHOLD_MS`` (0 disables it) and keeps the most recent
+stalls for ``GET /api/v1/diagnostics/loop-stalls``. ``sample_stacks``
+returns folded stacks (``frame;frame;frame count``), the input format of
+flamegraph.pl, speedscope and inferno.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+from types import FrameType
+from typing import Any
+
+from .metrics import register_gauge
+
+logger = logging.getLogger("myapp")
+
+LOOP_WATCHDOG_THRESHOLD_MS = float(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS", "500"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+
+def _short_filename(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    return os.path.basename(filename)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({_short_filename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack_labels(frame: FrameType | None) -> list[str]:
+    """Frame labels from the outermost call to ``frame``."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+# ---------------------------------------------------------------------------
+# Stall watchdog
+
+
+@dataclass
+class LoopStall:
+    detected_at: float
+    blocked_ms: float
+    stack: list[str]
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_seconds: float, history: int = 20):
+        self.threshold_seconds = threshold_seconds
+        self.stalls = 0
+        self.recent: deque[LoopStall] = deque(maxlen=history)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._last_beat = 0.0
+        self._reported_beat = 0.0
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_seconds > 0
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        if self._reported_beat == self._last_beat:
+            logger.warning("Event loop unblocked after %.0f ms", (now - self._last_beat) * 1000)
+        self._last_beat = now
+        if not self._stopped.is_set():
+            self._loop.call_later(self.threshold_seconds / 2, self._beat)
+
+    def _watch(self) -> None:
+        interval = self.threshold_seconds / 2
+        while not self._stopped.wait(interval):
+            last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat
+            if blocked < self.threshold_seconds or last_beat == self._reported_beat:
+                continue
+            # One report per stall: remember which heartbeat it was stuck after.
+            self._reported_beat = last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame is not None else []
+            self.stalls += 1
+            self.recent.append(LoopStall(detected_at=time.time(), blocked_ms=blocked * 1000, stack=stack))
+            logger.warning(
+                "Event loop blocked for %.0f ms (threshold %.0f ms); loop thread stack:\n%s",
+                blocked * 1000,
+                self.threshold_seconds * 1000,
+                "".join(stack),
+            )
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._last_beat = time.monotonic()
+        self._reported_beat = 0.0
+        self._loop.call_later(self.threshold_seconds / 2, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join(timeout=self.threshold_seconds)
+        self._thread = None
+
+    def recent_stalls(self) -> list[dict[str, Any]]:
+        return [asdict(stall) for stall in reversed(self.recent)]
+
+
+loop_watchdog = LoopWatchdog(LOOP_WATCHDOG_THRESHOLD_MS / 1000)
+
+register_gauge(
+    "event_loop_stalls_total",
+    "Event loop stalls longer than LOOP_WATCHDOG_THRESHOLD_MS.",
+    lambda: [({}, loop_watchdog.stalls)],
+    kind="counter",
+)
+
+
+# ---------------------------------------------------------------------------
+# Sampling profiler
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def sample_stacks(
+    seconds: float,
+    interval_seconds: float = 0.005,
+    thread_ids: set[int] | None = None,
+) -> tuple[Counter[str], int]:
+    """Sample thread stacks for ``seconds``; return folded stacks and the sample count.
+
+    Blocks the calling thread, so run it in a worker thread. ``thread_ids``
+    limits sampling to those threads; every thread except the sampler
+    itself is sampled otherwise. Each folded stack starts with the thread
+    name so threads stay separate in the flamegraph.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already being collected")
+    try:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        folded: Counter[str] = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (thread_ids is not None and thread_id not in thread_ids):
+                    continue
+                thread_name = names.get(thread_id) or f"thread-{thread_id}"
+                folded[";".join([thread_name] + _stack_labels(frame))] += 1
+            samples += 1
+            time.sleep(interval_seconds)
+        return folded, samples
+    finally:
+        _profile_lock.release()
+
+
+def render_folded(folded: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in folded.most_common())
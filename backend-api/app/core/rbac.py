@@ -5,6 +5,7 @@ from uuid import UUID
 from asyncpg import Connection
 from fastapi import HTTPException
 
+from ..db import queries
 from .auth import AuthenticatedActor
 
 
@@ -20,10 +21,7 @@ async def get_student_id_for_actor(conn: Connection, actor: AuthenticatedActor)
     email = _normalize_email(actor.email)
     if not email:
         return None
-    return await conn.fetchval(
-        "SELECT student_id FROM students WHERE lower(email) = lower($1)",
-        email,
-    )
+    return await queries.STUDENT_ID_BY_EMAIL.fetchval(conn, email)
 
 
 async def require_student_email_access(
@@ -54,20 +52,7 @@ async def require_student_id_access(
             return
         raise HTTPException(status_code=403, detail="Access denied for requested student")
     if actor.is_teacher:
-        row = await conn.fetchrow(
-            """
-            SELECT 1
-            FROM students s
-            JOIN enrollments e ON e.student_id = s.student_id
-            JOIN courses c ON c.course_id = e.course_id
-            JOIN instructors i ON i.instructor_id = c.instructor_id
-            WHERE s.student_id = $1
-              AND lower(i.email) = lower($2)
-            LIMIT 1
-            """,
-            student_id,
-            actor.email or "",
-        )
+        row = await queries.TEACHER_OF_STUDENT.fetchrow(conn, student_id, actor.email or "")
         if row:
             return
     raise HTTPException(status_code=403, detail="Access denied for requested student")
@@ -77,18 +62,7 @@ async def is_student_enrolled(conn: Connection, actor: AuthenticatedActor, cours
     email = _normalize_email(actor.email)
     if not email:
         return False
-    row = await conn.fetchrow(
-        """
-        SELECT 1
-        FROM students s
-        JOIN enrollments e ON e.student_id = s.student_id
-        WHERE lower(s.email) = lower($1)
-          AND e.course_id = $2
-        LIMIT 1
-        """,
-        email,
-        course_id,
-    )
+    row = await queries.STUDENT_IS_ENROLLED.fetchrow(conn, email, course_id)
     return bool(row)
 
 
@@ -96,18 +70,7 @@ async def is_course_teacher(conn: Connection, actor: AuthenticatedActor, course_
     email = _normalize_email(actor.email)
     if not email:
         return False
-    row = await conn.fetchrow(
-        """
-        SELECT 1
-        FROM courses c
-        JOIN instructors i ON i.instructor_id = c.instructor_id
-        WHERE c.course_id = $1
-          AND lower(i.email) = lower($2)
-        LIMIT 1
-        """,
-        course_id,
-        email,
-    )
+    row = await queries.COURSE_TEACHER.fetchrow(conn, course_id, email)
     return bool(row)
 
 
@@ -141,25 +104,14 @@ async def require_course_staff_access(
 
 
 async def get_course_id_for_module(conn: Connection, module_id: UUID) -> int:
-    course_id = await conn.fetchval(
-        "SELECT course_id FROM modules WHERE module_id = $1",
-        str(module_id),
-    )
+    course_id = await queries.COURSE_ID_FOR_MODULE.fetchval(conn, str(module_id))
     if course_id is None:
         raise HTTPException(status_code=404, detail="Module not found")
     return int(course_id)
 
 
 async def get_course_id_for_assignment(conn: Connection, assignment_id: int) -> int:
-    course_id = await conn.fetchval(
-        """
-        SELECT m.course_id
-        FROM assignments a
-        JOIN modules m ON m.module_id = a.module_id
-        WHERE a.assignment_id = $1
-        """,
-        assignment_id,
-    )
+    course_id = await queries.COURSE_ID_FOR_ASSIGNMENT.fetchval(conn, assignment_id)
     if course_id is None:
         raise HTTPException(status_code=404, detail="Assignment not found")
     return int(course_id)
@@ -171,20 +123,7 @@ async def get_course_id_for_question(
     assignment_id: int,
     question_id: int,
 ) -> int:
-    course_id = await conn.fetchval(
-        """
-        SELECT m.course_id
-        FROM questions q
-        JOIN assignments a ON a.assignment_id = q.assignment_id
-        JOIN modules m ON m.module_id = a.module_id
-        WHERE q.question_id = $1
-          AND a.assignment_id = $2
-          AND m.module_id = $3
-        """,
-        question_id,
-        assignment_id,
-        str(module_id),
-    )
+    course_id = await queries.COURSE_ID_FOR_QUESTION.fetchval(conn, question_id, assignment_id, str(module_id))
     if course_id is None:
         raise HTTPException(status_code=404, detail="Question not found in requested module/assignment")
     return int(course_id)
@@ -0,0 +1,39 @@
+"""orjson-backed JSON responses for endpoints that return trusted DB output.
+
+Returning ``FastJSONResponse(data)`` from an endpoint skips FastAPI's
+``response_model`` validation and ``jsonable_encoder`` pass entirely, so it is
+only for payloads built from our own queries. orjson handles UUID, date,
+datetime and NumPy values natively; the default hook below covers asyncpg
+``Record`` (serialized as an object, so crud code can hand rows over without
+copying them into dicts) and ``Decimal`` (as a float, like
+``jsonable_encoder``).
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from asyncpg import Record
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Record):
+        return dict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
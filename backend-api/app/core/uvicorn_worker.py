@@ -0,0 +1,16 @@
+"""Gunicorn worker class for the tuned serving profile in ``gunicorn.conf.py``.
+
+``UvicornWorker`` picks its event loop and HTTP parser with ``"auto"``,
+which quietly falls back to asyncio and h11 when an optional extra is
+missing. This worker names uvloop and httptools explicitly, so a missing
+dependency fails the deploy instead of silently slowing every request.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopHttptoolsWorker(UvicornWorker):
+    CONFIG_KWARGS: dict[str, Any] = {"loop": "uvloop", "http": "httptools"}
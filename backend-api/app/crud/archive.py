@@ -0,0 +1,96 @@
+# crud/archive.py
+from datetime import date
+from typing import List, Dict, Any
+from asyncpg import Connection
+
+# Responses are moved between studentresponses and studentresponses_archive in
+# batches of at most $2 rows; each batch is one statement, so a batch is either
+# fully moved or not at all and an interrupted job can simply be rerun.
+SQL_ARCHIVE_BATCH = """
+    WITH batch AS (
+        SELECT response_id FROM studentresponses
+        WHERE course_id = $1
+        LIMIT $2
+    ),
+    moved AS (
+        DELETE FROM studentresponses r
+        USING batch b
+        WHERE r.course_id = $1
+          AND r.response_id = b.response_id
+        RETURNING r.*
+    )
+    INSERT INTO studentresponses_archive (response_id, course_id, question_id, student_id, data)
+    SELECT moved.response_id, $1, moved.question_id, moved.student_id, to_jsonb(moved)
+    FROM moved
+"""
+
+SQL_RESTORE_BATCH = """
+    WITH batch AS (
+        SELECT response_id FROM studentresponses_archive
+        WHERE course_id = $1
+        LIMIT $2
+    ),
+    moved AS (
+        DELETE FROM studentresponses_archive a
+        USING batch b
+        WHERE a.response_id = b.response_id
+        RETURNING a.course_id, a.data
+    )
+    INSERT INTO studentresponses
+    SELECT (jsonb_populate_record(NULL::studentresponses, moved.data || jsonb_build_object('course_id', moved.course_id))).*
+    FROM moved
+"""
+
+# Ended, not yet archived courses with the number of live responses they hold
+async def get_courses_to_archive(conn: Connection, ended_before: date) -> List[Dict[str, Any]]:
+    sql_command = """
+        SELECT c.course_id, c.title, c.session_end_date, count(r.response_id) AS responses
+        FROM courses c
+        LEFT JOIN studentresponses r ON r.course_id = c.course_id
+        WHERE c.session_end_date < $1
+          AND c.archived_at IS NULL
+        GROUP BY c.course_id
+        ORDER BY c.session_end_date, c.course_id
+    """
+    rows = await conn.fetch(sql_command, ended_before)
+    return [dict(row) for row in rows]
+
+# Live and archived response counts for one course
+async def get_course_archive_status(conn: Connection, course_id: int) -> Dict[str, Any]:
+    sql_command = """
+        SELECT c.course_id,
+               c.title,
+               c.session_end_date,
+               c.archived_at,
+               (SELECT count(*)
+                FROM studentresponses r
+                WHERE r.course_id = $1) AS live_responses,
+               (SELECT count(*)
+                FROM studentresponses_archive ar
+                WHERE ar.course_id = $1) AS archived_responses
+        FROM courses c
+        WHERE c.course_id = $1
+    """
+    row = await conn.fetchrow(sql_command, course_id)
+    if row is None:
+        raise ValueError("Course not found")
+    return dict(row)
+
+# Move up to batch_size of a course's responses into the archive; returns the number moved
+async def archive_course_responses_batch(conn: Connection, course_id: int, batch_size: int) -> int:
+    status = await conn.execute(SQL_ARCHIVE_BATCH, course_id, batch_size)
+    return int(status.split()[-1])
+
+# Move up to batch_size of a course's archived responses back; returns the number moved
+async def restore_course_responses_batch(conn: Connection, course_id: int, batch_size: int) -> int:
+    status = await conn.execute(SQL_RESTORE_BATCH, course_id, batch_size)
+    return int(status.split()[-1])
+
+# Stamp or clear courses.archived_at
+async def set_course_archived(conn: Connection, course_id: int, archived: bool) -> None:
+    sql_command = """
+        UPDATE courses
+        SET archived_at = CASE WHEN $2 THEN now() ELSE NULL END
+        WHERE course_id = $1
+    """
+    await conn.execute(sql_command, course_id, archived)
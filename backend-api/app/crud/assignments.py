@@ -1,5 +1,4 @@
 from ..db.connection import get_db_connection
-import pandas as pd
 from datetime import datetime, timedelta
 from uuid import UUID
 from io import BytesIO
@@ -7,6 +6,10 @@ from ..schemas.schemas import AssignmentCreate, QuestionCreate, Option
 from datetime import datetime
 import logging
 from asyncpg import Connection
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd  # annotations only; imported where CSVs are parsed
 
 logging.basicConfig(level=logging.INFO)
 
@@ -25,7 +28,7 @@ async def create_assignment(conn: Connection, module_id: UUID, description: str,
         raise Exception("Failed to retrieve the new assignment ID.")
     return assignment_id
 
-async def create_questions_and_options(conn: Connection, assignment_id: int, df: pd.DataFrame):
+async def create_questions_and_options(conn: Connection, assignment_id: int, df: "pd.DataFrame"):
     for index, row in df.iterrows():
         logging.info(f"Processing row {index}")
         sql_question = """
@@ -75,7 +78,9 @@ async def create_assignment_and_questions_from_csv(conn: Connection, module_id:
     if assignment_id is None:
         raise Exception("Failed to retrieve the new assignment ID.")
 
-    df = pd.read_csv(pd.io.common.BytesIO(csv_content))
+    import pandas as pd
+
+    df = pd.read_csv(BytesIO(csv_content))
 
     for index, row in df.iterrows():
         sql_question = """
@@ -165,38 +170,70 @@ async def delete_assignment(conn: Connection, assignment_id: int) -> dict:
     await conn.execute(sql_delete, assignment_id)
     return dict(existing_assignment)
 
+# Everything that hangs off a module's assignments, deleted children-first by
+# one statement. All sub-statements share a snapshot and the FK checks run at
+# the end of the statement, so the ordering inside the CTE does not matter.
+SQL_DELETE_MODULE_ASSIGNMENTS = """
+    WITH target_assignments AS (
+        SELECT assignment_id FROM assignments WHERE module_id = $1
+    ),
+    target_questions AS (
+        SELECT question_id FROM questions
+        WHERE assignment_id IN (SELECT assignment_id FROM target_assignments)
+    ),
+    target_team_assignments AS (
+        SELECT team_assignment_id FROM teamassignments
+        WHERE assignment_id IN (SELECT assignment_id FROM target_assignments)
+    ),
+    deleted_responses AS (
+        DELETE FROM studentresponses
+        WHERE course_id = (SELECT course_id FROM modules WHERE module_id = $1)
+          AND question_id IN (SELECT question_id FROM target_questions)
+        RETURNING 1
+    ),
+    deleted_options AS (
+        DELETE FROM options
+        WHERE question_id IN (SELECT question_id FROM target_questions)
+        RETURNING 1
+    ),
+    deleted_questions AS (
+        DELETE FROM questions
+        WHERE question_id IN (SELECT question_id FROM target_questions)
+        RETURNING 1
+    ),
+    deleted_scores AS (
+        DELETE FROM assignment_scores
+        WHERE assignment_id IN (SELECT assignment_id FROM target_assignments)
+        RETURNING 1
+    ),
+    deleted_team_submissions AS (
+        DELETE FROM teamassignmentsubmissions
+        WHERE team_assignment_id IN (SELECT team_assignment_id FROM target_team_assignments)
+        RETURNING 1
+    ),
+    deleted_team_assignments AS (
+        DELETE FROM teamassignments
+        WHERE team_assignment_id IN (SELECT team_assignment_id FROM target_team_assignments)
+        RETURNING 1
+    ),
+    deleted_assignments AS (
+        DELETE FROM assignments
+        WHERE assignment_id IN (SELECT assignment_id FROM target_assignments)
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM deleted_assignments) AS assignments,
+           (SELECT count(*) FROM deleted_questions) AS questions,
+           (SELECT count(*) FROM deleted_options) AS options,
+           (SELECT count(*) FROM deleted_responses) AS studentresponses,
+           (SELECT count(*) FROM deleted_scores) AS assignment_scores,
+           (SELECT count(*) FROM deleted_team_assignments) AS teamassignments,
+           (SELECT count(*) FROM deleted_team_submissions) AS teamassignmentsubmissions
+"""
+
+# Delete a module's assignments with their questions, options and responses in one round trip
 async def delete_assignment_and_related_questions(conn: Connection, module_id: UUID) -> dict:
-    try:
-        sql_nullify_correct_option = """
-            UPDATE Questions
-            SET correct_option_id = NULL
-            WHERE assignment_id IN (
-                SELECT assignment_id FROM Assignments WHERE module_id = $1
-            )
-        """
-        await conn.execute(sql_nullify_correct_option, str(module_id))
-
-        sql_delete_options = """
-            DELETE FROM Options 
-            WHERE question_id IN (
-                SELECT question_id FROM Questions WHERE assignment_id IN (
-                    SELECT assignment_id FROM Assignments WHERE module_id = $1
-                )
-            )
-        """
-        await conn.execute(sql_delete_options, str(module_id))
-
-        sql_delete_questions = """
-            DELETE FROM Questions 
-            WHERE assignment_id IN (
-                SELECT assignment_id FROM Assignments WHERE module_id = $1
-            )
-        """
-        await conn.execute(sql_delete_questions, str(module_id))
-
-        sql_delete_assignments = "DELETE FROM Assignments WHERE module_id = $1"
-        await conn.execute(sql_delete_assignments, str(module_id))
-
-        return {"message": "Assignment and related questions and options deleted successfully"}
-    except Exception as e:
-        raise e
+    deleted = await conn.fetchrow(SQL_DELETE_MODULE_ASSIGNMENTS, str(module_id))
+    return {
+        "message": "Assignment and related questions and options deleted successfully",
+        "deleted": {table: int(count) for table, count in deleted.items()},
+    }
@@ -1,5 +1,5 @@
 from typing import List, Dict, Any
-from asyncpg import Connection
+from asyncpg import Connection, Record
 from ..db.connection import get_db_connection
 from ..schemas.schemas import CourseCreate
 
@@ -58,10 +58,10 @@ async def get_enrolled_students(conn: Connection, course_id: int) -> List[Dict[s
     return [dict(row) for row in rows]
 
 # List all courses
-async def get_courses(conn: Connection) -> List[Dict[str, Any]]:
+# Rows are returned as asyncpg Records; the endpoint serializes them with orjson directly
+async def get_courses(conn: Connection) -> List[Record]:
     sql_command = "SELECT * FROM Courses"
-    rows = await conn.fetch(sql_command)
-    return [dict(row) for row in rows]
+    return await conn.fetch(sql_command)
 
 # Get a course by internal URL
 async def get_course_by_internal_url(conn: Connection, internal_url) -> Dict[str, Any]:
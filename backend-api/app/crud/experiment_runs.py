@@ -0,0 +1,33 @@
+# crud/experiment_runs.py
+import json
+from typing import List, Dict, Any, Sequence
+from uuid import UUID
+from asyncpg import Connection
+
+EXPERIMENT_RUN_COLUMNS = ("module_id", "student_id", "model", "parameters", "metrics", "created_at")
+
+# Bulk-append buffered runs with COPY; records follow EXPERIMENT_RUN_COLUMNS
+async def copy_experiment_runs(conn: Connection, records: Sequence[tuple]) -> None:
+    await conn.copy_records_to_table(
+        "experiment_runs",
+        records=records,
+        columns=EXPERIMENT_RUN_COLUMNS,
+    )
+
+# Most recent runs for a module, newest first
+async def get_experiment_runs_for_module(conn: Connection, module_id: UUID, limit: int = 500) -> List[Dict[str, Any]]:
+    sql_command = """
+        SELECT run_id, module_id, student_id, model, parameters, metrics, created_at
+        FROM experiment_runs
+        WHERE module_id = $1
+        ORDER BY created_at DESC
+        LIMIT $2
+    """
+    rows = await conn.fetch(sql_command, str(module_id), limit)
+    runs = []
+    for row in rows:
+        run = dict(row)
+        run["parameters"] = json.loads(run["parameters"])
+        run["metrics"] = json.loads(run["metrics"]) if run["metrics"] is not None else None
+        runs.append(run)
+    return runs
@@ -0,0 +1,156 @@
+# crud/grading.py
+from typing import List, Dict, Any, Optional, Sequence
+from asyncpg import Connection
+from ..db import queries
+
+# Grading key of one question (type, points and the correct option or number)
+async def get_question_grading_key(conn: Connection, question_id: int) -> Dict[str, Any]:
+    row = await queries.QUESTION_GRADING_KEY.fetchrow(conn, question_id)
+    if row is None:
+        raise ValueError("Question not found")
+    return dict(row)
+
+# Grading keys of every question of an assignment
+async def get_assignment_grading_keys(conn: Connection, assignment_id: int) -> List[Dict[str, Any]]:
+    sql_command = """
+        SELECT question_id, assignment_id, question_type, points, correct_option_id,
+               correct_numeric_value, numeric_abs_tolerance, numeric_rel_tolerance
+        FROM questions
+        WHERE assignment_id = $1
+        ORDER BY question_id
+    """
+    return [dict(row) for row in await conn.fetch(sql_command, assignment_id)]
+
+# Next page of a course's responses to the given questions, in response_id order
+async def get_responses_for_grading(
+    conn: Connection,
+    course_id: int,
+    question_ids: Sequence[int],
+    after_response_id: int,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    sql_command = """
+        SELECT response_id, question_id, response, score, is_correct, graded_at
+        FROM studentresponses
+        WHERE course_id = $1
+          AND question_id = ANY($2::int[])
+          AND response_id > $3
+        ORDER BY response_id
+        LIMIT $4
+    """
+    rows = await conn.fetch(sql_command, course_id, list(question_ids), after_response_id, limit)
+    return [dict(row) for row in rows]
+
+# Store new scores and correctness for a batch of responses. A response whose graded_at no
+# longer matches was resubmitted (and graded) since it was read; it is left
+# alone. Returns the number of responses updated.
+async def update_response_scores(
+    conn: Connection,
+    course_id: int,
+    response_ids: Sequence[int],
+    scores: Sequence[Optional[float]],
+    is_correct: Sequence[Optional[bool]],
+    graded_at: Sequence[Any],
+) -> int:
+    sql_command = """
+        UPDATE studentresponses r
+        SET score = u.score, is_correct = u.is_correct, graded_at = now()
+        FROM unnest($2::int[], $3::float8[], $4::bool[], $5::timestamptz[]) AS u(response_id, score, is_correct, graded_at)
+        WHERE r.course_id = $1
+          AND r.response_id = u.response_id
+          AND r.graded_at IS NOT DISTINCT FROM u.graded_at
+    """
+    status = await conn.execute(sql_command, course_id, list(response_ids), list(scores), list(is_correct), list(graded_at))
+    return int(status.split()[-1])
+
+# Recompute every student's assignment_scores row of an assignment from the
+# stored response scores. The assignment's advisory lock makes response saves
+# to this assignment wait (they take it shared), so none of their increments
+# is overwritten; saves to other assignments carry on. Call it in a
+# transaction. Returns the number of students with a total.
+async def rebuild_assignment_scores(conn: Connection, assignment_id: int) -> int:
+    await conn.execute("SELECT pg_advisory_xact_lock($1, $2)", queries.ASSIGNMENT_SCORES_LOCK, assignment_id)
+    sql_command = """
+        WITH totals AS (
+            SELECT q.assignment_id, r.course_id, r.student_id,
+                   COALESCE(sum(r.score), 0) AS score, count(r.score) AS graded_responses
+            FROM studentresponses r
+            JOIN questions q ON q.question_id = r.question_id
+            WHERE q.assignment_id = $1
+              AND r.student_id IS NOT NULL
+              AND r.course_id = (
+                  SELECT m.course_id
+                  FROM assignments a
+                  JOIN modules m ON m.module_id = a.module_id
+                  WHERE a.assignment_id = $1
+              )
+            GROUP BY q.assignment_id, r.course_id, r.student_id
+        ),
+        removed AS (
+            DELETE FROM assignment_scores s
+            WHERE s.assignment_id = $1
+              AND NOT EXISTS (SELECT 1 FROM totals t WHERE t.student_id = s.student_id)
+        ),
+        upserted AS (
+            INSERT INTO assignment_scores (assignment_id, course_id, student_id, score, graded_responses)
+            SELECT assignment_id, course_id, student_id, score, graded_responses FROM totals
+            ON CONFLICT (assignment_id, student_id) DO UPDATE
+            SET score = EXCLUDED.score,
+                graded_responses = EXCLUDED.graded_responses,
+                updated_at = now()
+            RETURNING 1
+        )
+        SELECT count(*) FROM upserted
+    """
+    return await conn.fetchval(sql_command, assignment_id)
+
+# Per-assignment totals of every student in a course, with each assignment's maximum
+async def get_course_gradebook(conn: Connection, course_id: int) -> Dict[str, Any]:
+    sql_assignments = """
+        SELECT a.assignment_id,
+               a.title,
+               m.module_id,
+               m.title AS module_title,
+               COALESCE(sum(q.points) FILTER (
+                   WHERE (q.question_type = 'multiple_choice' AND q.correct_option_id IS NOT NULL)
+                      OR (q.question_type = 'numeric' AND q.correct_numeric_value IS NOT NULL)
+               ), 0) AS max_score
+        FROM modules m
+        JOIN assignments a ON a.module_id = m.module_id
+        LEFT JOIN questions q ON q.assignment_id = a.assignment_id
+        WHERE m.course_id = $1
+        GROUP BY a.assignment_id, m.module_id
+        ORDER BY m.title, a.assignment_id
+    """
+    sql_scores = """
+        SELECT s.student_id, s.name AS student_name, s.email AS student_email,
+               sc.assignment_id, sc.score, sc.graded_responses
+        FROM assignment_scores sc
+        JOIN students s ON s.student_id = sc.student_id
+        WHERE sc.course_id = $1
+        ORDER BY s.name, s.student_id, sc.assignment_id
+    """
+    assignments = [dict(row) for row in await conn.fetch(sql_assignments, course_id)]
+    students: Dict[int, Dict[str, Any]] = {}
+    for row in await conn.fetch(sql_scores, course_id):
+        student = students.get(row["student_id"])
+        if student is None:
+            student = students[row["student_id"]] = {
+                "student_id": row["student_id"],
+                "student_name": row["student_name"],
+                "student_email": row["student_email"],
+                "total_score": 0.0,
+                "scores": [],
+            }
+        student["total_score"] += row["score"]
+        student["scores"].append({
+            "assignment_id": row["assignment_id"],
+            "score": row["score"],
+            "graded_responses": row["graded_responses"],
+        })
+    return {
+        "course_id": course_id,
+        "assignments": assignments,
+        "max_score": sum(a["max_score"] for a in assignments),
+        "students": list(students.values()),
+    }
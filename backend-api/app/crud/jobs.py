@@ -0,0 +1,140 @@
+# crud/jobs.py
+import json
+from typing import Dict, Any, Optional, Sequence
+from asyncpg import Connection
+
+# Columns a status poll returns; the payload (e.g. an uploaded CSV) stays in the table.
+JOB_STATUS_COLUMNS = """
+    job_id, kind, status, course_id, created_by, attempts, max_attempts, run_after,
+    progress, progress_message, result, error, created_at, started_at, finished_at, updated_at
+"""
+
+def _job(row) -> Dict[str, Any]:
+    job = dict(row)
+    for column in ("payload", "result"):
+        if job.get(column) is not None:
+            job[column] = json.loads(job[column])
+    return job
+
+# Queue a job to run as soon as a worker is free
+async def enqueue_job(
+    conn: Connection,
+    kind: str,
+    payload: Dict[str, Any],
+    course_id: Optional[int] = None,
+    created_by: Optional[str] = None,
+    max_attempts: int = 3,
+) -> Dict[str, Any]:
+    sql_command = f"""
+        INSERT INTO jobs (kind, payload, course_id, created_by, max_attempts)
+        VALUES ($1, $2::jsonb, $3, $4, $5)
+        RETURNING {JOB_STATUS_COLUMNS}
+    """
+    row = await conn.fetchrow(sql_command, kind, json.dumps(payload), course_id, created_by, max_attempts)
+    return _job(row)
+
+# Claim the next due job of the given kinds for worker_id, or None. A running
+# job whose lease expired (its worker died) is claimed again. SKIP LOCKED lets
+# concurrent workers pass over each other's candidates instead of queueing on
+# the row lock.
+async def claim_job(conn: Connection, kinds: Sequence[str], worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+    sql_command = """
+        WITH next AS (
+            SELECT job_id
+            FROM jobs
+            WHERE kind = ANY($1::text[])
+              AND ((status = 'queued' AND run_after <= now())
+                   OR (status = 'running' AND locked_until < now()))
+            ORDER BY run_after
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE jobs j
+        SET status = 'running',
+            attempts = j.attempts + 1,
+            locked_by = $2,
+            locked_until = now() + make_interval(secs => $3),
+            started_at = COALESCE(j.started_at, now()),
+            updated_at = now()
+        FROM next
+        WHERE j.job_id = next.job_id
+        RETURNING j.*
+    """
+    row = await conn.fetchrow(sql_command, list(kinds), worker_id, lease_seconds)
+    return _job(row) if row is not None else None
+
+# Extend a running job's lease. False when worker_id no longer holds it.
+async def extend_job_lease(conn: Connection, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    sql_command = """
+        UPDATE jobs
+        SET locked_until = now() + make_interval(secs => $3)
+        WHERE job_id = $1 AND locked_by = $2 AND status = 'running'
+    """
+    status = await conn.execute(sql_command, job_id, worker_id, lease_seconds)
+    return status.split()[-1] != "0"
+
+# Record how far a running job is (0..1, None keeps the last value) with a short message
+async def update_job_progress(conn: Connection, job_id: int, worker_id: str, progress: Optional[float], message: Optional[str]) -> bool:
+    sql_command = """
+        UPDATE jobs
+        SET progress = COALESCE($3::float8, progress), progress_message = $4, updated_at = now()
+        WHERE job_id = $1 AND locked_by = $2 AND status = 'running'
+    """
+    status = await conn.execute(sql_command, job_id, worker_id, progress, message)
+    return status.split()[-1] != "0"
+
+# Mark a job done with its result. False when worker_id lost the job meanwhile.
+async def complete_job(conn: Connection, job_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+    sql_command = """
+        UPDATE jobs
+        SET status = 'succeeded', result = $3::jsonb, error = NULL, progress = 1,
+            locked_by = NULL, locked_until = NULL, finished_at = now(), updated_at = now()
+        WHERE job_id = $1 AND locked_by = $2 AND status = 'running'
+    """
+    status = await conn.execute(sql_command, job_id, worker_id, json.dumps(result, default=str))
+    return status.split()[-1] != "0"
+
+# Record a failed attempt. The job is queued again after retry_delay_seconds
+# while it has attempts left (and retry is true), otherwise it fails for good.
+# Returns the new status, or None when worker_id lost the job meanwhile.
+async def fail_job(conn: Connection, job_id: int, worker_id: str, error: str, retry_delay_seconds: float, retry: bool = True) -> Optional[str]:
+    sql_command = """
+        UPDATE jobs
+        SET status = CASE WHEN $5 AND attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+            run_after = now() + make_interval(secs => $4),
+            error = $3,
+            locked_by = NULL,
+            locked_until = NULL,
+            finished_at = CASE WHEN $5 AND attempts < max_attempts THEN NULL ELSE now() END,
+            updated_at = now()
+        WHERE job_id = $1 AND locked_by = $2 AND status = 'running'
+        RETURNING status
+    """
+    return await conn.fetchval(sql_command, job_id, worker_id, error, retry_delay_seconds, retry)
+
+# Put a job back in the queue without counting the attempt (worker shutdown)
+async def release_job(conn: Connection, job_id: int, worker_id: str) -> bool:
+    sql_command = """
+        UPDATE jobs
+        SET status = 'queued', attempts = greatest(attempts - 1, 0), run_after = now(),
+            locked_by = NULL, locked_until = NULL, updated_at = now()
+        WHERE job_id = $1 AND locked_by = $2 AND status = 'running'
+    """
+    status = await conn.execute(sql_command, job_id, worker_id)
+    return status.split()[-1] != "0"
+
+# Status, progress and outcome of one job
+async def get_job(conn: Connection, job_id: int) -> Dict[str, Any]:
+    row = await conn.fetchrow(f"SELECT {JOB_STATUS_COLUMNS} FROM jobs WHERE job_id = $1", job_id)
+    if row is None:
+        raise ValueError("Job not found")
+    return _job(row)
+
+# Delete jobs that finished more than retention_seconds ago, payload included
+async def delete_finished_jobs(conn: Connection, retention_seconds: float) -> int:
+    sql_command = """
+        DELETE FROM jobs
+        WHERE finished_at < now() - make_interval(secs => $1)
+    """
+    status = await conn.execute(sql_command, retention_seconds)
+    return int(status.split()[-1])
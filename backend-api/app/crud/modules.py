@@ -1,13 +1,14 @@
 from ..schemas.schemas import ModuleCreate
 from ..schemas.schemas import AssignmentCreate, ModuleAssignments, Assignment, Question, Option
 from ..db.connection import get_db_connection
+from ..db import queries
 from datetime import datetime, timedelta
 from ..crud.assignments import create_assignment
 from uuid import UUID, uuid4
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
 import logging
-from asyncpg import Connection
+from asyncpg import Connection, Record
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("myapp")
@@ -43,27 +44,26 @@ async def get_questions_and_options_by_module(conn: Connection, module_id: UUID)
 
     return all_assignments
 
-async def create_module(conn: Connection, course_id: int, module: ModuleCreate) -> Dict[str, Any]:
+async def create_module(conn: Connection, course_id: int, module: ModuleCreate, experiment_config: Optional[str] = None) -> Dict[str, Any]:
     module_id = uuid4()  # Generate a new UUID for the module
     logger.info(f"Generated module_id: {module_id}")
     sql_command = """
-        INSERT INTO modules (course_id, title, description, theory, plottingexperimentconfig, InteractiveConfig, concept, fun_fact, interactive_file, attachment_1_link, attachment_2_link, attachment_3_link, video_link_1, video_link_2, module_id)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+        INSERT INTO modules (course_id, title, description, theory, plottingexperimentconfig, InteractiveConfig, concept, fun_fact, interactive_file, attachment_1_link, attachment_2_link, attachment_3_link, video_link_1, video_link_2, module_id, experiment_config)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16)
     """
-    await conn.execute(sql_command, course_id, module.title, module.description, module.theory, module.plottingexperimentconfig, module.InteractiveConfig, module.concept, module.fun_fact, module.interactive_file, module.attachment_1_link, module.attachment_2_link, module.attachment_3_link, module.video_link_1, module.video_link_2, str(module_id))
+    await conn.execute(sql_command, course_id, module.title, module.description, module.theory, module.plottingexperimentconfig, module.InteractiveConfig, module.concept, module.fun_fact, module.interactive_file, module.attachment_1_link, module.attachment_2_link, module.attachment_3_link, module.video_link_1, module.video_link_2, str(module_id), experiment_config)
     duedate = datetime.now().date() + timedelta(days=90)
     # assignment = AssignmentCreate(module_id=module_id, assignment_title="Default Assignment", description="Basic questions to demonstrate fundamental understanding of the topic", due_date=duedate)
     # await create_assignment(conn, module_id=module_id, assignment_title="Default Assignment", description="Basic questions to demonstrate fundamental understanding of the topic", due_date=duedate)
     return {"module_id": str(module_id), "course_id": course_id, **module.dict()}
 
-async def get_modules_for_course(conn: Connection, course_id: int) -> List[Dict[str, Any]]:
+# Rows are returned as asyncpg Records; the endpoint serializes them with orjson directly
+async def get_modules_for_course(conn: Connection, course_id: int) -> List[Record]:
     sql_command = "SELECT * FROM Modules WHERE course_id = $1"
-    rows = await conn.fetch(sql_command, course_id)
-    return [dict(row) for row in rows]
+    return await conn.fetch(sql_command, course_id)
 
 async def get_module_by_id(conn: Connection, module_id: UUID) -> Dict[str, Any]:
-    sql_command = "SELECT * FROM Modules WHERE module_id = $1"
-    row = await conn.fetchrow(sql_command, str(module_id))
+    row = await queries.MODULE_BY_ID.fetchrow(conn, str(module_id))
     if row:
         return dict(row)
     else:
@@ -98,7 +98,7 @@ async def get_module_assignments(conn: Connection, module_id: UUID) -> List[Dict
     
     return all_assignments
 
-async def update_module(conn: Connection, module_id: UUID, module: ModuleCreate) -> Dict[str, Any]:
+async def update_module(conn: Connection, module_id: UUID, module: ModuleCreate, experiment_config: Optional[str] = None) -> Dict[str, Any]:
     sql_select = "SELECT * FROM Modules WHERE module_id = $1"
     existing_module = await conn.fetchrow(sql_select, str(module_id))
     if not existing_module:
@@ -109,12 +109,38 @@ async def update_module(conn: Connection, module_id: UUID, module: ModuleCreate)
         SET title = $1, description = $2, theory = $3, concept = $4, fun_fact = $5,
             attachment_1_link = $6, attachment_2_link = $7, attachment_3_link = $8,
             video_link_1 = $9, video_link_2 = $10,
-            plottingexperimentconfig = $11, InteractiveConfig = $12, interactive_file = $13
-        WHERE module_id = $14
+            plottingexperimentconfig = $11, InteractiveConfig = $12, interactive_file = $13,
+            experiment_config = $14
+        WHERE module_id = $15
     """
-    await conn.execute(sql_update, module.title, module.description, module.theory, module.concept, module.fun_fact, module.attachment_1_link, module.attachment_2_link, module.attachment_3_link, module.video_link_1, module.video_link_2, module.plottingexperimentconfig, module.InteractiveConfig, module.interactive_file, str(module_id))
+    await conn.execute(sql_update, module.title, module.description, module.theory, module.concept, module.fun_fact, module.attachment_1_link, module.attachment_2_link, module.attachment_3_link, module.video_link_1, module.video_link_2, module.plottingexperimentconfig, module.InteractiveConfig, module.interactive_file, experiment_config, str(module_id))
     return {"module_id": module_id, **module.dict()}
 
+# Course and current row version of a module, for versioned experiment config cache keys
+async def get_module_config_version(conn: Connection, module_id: UUID) -> Dict[str, Any]:
+    row = await queries.MODULE_CONFIG_VERSION.fetchrow(conn, str(module_id))
+    if row is None:
+        raise ValueError("Module not found")
+    return dict(row)
+
+async def get_module_experiment_config(conn: Connection, module_id: UUID) -> Optional[Dict[str, Any]]:
+    sql_command = "SELECT plottingexperimentconfig, experiment_config FROM Modules WHERE module_id = $1"
+    row = await conn.fetchrow(sql_command, str(module_id))
+    return dict(row) if row else None
+
+async def set_module_experiment_config(conn: Connection, module_id: UUID, experiment_config: str) -> None:
+    sql_command = "UPDATE Modules SET experiment_config = $1 WHERE module_id = $2"
+    await conn.execute(sql_command, experiment_config, str(module_id))
+
+async def refresh_experiment_config_for_path(conn: Connection, config_path: str, experiment_config: str) -> List[str]:
+    sql_command = """
+        UPDATE Modules SET experiment_config = $1
+        WHERE plottingexperimentconfig = $2
+        RETURNING module_id
+    """
+    rows = await conn.fetch(sql_command, experiment_config, config_path)
+    return [str(row["module_id"]) for row in rows]
+
 async def delete_module(conn: Connection, module_id: UUID) -> Dict[str, Any]:
     sql_select = "SELECT * FROM Modules WHERE module_id = $1"
     existing_module = await conn.fetchrow(sql_select, str(module_id))
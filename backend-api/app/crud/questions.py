@@ -1,63 +1,130 @@
-from ..schemas.schemas import QuestionCreate
-from ..db.connection import get_db_connection
+import json
+from typing import List, Dict, Any, Sequence
+from asyncpg import Connection
+from asyncpg.exceptions import ForeignKeyViolationError
+from ..schemas.schemas import QuestionCreate, QuestionDraft
 
-def create_question(question: QuestionCreate):
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    
-    # Insert the question into the Questions table without options
-    sql_command = "INSERT INTO Questions (assignment_id, question_text, question_type) VALUES (?, ?, ?)"
-    cursor.execute(sql_command, (question.assignment_id, question.question_text, question.question_type))
-    question_id = cursor.execute("SELECT @@IDENTITY AS 'Identity';").fetchval()
-    
-    # Insert options into the Options table if there are any
-    if question.options:
-        options_values = [(question_id, option_text) for option_text in question.options]
-        cursor.executemany("INSERT INTO Options (question_id, option_text) VALUES (?, ?)", options_values)
-        
-        # Update the Questions table with the correct_option_id
-        if question.correct_option_index is not None and 0 <= question.correct_option_index < len(question.options):
-            correct_option_id = cursor.execute("""
-                SELECT option_id FROM Options 
-                WHERE question_id = ? AND option_text = ?""",
-                (question_id, question.options[question.correct_option_index])
-            ).fetchval()
-            cursor.execute("UPDATE Questions SET correct_option_id = ? WHERE question_id = ?", (correct_option_id, question_id))
-    
-    connection.commit()
-    cursor.close()
-    return {"question_id": question_id, **question.dict()}
+# Question and option ids are drawn from their sequences up front, so the
+# question row is inserted with its correct_option_id already set and the
+# whole batch (questions + options) is written by one statement.
+SQL_CREATE_QUESTIONS = """
+    WITH drafts AS (
+        SELECT nextval(pg_get_serial_sequence('questions', 'question_id')) AS question_id,
+               d.position,
+               d.item->>'question_text' AS question_text,
+               d.item->>'question_type' AS question_type,
+               d.item->'options' AS options,
+               (d.item->>'correct_option_index')::int AS correct_option_index,
+               (d.item->>'points')::float8 AS points,
+               (d.item->>'correct_numeric_value')::float8 AS correct_numeric_value,
+               (d.item->>'numeric_abs_tolerance')::float8 AS numeric_abs_tolerance,
+               (d.item->>'numeric_rel_tolerance')::float8 AS numeric_rel_tolerance
+        FROM jsonb_array_elements($2::jsonb) WITH ORDINALITY AS d(item, position)
+    ),
+    draft_options AS (
+        SELECT nextval(pg_get_serial_sequence('options', 'option_id')) AS option_id,
+               i.question_id, o.option_text, o.position - 1 AS option_index
+        FROM drafts i,
+             jsonb_array_elements_text(i.options) WITH ORDINALITY AS o(option_text, position)
+    ),
+    correct AS (
+        SELECT i.question_id, io.option_id AS correct_option_id
+        FROM drafts i
+        JOIN draft_options io ON io.question_id = i.question_id AND io.option_index = i.correct_option_index
+    ),
+    inserted_questions AS (
+        INSERT INTO questions (question_id, assignment_id, question_text, question_type, correct_option_id,
+                               points, correct_numeric_value, numeric_abs_tolerance, numeric_rel_tolerance)
+        SELECT i.question_id, $1, i.question_text, i.question_type, c.correct_option_id,
+               i.points, i.correct_numeric_value, i.numeric_abs_tolerance, i.numeric_rel_tolerance
+        FROM drafts i
+        LEFT JOIN correct c ON c.question_id = i.question_id
+        RETURNING question_id
+    ),
+    inserted_options AS (
+        INSERT INTO options (option_id, question_id, option_text)
+        SELECT option_id, question_id, option_text FROM draft_options
+        RETURNING option_id
+    )
+    SELECT i.question_id,
+           i.question_text,
+           i.question_type,
+           c.correct_option_id,
+           i.points,
+           i.correct_numeric_value,
+           i.numeric_abs_tolerance,
+           i.numeric_rel_tolerance,
+           COALESCE(
+               (SELECT jsonb_agg(jsonb_build_object('option_id', io.option_id, 'option_text', io.option_text)
+                                 ORDER BY io.option_index)
+                FROM draft_options io
+                WHERE io.question_id = i.question_id),
+               '[]'::jsonb
+           ) AS options
+    FROM drafts i
+    LEFT JOIN correct c ON c.question_id = i.question_id
+    ORDER BY i.position
+"""
 
-def get_questions_for_assignment(assignment_id: int):
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    cursor.execute("""
-        SELECT q.*, o.option_text, o.option_id 
-        FROM Questions q
-        LEFT JOIN Options o ON q.question_id = o.question_id
-        WHERE q.assignment_id = ?""", (assignment_id,))
-    
-    rows = cursor.fetchall()
-    cursor.close()
-    
-    # Group options by question
-    questions = {}
+# Create questions with their options for one assignment in a single round trip
+async def create_questions(conn: Connection, assignment_id: int, questions: Sequence[QuestionDraft]) -> List[Dict[str, Any]]:
+    payload = json.dumps([
+        {
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "options": question.options,
+            "correct_option_index": question.correct_option_index,
+            "points": question.points,
+            "correct_numeric_value": question.correct_numeric_value,
+            "numeric_abs_tolerance": question.numeric_abs_tolerance,
+            "numeric_rel_tolerance": question.numeric_rel_tolerance,
+        }
+        for question in questions
+    ])
+    try:
+        rows = await conn.fetch(SQL_CREATE_QUESTIONS, assignment_id, payload)
+    except ForeignKeyViolationError:
+        raise ValueError("Assignment not found")
+    created = []
     for row in rows:
-        question_id = row['question_id']
-        if question_id not in questions:
-            questions[question_id] = {
-                "question_id": question_id,
-                "assignment_id": row['assignment_id'],
-                "question_text": row['question_text'],
-                "question_type": row['question_type'],
-                "correct_option_id": row['correct_option_id'],
-                "options": []
-            }
-        if row['option_text']:
-            questions[question_id]['options'].append(row['option_text'])
-
-    return list(questions.values())
-
-
+        question = dict(row)
+        question["assignment_id"] = assignment_id
+        question["options"] = json.loads(question["options"])
+        created.append(question)
+    return created
 
+# Create a single question with its options
+async def create_question(conn: Connection, question: QuestionCreate) -> Dict[str, Any]:
+    created = await create_questions(conn, question.assignment_id, [question])
+    return created[0]
 
+# Questions of an assignment with their options, in authoring order
+async def get_questions_for_assignment(conn: Connection, assignment_id: int) -> List[Dict[str, Any]]:
+    sql_command = """
+        SELECT q.question_id,
+               q.assignment_id,
+               q.question_text,
+               q.question_type,
+               q.correct_option_id,
+               q.points,
+               q.correct_numeric_value,
+               q.numeric_abs_tolerance,
+               q.numeric_rel_tolerance,
+               COALESCE(
+                   jsonb_agg(jsonb_build_object('option_id', o.option_id, 'option_text', o.option_text)
+                             ORDER BY o.option_id) FILTER (WHERE o.option_id IS NOT NULL),
+                   '[]'::jsonb
+               ) AS options
+        FROM questions q
+        LEFT JOIN options o ON o.question_id = q.question_id
+        WHERE q.assignment_id = $1
+        GROUP BY q.question_id
+        ORDER BY q.question_id
+    """
+    rows = await conn.fetch(sql_command, assignment_id)
+    questions = []
+    for row in rows:
+        question = dict(row)
+        question["options"] = json.loads(question["options"])
+        questions.append(question)
+    return questions
@@ -1,32 +1,48 @@
 # crud/responses.py
+import json
 from typing import List, Dict, Any, Optional
 from ..db.connection import get_db_connection
+from ..db import queries
 from ..schemas.schemas import ResponseCreate
 
-# CRUD function to save a student's response to a question
-async def create_student_response(conn, student_id: int, question_id: int, response_text: str) -> dict:
-    # First, check if the response already exists for the given student_id and question_id
-    existing_response = await conn.fetchrow(
-        "SELECT response_id FROM studentresponses WHERE student_id = $1 AND question_id = $2",
-        student_id, question_id
-    )
-
-    if existing_response:
-        # Update the existing response
-        await conn.execute(
-            "UPDATE studentresponses SET response = $1 WHERE student_id = $2 AND question_id = $3",
-            response_text, student_id, question_id
+RESPONSE_UPSERT_ATTEMPTS = 3
+
+# CRUD function to save a student's response to a question with its score and
+# correctness (None when the question is not auto-graded; see
+# app/services/grading.py).
+# One statement upserts the response and adds the change in score to the
+# student's assignment_scores row. It writes nothing when it lost a race with
+# another first submission to the same question, and is then run again.
+# course_id is the partition key of studentresponses: it routes the insert and
+# lets the lookup and update touch only the course's partition.
+# selected_option_id is derived from the response text by a trigger on
+# studentresponses.
+async def create_student_response(
+    conn,
+    student_id: int,
+    question_id: int,
+    response_text: str,
+    course_id: int,
+    assignment_id: int,
+    score: Optional[float] = None,
+    is_correct: Optional[bool] = None,
+) -> dict:
+    for _ in range(RESPONSE_UPSERT_ATTEMPTS):
+        response_id = await queries.RESPONSE_UPSERT.fetchval(
+            conn, course_id, student_id, question_id, response_text, score, assignment_id, is_correct
         )
-        response_id = existing_response['response_id']  # Since the response exists, we use the existing id
+        if response_id is not None:
+            break
     else:
-        # Insert a new response and get the new id
-        response_record = await conn.fetchrow(
-            "INSERT INTO studentresponses (student_id, question_id, response) VALUES ($1, $2, $3) RETURNING response_id",
-            student_id, question_id, response_text
-        )
-        response_id = response_record['response_id']  # Fetch the new response id
-
-    return {"response_id": response_id, "student_id": student_id, "question_id": question_id, "response": response_text}
+        raise RuntimeError(f"Could not save the response of student {student_id} to question {question_id}")
+    return {
+        "response_id": response_id,
+        "student_id": student_id,
+        "question_id": question_id,
+        "response": response_text,
+        "score": score,
+        "is_correct": is_correct,
+    }
 
 
 # Get student responses to each assignment question
@@ -41,15 +57,16 @@ async def get_student_assignments_responses(conn, student_id: int) -> List[Dict[
                 WHEN Questions.question_type = 'multiple_choice' AND studentresponses.response IS NOT NULL THEN StudentOption.option_text
                 ELSE studentresponses.response
             END AS student_response,
-            CorrectOption.option_text AS correct_answer_text
+            COALESCE(CorrectOption.option_text, Questions.correct_numeric_value::text) AS correct_answer_text,
+            studentresponses.score
         FROM 
             studentresponses
         LEFT JOIN 
             Questions ON studentresponses.question_id = Questions.question_id
         LEFT JOIN 
-            Options AS StudentOption ON studentresponses.response::text = StudentOption.option_id::text AND Questions.question_type = 'multiple_choice'
+            Options AS StudentOption ON studentresponses.selected_option_id = StudentOption.option_id AND Questions.question_type = 'multiple_choice'
         LEFT JOIN 
-            Options AS CorrectOption ON Questions.correct_option_id::text = CorrectOption.option_id::text AND Questions.correct_option_id IS NOT NULL
+            Options AS CorrectOption ON Questions.correct_option_id = CorrectOption.option_id
         INNER JOIN 
             Assignments ON Questions.assignment_id = Assignments.assignment_id
         INNER JOIN 
@@ -87,7 +104,8 @@ async def get_student_assignments_responses(conn, student_id: int) -> List[Dict[
             'assignment_description': row_data['assignment_description'],
             'question_text': row_data['question_text'],
             'student_response': row_data['student_response'],
-            'correct_answer_text': row_data.get('correct_answer_text')  # .get() handles the case if key is missing
+            'correct_answer_text': row_data.get('correct_answer_text'),  # .get() handles the case if key is missing
+            'score': row_data['score']
         })
     
     # Return the grouped data as a list of modules
@@ -95,7 +113,10 @@ async def get_student_assignments_responses(conn, student_id: int) -> List[Dict[
 
 
 async def get_course_student_results(conn, course_id: int) -> List[Dict[str, Any]]:
-    """Get all student quiz results for a course, grouped by student."""
+    """Get all student quiz results for a course, grouped by student.
+
+    is_correct is the correctness stored when the response was graded.
+    """
     query = """
         SELECT
             Students.student_id,
@@ -112,14 +133,9 @@ async def get_course_student_results(conn, course_id: int) -> List[Dict[str, Any
                     THEN StudentOption.option_text
                 ELSE studentresponses.response
             END AS student_response,
-            CorrectOption.option_text AS correct_answer_text,
-            CASE
-                WHEN Questions.question_type = 'multiple_choice'
-                    AND studentresponses.response IS NOT NULL
-                    AND studentresponses.response::text = Questions.correct_option_id::text
-                    THEN true
-                ELSE false
-            END AS is_correct
+            COALESCE(CorrectOption.option_text, Questions.correct_numeric_value::text) AS correct_answer_text,
+            studentresponses.score,
+            COALESCE(studentresponses.is_correct, false) AS is_correct
         FROM
             studentresponses
         INNER JOIN
@@ -128,18 +144,18 @@ async def get_course_student_results(conn, course_id: int) -> List[Dict[str, Any
             Questions ON studentresponses.question_id = Questions.question_id
         LEFT JOIN
             Options AS StudentOption
-            ON studentresponses.response::text = StudentOption.option_id::text
+            ON studentresponses.selected_option_id = StudentOption.option_id
             AND Questions.question_type = 'multiple_choice'
         LEFT JOIN
             Options AS CorrectOption
-            ON Questions.correct_option_id::text = CorrectOption.option_id::text
-            AND Questions.correct_option_id IS NOT NULL
+            ON Questions.correct_option_id = CorrectOption.option_id
         INNER JOIN
             Assignments ON Questions.assignment_id = Assignments.assignment_id
         INNER JOIN
             Modules ON Assignments.module_id = Modules.module_id
         WHERE
             Modules.course_id = $1
+            AND studentresponses.course_id = $1
         ORDER BY
             Students.name,
             Modules.title,
@@ -172,10 +188,12 @@ async def get_course_student_results(conn, course_id: int) -> List[Dict[str, Any
             }
         module = student["modules"][mod_title]
         module["questions"].append({
+            "question_id": r["question_id"],
             "question_text": r["question_text"],
             "student_response": r["student_response"],
             "correct_answer": r["correct_answer_text"],
             "is_correct": r["is_correct"],
+            "score": r["score"],
         })
         module["total"] += 1
         student["total_questions"] += 1
@@ -189,4 +207,90 @@ async def get_course_student_results(conn, course_id: int) -> List[Dict[str, Any
         student["modules"] = list(student["modules"].values())
         result_list.append(student)
 
-    return result_list
\ No newline at end of file
+    return result_list
+
+# Questions and options of an assignment, one row per option, for item analysis
+async def get_assignment_item_bank(conn, assignment_id: int) -> List[Dict[str, Any]]:
+    query = """
+        SELECT
+            Questions.question_id,
+            Questions.question_text,
+            Questions.question_type,
+            Questions.correct_option_id,
+            Options.option_id,
+            Options.option_text
+        FROM Questions
+        LEFT JOIN Options ON Options.question_id = Questions.question_id
+        WHERE Questions.assignment_id = $1
+        ORDER BY Questions.question_id, Options.option_id
+    """
+    return [dict(row) for row in await conn.fetch(query, assignment_id)]
+
+
+
+# Course of an assignment and a version of its item analysis inputs. Every
+# response save and regrade bumps the assignment's assignment_scores rows. The
+# items part hashes the id and xmin (the row version Postgres bumps on every
+# UPDATE) of each question and option, so adding, editing or deleting any of
+# them, keys included, changes it too. The version therefore changes in every
+# worker without any cache invalidation.
+async def get_assignment_analysis_version(conn, assignment_id: int) -> Dict[str, Any]:
+    query = """
+        SELECT
+            m.course_id,
+            concat_ws(':', i.items, s.students, s.updated_at) AS version
+        FROM assignments a
+        JOIN modules m ON m.module_id = a.module_id
+        CROSS JOIN LATERAL (
+            SELECT COALESCE(md5(string_agg(
+                concat_ws('.', q.question_id, q.xmin, o.option_id, o.xmin), ','
+                ORDER BY q.question_id, o.option_id
+            )), '') AS items
+            FROM questions q
+            LEFT JOIN options o ON o.question_id = q.question_id
+            WHERE q.assignment_id = a.assignment_id
+        ) i
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS students, max(updated_at) AS updated_at
+            FROM assignment_scores
+            WHERE assignment_id = a.assignment_id
+        ) s
+        WHERE a.assignment_id = $1
+    """
+    row = await conn.fetchrow(query, assignment_id)
+    if row is None:
+        raise ValueError("Assignment not found")
+    return dict(row)
+
+# Every response of an assignment as three parallel arrays (student, question,
+# chosen option), aggregated server-side so item analysis can load them straight
+# into NumPy. option_id is 0 when the response does not name one of the
+# question's options (selected_option_id is NULL). The course_id subquery
+# is evaluated once at executor start and prunes studentresponses to one
+# partition.
+async def get_assignment_response_arrays(conn, assignment_id: int) -> Dict[str, List[int]]:
+    query = """
+        SELECT
+            COALESCE(array_agg(studentresponses.student_id), '{}') AS student_ids,
+            COALESCE(array_agg(studentresponses.question_id), '{}') AS question_ids,
+            COALESCE(array_agg(COALESCE(studentresponses.selected_option_id, 0)), '{}') AS option_ids
+        FROM studentresponses
+        INNER JOIN Questions ON studentresponses.question_id = Questions.question_id
+        WHERE Questions.assignment_id = $1
+          AND studentresponses.student_id IS NOT NULL
+          AND studentresponses.course_id = (
+              SELECT Modules.course_id
+              FROM Assignments
+              INNER JOIN Modules ON Modules.module_id = Assignments.module_id
+              WHERE Assignments.assignment_id = $1
+          )
+    """
+    row = await conn.fetchrow(query, assignment_id)
+    return dict(row)
+
+# Tell every live dashboard of a course to reload its results, e.g. after a
+# regrade rewrote scores without announcing each change. Delivered when the
+# surrounding transaction (if any) commits.
+async def notify_course_results_resync(conn, course_id: int) -> None:
+    payload = json.dumps({"type": "resync", "course_id": course_id})
+    await conn.execute("SELECT pg_notify('course_results', $1)", payload)
@@ -1,6 +1,11 @@
 import asyncpg
 import os
 from dotenv import load_dotenv
+from fastapi import Request
+from ..core.metrics import register_gauge
+from .instrumentation import InstrumentedConnection
+from .queries import pool_init_kwargs
+from .replica import read_replica
 
 # Load environment variables
 load_dotenv()
@@ -41,6 +46,32 @@ else:
         "port": int(os.getenv('DB_PORT', '5432')),
     }
 
+def _pool_size_kwargs() -> dict:
+    """Per-worker pool bounds.
+
+    DB_CONNECTION_BUDGET is the total number of connections the whole
+    deployment may open; it is divided between the WEB_CONCURRENCY workers.
+    DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE override the derived values. With
+    neither set, asyncpg's defaults (10/10) apply.
+    """
+    sizes = {}
+    budget = os.getenv('DB_CONNECTION_BUDGET')
+    if budget:
+        workers = max(int(os.getenv('WEB_CONCURRENCY', '1')), 1)
+        sizes["max_size"] = max(int(budget) // workers, 1)
+        sizes["min_size"] = min(2, sizes["max_size"])
+    if os.getenv('DB_POOL_MAX_SIZE'):
+        sizes["max_size"] = int(os.getenv('DB_POOL_MAX_SIZE'))
+    if os.getenv('DB_POOL_MIN_SIZE'):
+        sizes["min_size"] = int(os.getenv('DB_POOL_MIN_SIZE'))
+    if "max_size" in sizes:
+        sizes["min_size"] = min(sizes.get("min_size", 10), sizes["max_size"])
+    return sizes
+
+
+POOL_SIZE_KWARGS = _pool_size_kwargs()
+
+
 class DBConnection:
     _pool = None  # Class attribute to hold the pool
 
@@ -48,7 +79,10 @@ class DBConnection:
     async def init(cls):  # Initialize as a class method
         if cls._pool is None:
             cls._pool = await asyncpg.create_pool(
-                **CONNECTION_KWARGS
+                **CONNECTION_KWARGS,
+                **POOL_SIZE_KWARGS,
+                **pool_init_kwargs(),
+                connection_class=InstrumentedConnection,
             )
 
     async def __aenter__(self):
@@ -60,9 +94,39 @@ class DBConnection:
     async def __aexit__(self, exc_type, exc, tb):
         await self._pool.release(self.conn)
 
+def _pool_samples():
+    pool = DBConnection._pool
+    if pool is None:
+        return []
+    return [
+        ({"state": "open"}, pool.get_size()),
+        ({"state": "idle"}, pool.get_idle_size()),
+        ({"state": "max"}, pool.get_max_size()),
+        ({"state": "min"}, pool.get_min_size()),
+    ]
+
+
+register_gauge("db_pool_connections", "asyncpg pool connections by state.", _pool_samples)
+
 # Ensure that you have an async generator to use as a dependency in FastAPI
 async def get_db_connection():
     db_conn = DBConnection()
     async with db_conn as conn:
         yield conn
 
+# Read-only endpoints: the read replica when one is configured and fresh enough
+# for this client, otherwise the primary. See app/db/replica.py.
+async def get_read_connection(request: Request):
+    if read_replica.enabled and read_replica.route(request.cookies, request.headers) == "replica":
+        try:
+            conn = await read_replica.pool.acquire()
+        except Exception:
+            read_replica.lag_seconds = None
+        else:
+            try:
+                yield conn
+            finally:
+                await read_replica.pool.release(conn)
+            return
+    async with DBConnection() as conn:
+        yield conn
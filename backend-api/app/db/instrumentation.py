@@ -0,0 +1,57 @@
+"""asyncpg connection class that reports every query to ``app.core.metrics``.
+
+Installed as the pool's ``connection_class``, so it also covers connections
+used outside request handlers (background flushes, CLI scripts).
+"""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import asyncpg
+
+from ..core.metrics import record_query
+
+
+class InstrumentedConnection(asyncpg.Connection):
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, *args, **kwargs)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    async def executemany(self, command: str, args: Any, **kwargs: Any) -> None:
+        started = time.perf_counter()
+        try:
+            return await super().executemany(command, args, **kwargs)
+        finally:
+            record_query(command, time.perf_counter() - started)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list:
+        started = time.perf_counter()
+        try:
+            return await super().fetch(query, *args, **kwargs)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await super().fetchrow(query, *args, **kwargs)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await super().fetchval(query, *args, **kwargs)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    async def copy_records_to_table(self, table_name: str, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            return await super().copy_records_to_table(table_name, **kwargs)
+        finally:
+            record_query(f"COPY {table_name} FROM STDIN", time.perf_counter() - started)
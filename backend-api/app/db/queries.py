@@ -0,0 +1,323 @@
+"""Registry of hot statements, prepared on every pooled connection.
+
+asyncpg already keeps a per-connection LRU of prepared statements keyed by
+SQL text. Each new pool connection still parses and introspects a statement
+on its first use, and a busy connection can evict it again. Statements
+registered here are prepared once, in the pool's ``init`` hook, and stay
+prepared for the connection's lifetime. Calls through ``Query`` skip the
+cache lookup, are counted in the request's Server-Timing like any other
+query, and keep per-statement call counts and timings for ``/metrics``.
+
+``DB_PREPARE_QUERIES=false`` turns the init hook off, for example behind
+PgBouncer in transaction mode. ``Query`` then runs its SQL on the plain
+connection. So does any connection that was not prepared by a pool
+(scripts, benchmarks).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+
+from ..core.metrics import record_query, register_gauge
+
+logger = logging.getLogger("myapp")
+
+DB_PREPARE_QUERIES = os.getenv("DB_PREPARE_QUERIES", "true").lower() == "true"
+
+
+@dataclass
+class QueryStats:
+    calls: int = 0
+    prepared_calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class Query:
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.stats = QueryStats()
+
+    def _prepared(self, conn) -> asyncpg.prepared_stmt.PreparedStatement | None:
+        prepared = getattr(conn, "prepared_queries", None)
+        return prepared.get(self.name) if prepared else None
+
+    async def _call(self, conn, method: str, args: tuple) -> Any:
+        statement = self._prepared(conn)
+        started = time.perf_counter()
+        try:
+            if statement is None:
+                return await getattr(conn, method)(self.sql, *args)
+            try:
+                return await getattr(statement, method)(*args)
+            except asyncpg.exceptions.FeatureNotSupportedError:
+                # The statement's result type changed under it (ALTER TABLE on
+                # a SELECT * query). Drop it; the retry and later calls go
+                # through asyncpg's own cache, which re-prepares.
+                conn.prepared_queries.pop(self.name, None)
+                statement = None
+                if conn.is_in_transaction():
+                    raise
+                return await getattr(conn, method)(self.sql, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.calls += 1
+            self.stats.prepared_calls += statement is not None
+            self.stats.seconds += elapsed
+            self.stats.max_seconds = max(self.stats.max_seconds, elapsed)
+            if statement is not None:
+                # Unprepared calls are already recorded by InstrumentedConnection.
+                record_query(self.sql, elapsed)
+
+    async def fetch(self, conn, *args: Any) -> list[asyncpg.Record]:
+        return await self._call(conn, "fetch", args)
+
+    async def fetchrow(self, conn, *args: Any) -> asyncpg.Record | None:
+        return await self._call(conn, "fetchrow", args)
+
+    async def fetchval(self, conn, *args: Any) -> Any:
+        return await self._call(conn, "fetchval", args)
+
+
+class QueryRegistry:
+    def __init__(self):
+        self.queries: dict[str, Query] = {}
+
+    def add(self, name: str, sql: str) -> Query:
+        if name in self.queries:
+            raise ValueError(f"Query {name!r} is already registered")
+        query = self.queries[name] = Query(name, sql)
+        return query
+
+    async def prepare(self, conn: asyncpg.Connection) -> None:
+        """Pool ``init`` hook: prepare every registered statement on a new connection."""
+        prepared = {}
+        for query in self.queries.values():
+            try:
+                prepared[query.name] = await conn.prepare(query.sql)
+            except Exception as e:
+                # A missing column or table (schema not migrated yet) must not
+                # take the pool down; the query runs unprepared instead.
+                logger.warning("Could not prepare query %s: %s", query.name, e)
+        conn.prepared_queries = prepared
+
+
+registry = QueryRegistry()
+
+
+def pool_init_kwargs() -> dict:
+    """Extra ``create_pool`` arguments that install the registry's init hook."""
+    return {"init": registry.prepare} if DB_PREPARE_QUERIES else {}
+
+
+def _stat_samples(attribute: str):
+    return [({"query": name}, getattr(query.stats, attribute)) for name, query in sorted(registry.queries.items())]
+
+
+register_gauge("db_registry_query_calls_total", "Calls per registered query.", lambda: _stat_samples("calls"), kind="counter")
+register_gauge(
+    "db_registry_query_prepared_calls_total",
+    "Calls per registered query that used the connection's prepared statement.",
+    lambda: _stat_samples("prepared_calls"),
+    kind="counter",
+)
+register_gauge("db_registry_query_seconds_total", "Time spent per registered query.", lambda: _stat_samples("seconds"), kind="counter")
+register_gauge("db_registry_query_max_seconds", "Slowest call per registered query.", lambda: _stat_samples("max_seconds"))
+
+
+# ---------------------------------------------------------------------------
+# Access control (app/core/rbac.py); at least one per authenticated request
+
+STUDENT_ID_BY_EMAIL = registry.add(
+    "student_id_by_email",
+    "SELECT student_id FROM students WHERE lower(email) = lower($1)",
+)
+
+STUDENT_IS_ENROLLED = registry.add(
+    "student_is_enrolled",
+    """
+    SELECT 1
+    FROM students s
+    JOIN enrollments e ON e.student_id = s.student_id
+    WHERE lower(s.email) = lower($1)
+      AND e.course_id = $2
+    LIMIT 1
+    """,
+)
+
+TEACHER_OF_STUDENT = registry.add(
+    "teacher_of_student",
+    """
+    SELECT 1
+    FROM students s
+    JOIN enrollments e ON e.student_id = s.student_id
+    JOIN courses c ON c.course_id = e.course_id
+    JOIN instructors i ON i.instructor_id = c.instructor_id
+    WHERE s.student_id = $1
+      AND lower(i.email) = lower($2)
+    LIMIT 1
+    """,
+)
+
+COURSE_TEACHER = registry.add(
+    "course_teacher",
+    """
+    SELECT 1
+    FROM courses c
+    JOIN instructors i ON i.instructor_id = c.instructor_id
+    WHERE c.course_id = $1
+      AND lower(i.email) = lower($2)
+    LIMIT 1
+    """,
+)
+
+COURSE_ID_FOR_MODULE = registry.add(
+    "course_id_for_module",
+    "SELECT course_id FROM modules WHERE module_id = $1",
+)
+
+COURSE_ID_FOR_ASSIGNMENT = registry.add(
+    "course_id_for_assignment",
+    """
+    SELECT m.course_id
+    FROM assignments a
+    JOIN modules m ON m.module_id = a.module_id
+    WHERE a.assignment_id = $1
+    """,
+)
+
+COURSE_ID_FOR_QUESTION = registry.add(
+    "course_id_for_question",
+    """
+    SELECT m.course_id
+    FROM questions q
+    JOIN assignments a ON a.assignment_id = q.assignment_id
+    JOIN modules m ON m.module_id = a.module_id
+    WHERE q.question_id = $1
+      AND a.assignment_id = $2
+      AND m.module_id = $3
+    """,
+)
+
+
+# ---------------------------------------------------------------------------
+# Graded student response upsert (app/crud/responses.py, app/services/grading.py)
+
+QUESTION_GRADING_KEY = registry.add(
+    "question_grading_key",
+    """
+    SELECT question_id, assignment_id, question_type, points, correct_option_id,
+           correct_numeric_value, numeric_abs_tolerance, numeric_rel_tolerance
+    FROM questions
+    WHERE question_id = $1
+    """,
+)
+
+# First key of the advisory lock on an assignment's assignment_scores rows; the
+# second key is the assignment_id.
+ASSIGNMENT_SCORES_LOCK = 4701
+
+# $1 course_id, $2 student_id, $3 question_id, $4 response, $5 score and $7
+# is_correct (NULL when ungraded), $6 assignment_id. Upserts the student's one response to the
+# question (unique on course_id, student_id, question_id) and adds the change
+# in score to assignment_scores. The earlier response, if any, is read FOR
+# UPDATE first, so its score is the one being replaced. When a first
+# submission races another one for the same question, the row it conflicts
+# with was committed after this statement's snapshot and its score is
+# unknown; the update is then skipped and nothing is written or returned, and
+# the caller runs the statement again. The new totals are announced on the
+# course_results channel for live dashboards (app/services/live_results.py),
+# with the texts a results row shows so a dashboard never re-runs the results
+# join; they are truncated to keep the payload under NOTIFY's 8000-byte limit.
+# The assignment's scores lock is taken shared before the assignment_scores row
+# is touched, so saves run side by side but wait for rebuild_assignment_scores
+# (app/crud/grading.py) of the same assignment. Returns the response id.
+RESPONSE_UPSERT = registry.add(
+    "response_upsert",
+    """
+    WITH scores_lock AS (
+        SELECT pg_advisory_xact_lock_shared(%d, $6::int)
+    ),
+    previous AS (
+        SELECT count(*) AS responses, COALESCE(sum(score), 0) AS score, count(score) AS graded
+        FROM (
+            SELECT score
+            FROM studentresponses
+            WHERE course_id = $1 AND student_id = $2 AND question_id = $3
+            FOR UPDATE
+        ) existing
+    ),
+    saved AS (
+        INSERT INTO studentresponses (course_id, student_id, question_id, response, score, is_correct, graded_at)
+        SELECT $1, $2, $3, $4, $5::float8, $7::bool, now()
+        FROM previous
+        ON CONFLICT (course_id, student_id, question_id) DO UPDATE
+        SET response = EXCLUDED.response, score = EXCLUDED.score, is_correct = EXCLUDED.is_correct,
+            graded_at = EXCLUDED.graded_at
+        WHERE (SELECT responses FROM previous) > 0
+        RETURNING response_id, selected_option_id
+    ),
+    totals AS (
+        INSERT INTO assignment_scores (assignment_id, course_id, student_id, score, graded_responses)
+        SELECT $6, $1, $2,
+               COALESCE($5::float8, 0) - p.score,
+               ($5::float8 IS NOT NULL)::int - p.graded
+        FROM saved, previous p, scores_lock
+        ON CONFLICT (assignment_id, student_id) DO UPDATE
+        SET score = assignment_scores.score + EXCLUDED.score,
+            graded_responses = assignment_scores.graded_responses + EXCLUDED.graded_responses,
+            updated_at = now()
+        RETURNING score, graded_responses
+    )
+    SELECT saved.response_id,
+           pg_notify('course_results', json_build_object(
+               'course_id', $1::int,
+               'student_id', $2::int,
+               'student_name', s.name,
+               'student_email', s.email,
+               'assignment_id', $6::int,
+               'module_title', left(m.title, 200),
+               'question_id', $3::int,
+               'question_text', left(q.question_text, 500),
+               'response_id', saved.response_id,
+               'student_response', left(CASE WHEN q.question_type = 'multiple_choice' THEN so.option_text ELSE $4 END, 500),
+               'correct_answer', left(COALESCE(co.option_text, q.correct_numeric_value::text), 500),
+               'score', $5::float8,
+               'is_correct', COALESCE($7::bool, false),
+               'delta', COALESCE($5::float8, 0) - p.score,
+               'assignment_score', t.score,
+               'graded_responses', t.graded_responses
+           )::text)
+    FROM saved
+    CROSS JOIN totals t
+    CROSS JOIN previous p
+    JOIN questions q ON q.question_id = $3
+    JOIN assignments a ON a.assignment_id = q.assignment_id
+    JOIN modules m ON m.module_id = a.module_id
+    LEFT JOIN students s ON s.student_id = $2
+    LEFT JOIN options so ON so.option_id = saved.selected_option_id
+    LEFT JOIN options co ON co.option_id = q.correct_option_id
+    """ % ASSIGNMENT_SCORES_LOCK,
+)
+
+
+# ---------------------------------------------------------------------------
+# Module fetch (app/crud/modules.py)
+
+MODULE_BY_ID = registry.add(
+    "module_by_id",
+    "SELECT * FROM Modules WHERE module_id = $1",
+)
+
+# xmin changes whenever the row is updated, so it versions cached copies of
+# the module's experiment config across workers.
+MODULE_CONFIG_VERSION = registry.add(
+    "module_config_version",
+    "SELECT course_id, xmin::text AS version FROM Modules WHERE module_id = $1",
+)
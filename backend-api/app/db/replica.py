@@ -0,0 +1,171 @@
+"""Optional read-replica routing.
+
+With ``READ_REPLICA_DATABASE_URL`` set, read-only listing, results and
+analytics endpoints take their connection from ``get_read_connection``
+(``app.db.connection``). That dependency serves them from a second pool on
+the replica, and everything else keeps using the primary. A read goes to the
+primary instead when:
+
+* the client wrote recently. ``ReadAfterWriteMiddleware`` answers every
+  successful non-GET request with an ``X-DB-Read-Primary: <seconds>`` header
+  and a cookie of the same lifetime. For that long the frontend sends
+  ``X-DB-Read-Primary: 1`` on its requests (``src/readAfterWrite.js``), so a
+  user who just submitted an answer reads their own write, not the replica's
+  older snapshot. The header works when the API is on another origin, where
+  the frontend sends no cookies; the cookie covers same-origin clients that
+  do not send the header. Either can only move the client's own reads to the
+  primary.
+* the replica lags more than ``REPLICA_MAX_LAG_SECONDS``, or the last lag
+  check failed. A background task measures the lag every
+  ``REPLICA_LAG_CHECK_SECONDS``.
+
+Without the variable nothing changes: ``get_read_connection`` is the primary
+pool. For local testing, point the variable at the primary database itself.
+It is not in recovery, so it reports zero lag.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+import asyncpg
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.metrics import register_gauge
+from .instrumentation import InstrumentedConnection
+from .queries import pool_init_kwargs
+
+logger = logging.getLogger("myapp")
+
+READ_REPLICA_DATABASE_URL = os.getenv("READ_REPLICA_DATABASE_URL", "")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "2"))
+# Long enough for a write to reach a replica that is within the lag limit.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", str(int(REPLICA_MAX_LAG_SECONDS) + 5)))
+STICKY_COOKIE = "db_read_primary"
+STICKY_HEADER = "X-DB-Read-Primary"
+
+# Zero when the replica has replayed everything it received (an idle primary
+# produces no new transactions, so the replay timestamp alone would grow).
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReadReplica:
+    def __init__(self, dsn: str, max_lag_seconds: float, check_interval_seconds: float):
+        self.dsn = dsn
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        # None until the first successful check, and after a failed one.
+        self.lag_seconds: float | None = None
+        self.pool: asyncpg.Pool | None = None
+        self.routes: dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.dsn)
+
+    async def check(self) -> None:
+        try:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    dsn=self.dsn,
+                    min_size=1,
+                    max_size=int(os.getenv("REPLICA_POOL_MAX_SIZE", "10")),
+                    **pool_init_kwargs(),
+                    connection_class=InstrumentedConnection,
+                )
+            async with self.pool.acquire() as conn:
+                lag = float(await conn.fetchval(LAG_QUERY))
+        except Exception as e:
+            if self.lag_seconds is not None:
+                logger.warning("Read replica unavailable, reading from primary: %s", e)
+            self.lag_seconds = None
+            return
+        if lag > self.max_lag_seconds and (self.lag_seconds or 0) <= self.max_lag_seconds:
+            logger.warning("Read replica is %.1fs behind, reading from primary", lag)
+        self.lag_seconds = lag
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    def route(self, cookies: dict[str, str], headers: Headers) -> str:
+        """Return the reason to serve this read from the primary, or "replica"."""
+        if STICKY_COOKIE in cookies or STICKY_HEADER in headers:
+            reason = "read_after_write"
+        elif self.lag_seconds is None or self.pool is None:
+            reason = "unavailable"
+        elif self.lag_seconds > self.max_lag_seconds:
+            reason = "lagging"
+        else:
+            reason = "replica"
+        self.routes[reason] = self.routes.get(reason, 0) + 1
+        return reason
+
+
+read_replica = ReadReplica(READ_REPLICA_DATABASE_URL, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_SECONDS)
+
+
+def _lag_samples():
+    if not read_replica.enabled or read_replica.lag_seconds is None:
+        return []
+    return [({}, read_replica.lag_seconds)]
+
+
+register_gauge("db_replica_lag_seconds", "Replication lag of the read replica at the last check.", _lag_samples)
+register_gauge(
+    "db_read_routes_total",
+    "Reads routed by get_read_connection; every reason except replica was served by the primary.",
+    lambda: [({"reason": reason}, count) for reason, count in sorted(read_replica.routes.items())],
+    kind="counter",
+)
+
+
+class ReadAfterWriteMiddleware:
+    """Marks clients that just wrote so their next reads go to the primary."""
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app: ASGIApp, sticky_seconds: int = REPLICA_STICKY_SECONDS):
+        self.app = app
+        self.cookie = f"{STICKY_COOKIE}=1; Max-Age={sticky_seconds}; Path=/; HttpOnly; SameSite=Lax".encode("latin-1")
+        self.header = (STICKY_HEADER.lower().encode("latin-1"), str(sticky_seconds).encode("latin-1"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = self.cookie + (b"; Secure" if scope.get("scheme") == "https" else b"")
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie), self.header]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
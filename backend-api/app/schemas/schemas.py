@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, HttpUrl, Field, UUID4
+from pydantic import BaseModel, EmailStr, HttpUrl, Field, UUID4, validator
 from datetime import date
 
 # Response Schema
@@ -234,8 +234,45 @@ class AssignmentInDBBase(Assignment):
 # Question Schema
 
 
-class QuestionCreate(QuestionBase):
-    pass
+class QuestionDraft(BaseModel):
+    question_text: str
+    question_type: str = "multiple_choice"
+    options: List[str] = Field(default_factory=list)
+    correct_option_index: Optional[int] = None
+    # Grading; see app/services/grading.py
+    points: float = Field(1.0, ge=0)
+    correct_numeric_value: Optional[float] = None
+    numeric_abs_tolerance: Optional[float] = Field(None, ge=0)
+    numeric_rel_tolerance: Optional[float] = Field(None, ge=0)
+
+    @validator("correct_option_index")
+    def correct_option_in_range(cls, value, values):
+        options = values.get("options") or []
+        if value is not None and not 0 <= value < len(options):
+            raise ValueError(f"correct_option_index must point at one of the {len(options)} options")
+        return value
+
+    @validator("correct_numeric_value", always=True)
+    def numeric_question_has_value(cls, value, values):
+        if values.get("question_type") == "numeric" and value is None:
+            raise ValueError("numeric questions need a correct_numeric_value")
+        return value
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "question_text": "What is the capital of France?",
+                "question_type": "multiple_choice",
+                "options": ["Paris", "London", "Berlin", "Madrid"],
+                "correct_option_index": 0
+            }
+        }
+
+class QuestionCreate(QuestionDraft):
+    assignment_id: int
+
+class QuestionBatchCreate(BaseModel):
+    questions: List[QuestionDraft] = Field(..., min_items=1, max_items=500)
 
 class QuestionUpdate(QuestionBase):
     pass
@@ -332,3 +369,34 @@ class ResponseInDBBase(ResponseBase):
 
 class Response(ResponseInDBBase):
     pass
+
+
+# Simulation Schema
+class SimulationRequest(BaseModel):
+    parameters: Dict[str, float]
+    max_points: Optional[int] = Field(None, ge=3, le=100000)
+    format: Literal["json", "float32"] = "json"
+
+
+# Tariff Bill Schema: parallel arrays, one entry per consumption profile;
+# a list of length 1 applies to every profile.
+class TariffBillRequest(BaseModel):
+    tariff_ids: List[int] = Field(..., min_items=1, max_items=100000)
+    energy_kwh: List[float] = Field(..., min_items=1, max_items=100000)
+    load_kw: Optional[List[float]] = Field(None, min_items=1, max_items=100000)
+    months: float = Field(1, gt=0, le=12)
+    power_factor: float = Field(0.9, gt=0, le=1)
+
+    @validator("energy_kwh", "load_kw")
+    def same_length_as_tariff_ids(cls, value, values):
+        profiles = len(values.get("tariff_ids") or [])
+        if value is not None and profiles > 1 and len(value) not in (1, profiles):
+            raise ValueError(f"must have {profiles} entries, one per tariff_id, or exactly one")
+        return value
+
+
+# Experiment Run Schema
+class ExperimentRunCreate(BaseModel):
+    model: Optional[str] = None
+    parameters: Dict[str, float]
+    metrics: Optional[Dict[str, Optional[float]]] = None
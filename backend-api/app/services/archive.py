@@ -0,0 +1,130 @@
+"""Archive tier for the student responses of ended courses.
+
+Archiving moves a course's rows out of ``studentresponses`` into
+``studentresponses_archive`` in small batches, so results, item analysis and
+response writes only ever scan live courses, and stamps
+``courses.archived_at``. Restoring moves the rows back and clears the stamp.
+Each batch commits on its own: a job that is interrupted leaves every row in
+exactly one of the two tables and can be rerun.
+
+Run it as a batch job from ``backend-api`` with the app's database settings::
+
+    python -m app.services.archive list
+    python -m app.services.archive archive --ended-before 2026-06-30
+    python -m app.services.archive archive --course-id 12
+    python -m app.services.archive restore --course-id 12
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import date
+from typing import Callable
+
+from ..crud.archive import (
+    archive_course_responses_batch,
+    get_course_archive_status,
+    get_courses_to_archive,
+    restore_course_responses_batch,
+    set_course_archived,
+)
+from ..db.connection import DBConnection
+
+logger = logging.getLogger("myapp")
+
+DEFAULT_BATCH_SIZE = 5000
+
+Progress = Callable[[int, int, float], None]
+
+
+async def _move_in_batches(conn, move_batch, course_id: int, total: int, batch_size: int, progress: Progress | None) -> int:
+    moved = 0
+    started = time.perf_counter()
+    while True:
+        async with conn.transaction():
+            count = await move_batch(conn, course_id, batch_size)
+        if count == 0:
+            return moved
+        moved += count
+        if progress is not None:
+            progress(moved, total, time.perf_counter() - started)
+
+
+async def archive_course(conn, course_id: int, batch_size: int = DEFAULT_BATCH_SIZE, progress: Progress | None = None) -> int:
+    """Move every live response of ``course_id`` to the archive; returns the number moved."""
+    status = await get_course_archive_status(conn, course_id)
+    moved = await _move_in_batches(
+        conn, archive_course_responses_batch, course_id, status["live_responses"], batch_size, progress
+    )
+    await set_course_archived(conn, course_id, True)
+    logger.info("Archived %d responses of course %d", moved, course_id)
+    return moved
+
+
+async def restore_course(conn, course_id: int, batch_size: int = DEFAULT_BATCH_SIZE, progress: Progress | None = None) -> int:
+    """Move every archived response of ``course_id`` back to studentresponses."""
+    status = await get_course_archive_status(conn, course_id)
+    moved = await _move_in_batches(
+        conn, restore_course_responses_batch, course_id, status["archived_responses"], batch_size, progress
+    )
+    await set_course_archived(conn, course_id, False)
+    logger.info("Restored %d responses of course %d", moved, course_id)
+    return moved
+
+
+def _print_progress(course_id: int) -> Progress:
+    def report(moved: int, total: int, elapsed: float) -> None:
+        rate = moved / elapsed if elapsed > 0 else 0.0
+        share = f"{100 * moved / total:5.1f}%" if total else "  n/a"
+        print(f"  course {course_id}: {moved:>10,}/{total:,} {share}  {rate:,.0f} rows/s", flush=True)
+    return report
+
+
+async def _run(args: argparse.Namespace) -> int:
+    async with DBConnection() as conn:
+        if args.command == "list":
+            for course in await get_courses_to_archive(conn, args.ended_before):
+                print(f"{course['course_id']:>6}  {course['session_end_date']}  {course['responses']:>10,}  {course['title']}")
+            return 0
+
+        if args.course_id:
+            course_ids = args.course_id
+        else:
+            course_ids = [course["course_id"] for course in await get_courses_to_archive(conn, args.ended_before)]
+
+        job = archive_course if args.command == "archive" else restore_course
+        for course_id in course_ids:
+            print(f"{args.command} course {course_id}", flush=True)
+            if args.dry_run:
+                print(f"  {await get_course_archive_status(conn, course_id)}")
+                continue
+            moved = await job(conn, course_id, args.batch_size, _print_progress(course_id))
+            print(f"  done: {moved:,} responses", flush=True)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.services.archive", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="ended courses that are not archived yet")
+    archive_parser = commands.add_parser("archive", help="move responses of ended courses to the archive")
+    restore_parser = commands.add_parser("restore", help="bring a course's responses back")
+    for sub in (list_parser, archive_parser):
+        sub.add_argument("--ended-before", type=date.fromisoformat, default=date.today(),
+                         help="courses whose session_end_date is before this date (default: today)")
+    archive_parser.add_argument("--course-id", type=int, action="append",
+                                help="archive these courses regardless of their end date (repeatable)")
+    restore_parser.add_argument("--course-id", type=int, action="append", required=True)
+    for sub in (archive_parser, restore_parser):
+        sub.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        sub.add_argument("--dry-run", action="store_true", help="print what would move and exit")
+
+    return asyncio.run(_run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
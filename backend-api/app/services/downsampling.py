@@ -0,0 +1,70 @@
+"""Plot-aware downsampling and compact encodings for simulation waveforms."""
+from __future__ import annotations
+
+import numpy as np
+
+FLOAT32_MEDIA_TYPE = "application/octet-stream"
+FLOAT32_LAYOUT = "float32-le; x[points] then y[points]"
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last samples are always kept, and with ``max_points >= 4``
+    so are the global maximum and minimum of ``y``: LTTB usually selects
+    them, but impulse crests and PD pulse peaks are read off these plots, so
+    it is guaranteed here. (With 3 points there is one interior slot, which
+    goes to the maximum.)
+    """
+    n = len(x)
+    if max_points >= n or n <= 2:
+        return x, y
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+
+    # Interior samples are split into max_points - 2 buckets; edges[b] is the
+    # first sample index of bucket b.
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for b in range(max_points - 2):
+        start, end = edges[b], edges[b + 1]
+        next_end = edges[b + 2] if b + 2 < len(edges) else n
+        if end >= next_end:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[b + 1] = a
+
+    extremes = sorted({e for e in (int(y.argmin()), int(y.argmax())) if 0 < e < n - 1})
+    buckets = [int(np.searchsorted(edges, e, side="right")) - 1 for e in extremes]
+    if len(extremes) == 2 and buckets[0] == buckets[1]:
+        if max_points == 3:
+            extremes, buckets = [int(y.argmax())], buckets[:1]
+        elif buckets[0] + 1 < max_points - 2:
+            # Both in one bucket: the later one takes the next bucket's slot,
+            # which keeps the selection in x order.
+            buckets[1] += 1
+        else:
+            buckets[0] -= 1
+    for extreme, bucket in zip(extremes, buckets):
+        selected[bucket + 1] = extreme
+
+    return x[selected], y[selected]
+
+
+def encode_float32(x: np.ndarray, y: np.ndarray) -> bytes:
+    """Pack a waveform as little-endian float32, all x values then all y values."""
+    packed = np.concatenate((x, y))
+    if np.abs(packed).max(initial=0.0) > np.finfo(np.float32).max:
+        raise ValueError("Waveform values exceed float32 range; request JSON output instead")
+    return packed.astype("<f4").tobytes()
@@ -0,0 +1,139 @@
+"""Validation and caching of parametric experiment configs (``*_config.json``).
+
+``ExperimentFormParameteric.jsx`` renders one input per entry in
+``variables`` and loads the compute script named in ``compute``. Configs are
+checked here when they are uploaded or attached to a module, and the
+normalized result is stored on the module row so students are served a
+config that is already known to be well formed.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from pathlib import PurePosixPath
+from typing import Any, Callable
+
+from ..core.cache import TTLCache
+from ..storage.local_storage import LocalStorage
+
+EXPERIMENT_CONFIG_SUFFIX = "_config.json"
+OUTPUT_PLOT_FIELDS = ("xAxisLabel", "yAxisLabel", "title")
+
+# (module_id, module row version) -> compact JSON text of the normalized
+# config. The version is the row's xmin, so a save in any worker makes the
+# other workers' entries unreachable; they age out of the LRU.
+experiment_config_cache = TTLCache(
+    maxsize=256,
+    ttl_seconds=float(os.getenv("EXPERIMENT_CONFIG_CACHE_TTL_SECONDS", "600")),
+    name="experiment_config",
+)
+
+
+class ExperimentConfigError(ValueError):
+    """Raised when an experiment config does not match the expected schema."""
+
+
+def is_experiment_config(filename: str) -> bool:
+    return filename.lower().endswith(EXPERIMENT_CONFIG_SUFFIX)
+
+
+def _number(value: Any, where: str) -> float | int:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ExperimentConfigError(f"{where} must be a finite number")
+    return value
+
+
+def _text(value: Any, where: str, required: bool = True) -> str:
+    if value is None and not required:
+        return ""
+    if not isinstance(value, str) or (required and not value.strip()):
+        raise ExperimentConfigError(f"{where} must be a non-empty string")
+    return value.strip()
+
+
+def _normalize_variable(name: str, spec: Any) -> dict[str, Any]:
+    where = f"variables.{name}"
+    if not isinstance(spec, dict):
+        raise ExperimentConfigError(f"{where} must be an object")
+    lower = _number(spec.get("min"), f"{where}.min")
+    upper = _number(spec.get("max"), f"{where}.max")
+    initial = _number(spec.get("initial"), f"{where}.initial")
+    if lower > upper:
+        raise ExperimentConfigError(f"{where}.min must not exceed {where}.max")
+    if not lower <= initial <= upper:
+        raise ExperimentConfigError(f"{where}.initial must lie between min and max")
+    return {
+        "variableLabel": _text(spec.get("variableLabel"), f"{where}.variableLabel"),
+        "variableDescription": _text(spec.get("variableDescription"), f"{where}.variableDescription", required=False),
+        "initial": initial,
+        "min": lower,
+        "max": upper,
+    }
+
+
+def _normalize_compute(value: Any) -> str:
+    compute = _text(value, "compute")
+    path = PurePosixPath(compute.replace("\\", "/"))
+    if path.is_absolute() or ".." in path.parts or path.suffix.lower() != ".js":
+        raise ExperimentConfigError("compute must be a relative path to a .js file")
+    return path.as_posix()
+
+
+def normalize_experiment_config(
+    raw: bytes | str | dict[str, Any],
+    compute_exists: Callable[[str], bool] | None = None,
+) -> dict[str, Any]:
+    """Validate an experiment config and return its normalized form.
+
+    Unknown keys are dropped, labels are trimmed and variable order is
+    preserved. ``compute_exists`` is called with the compute script path when
+    given, so callers decide where scripts are looked up.
+    """
+    if isinstance(raw, (bytes, str)):
+        try:
+            raw = json.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ExperimentConfigError(f"Experiment config is not valid JSON: {e}")
+    if not isinstance(raw, dict):
+        raise ExperimentConfigError("Experiment config must be a JSON object")
+
+    variables = raw.get("variables")
+    if not isinstance(variables, dict) or not variables:
+        raise ExperimentConfigError("variables must be a non-empty object")
+
+    output_plot = raw.get("output_plot")
+    if not isinstance(output_plot, dict):
+        raise ExperimentConfigError("output_plot must be an object")
+
+    compute = _normalize_compute(raw.get("compute"))
+    if compute_exists is not None and not compute_exists(compute):
+        raise ExperimentConfigError(f"Compute script not found: {compute}")
+
+    return {
+        "variables": {name: _normalize_variable(name, spec) for name, spec in variables.items()},
+        "output_plot": {
+            field: _text(output_plot.get(field), f"output_plot.{field}", required=False)
+            for field in OUTPUT_PLOT_FIELDS
+        },
+        "compute": compute,
+    }
+
+
+def serialize_experiment_config(config: dict[str, Any]) -> str:
+    return json.dumps(config, separators=(",", ":"), ensure_ascii=False)
+
+
+def load_experiment_config(storage: LocalStorage, bucket_name: str, blob_name: str) -> dict[str, Any]:
+    """Read a config from storage and validate it, including its compute script."""
+    try:
+        exists = storage.file_exists(bucket_name, blob_name)
+    except ValueError as e:
+        raise ExperimentConfigError(str(e))
+    if not exists:
+        raise ExperimentConfigError(f"Experiment config not found: {blob_name}")
+    raw = storage.get_file_path(bucket_name, blob_name).read_bytes()
+    return normalize_experiment_config(
+        raw,
+        compute_exists=lambda compute: storage.file_exists(bucket_name, compute),
+    )
@@ -0,0 +1,325 @@
+"""Cached, concurrency-limited text generation for the rephrase and fun-fact buttons.
+
+Students on the same module send the same concept text and title, so every
+(template, normalized text) pair keeps a small pool of generated variants.
+Once the pool is full, requests are answered from it at random and never
+reach OpenAI. While the pool is short, concurrent requests for the same key
+share one upstream call instead of each starting their own.
+
+Upstream calls share one semaphore: callers wait in line for a slot for at
+most ``GENERATION_QUEUE_TIMEOUT_SECONDS`` and then get a
+``GenerationBusyError`` instead of piling up more open requests. A call that
+takes longer than ``GENERATION_TIMEOUT_SECONDS`` raises
+``GenerationTimeoutError``.
+
+The pool and the semaphore live in each worker process.
+``GENERATION_MAX_CONCURRENCY`` is the budget for the whole deployment and is
+divided between the ``WEB_CONCURRENCY`` workers (at least one slot each),
+like ``DB_CONNECTION_BUDGET``. Prefill on module save (``prefill_module``)
+warms only the worker that handled the save. Each other worker fills its
+pool from its first ``GENERATION_VARIANTS`` requests for a text.
+
+``OPENAI_BASE_URL`` points the client at any OpenAI-compatible server, e.g.
+a local stub during development.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+import anyio
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+from ..core.cache import TTLCache
+
+logger = logging.getLogger("myapp")
+
+GENERATION_MODEL = os.getenv("GENERATION_MODEL", "gpt-3.5-turbo")
+GENERATION_VARIANTS = int(os.getenv("GENERATION_VARIANTS", "3"))
+GENERATION_MAX_CONCURRENCY = int(os.getenv("GENERATION_MAX_CONCURRENCY", "4"))
+GENERATION_WORKER_SLOTS = max(GENERATION_MAX_CONCURRENCY // max(int(os.getenv("WEB_CONCURRENCY", "1")), 1), 1)
+GENERATION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("GENERATION_QUEUE_TIMEOUT_SECONDS", "10"))
+GENERATION_TIMEOUT_SECONDS = float(os.getenv("GENERATION_TIMEOUT_SECONDS", "30"))
+GENERATION_PREFILL_ON_SAVE = os.getenv("GENERATION_PREFILL_ON_SAVE", "true").lower() == "true"
+
+# (template name, normalized text) -> list of generated variants
+generation_cache = TTLCache(
+    maxsize=int(os.getenv("GENERATION_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("GENERATION_CACHE_TTL_SECONDS", "86400")),
+    name="generation",
+)
+
+_generation_slots = asyncio.Semaphore(GENERATION_WORKER_SLOTS)
+# cache key -> future of the upstream call currently generating a variant for it
+_inflight: dict[tuple[str, str], asyncio.Future] = {}
+_openai_client: AsyncOpenAI | None = None
+
+
+class GenerationBusyError(RuntimeError):
+    """Raised when no upstream slot frees up within the queue timeout."""
+
+
+class GenerationTimeoutError(RuntimeError):
+    """Raised when the upstream model does not answer within GENERATION_TIMEOUT_SECONDS."""
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    system: str
+    user: str
+    angles: tuple[str, ...]
+    fallback: str
+
+    def messages(self, text: str) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.format(angle=random.choice(self.angles), text=text)},
+        ]
+
+
+PROMPT_TEMPLATES = {
+    template.name: template
+    for template in (
+        PromptTemplate(
+            name="rephrase",
+            system="You are a helpful assistant.",
+            user=(
+                "Add some {angle} related to every day world that a young person living in Singapore can relate to, "
+                "and then rewrite this in a different way: \"{text}\". Keep it between 500-700 characters max."
+            ),
+            angles=("analogy", "example", "metaphor", "simile"),
+            fallback="Could not generate alternative text.",
+        ),
+        PromptTemplate(
+            name="funfact",
+            system="You are a professor teaching undergraduate electrical engineering students.",
+            user="{angle} about \"{text}\". Keep it under 600 characters.",
+            angles=(
+                "Who invented discovered the concept",
+                "The origin story",
+                "Make it relevant to Singapore and tell something ",
+                "Do you something about the worlds largest or smallest example",
+                "Tell something interesting",
+                "From when did people start using",
+            ),
+            fallback="Could not generate fun fact.",
+        ),
+    )
+}
+
+
+def get_openai_client() -> AsyncOpenAI:
+    global _openai_client
+    if _openai_client is None:
+        # The openai package takes most of a second to import, so workers only
+        # pay for it once someone actually asks for generated text.
+        from openai import AsyncOpenAI
+
+        _openai_client = AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY", ""),
+            base_url=os.environ.get("OPENAI_BASE_URL") or None,
+            timeout=GENERATION_TIMEOUT_SECONDS,
+            max_retries=1,
+        )
+    return _openai_client
+
+
+def normalize_prompt_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def generation_cache_key(template_name: str, text: str) -> tuple[str, str]:
+    return (template_name, normalize_prompt_text(text))
+
+
+async def acquire_generation_slot() -> None:
+    try:
+        await asyncio.wait_for(_generation_slots.acquire(), timeout=GENERATION_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise GenerationBusyError("Text generation is busy, try again shortly")
+
+
+def release_generation_slot() -> None:
+    _generation_slots.release()
+
+
+async def _join_inflight(key: tuple[str, str]) -> str | None:
+    """Wait for the upstream call already generating for ``key``; None when there is none."""
+    while (pending := _inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # The caller that started it went away; look again.
+    return None
+
+
+def _lead_inflight(key: tuple[str, str]) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    return future
+
+
+def _settle_inflight(key: tuple[str, str], future: asyncio.Future, result: str | None = None, error: BaseException | None = None) -> None:
+    if _inflight.get(key) is future:
+        del _inflight[key]
+    if future.done():
+        return
+    if error is None:
+        future.set_result(result)
+    elif isinstance(error, Exception):
+        future.set_exception(error)
+        future.exception()  # waiters re-raise it; nobody else needs to
+    else:
+        # Cancelled or closed: waiters start a call of their own.
+        future.cancel()
+
+
+def _remember(key: tuple[str, str], variant: str) -> None:
+    pool: list[str] = generation_cache.get(key) or []
+    if variant not in pool and len(pool) < GENERATION_VARIANTS:
+        generation_cache.set(key, pool + [variant])
+
+
+def _is_timeout(error: Exception) -> bool:
+    from openai import APITimeoutError
+
+    return isinstance(error, APITimeoutError)
+
+
+async def _complete(template: PromptTemplate, text: str) -> str:
+    await acquire_generation_slot()
+    try:
+        chat_completion = await get_openai_client().chat.completions.create(
+            messages=template.messages(text),
+            model=GENERATION_MODEL,
+        )
+    except Exception as e:
+        if _is_timeout(e):
+            raise GenerationTimeoutError("Text generation timed out, try again shortly") from e
+        raise
+    finally:
+        release_generation_slot()
+    if not chat_completion.choices or not chat_completion.choices[0].message.content:
+        return template.fallback
+    return chat_completion.choices[0].message.content.strip()
+
+
+async def _generate_variant(template: PromptTemplate, key: tuple[str, str]) -> str:
+    """One new variant for ``key``, shared with concurrent callers for the same key."""
+    shared = await _join_inflight(key)
+    if shared is not None:
+        return shared
+    future = _lead_inflight(key)
+    try:
+        variant = await _complete(template, key[1])
+    except BaseException as e:
+        _settle_inflight(key, future, error=e)
+        raise
+    if variant != template.fallback:
+        _remember(key, variant)
+    _settle_inflight(key, future, variant)
+    return variant
+
+
+async def generate(template_name: str, text: str) -> str:
+    """Return a variant for ``text``, generating one only while the pool is short."""
+    template = PROMPT_TEMPLATES[template_name]
+    key = generation_cache_key(template_name, text)
+    pool: list[str] = generation_cache.get(key) or []
+    if len(pool) >= GENERATION_VARIANTS:
+        return random.choice(pool)
+    return await _generate_variant(template, key)
+
+
+async def stream_generation(template_name: str, text: str) -> AsyncIterator[str]:
+    """Yield a variant for ``text`` piece by piece as the upstream model produces it.
+
+    A full pool is replayed as a single piece, and so is the result of a
+    call already in flight for the same text. The upstream response is
+    closed and the slot released even when the consumer goes away mid-stream
+    (the generator is cancelled or closed).
+    """
+    template = PROMPT_TEMPLATES[template_name]
+    key = generation_cache_key(template_name, text)
+    pool: list[str] = generation_cache.get(key) or []
+    if len(pool) >= GENERATION_VARIANTS:
+        yield random.choice(pool)
+        return
+    shared = await _join_inflight(key)
+    if shared is not None:
+        yield shared
+        return
+
+    future = _lead_inflight(key)
+    parts: list[str] = []
+    try:
+        await acquire_generation_slot()
+        try:
+            stream = await get_openai_client().chat.completions.create(
+                messages=template.messages(key[1]),
+                model=GENERATION_MODEL,
+                stream=True,
+            )
+            try:
+                async for chunk in stream:
+                    piece = chunk.choices[0].delta.content if chunk.choices else None
+                    if piece:
+                        parts.append(piece)
+                        yield piece
+            finally:
+                with anyio.CancelScope(shield=True):
+                    await stream.close()
+        except Exception as e:
+            if _is_timeout(e):
+                raise GenerationTimeoutError("Text generation timed out, try again shortly") from e
+            raise
+        finally:
+            release_generation_slot()
+    except BaseException as e:
+        _settle_inflight(key, future, error=e)
+        raise
+
+    variant = "".join(parts).strip()
+    if variant:
+        _remember(key, variant)
+        _settle_inflight(key, future, variant)
+    else:
+        _settle_inflight(key, future, template.fallback)
+        yield template.fallback
+
+
+async def prefill(template_name: str, text: str | None) -> int:
+    """Top up the variant pool for ``text``; returns how many were generated."""
+    if not text or not text.strip():
+        return 0
+    template = PROMPT_TEMPLATES[template_name]
+    key = generation_cache_key(template_name, text)
+    generated = 0
+    while len(generation_cache.get(key) or []) < GENERATION_VARIANTS and generated < GENERATION_VARIANTS:
+        await _generate_variant(template, key)
+        generated += 1
+    return generated
+
+
+async def prefill_module(module: Any) -> None:
+    """Background task run after a module is saved: warm the texts students will send.
+
+    Runs in the worker that handled the save, so only that worker's pool is warmed.
+    """
+    if not GENERATION_PREFILL_ON_SAVE or not os.environ.get("OPENAI_API_KEY"):
+        return
+    try:
+        # ModuleDetailPage rephrases the concept and asks for fun facts about the title.
+        await prefill("rephrase", module.concept)
+        await prefill("funfact", module.title)
+    except Exception:
+        logger.exception("Failed to pre-generate rephrase/fun-fact variants")
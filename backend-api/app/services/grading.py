@@ -0,0 +1,146 @@
+"""Auto-grading of student responses.
+
+A question's grading key is its type, ``points`` and its answer:
+
+* ``multiple_choice`` with a ``correct_option_id``: full points when the
+  response names that option id, otherwise 0.
+* ``numeric`` with a ``correct_numeric_value``: full points when the first
+  number in the response is within tolerance of the value, otherwise 0.
+  Units or text after the number are ignored, so ``"1.052 pu"`` reads as
+  1.052. The tolerance is ``numeric_abs_tolerance`` or
+  ``numeric_rel_tolerance`` times the expected value, whichever is larger,
+  so ``|answer - expected| <= max(abs, rel * |expected|)``. With
+  neither set it is ``DEFAULT_RELATIVE_TOLERANCE``. That is enough for lab
+  calculations such as the Ferranti voltage rise of a long line, where
+  students round intermediate results.
+* anything else (long text, or a question without a key) is not graded:
+  the score is ``None``.
+
+A grade carries the score and whether the answer was correct. Correctness is
+stored next to the score rather than read back from it, so a correct answer
+to a question worth 0 points still counts as correct.
+
+``save_graded_response`` grades a response as it is written.
+``regrade_assignment`` re-scores every stored response of an assignment in
+batches after a key changes, then rebuilds the assignment's totals.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+from typing import Any, Awaitable, Callable, Mapping, NamedTuple
+
+from ..crud.grading import (
+    get_assignment_grading_keys,
+    get_question_grading_key,
+    get_responses_for_grading,
+    rebuild_assignment_scores,
+    update_response_scores,
+)
+from ..crud.responses import create_student_response
+
+logger = logging.getLogger("myapp")
+
+MULTIPLE_CHOICE = "multiple_choice"
+NUMERIC = "numeric"
+DEFAULT_RELATIVE_TOLERANCE = 0.01
+REGRADE_BATCH_SIZE = 5000
+
+_NUMBER = re.compile(r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?")
+_OPTION_ID = re.compile(r"\d+")
+
+
+class Grade(NamedTuple):
+    score: float | None
+    is_correct: bool | None
+
+
+UNGRADED = Grade(None, None)
+
+
+def parse_number(response: str | None) -> float | None:
+    """The number a response starts with, or None."""
+    if response is None:
+        return None
+    match = _NUMBER.match(response.strip())
+    if match is None:
+        return None
+    value = float(match.group())
+    return value if math.isfinite(value) else None
+
+
+def is_graded(key: Mapping[str, Any]) -> bool:
+    if key["question_type"] == MULTIPLE_CHOICE:
+        return key["correct_option_id"] is not None
+    if key["question_type"] == NUMERIC:
+        return key["correct_numeric_value"] is not None
+    return False
+
+
+def grade_response(key: Mapping[str, Any], response: str | None) -> Grade:
+    """Grade of ``response`` under a question's grading key; ``UNGRADED`` if the question is not auto-graded."""
+    if not is_graded(key):
+        return UNGRADED
+    if key["question_type"] == MULTIPLE_CHOICE:
+        answer = (response or "").strip()
+        correct = _OPTION_ID.fullmatch(answer) is not None and int(answer) == key["correct_option_id"]
+    else:
+        value = parse_number(response)
+        expected = float(key["correct_numeric_value"])
+        abs_tolerance = key["numeric_abs_tolerance"]
+        rel_tolerance = key["numeric_rel_tolerance"]
+        if abs_tolerance is None and rel_tolerance is None:
+            rel_tolerance = DEFAULT_RELATIVE_TOLERANCE
+        tolerance = max(abs_tolerance or 0.0, (rel_tolerance or 0.0) * abs(expected))
+        correct = value is not None and abs(value - expected) <= tolerance
+    return Grade(float(key["points"]) if correct else 0.0, correct)
+
+
+async def save_graded_response(conn, student_id: int, question_id: int, response_text: str, course_id: int) -> dict:
+    """Grade a response and save it together with its score and the assignment total."""
+    key = await get_question_grading_key(conn, question_id)
+    grade = grade_response(key, response_text)
+    return await create_student_response(
+        conn, student_id, question_id, response_text, course_id, key["assignment_id"], grade.score, grade.is_correct
+    )
+
+
+async def regrade_assignment(
+    conn,
+    assignment_id: int,
+    course_id: int,
+    batch_size: int = REGRADE_BATCH_SIZE,
+    progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> dict:
+    """Re-score every response of an assignment under the current keys and rebuild its totals.
+
+    Responses are read and rewritten ``batch_size`` at a time; each batch's
+    changed scores are written by one statement. Students keep
+    submitting while this runs: a response saved in the meantime was already
+    graded under the current key and is skipped. ``progress`` is awaited
+    with the responses read and changed so far after every batch.
+    """
+    keys = {key["question_id"]: key for key in await get_assignment_grading_keys(conn, assignment_id)}
+    responses = changed = 0
+    after_response_id = 0
+    while keys:
+        batch = await get_responses_for_grading(conn, course_id, list(keys), after_response_id, batch_size)
+        if not batch:
+            break
+        updates = []
+        for row in batch:
+            grade = grade_response(keys[row["question_id"]], row["response"])
+            if grade != (row["score"], row["is_correct"]):
+                updates.append((row["response_id"], grade.score, grade.is_correct, row["graded_at"]))
+        if updates:
+            response_ids, scores, correct, graded_at = zip(*updates)
+            changed += await update_response_scores(conn, course_id, response_ids, scores, correct, graded_at)
+        responses += len(batch)
+        after_response_id = batch[-1]["response_id"]
+        if progress is not None:
+            await progress(responses, changed)
+    async with conn.transaction():
+        students = await rebuild_assignment_scores(conn, assignment_id)
+    logger.info("Regraded assignment %d: %d responses, %d changed", assignment_id, responses, changed)
+    return {"assignment_id": assignment_id, "responses": responses, "changed": changed, "students": students}
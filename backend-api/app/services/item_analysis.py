@@ -0,0 +1,156 @@
+"""Classical test theory item analysis for an assignment's quiz questions.
+
+All statistics are computed from one students x questions score matrix:
+a student who answered at least one question of the assignment scores 0 on
+every multiple-choice question they skipped, and free-text questions are
+reported but not scored because there is no key to mark them against.
+"""
+from __future__ import annotations
+
+import math
+import os
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from ..core.cache import TTLCache
+
+SCORED_QUESTION_TYPE = "multiple_choice"
+
+# (assignment_id, version) -> report dict. The version comes from
+# get_assignment_analysis_version, so saves in any worker make entries stale.
+item_analysis_cache = TTLCache(
+    maxsize=128,
+    ttl_seconds=float(os.getenv("ITEM_ANALYSIS_CACHE_TTL_SECONDS", "300")),
+    name="item_analysis",
+)
+
+
+def _finite(value: Any) -> float | None:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _point_biserial(scores: np.ndarray) -> np.ndarray:
+    """Corrected item-total correlation for every column at once.
+
+    Each item is correlated with the total of the *other* items so that an
+    item does not inflate its own discrimination. Columns with no variance
+    come out as NaN.
+    """
+    rest = scores.sum(axis=1, keepdims=True) - scores
+    item_dev = scores - scores.mean(axis=0)
+    rest_dev = rest - rest.mean(axis=0)
+    numerator = np.einsum("ij,ij->j", item_dev, rest_dev)
+    denominator = np.sqrt(np.einsum("ij,ij->j", item_dev, item_dev) * np.einsum("ij,ij->j", rest_dev, rest_dev))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / denominator
+
+
+def _cronbach_alpha(scores: np.ndarray) -> float | None:
+    students, items = scores.shape
+    if students < 2 or items < 2:
+        return None
+    total_variance = scores.sum(axis=1).var(ddof=1)
+    if total_variance == 0:
+        return None
+    item_variance = scores.var(axis=0, ddof=1).sum()
+    return _finite(items / (items - 1) * (1 - item_variance / total_variance))
+
+
+def compute_item_analysis(
+    assignment_id: int,
+    item_bank: Iterable[Mapping[str, Any]],
+    student_ids: Sequence[int],
+    question_ids: Sequence[int],
+    option_ids: Sequence[int],
+) -> dict[str, Any]:
+    """Build the report from ``get_assignment_item_bank`` rows and the
+    parallel arrays returned by ``get_assignment_response_arrays``."""
+    questions: dict[int, dict[str, Any]] = {}
+    for row in item_bank:
+        question = questions.setdefault(row["question_id"], {
+            "question_id": row["question_id"],
+            "question_text": row["question_text"],
+            "question_type": row["question_type"],
+            "correct_option_id": row["correct_option_id"],
+            "options": [],
+        })
+        if row["option_id"] is not None:
+            question["options"].append((row["option_id"], row["option_text"]))
+
+    question_key = np.fromiter(questions, dtype=np.int64, count=len(questions))
+    order = np.argsort(question_key)
+    question_key = question_key[order]
+    correct_key = np.array(
+        [questions[q]["correct_option_id"] or 0 for q in question_key.tolist()], dtype=np.int64
+    )
+    scored = np.array(
+        [questions[q]["question_type"] == SCORED_QUESTION_TYPE for q in question_key.tolist()], dtype=bool
+    ) & (correct_key != 0)
+
+    responders = np.asarray(student_ids, dtype=np.int64)
+    answered_q = np.asarray(question_ids, dtype=np.int64)
+    chosen = np.asarray(option_ids, dtype=np.int64)
+    q_code = np.minimum(np.searchsorted(question_key, answered_q), max(len(question_key) - 1, 0))
+    if len(question_key):
+        known = question_key[q_code] == answered_q
+    else:
+        known = np.zeros(len(answered_q), dtype=bool)
+    responders, q_code, chosen = responders[known], q_code[known], chosen[known]
+    student_key, s_code = np.unique(responders, return_inverse=True)
+
+    # Students x questions, 1 for a correct answer and 0 otherwise; unscored
+    # columns are dropped before computing statistics.
+    scores = np.zeros((len(student_key), len(question_key)), dtype=np.float64)
+    hit = (chosen != 0) & (chosen == correct_key[q_code])
+    scores[s_code[hit], q_code[hit]] = 1.0
+    scores = scores[:, scored]
+
+    answered = np.bincount(q_code, minlength=len(question_key))
+    option_key = np.array(sorted(opt for q in questions.values() for opt, _ in q["options"]), dtype=np.int64)
+    matched = chosen[chosen != 0]
+    option_counts = np.bincount(np.searchsorted(option_key, matched), minlength=len(option_key))
+
+    if len(student_key):
+        difficulty = scores.mean(axis=0)
+        discrimination = _point_biserial(scores)
+    else:
+        difficulty = discrimination = np.full(scores.shape[1], np.nan)
+    scored_pos = np.cumsum(scored) - 1
+
+    report_questions = []
+    for pos, question_id in enumerate(question_key.tolist()):
+        question = questions[question_id]
+        total = int(answered[pos])
+        options = []
+        for option_id, option_text in question["options"]:
+            count = int(option_counts[np.searchsorted(option_key, option_id)])
+            options.append({
+                "option_id": option_id,
+                "option_text": option_text,
+                "is_correct": option_id == question["correct_option_id"],
+                "count": count,
+                "frequency": count / total if total else None,
+            })
+        entry = {
+            "question_id": question_id,
+            "question_text": question["question_text"],
+            "question_type": question["question_type"],
+            "response_count": total,
+            "difficulty": _finite(difficulty[scored_pos[pos]]) if scored[pos] else None,
+            "point_biserial": _finite(discrimination[scored_pos[pos]]) if scored[pos] else None,
+            "options": options,
+        }
+        if options:
+            entry["unmatched_responses"] = total - sum(option["count"] for option in options)
+        report_questions.append(entry)
+
+    return {
+        "assignment_id": assignment_id,
+        "student_count": int(len(student_key)),
+        "question_count": int(len(question_key)),
+        "scored_question_count": int(scored.sum()),
+        "cronbach_alpha": _cronbach_alpha(scores),
+        "questions": report_questions,
+    }
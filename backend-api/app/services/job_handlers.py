@@ -0,0 +1,95 @@
+"""Staff operations that can run as background jobs (see ``app/services/jobs.py``).
+
+Each operation is a plain coroutine that the synchronous endpoint calls
+directly, plus a ``@job_handler`` that runs it from a job payload. Payloads
+are JSON, so UUIDs travel as strings and uploaded files as text.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from ..crud.assignments import create_assignment, create_questions_and_options, delete_assignment_and_related_questions
+from ..crud.responses import notify_course_results_resync
+from ..crud.students import enroll_students_in_course
+from .grading import regrade_assignment
+from .jobs import JobContext, JobFailed, job_handler
+
+logger = logging.getLogger("myapp")
+
+IMPORT_ASSIGNMENT_CSV = "assignments.import_csv"
+DELETE_MODULE_ASSIGNMENTS = "assignments.delete_for_module"
+REGRADE_ASSIGNMENT = "grading.regrade_assignment"
+ENROLL_STUDENTS = "students.enroll_in_course"
+ENROLL_BATCH_SIZE = 200
+
+
+async def import_assignment_csv(conn, module_id: UUID | str, contents: bytes) -> dict[str, Any]:
+    """Create a default assignment for a module with the questions of a quiz CSV, in one transaction."""
+    import pandas as pd  # deferred: pandas dominates worker import time
+
+    df = pd.read_csv(BytesIO(contents))
+    duedate = datetime.now().date() + timedelta(days=90)
+
+    async with conn.transaction():
+        assignment_id = await create_assignment(conn, module_id=module_id, assignment_title="Default Assignment", description="Basic questions to demonstrate fundamental understanding of the topic", due_date=duedate)
+        await create_questions_and_options(conn, assignment_id, df)
+
+    return {
+        "assignment_id": assignment_id,
+        "module_id": str(module_id),
+        "title": "Default Assignment",
+        "due_date": duedate.strftime('%Y-%m-%d'),
+        "questions": len(df),
+        "message": "Assignment and questions created successfully"
+    }
+
+
+async def regrade_and_notify(
+    conn,
+    assignment_id: int,
+    course_id: int,
+    progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> dict[str, Any]:
+    """Regrade an assignment, then tell live dashboards of the course to reload."""
+    result = await regrade_assignment(conn, assignment_id, course_id, progress=progress)
+    await notify_course_results_resync(conn, course_id)
+    return result
+
+
+@job_handler(IMPORT_ASSIGNMENT_CSV)
+async def _import_assignment_csv(conn, ctx: JobContext) -> dict:
+    await ctx.progress(0.1, "Parsing CSV")
+    try:
+        return await import_assignment_csv(conn, ctx.payload["module_id"], ctx.payload["csv"].encode("utf-8"))
+    except (ValueError, KeyError) as e:
+        # Malformed CSV or missing columns/options: the same file fails again.
+        raise JobFailed(f"Invalid quiz CSV: {e}") from e
+
+
+@job_handler(REGRADE_ASSIGNMENT)
+async def _regrade_assignment(conn, ctx: JobContext) -> dict:
+    async def report(responses: int, changed: int) -> None:
+        await ctx.progress(None, f"{responses} responses regraded, {changed} changed")
+
+    return await regrade_and_notify(conn, ctx.payload["assignment_id"], ctx.payload["course_id"], report)
+
+
+@job_handler(DELETE_MODULE_ASSIGNMENTS)
+async def _delete_module_assignments(conn, ctx: JobContext) -> dict:
+    return await delete_assignment_and_related_questions(conn, UUID(ctx.payload["module_id"]))
+
+
+@job_handler(ENROLL_STUDENTS)
+async def _enroll_students(conn, ctx: JobContext) -> dict:
+    # Enrolling is idempotent ("already_enrolled"), so a retried job simply
+    # walks the list again.
+    emails = ctx.payload["emails"]
+    enrolled = []
+    for start in range(0, len(emails), ENROLL_BATCH_SIZE):
+        enrolled += await enroll_students_in_course(conn, ctx.payload["course_id"], emails[start:start + ENROLL_BATCH_SIZE])
+        await ctx.progress(len(enrolled) / len(emails), f"{len(enrolled)} of {len(emails)} emails processed")
+    return {"students": enrolled}
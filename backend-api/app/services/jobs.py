@@ -0,0 +1,303 @@
+"""Postgres-backed background jobs for long-running staff operations.
+
+An endpoint calls ``submit_job`` and returns the job id at once. Jobs are
+rows in ``jobs`` (sql/2026-10-19-08-jobs.sql). A ``JobWorker`` claims the next
+due row with ``SELECT ... FOR UPDATE SKIP LOCKED``, so workers in every API
+process and in separate worker processes can share one queue without
+claiming the same job twice.
+
+While a handler runs, its lease (``locked_until``) is extended every third of
+``JOB_LEASE_SECONDS``. If the worker dies, the lease runs out and another
+worker claims the job again. A worker whose heartbeat finds the lease gone
+(it could not extend it in time and the job was claimed again) cancels its
+handler rather than let it run to the end alongside the new attempt. A
+handler that raises is retried after
+``JOB_RETRY_BASE_SECONDS * 2**(attempt - 1)`` (with jitter, capped at
+``JOB_RETRY_MAX_SECONDS``) until the job's ``max_attempts``. Raising
+``JobFailed`` fails the job at once, e.g. for a CSV that cannot be parsed.
+Handlers must be safe to run again: wrap writes in one transaction or make
+them idempotent.
+
+Handlers are registered with ``@job_handler(kind)`` in
+``app/services/job_handlers.py``. Each API worker runs ``JOB_WORKERS``
+concurrent job loops; set it to 0 and run the loops in their own process
+instead::
+
+    python -m app.services.jobs --concurrency 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from ..core.metrics import register_gauge
+from ..crud.jobs import (
+    claim_job,
+    complete_job,
+    delete_finished_jobs,
+    enqueue_job,
+    extend_job_lease,
+    fail_job,
+    release_job,
+    update_job_progress,
+)
+from ..db.connection import DBConnection
+
+logger = logging.getLogger("myapp")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+CLEANUP_INTERVAL_SECONDS = 3600
+
+
+class JobFailed(Exception):
+    """Raised by a handler for an error that retrying will not fix."""
+
+
+class JobLeaseLost(Exception):
+    """The job was claimed by another worker after this one's lease ran out."""
+
+
+class JobContext:
+    """What a handler gets besides its connection: the job row and progress reporting."""
+
+    def __init__(self, job: dict[str, Any], worker_id: str):
+        self.job = job
+        self.worker_id = worker_id
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        return self.job["payload"]
+
+    async def progress(self, fraction: float | None, message: str | None = None) -> None:
+        """Report progress (0..1; None keeps the last fraction) and a short message."""
+        if fraction is not None:
+            fraction = min(max(fraction, 0.0), 1.0)
+        # On a pool connection of its own, so it is visible at once even when
+        # the handler's connection is inside a long transaction.
+        async with DBConnection() as conn:
+            held = await update_job_progress(conn, self.job["job_id"], self.worker_id, fraction, message)
+        if not held:
+            raise JobLeaseLost(f"job {self.job['job_id']} is no longer held by {self.worker_id}")
+
+
+Handler = Callable[[Any, JobContext], Awaitable[dict]]
+
+
+@dataclass
+class JobKind:
+    handler: Handler
+    max_attempts: int
+
+
+handlers: dict[str, JobKind] = {}
+
+
+def job_handler(kind: str, max_attempts: int = 3):
+    """Register ``async def handler(conn, ctx) -> dict`` for jobs of ``kind``."""
+    def register(fn: Handler) -> Handler:
+        handlers[kind] = JobKind(fn, max_attempts)
+        return fn
+    return register
+
+
+def retry_delay(attempt: int) -> float:
+    delay = min(JOB_RETRY_BASE_SECONDS * 2 ** max(attempt - 1, 0), JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def submit_job(conn, kind: str, payload: dict[str, Any], course_id: int | None = None, created_by: str | None = None) -> dict:
+    """Queue a job of a registered kind and wake this process's workers."""
+    if kind not in handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = await enqueue_job(conn, kind, payload, course_id, created_by, handlers[kind].max_attempts)
+    job_worker.wake()
+    return job
+
+
+class JobWorker:
+    def __init__(self, concurrency: int, poll_seconds: float, lease_seconds: float):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        # Named in start(), after gunicorn forks the workers: an id made at
+        # import time would be shared by every worker of a preloaded app.
+        self.worker_id = ""
+        self.running = 0
+        self.stats = {"succeeded": 0, "retried": 0, "failed": 0, "lost": 0}
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._last_cleanup = 0.0
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _heartbeat(self, job_id: int, work: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with DBConnection() as conn:
+                    if not await extend_job_lease(conn, job_id, self.worker_id, self.lease_seconds):
+                        work.cancel()
+                        return
+            except Exception:
+                logger.warning("Could not extend the lease of job %d", job_id, exc_info=True)
+
+    async def _finish(self, job: dict[str, Any], outcome: str, result: dict | None = None, error: str | None = None) -> None:
+        job_id = job["job_id"]
+        async with DBConnection() as conn:
+            if outcome == "succeeded":
+                held = await complete_job(conn, job_id, self.worker_id, result or {})
+            elif outcome == "released":
+                held = await release_job(conn, job_id, self.worker_id)
+            else:
+                status = await fail_job(conn, job_id, self.worker_id, error or "", retry_delay(job["attempts"]), outcome == "retry")
+                held = status is not None
+                outcome = "retried" if status == "queued" else "failed"
+        if not held:
+            outcome = "lost"
+        if outcome in self.stats:
+            self.stats[outcome] += 1
+        logger.info("Job %d (%s) %s after attempt %d", job_id, job["kind"], outcome, job["attempts"])
+
+    async def run_job(self, job: dict[str, Any]) -> None:
+        kind = handlers.get(job["kind"])
+        if kind is None:
+            await self._finish(job, "fail", error=f"No handler for job kind {job['kind']!r}")
+            return
+        if job["attempts"] > job["max_attempts"]:
+            # Claimed again after its lease expired, e.g. the job keeps killing its worker.
+            await self._finish(job, "fail", error=job.get("error") or "Lease expired on the last attempt")
+            return
+
+        async def handle() -> dict:
+            async with DBConnection() as conn:
+                return await kind.handler(conn, JobContext(job, self.worker_id))
+
+        work = asyncio.create_task(handle())
+        heartbeat = asyncio.create_task(self._heartbeat(job["job_id"], work))
+        self.running += 1
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # The worker is stopping: put the job back in the queue.
+                await asyncio.shield(self._finish(job, "released"))
+                raise
+            # Only the handler was cancelled, by the heartbeat after the lease was lost.
+            self.stats["lost"] += 1
+            logger.warning("Job %d was taken over by another worker; cancelled its handler", job["job_id"])
+        except JobLeaseLost:
+            self.stats["lost"] += 1
+            logger.warning("Job %d was taken over by another worker", job["job_id"])
+        except JobFailed as e:
+            await self._finish(job, "fail", error=str(e))
+        except Exception as e:
+            logger.exception("Job %d (%s) failed", job["job_id"], job["kind"])
+            await self._finish(job, "retry", error=f"{type(e).__name__}: {e}")
+        else:
+            await self._finish(job, "succeeded", result=result)
+        finally:
+            self.running -= 1
+            heartbeat.cancel()
+
+    async def run_once(self) -> bool:
+        """Claim and run one due job; False when there was none."""
+        async with DBConnection() as conn:
+            job = await claim_job(conn, list(handlers), self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+        await self.run_job(job)
+        return True
+
+    async def _cleanup(self) -> None:
+        if time.monotonic() - self._last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = time.monotonic()
+        async with DBConnection() as conn:
+            deleted = await delete_finished_jobs(conn, JOB_RETENTION_DAYS * 86400)
+        if deleted:
+            logger.info("Deleted %d finished jobs older than %g days", deleted, JOB_RETENTION_DAYS)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+                await self._cleanup()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Typically the database is unreachable; keep polling.
+                logger.warning("Job worker loop failed, retrying in %gs: %s", self.poll_seconds, e)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        if self.concurrency > 0:
+            from . import job_handlers  # noqa: F401  registers the handlers
+
+            self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Stop the loops; jobs still running are put back in the queue."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_worker = JobWorker(JOB_WORKERS, JOB_POLL_SECONDS, JOB_LEASE_SECONDS)
+
+register_gauge("jobs_running", "Background jobs running in this process.", lambda: [({}, job_worker.running)])
+register_gauge(
+    "jobs_finished_total",
+    "Background job attempts by outcome (lost: another worker took the job over).",
+    lambda: [({"outcome": name}, count) for name, count in sorted(job_worker.stats.items())],
+    kind="counter",
+)
+
+
+async def _serve(concurrency: int) -> int:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+    job_worker.concurrency = concurrency
+    job_worker.start()
+    logger.info("Job worker %s running %d loops for %s", job_worker.worker_id, concurrency, ", ".join(sorted(handlers)))
+    await stopping.wait()
+    await job_worker.stop()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.services.jobs", description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=max(JOB_WORKERS, 1), help="jobs run at the same time")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return asyncio.run(_serve(args.concurrency))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
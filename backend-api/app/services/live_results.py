@@ -0,0 +1,262 @@
+"""Live course results for instructor dashboards over WebSockets.
+
+Every saved response announces the student's new assignment total with
+``NOTIFY course_results``. The upsert in ``app/db/queries.py`` sends it in the
+same statement. Each worker keeps one ``LISTEN`` connection to the primary,
+opened when its first dashboard connects. ``ResultsHub`` fans the
+notifications out to that worker's WebSocket subscribers. Every worker sees
+every save, whichever worker wrote it, and nobody polls the results join.
+
+A dashboard never receives one message per save. Each subscription keeps
+the latest event per (student, question). A newer event replaces an older
+one and their score deltas add up. A sender task flushes the pending events
+as one message at most every ``LIVE_RESULTS_FLUSH_SECONDS``.
+
+Backpressure is per connection:
+
+* while a send is in flight, new events keep coalescing into the pending
+  map. Its size is bounded by the distinct cells, not by the event rate.
+* past ``LIVE_RESULTS_MAX_PENDING`` cells, the pending events are dropped and
+  the client gets ``{"type": "resync"}``. It reloads the full results once.
+* a client that does not take a message within
+  ``LIVE_RESULTS_SEND_TIMEOUT_SECONDS`` is disconnected with code 1013, so it
+  cannot hold the worker's memory or loop.
+
+Clients authenticate with their first message, ``{"type": "auth", "token":
+...}``, sent right after the socket opens (``receive_auth_token``). The token
+never goes in the URL, where proxies and access logs would record it.
+
+If the LISTEN connection drops, every subscriber is told to resync, and the
+hub reconnects with backoff while anyone is subscribed. LISTEN needs a
+session-level connection, so it does not work through a transaction-pooling
+PgBouncer.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+import asyncpg
+import orjson
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from ..core.metrics import register_gauge
+from ..db.connection import CONNECTION_KWARGS
+
+logger = logging.getLogger("myapp")
+
+CHANNEL = "course_results"
+LIVE_RESULTS_FLUSH_SECONDS = float(os.getenv("LIVE_RESULTS_FLUSH_SECONDS", "0.5"))
+LIVE_RESULTS_MAX_PENDING = int(os.getenv("LIVE_RESULTS_MAX_PENDING", "2000"))
+LIVE_RESULTS_SEND_TIMEOUT_SECONDS = float(os.getenv("LIVE_RESULTS_SEND_TIMEOUT_SECONDS", "10"))
+LIVE_RESULTS_AUTH_TIMEOUT_SECONDS = float(os.getenv("LIVE_RESULTS_AUTH_TIMEOUT_SECONDS", "5"))
+RESYNC = {"type": "resync"}
+
+
+async def receive_auth_token(websocket: WebSocket) -> str | None:
+    """The bearer token from an accepted socket's first message.
+
+    None when that message is not ``{"type": "auth", "token": "..."}`` or does
+    not arrive within ``LIVE_RESULTS_AUTH_TIMEOUT_SECONDS``.
+    """
+    try:
+        message = await asyncio.wait_for(websocket.receive(), LIVE_RESULTS_AUTH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return None
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    try:
+        payload = orjson.loads(message.get("text") or message.get("bytes") or b"")
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(payload, dict) or payload.get("type") != "auth":
+        return None
+    token = payload.get("token")
+    return token if isinstance(token, str) and token else None
+
+
+class Subscription:
+    """One dashboard's pending events, coalesced until the next flush."""
+
+    def __init__(self, course_id: int, max_pending: int):
+        self.course_id = course_id
+        self.max_pending = max_pending
+        self.pending: dict[tuple[int, int], dict[str, Any]] = {}
+        self.resync = False
+        self.ready = asyncio.Event()
+
+    def push(self, event: dict[str, Any]) -> None:
+        if event.get("type") == "resync":
+            self.request_resync()
+            return
+        if self.resync:
+            return
+        key = (event["student_id"], event["question_id"])
+        previous = self.pending.pop(key, None)
+        if previous is not None:
+            event = {**event, "delta": previous["delta"] + event["delta"]}
+        elif len(self.pending) >= self.max_pending:
+            self.request_resync()
+            return
+        # Coalesced per (student, question) and re-inserted at the end: the
+        # message lists events oldest first, so a student's last event for an
+        # assignment carries that assignment's current total.
+        self.pending[key] = event
+        self.ready.set()
+
+    def request_resync(self) -> None:
+        self.pending.clear()
+        self.resync = True
+        self.ready.set()
+
+    def take(self) -> dict[str, Any] | None:
+        self.ready.clear()
+        if self.resync:
+            self.resync = False
+            return RESYNC
+        if not self.pending:
+            return None
+        events, self.pending = list(self.pending.values()), {}
+        return {"type": "results", "course_id": self.course_id, "events": events}
+
+
+class ResultsHub:
+    def __init__(self, flush_seconds: float, max_pending: int, send_timeout_seconds: float):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.send_timeout_seconds = send_timeout_seconds
+        self.subscriptions: dict[int, set[Subscription]] = {}
+        self.stats = {"notifications": 0, "messages": 0, "resyncs": 0, "slow_disconnects": 0}
+        self._conn: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subs) for subs in self.subscriptions.values())
+
+    def publish(self, event: dict[str, Any]) -> None:
+        for sub in self.subscriptions.get(event.get("course_id"), ()):
+            sub.push(event)
+
+    def _on_notification(self, conn, pid: int, channel: str, payload: str) -> None:
+        self.stats["notifications"] += 1
+        try:
+            event = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning("Ignoring malformed %s notification: %.200s", CHANNEL, payload)
+            return
+        self.publish(event)
+
+    def _on_termination(self, conn) -> None:
+        if conn is not self._conn:
+            return
+        self._conn = None
+        logger.warning("Live results listener lost its connection; dashboards will resync")
+        for subs in self.subscriptions.values():
+            for sub in subs:
+                sub.request_resync()
+        if self.subscribers and self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _listen(self) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            conn = await asyncpg.connect(**CONNECTION_KWARGS)
+            conn.add_termination_listener(self._on_termination)
+            await conn.add_listener(CHANNEL, self._on_notification)
+            self._conn = conn
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        try:
+            while self.subscribers:
+                try:
+                    await self._listen()
+                except Exception as e:
+                    logger.warning("Live results listener reconnect failed: %s", e)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+                    continue
+                # Events sent while disconnected are lost; start everyone over.
+                for subs in self.subscriptions.values():
+                    for sub in subs:
+                        sub.request_resync()
+                return
+        finally:
+            self._reconnect_task = None
+
+    async def subscribe(self, course_id: int) -> Subscription:
+        await self._listen()
+        sub = Subscription(course_id, self.max_pending)
+        self.subscriptions.setdefault(course_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self.subscriptions.get(sub.course_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self.subscriptions[sub.course_id]
+
+    async def _send_loop(self, websocket: WebSocket, sub: Subscription) -> None:
+        while True:
+            await sub.ready.wait()
+            # Coalescing window: whatever arrives meanwhile goes out in this message.
+            await asyncio.sleep(self.flush_seconds)
+            message = sub.take()
+            if message is None:
+                continue
+            try:
+                await asyncio.wait_for(websocket.send_text(orjson.dumps(message).decode()), self.send_timeout_seconds)
+            except asyncio.TimeoutError:
+                self.stats["slow_disconnects"] += 1
+                await websocket.close(code=1013)
+                return
+            self.stats["resyncs" if message is RESYNC else "messages"] += 1
+
+    async def serve(self, websocket: WebSocket, course_id: int) -> None:
+        """Stream a course's result events to an accepted WebSocket until either side closes."""
+        sub = await self.subscribe(course_id)
+        sender = asyncio.create_task(self._send_loop(websocket, sub))
+        try:
+            await websocket.send_text(orjson.dumps({"type": "subscribed", "course_id": course_id}).decode())
+            receiver = asyncio.create_task(self._drain(websocket))
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            receiver.cancel()
+            for task in done:
+                if not task.cancelled() and task.exception() is not None and not isinstance(task.exception(), WebSocketDisconnect):
+                    logger.warning("Live results connection for course %d failed: %s", course_id, task.exception())
+        finally:
+            sender.cancel()
+            self.unsubscribe(sub)
+
+    @staticmethod
+    async def _drain(websocket: WebSocket) -> None:
+        # Clients only send keep-alives; reading is how a disconnect is noticed.
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    async def stop(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+
+results_hub = ResultsHub(LIVE_RESULTS_FLUSH_SECONDS, LIVE_RESULTS_MAX_PENDING, LIVE_RESULTS_SEND_TIMEOUT_SECONDS)
+
+
+register_gauge("live_results_subscribers", "Open live results WebSockets in this worker.", lambda: [({}, results_hub.subscribers)])
+register_gauge(
+    "live_results_events_total",
+    "Live results notifications received, messages sent, resyncs and slow-client disconnects.",
+    lambda: [({"event": name}, count) for name, count in sorted(results_hub.stats.items())],
+    kind="counter",
+)
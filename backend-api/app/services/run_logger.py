@@ -0,0 +1,155 @@
+"""Buffered, append-only writer for experiment run records.
+
+Requests hand records to ``ExperimentRunLogger.record`` and return
+immediately; a background task drains the buffer with one COPY per batch
+when it reaches ``batch_size`` or every ``flush_interval_seconds``. The
+buffer is bounded so a slow or unavailable database sheds new runs instead
+of growing memory without limit.
+
+A batch the database rejects as invalid (a constraint or data error, e.g. a
+run whose module was deleted before the flush) is split in halves until the
+offending rows are isolated; only those are discarded. Any other failure
+puts the batch back for the next tick, up to ``max_retries`` consecutive
+failed flushes, after which the batch is discarded.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+
+import asyncpg
+
+from ..core.metrics import register_gauge
+from ..crud.experiment_runs import copy_experiment_runs
+from ..db.connection import DBConnection
+
+logger = logging.getLogger("myapp")
+
+
+class ExperimentRunLogger:
+    def __init__(self, max_buffer: int, batch_size: int, flush_interval_seconds: float, max_retries: int = 5):
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+        self.dropped = 0
+        self.discarded = {"rejected": 0, "retries_exhausted": 0}
+        self._failed_flushes = 0
+        self._buffer: list[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def record(self, record: tuple) -> bool:
+        """Queue one run. Returns False when the buffer is full."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return False
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def _copy_valid(self, conn, chunks: deque[list[tuple]]) -> int:
+        """COPY chunks in order, halving any chunk the database rejects as invalid.
+
+        Returns the rows written. If another error escapes, the chunks still in
+        ``chunks`` are exactly the rows that were not written.
+        """
+        written = 0
+        while chunks:
+            chunk = chunks[0]
+            try:
+                await copy_experiment_runs(conn, chunk)
+            except (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError) as e:
+                chunks.popleft()
+                if len(chunk) == 1:
+                    logger.warning("Discarding an experiment run the database rejected: %s", e)
+                    self.discarded["rejected"] += 1
+                else:
+                    middle = len(chunk) // 2
+                    chunks.extendleft((chunk[middle:], chunk[:middle]))
+                continue
+            chunks.popleft()
+            written += len(chunk)
+        return written
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            chunks = deque([batch])
+            try:
+                async with DBConnection() as conn:
+                    written = await self._copy_valid(conn, chunks)
+            except Exception:
+                batch = [record for chunk in chunks for record in chunk]
+                self._failed_flushes += 1
+                if self._failed_flushes >= self.max_retries:
+                    logger.exception("Discarding %d experiment runs after %d failed flushes", len(batch), self._failed_flushes)
+                    self.discarded["retries_exhausted"] += len(batch)
+                    self._failed_flushes = 0
+                    return 0
+                # Put the unwritten rows back in front of anything queued
+                # meanwhile, trimmed to the buffer limit, and retry on the next tick.
+                logger.exception("Failed to write %d experiment runs", len(batch))
+                keep = max(self.max_buffer - len(self._buffer), 0)
+                self.dropped += len(batch) - min(keep, len(batch))
+                self._buffer = batch[:keep] + self._buffer
+                return 0
+            self._failed_flushes = 0
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # Shielded so stop() cannot cancel a COPY halfway through a batch.
+            await asyncio.shield(self.flush())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+experiment_run_logger = ExperimentRunLogger(
+    max_buffer=int(os.getenv("EXPERIMENT_RUN_MAX_BUFFER", "10000")),
+    batch_size=int(os.getenv("EXPERIMENT_RUN_BATCH_SIZE", "500")),
+    flush_interval_seconds=float(os.getenv("EXPERIMENT_RUN_FLUSH_SECONDS", "2")),
+    max_retries=int(os.getenv("EXPERIMENT_RUN_MAX_RETRIES", "5")),
+)
+
+register_gauge("experiment_runs_pending", "Experiment runs buffered in memory awaiting COPY.", lambda: [({}, experiment_run_logger.pending)])
+register_gauge(
+    "experiment_runs_dropped_total",
+    "Experiment runs rejected because the buffer was full.",
+    lambda: [({}, experiment_run_logger.dropped)],
+    kind="counter",
+)
+register_gauge(
+    "experiment_runs_discarded_total",
+    "Buffered experiment runs discarded: rows the database rejected, or batches that kept failing.",
+    lambda: [({"reason": reason}, count) for reason, count in sorted(experiment_run_logger.discarded.items())],
+    kind="counter",
+)
@@ -0,0 +1,299 @@
+"""Server-side simulation engine for the experiment compute scripts.
+
+Each model mirrors the ``window.MyLibrary.calculate`` function shipped with
+the experiment in ``content_files`` but evaluates the whole time axis with
+NumPy instead of a per-step loop, so the output can be downsampled before it
+is sent to the browser.
+"""
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import numpy as np
+
+from ..core.cache import TTLCache
+from .waveform_metrics import (
+    Metrics,
+    cockroft_walton_metrics,
+    ferranti_metrics,
+    impulse_metrics,
+    partial_discharge_metrics,
+    trv_metrics,
+)
+
+# The browser scripts stop at 10,000 steps, and so does the server by default.
+# The cap shortens the simulated window (steps * timeStep), not the grid, so a
+# higher cap would give a longer waveform and different metrics than the
+# browser shows for the same parameters. Raise it only where that is wanted.
+MAX_SIMULATION_STEPS = int(os.getenv("MAX_SIMULATION_STEPS", "10000"))
+
+Waveform = tuple[np.ndarray, np.ndarray]
+
+
+def _result_nbytes(result: SimulationResult) -> int:
+    return result.x.nbytes + result.y.nbytes
+
+
+# Results hold full-resolution arrays (160 KB each at 10,000 steps, more with a
+# higher MAX_SIMULATION_STEPS) and keys are arbitrary client parameters, so the
+# cache is bounded by bytes per worker as well as by entries.
+simulation_cache = TTLCache(
+    maxsize=int(os.getenv("SIMULATION_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("SIMULATION_CACHE_TTL_SECONDS", "3600")),
+    name="simulation",
+    maxbytes=int(os.getenv("SIMULATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    sizeof=_result_nbytes,
+)
+
+
+class SimulationError(ValueError):
+    """Raised when simulation parameters cannot produce a waveform."""
+
+
+@dataclass(frozen=True)
+class SimulationModel:
+    name: str
+    compute: str
+    run: Callable[[dict[str, Any]], Waveform]
+    metrics: Callable[[np.ndarray, np.ndarray, dict[str, Any]], Metrics]
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    x: np.ndarray
+    y: np.ndarray
+    metrics: Metrics
+
+
+def _param(params: dict[str, Any], name: str) -> float:
+    if name not in params:
+        raise SimulationError(f"Missing simulation parameter: {name}")
+    try:
+        value = float(params[name])
+    except (TypeError, ValueError):
+        raise SimulationError(f"Simulation parameter {name} must be numeric")
+    if not math.isfinite(value):
+        raise SimulationError(f"Simulation parameter {name} must be finite")
+    return value
+
+
+def _step_count(total_time: float, dt: float) -> int:
+    if dt <= 0:
+        raise SimulationError("timeStep must be greater than zero")
+    if total_time <= 0:
+        raise SimulationError("totalTime must be greater than zero")
+    return min(int(math.floor(total_time / dt)), MAX_SIMULATION_STEPS)
+
+
+def _js_round(value: float) -> int:
+    # Math.round rounds halves towards +infinity; Python's round() does not.
+    return int(math.floor(value + 0.5))
+
+
+def impulse_voltage_generator(params: dict[str, Any]) -> Waveform:
+    """Double-exponential impulse V(t) = k * eta * V0 * (exp(-alpha t) - exp(-beta t))."""
+    v0 = _param(params, "chargingVoltage") * 1000
+    cg = _param(params, "groundCapacitance") * 1e-6
+    c1 = _param(params, "tailCapacitance") * 1e-6
+    rf = _param(params, "frontResistance")
+    rt = _param(params, "tailResistance")
+    dt = _param(params, "timeStep")
+    total_time = _param(params, "totalTime")
+
+    tau1 = rt * cg
+    tau2 = rf * c1
+    if tau2 > tau1:
+        tau1, tau2 = tau2, tau1
+    if tau2 <= 0:
+        raise SimulationError("Front and tail time constants must be greater than zero")
+
+    alpha = 1.0 / (tau1 * 1e6)
+    beta = 1.0 / (tau2 * 1e6)
+    eta = cg / (cg + c1)
+
+    try:
+        t_peak = tau2 * 1e6 * math.log(beta / alpha) / (beta - alpha)
+        k = 1.0 / (math.exp(-alpha * t_peak) - math.exp(-beta * t_peak))
+    except (ValueError, ZeroDivisionError, OverflowError):
+        k = 1.0
+    if not math.isfinite(k):
+        k = 1.0
+
+    t = np.arange(_step_count(total_time, dt) + 1, dtype=np.float64) * dt
+    voltage = eta * v0 * k * (np.exp(-alpha * t) - np.exp(-beta * t))
+    return t * 1e-6, voltage
+
+
+def cockroft_walton(params: dict[str, Any]) -> Waveform:
+    """DC output of an n-stage multiplier with a triangular ripple approximation."""
+    vs = _param(params, "supplyVoltage")
+    il = _param(params, "loadCurrent") * 1e-6
+    c = _param(params, "stageCapacitance") * 1e-6
+    f = _param(params, "acFrequency")
+    n = _param(params, "numberOfStages")
+    if c <= 0 or f <= 0:
+        raise SimulationError("stageCapacitance and acFrequency must be greater than zero")
+
+    vout_ideal = 2 * n * vs
+    voltage_drop = (il / (f * c)) * ((2 * n ** 3 / 3) + (n ** 2 / 2) - (n / 6))
+    ripple_amplitude = (il / (f * c)) * (n * (n + 1) / 2)
+    vout = vout_ideal - voltage_drop
+
+    steps = 500
+    total_time = 5 / f
+    index = np.arange(steps + 1, dtype=np.float64)
+    phase = (index * (total_time / steps) * f) % 1.0
+    return index, vout + ripple_amplitude * (1 - 2 * phase)
+
+
+def ferranti_effect(params: dict[str, Any]) -> Waveform:
+    """No-load receiving-end voltage Vr = Vs / |cosh(gamma d)| along a long line."""
+    vs = _param(params, "sendingEndVoltage")
+    length = _param(params, "lineLength")
+    c_per_km = _param(params, "capacitancePerKm") * 1e-9
+    l_per_km = _param(params, "inductancePerKm") * 1e-3
+    r_per_km = _param(params, "resistancePerKm")
+    omega = 2 * math.pi * _param(params, "frequency")
+
+    gamma = np.sqrt((r_per_km + 1j * omega * l_per_km) * (1j * omega * c_per_km))
+    distance = np.arange(101, dtype=np.float64) * (length / 100)
+    return distance, vs / np.abs(np.cosh(gamma * distance))
+
+
+_CABLE_PROPERTIES = {
+    1: (0.02, 0.7),  # XLPE: attenuation factor, PD threshold
+    2: (0.05, 0.5),  # PVC
+}
+_OTHER_CABLE = (0.035, 0.6)
+
+
+def partial_discharge(params: dict[str, Any]) -> Waveform:
+    """Superposition of damped 1 kHz PD pulses with the script's seeded event train."""
+    cable_type = _js_round(_param(params, "typeOfCable"))
+    load_percent = _param(params, "loadingCondition")
+    dt = _param(params, "timeStep")
+    total_time = _param(params, "totalTime")
+
+    attenuation, threshold = _CABLE_PROPERTIES.get(cable_type, _OTHER_CABLE)
+    load_factor = 1.0 + (load_percent / 100) * 0.5
+    num_events = min(max(3, int(math.floor(total_time * 50))), 20)
+
+    seed = _js_round(cable_type * 1000 + load_percent * 10)
+
+    def seeded_random() -> float:
+        nonlocal seed
+        seed = (seed * 9301 + 49297) % 233280
+        return seed / 233280
+
+    events = []
+    for e in range(num_events):
+        magnitude = (0.3 + 0.7 * seeded_random()) * load_factor * threshold
+        decay = attenuation * (500 + 500 * seeded_random())
+        events.append(((e + 0.5) * total_time / num_events, magnitude, decay))
+
+    t = np.arange(_step_count(total_time, dt) + 1, dtype=np.float64) * dt
+    voltage = np.zeros_like(t)
+    window = total_time * 0.1
+    for event_time, magnitude, decay in events:
+        tdiff = t - event_time
+        active = (tdiff >= 0) & (tdiff < window)
+        td = tdiff[active]
+        voltage[active] += magnitude * np.exp(-decay * td) * np.sin(2 * math.pi * 1000 * td)
+    return t, voltage
+
+
+def transient_recovery_voltage(params: dict[str, Any]) -> Waveform:
+    """RLC recovery voltage after current zero, in microseconds and kilovolts."""
+    r = _param(params, "resistance")
+    l = _param(params, "inductance")
+    c = _param(params, "capacitance")
+    i0 = _param(params, "initialCurrent")
+    dt = _param(params, "timeStep") * 1e-3
+    total_time = _param(params, "totalTime") * 1e-3
+    if l <= 0 or c <= 0:
+        raise SimulationError("inductance and capacitance must be greater than zero")
+
+    omega0 = 1.0 / math.sqrt(l * c)
+    alpha = r / (2 * l)
+    omega_d_sq = omega0 * omega0 - alpha * alpha
+    v_peak = i0 * math.sqrt(l / c)
+
+    t = np.arange(_step_count(total_time, dt) + 1, dtype=np.float64) * dt
+    if omega_d_sq > 0:
+        omega_d = math.sqrt(omega_d_sq)
+        voltage = v_peak * (1 - np.exp(-alpha * t) * (np.cos(omega_d * t) + (alpha / omega_d) * np.sin(omega_d * t)))
+    elif omega_d_sq == 0:
+        voltage = v_peak * (1 - np.exp(-alpha * t) * (1 + alpha * t))
+    else:
+        root = math.sqrt(alpha * alpha - omega0 * omega0)
+        s1 = -alpha + root
+        s2 = -alpha - root
+        voltage = v_peak * (1 - (s1 * np.exp(s2 * t) - s2 * np.exp(s1 * t)) / (s1 - s2))
+    return t * 1e6, voltage / 1000
+
+
+SIMULATION_MODELS: dict[str, SimulationModel] = {
+    model.name: model
+    for model in (
+        SimulationModel(
+            "impulse_voltage_generator",
+            "exp1_impulse_voltage_generator/exp1_impulsevoltagegenerator.js",
+            impulse_voltage_generator,
+            impulse_metrics,
+        ),
+        SimulationModel(
+            "cockroft_walton",
+            "exp2_3stage_cockroft_walton/exp2_cockroftwalton.js",
+            cockroft_walton,
+            cockroft_walton_metrics,
+        ),
+        SimulationModel(
+            "ferranti_effect",
+            "exp3_ferranti_effect/exp3_ferranti.js",
+            ferranti_effect,
+            ferranti_metrics,
+        ),
+        SimulationModel(
+            "partial_discharge",
+            "exp4_partial_discharge/exp4_partialdischarge.js",
+            partial_discharge,
+            partial_discharge_metrics,
+        ),
+        SimulationModel(
+            "transient_recovery_voltage",
+            "exp5_transient_recovery_voltage/exp5_transientVoltage.js",
+            transient_recovery_voltage,
+            trv_metrics,
+        ),
+    )
+}
+
+
+def get_simulation_model(name: str) -> SimulationModel:
+    model = SIMULATION_MODELS.get(name)
+    if model is None:
+        raise KeyError(f"Unknown simulation model: {name}")
+    return model
+
+
+def run_simulation(name: str, params: dict[str, Any]) -> Waveform:
+    x, y = get_simulation_model(name).run(params)
+    if not (np.all(np.isfinite(x)) and np.all(np.isfinite(y))):
+        raise SimulationError("Simulation produced non-finite values for these parameters")
+    return x, y
+
+
+def simulation_cache_key(name: str, params: dict[str, Any]) -> tuple:
+    return (name, tuple(sorted((key, float(value)) for key, value in params.items())))
+
+
+def simulate(name: str, params: dict[str, Any]) -> SimulationResult:
+    """Run a model and derive its waveform metrics in one pass (uncached)."""
+    model = get_simulation_model(name)
+    x, y = run_simulation(name, params)
+    x.flags.writeable = False
+    y.flags.writeable = False
+    return SimulationResult(x=x, y=y, metrics=model.metrics(x, y, params))
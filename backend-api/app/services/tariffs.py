@@ -0,0 +1,226 @@
+"""Electricity tariffs of Indian DISCOMs for the energy-economics labs.
+
+``tariffs_all_india.csv`` has one row per state, DISCOM and sector (Residential,
+Commercial, Industrial). It holds an energy rate in Rs/kWh and a free-text
+"Fixed Charge". The table is parsed once, when the worker starts, into
+NumPy columns. Rows are indexed by state, DISCOM and sector, and a row's
+position is its ``tariff_id``.
+
+Fixed charges are normalised to rupees per month on one of three bases:
+
+* ``kW`` of connected load: ``₹30/kW/month``, ``₹21.5/kW``, and
+  ``Rs.140/HP/month`` converted at 1 HP = 0.7457 kW.
+* ``kVA`` of demand: ``₹250/kVA/month``, billed as load_kw / power_factor.
+* ``connection``, a flat monthly charge: ``₹100/connection/month``,
+  ``₹185/month``, ``₹30 customer charge/month`` and ``MMFC ₹80/month``.
+
+A charge without a period (``₹10/kW``) is monthly, like every other row. A
+qualifier such as ``(below 100 HP)`` is kept as ``fixed_charge_note``. A
+missing charge is 0. Slab-based categories carry a single rate in the CSV
+and are priced at that rate.
+
+``TariffTable.bills`` prices any number of consumption profiles in one
+vectorised pass, with no Python loop per profile.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger("myapp")
+
+DEFAULT_TARIFF_CSV_PATH = Path(__file__).resolve().parents[3] / "tariffs_all_india.csv"
+TARIFF_CSV_PATH = Path(os.getenv("TARIFF_CSV_PATH") or DEFAULT_TARIFF_CSV_PATH)
+HP_TO_KW = 0.745699872
+DEFAULT_POWER_FACTOR = 0.9
+
+_AMOUNT = re.compile(r"(?:₹|Rs\.?)\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_PER_UNIT = re.compile(r"/\s*(kW|kVA|HP|connection)\b", re.IGNORECASE)
+_ANY_UNIT = re.compile(r"/\s*([^\W\d_]+)")
+_KNOWN_UNITS = {"kw", "kva", "hp", "connection", "month"}
+_NOTE = re.compile(r"\(([^)]*)\)")
+_FLAT = re.compile(r"/\s*month|customer charge|\bMMFC\b", re.IGNORECASE)
+
+
+class FixedCharge(NamedTuple):
+    amount: float  # rupees per basis unit per month
+    basis: str | None  # "kW", "kVA", "connection", or None when there is no charge
+    note: str | None
+
+
+def parse_fixed_charge(text: str | None) -> FixedCharge:
+    """Normalise a "Fixed Charge" cell; raises ValueError when it cannot be read."""
+    text = (text or "").strip()
+    if not text:
+        return FixedCharge(0.0, None, None)
+    amount = _AMOUNT.search(text)
+    if amount is None:
+        raise ValueError(f"No amount in fixed charge {text!r}")
+    value = float(amount.group(1))
+    unknown = [u for u in _ANY_UNIT.findall(text) if u.lower() not in _KNOWN_UNITS]
+    if unknown:
+        # e.g. ₹/kWh or ₹/kVAh is an energy rate, not a fixed charge
+        raise ValueError(f"Unknown fixed charge unit {unknown[0]!r} in {text!r}")
+    note = _NOTE.search(text)
+    note = note.group(1).strip() if note else ("minimum monthly fixed charge" if "MMFC" in text.upper() else None)
+    unit = _PER_UNIT.search(text)
+    if unit is not None:
+        basis = unit.group(1).lower()
+        if basis == "hp":
+            return FixedCharge(value / HP_TO_KW, "kW", note or "per HP")
+        return FixedCharge(value, {"kw": "kW", "kva": "kVA"}.get(basis, "connection"), note)
+    if _FLAT.search(text):
+        return FixedCharge(value, "connection", note)
+    raise ValueError(f"Unknown fixed charge basis in {text!r}")
+
+
+def _key(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+class TariffTable:
+    TEXT_COLUMNS = ("state", "discom", "sector", "category", "incentives", "fixed_charge_text", "fixed_charge_note")
+
+    def __init__(self, rows: list[dict[str, Any]]):
+        self.state = np.array([r["state"] for r in rows], dtype=object)
+        self.discom = np.array([r["discom"] for r in rows], dtype=object)
+        self.sector = np.array([r["sector"] for r in rows], dtype=object)
+        self.category = np.array([r["category"] for r in rows], dtype=object)
+        self.incentives = np.array([r["incentives"] for r in rows], dtype=object)
+        self.fixed_charge_text = np.array([r["fixed_charge_text"] for r in rows], dtype=object)
+        self.fixed_charge_note = np.array([r["fixed_charge"].note for r in rows], dtype=object)
+        self.rate = np.array([r["rate"] for r in rows], dtype=np.float64)
+        self.fixed_charge_basis = np.array([r["fixed_charge"].basis for r in rows], dtype=object)
+        amounts = np.array([r["fixed_charge"].amount for r in rows], dtype=np.float64)
+        # One column per basis, zero elsewhere, so a bill is a sum of products.
+        self.fixed_per_kw = np.where(self.fixed_charge_basis == "kW", amounts, 0.0)
+        self.fixed_per_kva = np.where(self.fixed_charge_basis == "kVA", amounts, 0.0)
+        self.fixed_per_connection = np.where(self.fixed_charge_basis == "connection", amounts, 0.0)
+        self._indexes = {
+            column: self._build_index(getattr(self, column)) for column in ("state", "discom", "sector")
+        }
+
+    @staticmethod
+    def _build_index(values: np.ndarray) -> dict[str, np.ndarray]:
+        positions: dict[str, list[int]] = {}
+        for i, value in enumerate(values):
+            positions.setdefault(_key(value), []).append(i)
+        return {key: np.array(ids, dtype=np.intp) for key, ids in positions.items()}
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "TariffTable":
+        rows = []
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                try:
+                    fixed_charge = parse_fixed_charge(record["Fixed Charge"])
+                except ValueError as e:
+                    logger.warning("%s line %d: %s; fixed charge taken as 0", path.name, line, e)
+                    fixed_charge = FixedCharge(0.0, None, None)
+                rows.append({
+                    "state": record["State"].strip(),
+                    "discom": record["DISCOM"].strip(),
+                    "sector": record["Sector"].strip(),
+                    "category": record["Category"].strip(),
+                    "incentives": record["Incentives"].strip() or None,
+                    "rate": float(record["Rate (Rs/kWh)"]),
+                    "fixed_charge_text": record["Fixed Charge"].strip() or None,
+                    "fixed_charge": fixed_charge,
+                })
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.rate)
+
+    def values(self, column: str) -> list[str]:
+        """Distinct values of state, discom or sector, sorted."""
+        return sorted({getattr(self, column)[ids[0]] for ids in self._indexes[column].values()})
+
+    def find(self, state: str | None = None, discom: str | None = None, sector: str | None = None) -> np.ndarray:
+        """tariff_ids matching every given filter (case- and whitespace-insensitive)."""
+        ids = np.arange(len(self), dtype=np.intp)
+        for column, value in (("state", state), ("discom", discom), ("sector", sector)):
+            if value is not None:
+                ids = np.intersect1d(ids, self._indexes[column].get(_key(value), ids[:0]), assume_unique=True)
+        return ids
+
+    def records(self, ids: np.ndarray) -> list[dict[str, Any]]:
+        return [
+            {
+                "tariff_id": int(i),
+                **{column: getattr(self, column)[i] for column in self.TEXT_COLUMNS},
+                "rate_per_kwh": float(self.rate[i]),
+                "fixed_charge_basis": self.fixed_charge_basis[i],
+                "fixed_per_kw_month": float(self.fixed_per_kw[i]),
+                "fixed_per_kva_month": float(self.fixed_per_kva[i]),
+                "fixed_per_connection_month": float(self.fixed_per_connection[i]),
+            }
+            for i in ids
+        ]
+
+    def bills(
+        self,
+        tariff_ids,
+        energy_kwh,
+        load_kw=0.0,
+        months: float = 1.0,
+        power_factor: float = DEFAULT_POWER_FACTOR,
+    ) -> dict[str, np.ndarray]:
+        """Bills for consumption profiles given as parallel arrays (or scalars, broadcast).
+
+        ``energy_kwh`` is the energy over the whole billing period of
+        ``months`` months, and ``load_kw`` the connected load. Returns the
+        energy charge, the fixed charge and their total in rupees, one value
+        per profile.
+        """
+        ids = np.asarray(tariff_ids, dtype=np.intp)
+        energy = np.asarray(energy_kwh, dtype=np.float64)
+        load = np.asarray(load_kw, dtype=np.float64)
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self)):
+            raise ValueError(f"tariff_id must be between 0 and {len(self) - 1}")
+        if not 0 < power_factor <= 1:
+            raise ValueError("power_factor must be in (0, 1]")
+        if months <= 0:
+            raise ValueError("months must be positive")
+        try:
+            ids, energy, load = np.broadcast_arrays(ids, energy, load)
+        except ValueError:
+            raise ValueError("tariff_ids, energy_kwh and load_kw must have the same length (or length 1)")
+        if (energy < 0).any() or (load < 0).any():
+            raise ValueError("energy_kwh and load_kw must not be negative")
+        energy_charge = self.rate[ids] * energy
+        fixed_charge = months * (
+            self.fixed_per_kw[ids] * load
+            + self.fixed_per_kva[ids] * (load / power_factor)
+            + self.fixed_per_connection[ids]
+        )
+        return {
+            "energy_charge": energy_charge,
+            "fixed_charge": fixed_charge,
+            "total": energy_charge + fixed_charge,
+        }
+
+
+_tariff_table: TariffTable | None = None
+
+
+def load_tariff_table(path: Path = TARIFF_CSV_PATH) -> TariffTable | None:
+    """Parse the tariff CSV; called once at startup. Leaves the table unset if the file is missing."""
+    global _tariff_table
+    try:
+        _tariff_table = TariffTable.from_csv(path)
+    except FileNotFoundError:
+        logger.warning("Tariff CSV not found at %s; set TARIFF_CSV_PATH to enable /tariffs", path)
+        return None
+    logger.info("Loaded %d tariffs from %s", len(_tariff_table), path)
+    return _tariff_table
+
+
+def get_tariff_table() -> TariffTable | None:
+    return _tariff_table
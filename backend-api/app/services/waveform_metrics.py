@@ -0,0 +1,116 @@
+"""Derived metrics for simulated experiment waveforms.
+
+Each function takes the waveform in the units returned by the matching model
+in ``simulation.py`` plus the input parameters, and returns a flat dict of
+JSON-safe numbers. A metric is ``None`` when the simulated window does not
+contain the feature it depends on (e.g. the tail never falls to half value).
+"""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+
+Metrics = dict[str, float | int | None]
+
+
+def _finite(value: float) -> float | None:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _first_crossing(x: np.ndarray, y: np.ndarray, level: float, rising: bool) -> float | None:
+    """Linearly interpolated x of the first sample pair that crosses ``level``."""
+    hits = y >= level if rising else y <= level
+    if not hits.any():
+        return None
+    i = int(hits.argmax())
+    if i == 0:
+        return float(x[0])
+    x0, x1, y0, y1 = x[i - 1], x[i], y[i - 1], y[i]
+    if y1 == y0:
+        return float(x1)
+    return float(x0 + (level - y0) * (x1 - x0) / (y1 - y0))
+
+
+def impulse_metrics(x: np.ndarray, y: np.ndarray, params: dict[str, Any]) -> Metrics:
+    """Front time T1, time to half-value T2 and peak of a lightning impulse.
+
+    Uses the IEC 60060-1 definitions behind the 1.2/50 us standard impulse:
+    T1 = 1.67 (t90 - t30) on the front, the virtual origin O1 lies 0.3 T1
+    before t30, and T2 runs from O1 to the 50 % point on the tail. ``x`` is in
+    seconds; times are reported in microseconds.
+    """
+    peak_index = int(y.argmax())
+    peak = float(y[peak_index])
+    metrics: Metrics = {
+        "peak_voltage": _finite(peak),
+        "time_to_peak_us": _finite(x[peak_index] * 1e6),
+        "front_time_us": None,
+        "tail_time_us": None,
+    }
+    if peak <= 0:
+        return metrics
+
+    t_us = x * 1e6
+    front_t, front_v = t_us[: peak_index + 1], y[: peak_index + 1]
+    t30 = _first_crossing(front_t, front_v, 0.3 * peak, rising=True)
+    t90 = _first_crossing(front_t, front_v, 0.9 * peak, rising=True)
+    if t30 is None or t90 is None:
+        return metrics
+    front_time = 1.67 * (t90 - t30)
+    metrics["front_time_us"] = _finite(front_time)
+
+    t50 = _first_crossing(t_us[peak_index:], y[peak_index:], 0.5 * peak, rising=False)
+    if t50 is not None:
+        metrics["tail_time_us"] = _finite(t50 - (t30 - 0.3 * front_time))
+    return metrics
+
+
+def trv_metrics(x: np.ndarray, y: np.ndarray, params: dict[str, Any]) -> Metrics:
+    """Peak TRV, rate of rise and amplitude (peak) factor.
+
+    ``x`` is in microseconds and ``y`` in kilovolts. The peak factor is the
+    first TRV peak over the recovery voltage the circuit settles to,
+    I0 * sqrt(L / C).
+    """
+    peak_index = int(y.argmax())
+    peak = float(y[peak_index])
+    time_to_peak = float(x[peak_index] - x[0])
+    steady_state_kv = float(params["initialCurrent"]) * math.sqrt(
+        float(params["inductance"]) / float(params["capacitance"])
+    ) / 1000
+    slope = np.gradient(y, x) if len(x) > 1 else np.zeros(1)
+    return {
+        "peak_voltage_kv": _finite(peak),
+        "time_to_peak_us": _finite(time_to_peak),
+        "rate_of_rise_kv_per_us": _finite(peak / time_to_peak) if time_to_peak > 0 else None,
+        "max_rate_of_rise_kv_per_us": _finite(slope.max()),
+        "peak_factor": _finite(peak / steady_state_kv) if steady_state_kv > 0 else None,
+    }
+
+
+def ferranti_metrics(x: np.ndarray, y: np.ndarray, params: dict[str, Any]) -> Metrics:
+    """Receiving-end voltage and its percentage rise over the sending end."""
+    sending, receiving = float(y[0]), float(y[-1])
+    return {
+        "sending_end_voltage": _finite(sending),
+        "receiving_end_voltage": _finite(receiving),
+        "voltage_rise_percent": _finite((receiving - sending) / sending * 100) if sending else None,
+    }
+
+
+def cockroft_walton_metrics(x: np.ndarray, y: np.ndarray, params: dict[str, Any]) -> Metrics:
+    return {
+        "mean_output_voltage": _finite(y.mean()),
+        "ripple_peak_to_peak": _finite(y.max() - y.min()),
+    }
+
+
+def partial_discharge_metrics(x: np.ndarray, y: np.ndarray, params: dict[str, Any]) -> Metrics:
+    peak_index = int(np.abs(y).argmax())
+    return {
+        "peak_magnitude": _finite(abs(y[peak_index])),
+        "time_of_peak": _finite(x[peak_index]),
+    }
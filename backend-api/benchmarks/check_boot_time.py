@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Worker boot-time budget check for backend-api.
+
+Each run starts a fresh interpreter, imports ``main`` and runs the app
+lifespan startup/shutdown, which is what a gunicorn worker does before it
+accepts traffic. The check fails if the median boot time exceeds the budget
+or if a module that is supposed to load lazily was imported during boot.
+
+    python benchmarks/check_boot_time.py --budget-seconds 1.5
+    python benchmarks/check_boot_time.py --profile 25   # per-module import times
+
+No database is needed: the lifespan only starts background tasks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_LAZY_MODULES = ("openai", "pandas", "requests")
+
+BOOT_SNIPPET = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def _lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+
+asyncio.run(_lifespan())
+finished = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - started,
+    "boot_seconds": finished - started,
+    "loaded": sorted(name for name in sys.modules if "." not in name),
+}))
+"""
+
+
+def boot_env() -> dict[str, str]:
+    env = dict(os.environ)
+    # Enough configuration for main to import without real services.
+    env.setdefault("ENVIRONMENT", "local")
+    env.setdefault("BACKEND_API_JWT_SECRET", "boot-time-check")
+    env["PYTHONPATH"] = str(BACKEND_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def boot_once(importtime: bool) -> tuple[dict, str]:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", BOOT_SNIPPET]
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=boot_env(), capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"Worker boot failed with exit code {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) rows from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+        except ValueError:
+            continue
+    return rows
+
+
+def print_profile(stderr: str, limit: int) -> None:
+    rows = parse_importtime(stderr)
+    print(f"\nSlowest imports by cumulative time (top {limit}):")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:limit]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+    first_party: dict[str, int] = {}
+    for name, self_us, _ in rows:
+        if name == "main" or name.startswith("app."):
+            first_party[name] = first_party.get(name, 0) + self_us
+    print("\nbackend-api modules by self time:")
+    for name, self_us in sorted(first_party.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        print(f"{self_us / 1000:9.1f} ms  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold boots to measure (default: 5)")
+    parser.add_argument(
+        "--budget-seconds",
+        type=float,
+        default=float(os.getenv("BOOT_TIME_BUDGET_SECONDS", "1.5")),
+        help="fail if the median boot exceeds this (env BOOT_TIME_BUDGET_SECONDS, default 1.5)",
+    )
+    parser.add_argument(
+        "--lazy-modules",
+        default=",".join(DEFAULT_LAZY_MODULES),
+        help="comma-separated top-level modules that must not be imported at boot",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        nargs="?",
+        const=30,
+        default=int(os.getenv("STARTUP_PROFILE", "0") or 0),
+        help="also print the N slowest imports (env STARTUP_PROFILE)",
+    )
+    args = parser.parse_args()
+
+    results = []
+    stderr = ""
+    for run in range(args.runs):
+        result, stderr = boot_once(importtime=bool(args.profile) and run == args.runs - 1)
+        results.append(result)
+        print(f"run {run + 1}: import {result['import_seconds']:.3f}s, boot {result['boot_seconds']:.3f}s")
+
+    # The -X importtime run is slower; keep it out of the budget when profiling.
+    timed = results[:-1] if args.profile and len(results) > 1 else results
+    median = statistics.median(r["boot_seconds"] for r in timed)
+    print(f"median boot {median:.3f}s (budget {args.budget_seconds:.3f}s)")
+
+    if args.profile:
+        print_profile(stderr, args.profile)
+
+    failed = False
+    lazy = {name.strip() for name in args.lazy_modules.split(",") if name.strip()}
+    eager = sorted(lazy.intersection(results[-1]["loaded"]))
+    if eager:
+        print(f"FAIL: imported at boot but expected to load lazily: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_seconds:
+        print(f"FAIL: median boot {median:.3f}s exceeds budget {args.budget_seconds:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
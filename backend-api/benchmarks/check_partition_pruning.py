@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Check that course-scoped response queries read one studentresponses partition.
+
+studentresponses is LIST-partitioned by course_id
+(sql/2026-10-19-01-partition-studentresponses.sql). Pruning only happens when a
+query constrains course_id. This script seeds a scratch database the same way
+``crud_benchmark.py`` does. It then calls each course-scoped crud function
+on a connection that first runs ``EXPLAIN (ANALYZE, FORMAT JSON)`` on every
+statement that mentions studentresponses. It records which partitions each
+statement actually scanned and fails when a strict check read any partition
+other than the course's own. Everything runs in rolled-back transactions.
+
+    python benchmarks/check_partition_pruning.py
+    python benchmarks/check_partition_pruning.py --initdb
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+
+# seed_dataset puts backend-api on sys.path, so it comes before the app imports.
+import seed_dataset
+from crud_benchmark import Context, PrivateCluster, ScratchDatabase, build_context
+from app.crud import archive, assignments, grading, responses
+from app.db.instrumentation import InstrumentedConnection
+
+PARTITIONED_TABLE = "studentresponses"
+
+
+def _scanned_partitions(plan: dict) -> set[str]:
+    """Partitions of PARTITIONED_TABLE that a plan node (or its children) actually scanned."""
+    scanned = set()
+    name = plan.get("Relation Name", "")
+    if "Scan" in plan.get("Node Type", "") and name.startswith(f"{PARTITIONED_TABLE}_") and plan.get("Actual Loops", 0) > 0:
+        scanned.add(name)
+    for child in plan.get("Plans", []):
+        scanned |= _scanned_partitions(child)
+    return scanned
+
+
+class ExplainingConnection(InstrumentedConnection):
+    """Runs EXPLAIN ANALYZE ahead of every statement on studentresponses and keeps the partitions it read."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.statements: list[tuple[str, set[str]]] = []
+
+    async def _explain(self, query: str, args: tuple) -> None:
+        if PARTITIONED_TABLE not in query.lower():
+            return
+        plan = json.loads(await super().fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", *args))
+        self.statements.append((" ".join(query.split())[:100], _scanned_partitions(plan[0]["Plan"])))
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        if args:
+            await self._explain(query, args)
+        return await super().execute(query, *args, **kwargs)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list:
+        await self._explain(query, args)
+        return await super().fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        await self._explain(query, args)
+        return await super().fetchrow(query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        await self._explain(query, args)
+        return await super().fetchval(query, *args, **kwargs)
+
+
+@dataclass
+class Check:
+    name: str
+    call: Callable[[Context], Awaitable[Any]]
+    # False where pruning is not expected (yet); those are reported, not failed.
+    strict: bool = True
+    note: str = ""
+
+
+CHECKS = [
+    Check("crud.responses.create_student_response",
+          lambda ctx: responses.create_student_response(ctx.conn, ctx.student_id, ctx.question_id, "A", ctx.course_id, ctx.assignment_id)),
+    Check("crud.responses.get_course_student_results",
+          lambda ctx: responses.get_course_student_results(ctx.conn, ctx.course_id)),
+    Check("crud.responses.get_assignment_response_arrays",
+          lambda ctx: responses.get_assignment_response_arrays(ctx.conn, ctx.assignment_id)),
+    Check("crud.grading.get_responses_for_grading",
+          lambda ctx: grading.get_responses_for_grading(ctx.conn, ctx.course_id, [ctx.question_id], 0, 5000)),
+    Check("crud.grading.rebuild_assignment_scores",
+          lambda ctx: grading.rebuild_assignment_scores(ctx.conn, ctx.assignment_id)),
+    Check("crud.archive.get_course_archive_status",
+          lambda ctx: archive.get_course_archive_status(ctx.conn, ctx.course_id)),
+    Check("crud.archive.archive_course_responses_batch",
+          lambda ctx: archive.archive_course_responses_batch(ctx.conn, ctx.course_id, 1000)),
+    Check("crud.assignments.delete_assignment_and_related_questions",
+          lambda ctx: assignments.delete_assignment_and_related_questions(ctx.conn, ctx.module_id),
+          strict=False, note="DELETE targets are pruned at run time only from PostgreSQL 14"),
+    Check("crud.responses.get_student_assignments_responses",
+          lambda ctx: responses.get_student_assignments_responses(ctx.conn, ctx.student_id),
+          strict=False, note="per-student history spans courses"),
+]
+
+
+async def run(args: argparse.Namespace) -> int:
+    failed = False
+    database = PrivateCluster() if args.initdb else ScratchDatabase()
+    async with database as connect_kwargs:
+        conn = await asyncpg.connect(**connect_kwargs, connection_class=ExplainingConnection)
+        try:
+            await seed_dataset.create_schema(conn)
+            manifest = await seed_dataset.load_dataset(conn, args, verbose=False)
+            ctx = await build_context(conn, manifest)
+            expected = {f"{PARTITIONED_TABLE}_course_{ctx.course_id}"}
+            for check in CHECKS:
+                conn.statements.clear()
+                transaction = conn.transaction()
+                await transaction.start()
+                try:
+                    await check.call(ctx)
+                finally:
+                    await transaction.rollback()
+                print(f"{check.name}{f'  ({check.note})' if check.note else ''}")
+                for statement, scanned in conn.statements:
+                    ok = scanned <= expected
+                    verdict = "ok" if ok else ("FAIL" if check.strict else "info")
+                    failed = failed or (check.strict and not ok)
+                    print(f"  {verdict:<5}{len(scanned):>3} partition(s)  {statement}")
+        finally:
+            await conn.close()
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seed_dataset.add_dataset_arguments(parser)
+    parser.set_defaults(courses=4, modules=8, students=300, responses=20_000)
+    parser.add_argument("--initdb", action="store_true", help="run a private cluster instead of a scratch database")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Compare memory and throughput of gunicorn serving profiles.
+
+Each profile is a set of environment overrides for ``gunicorn.conf.py``. The
+script starts gunicorn on a local port, waits for ``/health``, drives it with
+a fixed number of concurrent keep-alive clients, and records the total RSS
+and PSS of the master plus workers (Linux ``/proc``). PSS counts pages shared
+copy-on-write between processes only once, so it shows what preloading saves.
+
+    python benchmarks/compare_serving_profiles.py
+    python benchmarks/compare_serving_profiles.py --profiles legacy,tuned --duration 20 --json results.json
+
+``/health`` does not touch the database, so this measures the serving stack
+(worker model, event loop, HTTP parser) rather than query latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CPUS = multiprocessing.cpu_count()
+
+PROFILES: dict[str, dict[str, str]] = {
+    # What gunicorn.conf.py did before: oversized worker count, no preload, auto loop.
+    "legacy": {
+        "GUNICORN_WORKERS": str(CPUS * 2 + 1),
+        "GUNICORN_WORKER_CLASS": "uvicorn.workers.UvicornWorker",
+        "GUNICORN_PRELOAD": "false",
+    },
+    "tuned-no-preload": {
+        "GUNICORN_WORKERS": str(CPUS),
+        "GUNICORN_PRELOAD": "false",
+    },
+    # The defaults in gunicorn.conf.py.
+    "tuned": {
+        "GUNICORN_WORKERS": str(CPUS),
+    },
+}
+
+
+def process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split():
+        pids.extend(process_tree(int(child)))
+    return pids
+
+
+def memory_kib(pids: list[int]) -> dict[str, int]:
+    totals = {"rss_kib": 0, "pss_kib": 0}
+    for pid in pids:
+        try:
+            for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+                field, _, value = line.partition(":")
+                if field == "Rss":
+                    totals["rss_kib"] += int(value.split()[0])
+                elif field == "Pss":
+                    totals["pss_kib"] += int(value.split()[0])
+        except FileNotFoundError:
+            continue
+    return totals
+
+
+async def drive_load(url: str, concurrency: int, duration: float) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+        async def user() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pick = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000 if latencies else float("nan")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": pick(0.50),
+        "p99_ms": pick(0.99),
+    }
+
+
+def wait_until_ready(url: str, proc: subprocess.Popen, timeout: float = 60) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("gunicorn did not become ready in time")
+
+
+def run_profile(name: str, overrides: dict[str, str], args: argparse.Namespace) -> dict:
+    env = dict(os.environ)
+    env.setdefault("ENVIRONMENT", "local")
+    env.setdefault("BACKEND_API_JWT_SECRET", "serving-profile-benchmark")
+    env.pop("WEB_CONCURRENCY", None)
+    # Worker recycling mid-run shows up as connection errors, not as a profile difference.
+    env.setdefault("GUNICORN_MAX_REQUESTS", "0")
+    env.update(overrides)
+    env["GUNICORN_BIND"] = f"127.0.0.1:{args.port}"
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        ready_seconds = wait_until_ready(base_url + "/health", proc)
+        # Let every worker finish booting before sampling memory.
+        time.sleep(args.settle)
+        idle = memory_kib(process_tree(proc.pid))
+        asyncio.run(drive_load(base_url + args.path, args.concurrency, min(2.0, args.duration)))
+        load = asyncio.run(drive_load(base_url + args.path, args.concurrency, args.duration))
+        loaded = memory_kib(process_tree(proc.pid))
+        workers = len(process_tree(proc.pid)) - 1
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return {
+        "profile": name,
+        "overrides": overrides,
+        "workers": workers,
+        "ready_seconds": ready_seconds,
+        "idle_rss_mib": idle["rss_kib"] / 1024,
+        "idle_pss_mib": idle["pss_kib"] / 1024,
+        "loaded_pss_mib": loaded["pss_kib"] / 1024,
+        **load,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default=",".join(PROFILES), help=f"comma-separated subset of: {', '.join(PROFILES)}")
+    parser.add_argument("--path", default="/health", help="request path to drive (default: /health)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of measured load per profile")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait after ready before sampling memory")
+    parser.add_argument("--port", type=int, default=3199)
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for name in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        if name not in PROFILES:
+            parser.error(f"unknown profile: {name}")
+        print(f"running {name} ...", flush=True)
+        results.append(run_profile(name, PROFILES[name], args))
+
+    header = f"{'profile':<18}{'workers':>8}{'ready s':>9}{'RSS MiB':>9}{'PSS MiB':>9}{'PSS@load':>9}{'req/s':>9}{'p50 ms':>8}{'p99 ms':>8}{'errors':>7}"
+    print("\n" + header)
+    for r in results:
+        print(
+            f"{r['profile']:<18}{r['workers']:>8}{r['ready_seconds']:>9.2f}{r['idle_rss_mib']:>9.0f}"
+            f"{r['idle_pss_mib']:>9.0f}{r['loaded_pss_mib']:>9.0f}{r['rps']:>9.0f}{r['p50_ms']:>8.1f}"
+            f"{r['p99_ms']:>8.1f}{r['errors']:>7}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps({"cpus": CPUS, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
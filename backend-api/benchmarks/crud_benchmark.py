@@ -0,0 +1,857 @@
+#!/usr/bin/env python3
+"""Latency and round-trip microbenchmarks for ``app/crud`` and ``app/core/rbac``.
+
+Every case calls one function against a throwaway database seeded by
+``seed_dataset.py`` (small sizes by default). It records the median and p95
+latency and the number of database round trips per call, counted by
+``InstrumentedConnection``. Cases that write run inside a transaction
+that is rolled back after each call, so every iteration sees the same
+data.
+
+Where the database comes from:
+
+* default: ``CREATE DATABASE crud_bench_<random>`` on the server the app is
+  configured for (``ENVIRONMENT=local`` settings or ``DATABASE_URL``). It is
+  dropped afterwards.
+* ``--initdb``: a private cluster in a temp directory, started with the
+  ``initdb`` / ``pg_ctl`` binaries on PATH. It is removed afterwards.
+
+Baselines and regression checks:
+
+    python benchmarks/crud_benchmark.py --write-baseline benchmarks/crud_baseline.json
+    python benchmarks/crud_benchmark.py --compare benchmarks/crud_baseline.json --max-regression 25
+
+``--compare`` fails if any case makes more round trips than in the baseline.
+Round trips do not depend on hardware, so an N+1 loop fails on any machine.
+It also fails if a case's median is more than ``--max-regression`` percent
+slower and more than ``--min-delta-ms`` slower. Only compare latency between
+runs on the same machine.
+
+The run also lists public crud/rbac coroutines that have no case. Use
+``--strict`` to make that an error when a new function is added without one.
+
+The benchmark connection prepares ``app.db.queries`` the way the app's pools
+do. ``--no-prepare`` runs the same statements through asyncpg's statement
+cache instead, for comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import secrets
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
+os.environ.setdefault("ENVIRONMENT", "local")
+
+import asyncpg  # noqa: E402
+
+import seed_dataset  # noqa: E402
+from app.core import rbac  # noqa: E402
+from app.core.auth import AuthenticatedActor  # noqa: E402
+from app.core.metrics import track_queries  # noqa: E402
+from app.crud import archive, assignments, courses, experiment_runs, grading, instructors, jobs, modules, questions, responses, students  # noqa: E402
+from app.db import queries  # noqa: E402
+from app.db.connection import CONNECTION_KWARGS  # noqa: E402
+from app.db.instrumentation import InstrumentedConnection  # noqa: E402
+from app.schemas.schemas import AssignmentCreate, CourseCreate, InstructorCreate, InstructorUpdate, ModuleCreate, QuestionCreate, QuestionDraft  # noqa: E402
+
+# Not benchmarked, with the reason shown in the coverage report.
+SKIPPED: dict[str, str] = {}
+
+
+@dataclass
+class Context:
+    conn: asyncpg.Connection
+    course_id: int
+    module_id: UUID
+    assignment_id: int
+    question_id: int
+    option_ids: list[int]
+    student_id: int
+    student_email: str
+    instructor_id: int
+    instructor_email: str
+    enrolled_emails: list[str]
+
+    @property
+    def student(self) -> AuthenticatedActor:
+        return AuthenticatedActor(subject="bench-student", email=self.student_email, roles={"student"}, auth_method="lti")
+
+    @property
+    def teacher(self) -> AuthenticatedActor:
+        return AuthenticatedActor(subject="bench-teacher", email=self.instructor_email, roles={"teacher"}, auth_method="staff")
+
+
+# A case gets the context and returns the call to time. Anything it does
+# before returning (creating rows to delete, building inputs) is not timed.
+CaseFn = Callable[[Context], Awaitable[Callable[[], Awaitable[Any]]]]
+
+
+@dataclass
+class Case:
+    name: str
+    fn: CaseFn
+    writes: bool
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, writes: bool = False):
+    def register(fn: CaseFn) -> CaseFn:
+        CASES[name] = Case(name, fn, writes)
+        return fn
+    return register
+
+
+def _module(ctx: Context, **overrides) -> ModuleCreate:
+    return ModuleCreate(course_id=ctx.course_id, title="Bench module", description="Benchmark", **overrides)
+
+
+QUIZ_CSV = (
+    "Question,Question_Type,Option_A,Option_B,Option_C,Option_D,Correct_Answer\n"
+    + "".join(f"Bench question {i}?,multiple_choice,A{i},B{i},C{i},D{i},B{i}\n" for i in range(10))
+).encode()
+
+
+# Responses attached to the quiz removed by the cascade-delete case.
+CASCADE_RESPONSES = 10_000
+
+
+# --- crud/archive -----------------------------------------------------------
+
+@case("crud.archive.get_courses_to_archive")
+async def _(ctx):
+    return lambda: archive.get_courses_to_archive(ctx.conn, date(2100, 1, 1))
+
+
+@case("crud.archive.get_course_archive_status")
+async def _(ctx):
+    return lambda: archive.get_course_archive_status(ctx.conn, ctx.course_id)
+
+
+@case("crud.archive.archive_course_responses_batch", writes=True)
+async def _(ctx):
+    return lambda: archive.archive_course_responses_batch(ctx.conn, ctx.course_id, 5000)
+
+
+@case("crud.archive.restore_course_responses_batch", writes=True)
+async def _(ctx):
+    await archive.archive_course_responses_batch(ctx.conn, ctx.course_id, 5000)
+    return lambda: archive.restore_course_responses_batch(ctx.conn, ctx.course_id, 5000)
+
+
+@case("crud.archive.set_course_archived", writes=True)
+async def _(ctx):
+    return lambda: archive.set_course_archived(ctx.conn, ctx.course_id, True)
+
+
+# --- crud/assignments -------------------------------------------------------
+
+@case("crud.assignments.create_assignment", writes=True)
+async def _(ctx):
+    return lambda: assignments.create_assignment(ctx.conn, ctx.module_id, "Bench", "Bench quiz", date(2026, 12, 31))
+
+
+@case("crud.assignments.create_questions_and_options", writes=True)
+async def _(ctx):
+    import pandas as pd
+    from io import BytesIO
+
+    df = pd.read_csv(BytesIO(QUIZ_CSV))
+    return lambda: assignments.create_questions_and_options(ctx.conn, ctx.assignment_id, df)
+
+
+@case("crud.assignments.create_assignment_and_questions_from_csv", writes=True)
+async def _(ctx):
+    return lambda: assignments.create_assignment_and_questions_from_csv(
+        ctx.conn, ctx.module_id, "Bench CSV quiz", datetime(2026, 12, 31), QUIZ_CSV
+    )
+
+
+@case("crud.assignments.get_assignments_for_module")
+async def _(ctx):
+    return lambda: assignments.get_assignments_for_module(ctx.conn, ctx.module_id)
+
+
+@case("crud.assignments.update_assignment", writes=True)
+async def _(ctx):
+    update = AssignmentCreate(module_id=ctx.module_id, title="Renamed", description="Bench", due_date=date(2026, 12, 31))
+    return lambda: assignments.update_assignment(ctx.conn, ctx.assignment_id, update)
+
+
+@case("crud.assignments.delete_assignment", writes=True)
+async def _(ctx):
+    assignment_id = await assignments.create_assignment(ctx.conn, ctx.module_id, "", "To delete", date(2026, 12, 31))
+    return lambda: assignments.delete_assignment(ctx.conn, assignment_id)
+
+
+@case("crud.assignments.delete_assignment_and_related_questions", writes=True)
+async def _(ctx):
+    # A fresh module with one 10-question quiz and CASCADE_RESPONSES answers to it.
+    created = await modules.create_module(ctx.conn, ctx.course_id, _module(ctx))
+    module_id = UUID(created["module_id"])
+    quiz = await assignments.create_assignment_and_questions_from_csv(ctx.conn, module_id, "To delete", datetime(2026, 12, 31), QUIZ_CSV)
+    question_ids = await ctx.conn.fetch("SELECT question_id FROM questions WHERE assignment_id = $1", quiz["assignment_id"])
+    student_ids = await ctx.conn.fetch("SELECT student_id FROM students ORDER BY student_id LIMIT 1000")
+    await ctx.conn.copy_records_to_table(
+        "studentresponses",
+        columns=("course_id", "question_id", "student_id", "response"),
+        records=[
+            (ctx.course_id, question_ids[i % len(question_ids)][0], student_ids[i % len(student_ids)][0], "A")
+            for i in range(CASCADE_RESPONSES)
+        ],
+    )
+    return lambda: assignments.delete_assignment_and_related_questions(ctx.conn, module_id)
+
+
+# --- crud/courses -----------------------------------------------------------
+
+@case("crud.courses.create_course", writes=True)
+async def _(ctx):
+    course = CourseCreate(title="Bench course", description="Benchmark", instructor_id=ctx.instructor_id)
+    return lambda: courses.create_course(ctx.conn, course)
+
+
+@case("crud.courses.get_courses_for_instructor")
+async def _(ctx):
+    return lambda: courses.get_courses_for_instructor(ctx.conn, ctx.instructor_id)
+
+
+@case("crud.courses.get_courses_for_student")
+async def _(ctx):
+    return lambda: courses.get_courses_for_student(ctx.conn, ctx.student_email)
+
+
+@case("crud.courses.get_enrolled_students")
+async def _(ctx):
+    return lambda: courses.get_enrolled_students(ctx.conn, ctx.course_id)
+
+
+@case("crud.courses.get_courses")
+async def _(ctx):
+    return lambda: courses.get_courses(ctx.conn)
+
+
+@case("crud.courses.get_course_by_internal_url")
+async def _(ctx):
+    return lambda: courses.get_course_by_internal_url(ctx.conn, ctx.course_id)
+
+
+# --- crud/experiment_runs ---------------------------------------------------
+
+@case("crud.experiment_runs.copy_experiment_runs", writes=True)
+async def _(ctx):
+    now = datetime.now(timezone.utc)
+    records = [
+        (ctx.module_id, ctx.student_id, "ferranti", json.dumps({"voltage_kv": float(i)}), None, now)
+        for i in range(500)
+    ]
+    return lambda: experiment_runs.copy_experiment_runs(ctx.conn, records)
+
+
+@case("crud.experiment_runs.get_experiment_runs_for_module")
+async def _(ctx):
+    return lambda: experiment_runs.get_experiment_runs_for_module(ctx.conn, ctx.module_id)
+
+
+# --- crud/grading -----------------------------------------------------------
+
+@case("crud.grading.get_question_grading_key")
+async def _(ctx):
+    return lambda: grading.get_question_grading_key(ctx.conn, ctx.question_id)
+
+
+@case("crud.grading.get_assignment_grading_keys")
+async def _(ctx):
+    return lambda: grading.get_assignment_grading_keys(ctx.conn, ctx.assignment_id)
+
+
+@case("crud.grading.get_responses_for_grading")
+async def _(ctx):
+    question_ids = [key["question_id"] for key in await grading.get_assignment_grading_keys(ctx.conn, ctx.assignment_id)]
+    return lambda: grading.get_responses_for_grading(ctx.conn, ctx.course_id, question_ids, 0, 5000)
+
+
+@case("crud.grading.update_response_scores", writes=True)
+async def _(ctx):
+    question_ids = [key["question_id"] for key in await grading.get_assignment_grading_keys(ctx.conn, ctx.assignment_id)]
+    rows = await grading.get_responses_for_grading(ctx.conn, ctx.course_id, question_ids, 0, 5000)
+    response_ids = [row["response_id"] for row in rows]
+    graded_at = [row["graded_at"] for row in rows]
+    return lambda: grading.update_response_scores(ctx.conn, ctx.course_id, response_ids, [0.0] * len(rows), [False] * len(rows), graded_at)
+
+
+@case("crud.grading.rebuild_assignment_scores", writes=True)
+async def _(ctx):
+    return lambda: grading.rebuild_assignment_scores(ctx.conn, ctx.assignment_id)
+
+
+@case("crud.grading.get_course_gradebook")
+async def _(ctx):
+    return lambda: grading.get_course_gradebook(ctx.conn, ctx.course_id)
+
+
+# --- crud/jobs --------------------------------------------------------------
+
+BENCH_WORKER = "bench-worker"
+
+
+async def _claimed_job(ctx) -> int:
+    await jobs.enqueue_job(ctx.conn, "bench.noop", {"csv": QUIZ_CSV.decode()}, ctx.course_id, "bench")
+    job = await jobs.claim_job(ctx.conn, ["bench.noop"], BENCH_WORKER, 60)
+    return job["job_id"]
+
+
+@case("crud.jobs.enqueue_job", writes=True)
+async def _(ctx):
+    return lambda: jobs.enqueue_job(ctx.conn, "bench.noop", {"csv": QUIZ_CSV.decode()}, ctx.course_id, "bench")
+
+
+@case("crud.jobs.claim_job", writes=True)
+async def _(ctx):
+    await jobs.enqueue_job(ctx.conn, "bench.noop", {}, ctx.course_id, "bench")
+    return lambda: jobs.claim_job(ctx.conn, ["bench.noop"], BENCH_WORKER, 60)
+
+
+@case("crud.jobs.extend_job_lease", writes=True)
+async def _(ctx):
+    job_id = await _claimed_job(ctx)
+    return lambda: jobs.extend_job_lease(ctx.conn, job_id, BENCH_WORKER, 60)
+
+
+@case("crud.jobs.update_job_progress", writes=True)
+async def _(ctx):
+    job_id = await _claimed_job(ctx)
+    return lambda: jobs.update_job_progress(ctx.conn, job_id, BENCH_WORKER, 0.5, "halfway")
+
+
+@case("crud.jobs.complete_job", writes=True)
+async def _(ctx):
+    job_id = await _claimed_job(ctx)
+    return lambda: jobs.complete_job(ctx.conn, job_id, BENCH_WORKER, {"questions": 10})
+
+
+@case("crud.jobs.fail_job", writes=True)
+async def _(ctx):
+    job_id = await _claimed_job(ctx)
+    return lambda: jobs.fail_job(ctx.conn, job_id, BENCH_WORKER, "bench failure", 10)
+
+
+@case("crud.jobs.release_job", writes=True)
+async def _(ctx):
+    job_id = await _claimed_job(ctx)
+    return lambda: jobs.release_job(ctx.conn, job_id, BENCH_WORKER)
+
+
+@case("crud.jobs.get_job")
+async def _(ctx):
+    job = await jobs.enqueue_job(ctx.conn, "bench.noop", {}, ctx.course_id, "bench")
+    return lambda: jobs.get_job(ctx.conn, job["job_id"])
+
+
+@case("crud.jobs.delete_finished_jobs", writes=True)
+async def _(ctx):
+    return lambda: jobs.delete_finished_jobs(ctx.conn, 0)
+
+
+# --- crud/instructors -------------------------------------------------------
+
+@case("crud.instructors.create_instructor", writes=True)
+async def _(ctx):
+    instructor = InstructorCreate(name="Bench Instructor", email=f"bench-{secrets.token_hex(4)}@bench.example.edu")
+    return lambda: instructors.create_instructor(ctx.conn, instructor)
+
+
+@case("crud.instructors.update_instructor_by_email", writes=True)
+async def _(ctx):
+    update = InstructorUpdate(name="Renamed Instructor", email=ctx.instructor_email, city="Singapore")
+    return lambda: instructors.update_instructor_by_email(ctx.conn, ctx.instructor_email, update)
+
+
+# --- crud/modules -----------------------------------------------------------
+
+@case("crud.modules.get_questions_and_options_by_module")
+async def _(ctx):
+    return lambda: modules.get_questions_and_options_by_module(ctx.conn, ctx.module_id)
+
+
+@case("crud.modules.create_module", writes=True)
+async def _(ctx):
+    module = _module(ctx)
+    return lambda: modules.create_module(ctx.conn, ctx.course_id, module)
+
+
+@case("crud.modules.get_modules_for_course")
+async def _(ctx):
+    return lambda: modules.get_modules_for_course(ctx.conn, ctx.course_id)
+
+
+@case("crud.modules.get_module_by_id")
+async def _(ctx):
+    return lambda: modules.get_module_by_id(ctx.conn, ctx.module_id)
+
+
+@case("crud.modules.get_module_assignments")
+async def _(ctx):
+    return lambda: modules.get_module_assignments(ctx.conn, ctx.module_id)
+
+
+@case("crud.modules.update_module", writes=True)
+async def _(ctx):
+    module = _module(ctx, concept="Updated concept")
+    return lambda: modules.update_module(ctx.conn, ctx.module_id, module)
+
+
+@case("crud.modules.get_module_config_version")
+async def _(ctx):
+    return lambda: modules.get_module_config_version(ctx.conn, ctx.module_id)
+
+
+@case("crud.modules.get_module_experiment_config")
+async def _(ctx):
+    return lambda: modules.get_module_experiment_config(ctx.conn, ctx.module_id)
+
+
+@case("crud.modules.set_module_experiment_config", writes=True)
+async def _(ctx):
+    return lambda: modules.set_module_experiment_config(ctx.conn, ctx.module_id, '{"model": "ferranti"}')
+
+
+@case("crud.modules.refresh_experiment_config_for_path", writes=True)
+async def _(ctx):
+    return lambda: modules.refresh_experiment_config_for_path(ctx.conn, "configs/bench.json", '{"model": "ferranti"}')
+
+
+@case("crud.modules.delete_module", writes=True)
+async def _(ctx):
+    created = await modules.create_module(ctx.conn, ctx.course_id, _module(ctx))
+    return lambda: modules.delete_module(ctx.conn, UUID(created["module_id"]))
+
+
+# --- crud/questions ---------------------------------------------------------
+
+
+@case("crud.questions.create_question", writes=True)
+async def _(ctx):
+    question = QuestionCreate(
+        assignment_id=ctx.assignment_id,
+        question_text="Which phasor leads?",
+        options=["V", "I", "Neither", "Both"],
+        correct_option_index=0,
+    )
+    return lambda: questions.create_question(ctx.conn, question)
+
+
+@case("crud.questions.create_questions", writes=True)
+async def _(ctx):
+    drafts = [
+        QuestionDraft(
+            question_text=f"Question {i}",
+            options=[f"Option {i}.{j}" for j in range(4)],
+            correct_option_index=i % 4,
+        )
+        for i in range(20)
+    ]
+    return lambda: questions.create_questions(ctx.conn, ctx.assignment_id, drafts)
+
+
+@case("crud.questions.get_questions_for_assignment")
+async def _(ctx):
+    return lambda: questions.get_questions_for_assignment(ctx.conn, ctx.assignment_id)
+
+
+# --- crud/responses ---------------------------------------------------------
+
+@case("crud.responses.create_student_response", writes=True)
+async def _(ctx):
+    return lambda: responses.create_student_response(
+        ctx.conn, ctx.student_id, ctx.question_id, str(ctx.option_ids[0]), ctx.course_id, ctx.assignment_id, 1.0, True
+    )
+
+
+@case("crud.responses.get_student_assignments_responses")
+async def _(ctx):
+    return lambda: responses.get_student_assignments_responses(ctx.conn, ctx.student_id)
+
+
+@case("crud.responses.get_course_student_results")
+async def _(ctx):
+    return lambda: responses.get_course_student_results(ctx.conn, ctx.course_id)
+
+
+@case("crud.responses.get_assignment_item_bank")
+async def _(ctx):
+    return lambda: responses.get_assignment_item_bank(ctx.conn, ctx.assignment_id)
+
+
+@case("crud.responses.get_assignment_analysis_version")
+async def _(ctx):
+    return lambda: responses.get_assignment_analysis_version(ctx.conn, ctx.assignment_id)
+
+
+@case("crud.responses.get_assignment_response_arrays")
+async def _(ctx):
+    return lambda: responses.get_assignment_response_arrays(ctx.conn, ctx.assignment_id)
+
+
+@case("crud.responses.notify_course_results_resync")
+async def _(ctx):
+    return lambda: responses.notify_course_results_resync(ctx.conn, ctx.course_id)
+
+
+# --- crud/students ----------------------------------------------------------
+
+@case("crud.students.get_students")
+async def _(ctx):
+    return lambda: students.get_students(ctx.conn)
+
+
+@case("crud.students.get_student_by_email")
+async def _(ctx):
+    return lambda: students.get_student_by_email(ctx.conn, ctx.student_email)
+
+
+@case("crud.students.create_student", writes=True)
+async def _(ctx):
+    email = f"bench-{secrets.token_hex(4)}@bench.example.edu"
+    return lambda: students.create_student(ctx.conn, "Bench Student", email, None, None, "Singapore")
+
+
+@case("crud.students.update_student_login_info", writes=True)
+async def _(ctx):
+    return lambda: students.update_student_login_info(ctx.conn, ctx.student_email)
+
+
+@case("crud.students.get_number_of_logins_by_email")
+async def _(ctx):
+    return lambda: students.get_number_of_logins_by_email(ctx.conn, ctx.student_email)
+
+
+@case("crud.students.delete_student_by_email", writes=True)
+async def _(ctx):
+    created = await students.create_student(ctx.conn, "To delete", f"bench-{secrets.token_hex(4)}@bench.example.edu", None, None, None)
+    return lambda: students.delete_student_by_email(ctx.conn, created["email"])
+
+
+@case("crud.students.enroll_students_in_course", writes=True)
+async def _(ctx):
+    # A class-sized roster sync: most already enrolled, which is the common case.
+    return lambda: students.enroll_students_in_course(ctx.conn, ctx.course_id, ctx.enrolled_emails)
+
+
+@case("crud.students.unenroll_students_from_course", writes=True)
+async def _(ctx):
+    return lambda: students.unenroll_students_from_course(ctx.conn, ctx.course_id, ctx.enrolled_emails)
+
+
+@case("crud.students.get_courses_for_student")
+async def _(ctx):
+    return lambda: students.get_courses_for_student(ctx.conn, ctx.student_email)
+
+
+@case("crud.students.get_student_id_by_email")
+async def _(ctx):
+    return lambda: students.get_student_id_by_email(ctx.conn, ctx.student_email)
+
+
+# --- core/rbac --------------------------------------------------------------
+
+@case("rbac.get_student_id_for_actor")
+async def _(ctx):
+    return lambda: rbac.get_student_id_for_actor(ctx.conn, ctx.student)
+
+
+@case("rbac.require_student_email_access")
+async def _(ctx):
+    return lambda: rbac.require_student_email_access(ctx.conn, ctx.student, ctx.student_email)
+
+
+@case("rbac.require_student_id_access")
+async def _(ctx):
+    # Teacher path: the only one that joins through enrollments and courses.
+    return lambda: rbac.require_student_id_access(ctx.conn, ctx.teacher, ctx.student_id)
+
+
+@case("rbac.is_student_enrolled")
+async def _(ctx):
+    return lambda: rbac.is_student_enrolled(ctx.conn, ctx.student, ctx.course_id)
+
+
+@case("rbac.is_course_teacher")
+async def _(ctx):
+    return lambda: rbac.is_course_teacher(ctx.conn, ctx.teacher, ctx.course_id)
+
+
+@case("rbac.require_course_read_access")
+async def _(ctx):
+    return lambda: rbac.require_course_read_access(ctx.conn, ctx.student, ctx.course_id)
+
+
+@case("rbac.require_course_staff_access")
+async def _(ctx):
+    return lambda: rbac.require_course_staff_access(ctx.conn, ctx.teacher, ctx.course_id)
+
+
+@case("rbac.get_course_id_for_module")
+async def _(ctx):
+    return lambda: rbac.get_course_id_for_module(ctx.conn, ctx.module_id)
+
+
+@case("rbac.get_course_id_for_assignment")
+async def _(ctx):
+    return lambda: rbac.get_course_id_for_assignment(ctx.conn, ctx.assignment_id)
+
+
+@case("rbac.get_course_id_for_question")
+async def _(ctx):
+    return lambda: rbac.get_course_id_for_question(ctx.conn, ctx.module_id, ctx.assignment_id, ctx.question_id)
+
+
+@case("rbac.resolve_student_response_writer")
+async def _(ctx):
+    return lambda: rbac.resolve_student_response_writer(ctx.conn, ctx.student, None, ctx.course_id)
+
+
+# ---------------------------------------------------------------------------
+# Coverage
+
+
+def uncovered_functions() -> list[str]:
+    """Public coroutine functions in app.crud and app.core.rbac without a case or skip reason."""
+    import app.crud
+
+    targets = [(f"crud.{info.name}", importlib.import_module(f"app.crud.{info.name}")) for info in pkgutil.iter_modules(app.crud.__path__)]
+    targets.append(("rbac", rbac))
+    missing = []
+    for prefix, module in targets:
+        for name, obj in vars(module).items():
+            if name.startswith("_") or not inspect.isfunction(obj) or obj.__module__ != module.__name__:
+                continue
+            key = f"{prefix}.{name}"
+            if key not in CASES and key not in SKIPPED:
+                missing.append(key)
+    return sorted(missing)
+
+
+# ---------------------------------------------------------------------------
+# Ephemeral database
+
+
+class ScratchDatabase:
+    """A database created for one run on the configured server, dropped afterwards."""
+
+    def __init__(self):
+        self.name = f"crud_bench_{secrets.token_hex(4)}"
+
+    async def __aenter__(self) -> dict:
+        admin = await asyncpg.connect(**CONNECTION_KWARGS)
+        try:
+            await admin.execute(f'CREATE DATABASE "{self.name}"')
+        finally:
+            await admin.close()
+        return {**CONNECTION_KWARGS, "database": self.name}
+
+    async def __aexit__(self, *exc) -> None:
+        admin = await asyncpg.connect(**CONNECTION_KWARGS)
+        try:
+            await admin.execute(f'DROP DATABASE IF EXISTS "{self.name}"')
+        finally:
+            await admin.close()
+
+
+class PrivateCluster:
+    """A Postgres cluster in a temp directory, listening only on a unix socket."""
+
+    def __init__(self):
+        self.directory = Path(tempfile.mkdtemp(prefix="crud-bench-pg-"))
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+
+    async def __aenter__(self) -> dict:
+        data = self.directory / "data"
+        for tool in ("initdb", "pg_ctl"):
+            if shutil.which(tool) is None:
+                raise SystemExit(f"--initdb needs {tool} on PATH")
+        subprocess.run(["initdb", "-D", str(data), "-U", "bench", "--auth=trust", "-E", "UTF8"], check=True, capture_output=True)
+        options = f"-p {self.port} -k {self.directory} -c listen_addresses='' -c fsync=off -c synchronous_commit=off"
+        subprocess.run(["pg_ctl", "-D", str(data), "-o", options, "-w", "start"], check=True, capture_output=True)
+        return {"host": str(self.directory), "port": self.port, "user": "bench", "database": "postgres"}
+
+    async def __aexit__(self, *exc) -> None:
+        subprocess.run(["pg_ctl", "-D", str(self.directory / "data"), "-m", "immediate", "stop"], capture_output=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+
+
+async def build_context(conn: asyncpg.Connection, manifest: dict) -> Context:
+    course = next(c for c in manifest["courses"] if any(m["assignments"] for m in c["modules"]))
+    module = next(m for m in course["modules"] if m["assignments"])
+    assignment = module["assignments"][0]
+    question = assignment["questions"][0]
+    enrolled = [s for s in manifest["students"] if course["course_id"] in s["course_ids"]]
+    instructor_id = await conn.fetchval("SELECT instructor_id FROM courses WHERE course_id = $1", course["course_id"])
+    return Context(
+        conn=conn,
+        course_id=course["course_id"],
+        module_id=UUID(module["module_id"]),
+        assignment_id=assignment["assignment_id"],
+        question_id=question["question_id"],
+        option_ids=question["options"],
+        student_id=enrolled[0]["student_id"],
+        student_email=enrolled[0]["email"],
+        instructor_id=instructor_id,
+        instructor_email=course["instructor_email"],
+        enrolled_emails=[s["email"] for s in enrolled[:30]],
+    )
+
+
+async def run_case(ctx: Context, bench: Case, iterations: int, warmup: int) -> dict:
+    timings: list[float] = []
+    round_trips: list[int] = []
+    for iteration in range(warmup + iterations):
+        transaction = ctx.conn.transaction()
+        await transaction.start()
+        try:
+            call = await bench.fn(ctx)
+            with track_queries() as stats:
+                started = time.perf_counter()
+                await call()
+                elapsed = time.perf_counter() - started
+        finally:
+            # Read-only cases roll back too; it keeps every iteration identical.
+            await transaction.rollback()
+        if iteration >= warmup:
+            timings.append(elapsed)
+            round_trips.append(stats.queries)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(int(0.95 * len(timings)), len(timings) - 1)] * 1000,
+        "round_trips": max(round_trips),
+        "writes": bench.writes,
+    }
+
+
+async def run(args: argparse.Namespace, selected: list[Case]) -> tuple[dict, dict]:
+    database = PrivateCluster() if args.initdb else ScratchDatabase()
+    async with database as connect_kwargs:
+        conn = await asyncpg.connect(**connect_kwargs, connection_class=InstrumentedConnection)
+        try:
+            await seed_dataset.create_schema(conn)
+            manifest = await seed_dataset.load_dataset(conn, args, verbose=False)
+            ctx = await build_context(conn, manifest)
+            if not args.no_prepare:
+                # What the app's pools do to each new connection.
+                await queries.registry.prepare(conn)
+            results = {}
+            for bench in selected:
+                try:
+                    results[bench.name] = await run_case(ctx, bench, args.iterations, args.warmup)
+                except Exception as e:
+                    results[bench.name] = {"error": f"{type(e).__name__}: {e}"}
+                r = results[bench.name]
+                if "error" in r:
+                    print(f"{bench.name:<60} ERROR {r['error']}", flush=True)
+                else:
+                    print(f"{bench.name:<60}{r['median_ms']:9.2f}{r['p95_ms']:9.2f}{r['round_trips']:7}", flush=True)
+        finally:
+            await conn.close()
+    return results, manifest
+
+
+def compare(results: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> list[str]:
+    failures = []
+    for name, current in sorted(results.items()):
+        before = baseline.get("cases", {}).get(name)
+        if before is None or "error" in before or "error" in current:
+            continue
+        if current["round_trips"] > before["round_trips"]:
+            failures.append(f"{name}: round trips {before['round_trips']} -> {current['round_trips']}")
+        delta = current["median_ms"] - before["median_ms"]
+        if before["median_ms"] > 0 and delta > min_delta_ms and delta / before["median_ms"] * 100 > max_regression:
+            failures.append(
+                f"{name}: median {before['median_ms']:.2f} -> {current['median_ms']:.2f} ms "
+                f"(+{delta / before['median_ms'] * 100:.0f}%)"
+            )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seed_dataset.add_dataset_arguments(parser)
+    parser.set_defaults(courses=2, modules=10, students=500, responses=20_000)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--initdb", action="store_true", help="run a private cluster instead of a scratch database")
+    parser.add_argument("--strict", action="store_true", help="fail if a crud/rbac function has no case")
+    parser.add_argument("--no-prepare", action="store_true", help="leave the query registry unprepared, as with DB_PREPARE_QUERIES=false")
+    parser.add_argument("--write-baseline", type=Path, help="save results as the new baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=25.0, help="allowed median slowdown in percent")
+    parser.add_argument("--min-delta-ms", type=float, default=0.2, help="ignore slowdowns smaller than this")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    missing = uncovered_functions()
+    for name, reason in sorted(SKIPPED.items()):
+        print(f"skipped {name}: {reason}")
+    for name in missing:
+        print(f"NOT BENCHMARKED: {name}")
+    if missing and args.strict:
+        return 1
+
+    selected = [bench for name, bench in CASES.items() if not args.pattern or args.pattern in name]
+    print(f"\n{'case':<60}{'med ms':>9}{'p95 ms':>9}{'trips':>7}")
+    results, manifest = asyncio.run(run(args, selected))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "dataset": {"seed": manifest["seed"], "sizes": manifest["sizes"]},
+        "iterations": args.iterations,
+        "cases": results,
+    }
+    for path in (args.json, args.write_baseline):
+        if path:
+            path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+            print(f"results written to {path}")
+
+    failed = any("error" in r for r in results.values())
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("dataset") != report["dataset"]:
+            print("warning: baseline was recorded with a different dataset; latency comparison is not meaningful")
+        failures = compare(results, baseline, args.max_regression, args.min_delta_ms)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
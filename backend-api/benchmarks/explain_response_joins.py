@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""EXPLAIN ANALYZE the response/option joins before and after selected_option_id.
+
+Results and item analysis used to join options on
+``studentresponses.response::text = options.option_id::text``. They now join
+on the integer ``selected_option_id``
+(sql/2026-10-19-03-response-selected-option.sql). This script seeds a scratch
+database with the benchmark dataset (1M responses by default). For each query
+it runs ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` on the old text-cast SQL
+(kept below) and on the SQL that ``app.crud.responses`` sends today, with the
+same arguments. It prints the execution time, the shared buffers touched, the
+join methods and the sequential scans of each plan.
+
+    python benchmarks/explain_response_joins.py
+    python benchmarks/explain_response_joins.py --initdb --plans benchmarks/results/plans
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+
+# seed_dataset puts backend-api on sys.path, so it comes before the app imports.
+import seed_dataset
+from crud_benchmark import PrivateCluster, ScratchDatabase, build_context
+from app.crud import responses
+from app.db.instrumentation import InstrumentedConnection
+
+BEFORE = {
+    "get_student_assignments_responses": """
+        SELECT Modules.title AS module_title, Assignments.title AS assignment_title,
+               Assignments.description AS assignment_description, Questions.question_text,
+               CASE WHEN Questions.question_type = 'multiple_choice' AND studentresponses.response IS NOT NULL
+                    THEN StudentOption.option_text ELSE studentresponses.response END AS student_response,
+               CorrectOption.option_text AS correct_answer_text
+        FROM studentresponses
+        LEFT JOIN Questions ON studentresponses.question_id = Questions.question_id
+        LEFT JOIN Options AS StudentOption ON studentresponses.response::text = StudentOption.option_id::text AND Questions.question_type = 'multiple_choice'
+        LEFT JOIN Options AS CorrectOption ON Questions.correct_option_id::text = CorrectOption.option_id::text AND Questions.correct_option_id IS NOT NULL
+        INNER JOIN Assignments ON Questions.assignment_id = Assignments.assignment_id
+        INNER JOIN Modules ON Assignments.module_id = Modules.module_id
+        WHERE studentresponses.student_id = $1::int
+        ORDER BY Modules.title, Assignments.assignment_id, Questions.question_id
+    """,
+    "get_course_student_results": """
+        SELECT Students.student_id, Students.name AS student_name, Students.email AS student_email,
+               Modules.title AS module_title, Modules.module_id, Assignments.title AS assignment_title,
+               Questions.question_id, Questions.question_text, Questions.question_type,
+               CASE WHEN Questions.question_type = 'multiple_choice' AND studentresponses.response IS NOT NULL
+                    THEN StudentOption.option_text ELSE studentresponses.response END AS student_response,
+               CorrectOption.option_text AS correct_answer_text,
+               CASE WHEN Questions.question_type = 'multiple_choice' AND studentresponses.response IS NOT NULL
+                         AND studentresponses.response::text = Questions.correct_option_id::text
+                    THEN true ELSE false END AS is_correct
+        FROM studentresponses
+        INNER JOIN Students ON studentresponses.student_id = Students.student_id
+        INNER JOIN Questions ON studentresponses.question_id = Questions.question_id
+        LEFT JOIN Options AS StudentOption ON studentresponses.response::text = StudentOption.option_id::text AND Questions.question_type = 'multiple_choice'
+        LEFT JOIN Options AS CorrectOption ON Questions.correct_option_id::text = CorrectOption.option_id::text AND Questions.correct_option_id IS NOT NULL
+        INNER JOIN Assignments ON Questions.assignment_id = Assignments.assignment_id
+        INNER JOIN Modules ON Assignments.module_id = Modules.module_id
+        WHERE Modules.course_id = $1 AND studentresponses.course_id = $1
+        ORDER BY Students.name, Modules.title, Assignments.assignment_id, Questions.question_id
+    """,
+    "get_assignment_response_arrays": """
+        SELECT COALESCE(array_agg(studentresponses.student_id), '{}') AS student_ids,
+               COALESCE(array_agg(studentresponses.question_id), '{}') AS question_ids,
+               COALESCE(array_agg(COALESCE(Options.option_id, 0)), '{}') AS option_ids
+        FROM studentresponses
+        INNER JOIN Questions ON studentresponses.question_id = Questions.question_id
+        LEFT JOIN Options ON Options.question_id = studentresponses.question_id
+                         AND Options.option_id::text = btrim(studentresponses.response)
+        WHERE Questions.assignment_id = $1
+          AND studentresponses.student_id IS NOT NULL
+          AND studentresponses.course_id = (
+              SELECT Modules.course_id FROM Assignments
+              INNER JOIN Modules ON Modules.module_id = Assignments.module_id
+              WHERE Assignments.assignment_id = $1
+          )
+    """,
+}
+
+
+class PlanningConnection(InstrumentedConnection):
+    """Runs EXPLAIN ANALYZE ahead of every fetch and keeps the plans."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.plans: list[dict] = []
+
+    async def _explain(self, query: str, args: tuple) -> None:
+        plan = await super().fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args)
+        self.plans.append(json.loads(plan)[0])
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list:
+        await self._explain(query, args)
+        return await super().fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        await self._explain(query, args)
+        return await super().fetchrow(query, *args, **kwargs)
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def summarize(explained: dict) -> str:
+    nodes = list(_nodes(explained["Plan"]))
+    joins = [n["Node Type"] for n in nodes if n["Node Type"] in ("Hash Join", "Merge Join", "Nested Loop")]
+    seq_scans = sorted({n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Actual Loops", 0) > 0})
+    root = explained["Plan"]
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    return (
+        f"{explained['Execution Time']:10.1f} ms{buffers:10} buffers  "
+        f"joins: {', '.join(joins) or '-'}  seq scans: {', '.join(seq_scans) or '-'}"
+    )
+
+
+async def run(args: argparse.Namespace) -> int:
+    database = PrivateCluster() if args.initdb else ScratchDatabase()
+    async with database as connect_kwargs:
+        conn = await asyncpg.connect(**connect_kwargs, connection_class=PlanningConnection)
+        try:
+            await seed_dataset.create_schema(conn)
+            manifest = await seed_dataset.load_dataset(conn, args, verbose=True)
+            await conn.execute("VACUUM ANALYZE")
+            ctx = await build_context(conn, manifest)
+            calls = {
+                "get_student_assignments_responses": ((ctx.student_id,), responses.get_student_assignments_responses),
+                "get_course_student_results": ((ctx.course_id,), responses.get_course_student_results),
+                "get_assignment_response_arrays": ((ctx.assignment_id,), responses.get_assignment_response_arrays),
+            }
+            print(f"\n{manifest['counts']['studentresponses']} responses")
+            for name, (call_args, fn) in calls.items():
+                conn.plans.clear()
+                # Run each side twice and keep the second, warm-cache plan.
+                for _ in range(2):
+                    await conn.fetch(BEFORE[name], *call_args)
+                    await fn(conn, *call_args)
+                before, after = conn.plans[-2:]
+                print(name)
+                print(f"  before {summarize(before)}")
+                print(f"  after  {summarize(after)}")
+                if args.plans:
+                    args.plans.mkdir(parents=True, exist_ok=True)
+                    for label, plan in (("before", before), ("after", after)):
+                        (args.plans / f"{name}.{label}.json").write_text(json.dumps(plan, indent=2))
+        finally:
+            await conn.close()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seed_dataset.add_dataset_arguments(parser)
+    parser.add_argument("--initdb", action="store_true", help="run a private cluster instead of a scratch database")
+    parser.add_argument("--plans", type=Path, help="also write the full JSON plans to this directory")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Load the live results WebSocket with many dashboards and submitting students.
+
+Picks the seeded course with the most enrolled students and opens
+``--dashboards`` WebSockets to ``/api/v1/courses/{id}/results/live`` as its
+instructor. ``--students`` of its students then answer multiple-choice
+questions through the normal response endpoint, with ``--think-ms`` between
+answers, for ``--duration`` seconds.
+
+For each event a dashboard receives, the delivery latency is the time since
+that student last submitted that question. Coalescing means a dashboard sees
+only the latest submission per (student, question) in each flush, so this is
+the staleness of the number on screen. The report lists latency percentiles,
+messages and events per dashboard, resyncs and closed sockets, next to the
+submit latency of the POSTs.
+
+    python benchmarks/seed_dataset.py --reset --students 5000
+    python benchmarks/live_dashboard_load.py --base-url http://localhost:8000 --dashboards 50 --students 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import websockets
+
+from load_test import DEFAULT_MANIFEST, mint_token
+
+
+@dataclass
+class DashboardStats:
+    messages: int = 0
+    events: int = 0
+    resyncs: int = 0
+    closed: str | None = None
+
+
+@dataclass
+class Run:
+    submitted: dict[tuple[int, int], float] = field(default_factory=dict)
+    submit_latencies: list[float] = field(default_factory=list)
+    submit_errors: int = 0
+    delivery_latencies: list[float] = field(default_factory=list)
+
+
+def percentiles(values: list[float]) -> str:
+    if not values:
+        return "-"
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+    return f"p50 {pick(0.50):.0f} ms  p95 {pick(0.95):.0f} ms  p99 {pick(0.99):.0f} ms  max {ordered[-1] * 1000:.0f} ms"
+
+
+def pick_course(manifest: dict) -> tuple[dict, list[dict], list[tuple[str, int, dict]]]:
+    courses = {c["course_id"]: c for c in manifest["courses"] if any(m["assignments"] for m in c["modules"])}
+    if not courses:
+        raise SystemExit("Manifest has no course with assignments; run seed_dataset.py first")
+    enrolled: dict[int, list[dict]] = {}
+    for student in manifest["students"]:
+        for course_id in student["course_ids"]:
+            if course_id in courses:
+                enrolled.setdefault(course_id, []).append(student)
+    course_id = max(courses, key=lambda c: len(enrolled.get(c, [])))
+    questions = [
+        (module["module_id"], assignment["assignment_id"], question)
+        for module in courses[course_id]["modules"]
+        for assignment in module["assignments"]
+        for question in assignment["questions"]
+        if question["options"]
+    ]
+    return courses[course_id], enrolled.get(course_id, []), questions
+
+
+async def dashboard(url: str, token: str, stats: DashboardStats, run: Run, deadline: float) -> None:
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.send(json.dumps({"type": "auth", "token": token}))
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), remaining)
+                except asyncio.TimeoutError:
+                    return
+                received = time.perf_counter()
+                message = json.loads(raw)
+                if message["type"] == "resync":
+                    stats.resyncs += 1
+                elif message["type"] == "results":
+                    stats.messages += 1
+                    stats.events += len(message["events"])
+                    for event in message["events"]:
+                        sent = run.submitted.get((event["student_id"], event["question_id"]))
+                        if sent is not None:
+                            run.delivery_latencies.append(received - sent)
+    except websockets.ConnectionClosed as e:
+        stats.closed = f"{e.code} {e.reason}".strip()
+    except (OSError, websockets.InvalidHandshake) as e:
+        stats.closed = type(e).__name__
+
+
+async def student(client: httpx.AsyncClient, token: str, student_id: int, questions: list, run: Run,
+                  rng: random.Random, think_ms: float, deadline: float) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        module_id, assignment_id, question = rng.choice(questions)
+        started = time.perf_counter()
+        run.submitted[(student_id, question["question_id"])] = started
+        try:
+            response = await client.post(
+                f"/api/v1/modules/{module_id}/assignments/{assignment_id}/questions/{question['question_id']}/responses",
+                json={"response_text": str(rng.choice(question["options"]))},
+                headers=headers,
+            )
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        if failed:
+            run.submit_errors += 1
+        else:
+            run.submit_latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * think_ms / 1000)
+
+
+async def run_load(args: argparse.Namespace, manifest: dict) -> int:
+    rng = random.Random(args.seed)
+    course, enrolled, questions = pick_course(manifest)
+    course_id = course["course_id"]
+    if not enrolled or not questions:
+        raise SystemExit(f"Course {course_id} has no enrolled students or no multiple-choice questions")
+    submitters = [enrolled[i % len(enrolled)] for i in range(args.students)]
+    if args.students > len(enrolled):
+        print(f"note: course {course_id} has {len(enrolled)} students; some submit as more than one user")
+
+    instructor_token = mint_token(course["instructor_email"], ["teacher"], "staff", course_id)
+    ws_base = args.base_url.replace("https://", "wss://").replace("http://", "ws://")
+    url = f"{ws_base}/api/v1/courses/{course_id}/results/live"
+    print(f"course {course_id}: {args.dashboards} dashboards, {args.students} students, {len(questions)} questions, {args.duration:.0f}s")
+
+    run = Run()
+    dashboards = [DashboardStats() for _ in range(args.dashboards)]
+    started = time.perf_counter()
+    deadline = started + args.duration
+    watchers = [asyncio.create_task(dashboard(url, instructor_token, stats, run, deadline + args.drain)) for stats in dashboards]
+    # Let the sockets subscribe before anyone answers.
+    await asyncio.sleep(1.0)
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        tokens = {s["email"]: mint_token(s["email"], ["student"], "lti", course_id) for s in submitters}
+        await asyncio.gather(*(
+            student(client, tokens[s["email"]], s["student_id"], questions, run, random.Random(rng.random()), args.think_ms, deadline)
+            for s in submitters
+        ))
+    await asyncio.gather(*watchers)
+    elapsed = time.perf_counter() - started
+
+    submits = len(run.submit_latencies) + run.submit_errors
+    messages = sum(d.messages for d in dashboards)
+    events = sum(d.events for d in dashboards)
+    closed = [d.closed for d in dashboards if d.closed]
+    print(f"\nsubmits     {submits} ({submits / args.duration:.0f}/s), {run.submit_errors} errors")
+    print(f"  latency   {percentiles(run.submit_latencies)}")
+    print(f"delivery    {percentiles(run.delivery_latencies)}")
+    print(f"dashboards  {messages / len(dashboards):.1f} messages and {events / len(dashboards):.0f} events each"
+          f" over {elapsed:.0f}s, {sum(d.resyncs for d in dashboards)} resyncs, {len(closed)} closed early")
+    for reason in sorted(set(closed)):
+        print(f"  closed: {reason} x{closed.count(reason)}")
+    return 1 if closed or run.submit_errors else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.getenv("LOAD_TEST_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument("--dashboards", type=int, default=50, help="open live results WebSockets")
+    parser.add_argument("--students", type=int, default=500, help="concurrently answering students")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds students keep answering")
+    parser.add_argument("--drain", type=float, default=3.0, help="seconds dashboards keep listening afterwards")
+    parser.add_argument("--think-ms", type=float, default=2000.0, help="mean pause between a student's answers")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connections shared by the students")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text())
+    return asyncio.run(run_load(args, manifest))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
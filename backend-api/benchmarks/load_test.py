@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Replay scripted student and instructor journeys against a running backend-api.
+
+Reads the manifest written by ``seed_dataset.py``, mints HS256 bearer tokens
+with ``BACKEND_API_JWT_SECRET`` (and ``BACKEND_API_JWT_AUDIENCE`` if set) the
+way the LTI and staff login flows do, and runs ``--users`` concurrent
+virtual users for ``--duration`` seconds. Each user repeatedly picks a
+journey (instructor with probability ``--instructor-ratio``) and walks its
+steps with ``--think-ms`` between requests.
+
+Latency is reported per endpoint (method + route template) as p50/p95/p99
+and saved as JSON. ``--compare`` checks the run against an earlier result
+file and exits non-zero if any endpoint's p95 regressed by more than
+``--max-regression`` percent.
+
+    python benchmarks/seed_dataset.py --reset
+    python benchmarks/load_test.py --base-url http://localhost:8000 --users 50 --duration 60 \\
+        --output benchmarks/results/load-$(git rev-parse --short HEAD).json
+    python benchmarks/load_test.py ... --compare benchmarks/results/load-baseline.json --max-regression 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from jose import jwt
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MANIFEST = BACKEND_DIR / "benchmarks" / "results" / "dataset.json"
+
+
+def mint_token(email: str, roles: list[str], auth_method: str, course_id: int | None, ttl_seconds: int = 3600) -> str:
+    secret = os.getenv("BACKEND_API_JWT_SECRET") or os.getenv("VHVL_SIGNING_KEY")
+    if not secret:
+        raise SystemExit("BACKEND_API_JWT_SECRET must match the server's to mint test tokens")
+    now = int(time.time())
+    claims = {
+        "sub": f"loadtest:{email}",
+        "email": email,
+        "roles": roles,
+        "auth_method": auth_method,
+        "iat": now,
+        "exp": now + ttl_seconds,
+    }
+    if course_id is not None:
+        claims["course_id"] = str(course_id)
+    audience = os.getenv("BACKEND_API_JWT_AUDIENCE")
+    if audience:
+        claims["aud"] = audience
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+@dataclass
+class Step:
+    name: str  # method + route template, the key results are grouped by
+    method: str
+    path: str
+    body: dict | None = None
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pick(q: float) -> float | None:
+            if not ordered:
+                return None
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+
+        return {
+            "requests": len(ordered) + self.errors,
+            "errors": self.errors,
+            "rps": (len(ordered) + self.errors) / elapsed if elapsed else 0.0,
+            "p50_ms": pick(0.50),
+            "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99),
+            "max_ms": ordered[-1] * 1000 if ordered else None,
+            "statuses": self.statuses,
+        }
+
+
+class Journeys:
+    def __init__(self, manifest: dict, rng: random.Random, responses_per_visit: int):
+        self.manifest = manifest
+        self.rng = rng
+        self.responses_per_visit = responses_per_visit
+        self.courses = {course["course_id"]: course for course in manifest["courses"] if course["modules"]}
+        self.students = [s for s in manifest["students"] if any(c in self.courses for c in s["course_ids"])]
+        self._tokens: dict[str, str] = {}
+
+    def _token(self, email: str, roles: list[str], auth_method: str, course_id: int) -> str:
+        if email not in self._tokens:
+            self._tokens[email] = mint_token(email, roles, auth_method, course_id)
+        return self._tokens[email]
+
+    def student(self) -> tuple[str, list[Step]]:
+        student = self.rng.choice(self.students)
+        course_id = self.rng.choice([c for c in student["course_ids"] if c in self.courses])
+        module = self.rng.choice(self.courses[course_id]["modules"])
+        module_id = module["module_id"]
+        steps = [
+            Step("GET /students/{email}/courses", "GET", f"/api/v1/students/{student['email']}/courses"),
+            Step("GET /courses/{course_id}/modules", "GET", f"/api/v1/courses/{course_id}/modules"),
+            Step("GET /modules/{module_id}", "GET", f"/api/v1/modules/{module_id}"),
+            Step("GET /modules/{module_id}/experiment-config", "GET", f"/api/v1/modules/{module_id}/experiment-config"),
+            Step("GET /modules/{module_id}/assignments", "GET", f"/api/v1/modules/{module_id}/assignments"),
+            Step(
+                "POST /modules/{module_id}/experiment-runs",
+                "POST",
+                f"/api/v1/modules/{module_id}/experiment-runs",
+                {"parameters": {"voltage_kv": round(self.rng.uniform(1, 400), 1), "length_km": round(self.rng.uniform(1, 500), 1)}},
+            ),
+        ]
+        if module["assignments"]:
+            assignment = self.rng.choice(module["assignments"])
+            questions = assignment["questions"]
+            for question in self.rng.sample(questions, min(self.responses_per_visit, len(questions))):
+                steps.append(Step(
+                    "POST /modules/{module_id}/assignments/{assignment_id}/questions/{question_id}/responses",
+                    "POST",
+                    f"/api/v1/modules/{module_id}/assignments/{assignment['assignment_id']}/questions/{question['question_id']}/responses",
+                    {"response_text": str(self.rng.choice(question["options"]))},
+                ))
+        steps.append(Step(
+            "GET /students/{student_id}/assignments/responses",
+            "GET",
+            f"/api/v1/students/{student['student_id']}/assignments/responses",
+        ))
+        return self._token(student["email"], ["student"], "lti", course_id), steps
+
+    def instructor(self) -> tuple[str, list[Step]]:
+        course = self.courses[self.rng.choice(list(self.courses))]
+        course_id = course["course_id"]
+        module = self.rng.choice(course["modules"])
+        steps = [
+            Step("GET /courses", "GET", "/api/v1/courses"),
+            Step("GET /courses/{course_id}/students", "GET", f"/api/v1/courses/{course_id}/students"),
+            Step("GET /courses/{course_id}/modules", "GET", f"/api/v1/courses/{course_id}/modules"),
+            Step("GET /courses/{course_id}/student-results", "GET", f"/api/v1/courses/{course_id}/student-results"),
+            Step("GET /modules/{module_id}/experiment-runs", "GET", f"/api/v1/modules/{module['module_id']}/experiment-runs"),
+        ]
+        if module["assignments"]:
+            assignment = self.rng.choice(module["assignments"])
+            steps.append(Step(
+                "GET /assignments/{assignment_id}/item-analysis",
+                "GET",
+                f"/api/v1/assignments/{assignment['assignment_id']}/item-analysis",
+            ))
+        return self._token(course["instructor_email"], ["teacher"], "staff", course_id), steps
+
+
+async def run_load(args: argparse.Namespace, manifest: dict) -> tuple[dict[str, EndpointStats], float, dict[str, int]]:
+    rng = random.Random(args.seed)
+    journeys = Journeys(manifest, rng, args.responses_per_visit)
+    if not journeys.courses or not journeys.students:
+        raise SystemExit("Manifest has no courses with modules or no enrolled students; run seed_dataset.py first")
+
+    stats: dict[str, EndpointStats] = {}
+    journey_counts = {"student": 0, "instructor": 0}
+    measuring = False
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        async def user(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                kind = "instructor" if rng.random() < args.instructor_ratio else "student"
+                token, steps = journeys.instructor() if kind == "instructor" else journeys.student()
+                headers = {"Authorization": f"Bearer {token}"}
+                if measuring:
+                    journey_counts[kind] += 1
+                for step in steps:
+                    if time.perf_counter() >= deadline:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(step.method, step.path, json=step.body, headers=headers)
+                        status = str(response.status_code)
+                        failed = response.status_code >= 400
+                    except httpx.HTTPError as e:
+                        status, failed = type(e).__name__, True
+                    elapsed = time.perf_counter() - started
+                    if measuring:
+                        endpoint = stats.setdefault(step.name, EndpointStats())
+                        endpoint.statuses[status] = endpoint.statuses.get(status, 0) + 1
+                        if failed:
+                            endpoint.errors += 1
+                        else:
+                            endpoint.latencies.append(elapsed)
+                    if args.think_ms:
+                        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+
+        if args.warmup:
+            await asyncio.gather(*(user(time.perf_counter() + args.warmup) for _ in range(args.users)))
+        measuring = True
+        started = time.perf_counter()
+        await asyncio.gather(*(user(started + args.duration) for _ in range(args.users)))
+        elapsed = time.perf_counter() - started
+    return stats, elapsed, journey_counts
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(endpoints: dict[str, dict]) -> None:
+    print(f"\n{'endpoint':<90}{'reqs':>7}{'err':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+    for name, r in sorted(endpoints.items()):
+        print(f"{name:<90}{r['requests']:>7}{r['errors']:>6}{fmt(r['p50_ms'])}{fmt(r['p95_ms'])}{fmt(r['p99_ms'])}")
+
+
+def compare(current: dict, baseline: dict, metric: str, max_regression: float) -> list[str]:
+    """Return one line per endpoint whose ``metric`` regressed more than ``max_regression`` percent."""
+    failures = []
+    print(f"\nCompared with {baseline.get('git_revision') or 'baseline'} on {metric} (limit +{max_regression:.0f}%):")
+    for name, result in sorted(current["endpoints"].items()):
+        before = baseline.get("endpoints", {}).get(name, {}).get(metric)
+        after = result.get(metric)
+        if before is None or after is None or before <= 0:
+            continue
+        change = (after - before) / before * 100
+        marker = "REGRESSED" if change > max_regression else ""
+        print(f"  {name:<88}{before:9.1f} -> {after:9.1f} ms  {change:+6.1f}%  {marker}")
+        if change > max_regression:
+            failures.append(f"{name}: {metric} {before:.1f} -> {after:.1f} ms ({change:+.1f}%)")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.getenv("LOAD_TEST_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before the run")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="mean pause between steps of a journey")
+    parser.add_argument("--instructor-ratio", type=float, default=0.05)
+    parser.add_argument("--responses-per-visit", type=int, default=3, help="answers a student submits per module visit")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to check for regressions")
+    parser.add_argument("--compare-metric", default="p95_ms", choices=("p50_ms", "p95_ms", "p99_ms"))
+    parser.add_argument("--max-regression", type=float, default=20.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    manifest = json.loads(args.manifest.read_text())
+    print(f"{args.users} users for {args.duration:.0f}s against {args.base_url} (dataset seed {manifest.get('seed')})", flush=True)
+    stats, elapsed, journey_counts = asyncio.run(run_load(args, manifest))
+
+    endpoints = {name: endpoint.summary(elapsed) for name, endpoint in stats.items()}
+    total = sum(r["requests"] for r in endpoints.values())
+    errors = sum(r["errors"] for r in endpoints.values())
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "base_url": args.base_url,
+        "dataset": {"seed": manifest.get("seed"), "sizes": manifest.get("sizes")},
+        "config": {k: v for k, v in vars(args).items() if k not in {"output", "compare", "manifest"}},
+        "elapsed_seconds": elapsed,
+        "journeys": journey_counts,
+        "total": {"requests": total, "errors": errors, "rps": total / elapsed if elapsed else 0.0},
+        "endpoints": endpoints,
+    }
+
+    print_table(endpoints)
+    print(f"\n{total} requests, {errors} errors, {result['total']['rps']:.1f} req/s, journeys {journey_counts}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"results written to {args.output}")
+
+    if args.compare:
+        failures = compare(result, json.loads(args.compare.read_text()), args.compare_metric, args.max_regression)
+        if failures:
+            print("FAIL: " + "; ".join(failures))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Generate a reproducible synthetic dataset for load tests.
+
+Writes instructors, courses, enrollments, modules, assignments, questions,
+options and student responses shaped like ``sql/CreateInitialTables.sql``
+into a local Postgres with ``COPY``. The same ``--seed`` and sizes always
+produce the same rows, so results from different runs are comparable.
+
+    python benchmarks/seed_dataset.py --reset
+    python benchmarks/seed_dataset.py --reset --create-schema --students 500 --responses 50000
+
+Connection settings are the app's own (``DATABASE_URL`` or ``DB_HOST`` /
+``DB_NAME`` / ... with ``ENVIRONMENT=local``). ``--reset`` truncates every
+table it writes, so the script refuses to run against a non-local host
+unless ``--allow-remote`` is given.
+
+A manifest with the generated ids and accounts is written next to the
+results (``--manifest``) for ``load_test.py`` to replay journeys against.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlparse
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("ENVIRONMENT", "local")
+
+import asyncpg  # noqa: E402
+
+from app.db.connection import CONNECTION_KWARGS  # noqa: E402
+
+DEFAULT_MANIFEST = BACKEND_DIR / "benchmarks" / "results" / "dataset.json"
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "postgres"}
+
+# CASCADE on TRUNCATE also clears tables that reference these (experiment_runs, ...).
+SEEDED_TABLES = (
+    "studentresponses",
+    "options",
+    "questions",
+    "assignments",
+    "modules",
+    "enrollments",
+    "courses",
+    "instructors",
+    "students",
+)
+
+TOPICS = (
+    "Ferranti Effect",
+    "Corona Discharge",
+    "Partial Discharge",
+    "Impulse Voltage Generation",
+    "Insulation Coordination",
+    "Transformer Testing",
+    "Lightning Protection",
+    "Dielectric Breakdown",
+    "Cable Sheath Bonding",
+    "Surge Arresters",
+)
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class Dataset:
+    """Deterministic row generators; ids are assigned here, not by the sequences."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.course_ids = list(range(1, args.courses + 1))
+        self.module_ids: dict[int, list[uuid.UUID]] = {}
+        self.assignment_ids: dict[uuid.UUID, list[int]] = {}
+        self.question_ids: dict[int, list[int]] = {}  # per course
+        self.correct_option: dict[int, int] = {}
+        self.question_options: dict[int, list[int]] = {}
+        self.questions_by_assignment: dict[int, list[int]] = {}
+        self.difficulty: dict[int, float] = {}
+        self.student_courses: dict[int, list[int]] = {}
+
+    def instructors(self) -> list[tuple]:
+        return [
+            (i, f"Bench Instructor {i}", f"instructor{i}@bench.example.edu", "Bench University", "Singapore", None, None, None, None)
+            for i in self.course_ids
+        ]
+
+    def courses(self) -> list[tuple]:
+        start = date(2026, 1, 5)
+        return [
+            (c, f"High Voltage Engineering {c}", f"Synthetic course {c}", None, "open",
+             start, start + timedelta(days=30), start, start + timedelta(days=120), None, None, c)
+            for c in self.course_ids
+        ]
+
+    def students(self) -> list[tuple]:
+        return [
+            (s, f"Bench Student {s:05d}", f"student{s}@bench.example.edu", None, None, "Singapore", 0, None)
+            for s in range(1, self.args.students + 1)
+        ]
+
+    def enrollments(self) -> list[tuple]:
+        rows = []
+        enrolled_on = date(2026, 1, 5)
+        for s in range(1, self.args.students + 1):
+            courses = [self.course_ids[(s - 1) % len(self.course_ids)]]
+            if len(self.course_ids) > 1 and self.rng.random() < self.args.second_course_ratio:
+                courses.append(self.rng.choice([c for c in self.course_ids if c != courses[0]]))
+            self.student_courses[s] = courses
+            for c in courses:
+                rows.append((len(rows) + 1, s, c, enrolled_on, None))
+        return rows
+
+    def modules(self) -> list[tuple]:
+        rows = []
+        for m in range(self.args.modules):
+            course_id = self.course_ids[m % len(self.course_ids)]
+            module_id = _uuid(self.rng)
+            self.module_ids.setdefault(course_id, []).append(module_id)
+            topic = TOPICS[m % len(TOPICS)]
+            rows.append((
+                module_id, course_id, f"{topic} ({m + 1})", f"Synthetic module on {topic.lower()}.",
+                None, f"{topic} explained for load testing. " * 8, None,
+                None, None, None, None, None, None, None, None, None,
+            ))
+        return rows
+
+    def assignments(self) -> list[tuple]:
+        rows = []
+        due = date(2026, 4, 30)
+        for module_ids in self.module_ids.values():
+            for module_id in module_ids:
+                for _ in range(self.args.assignments_per_module):
+                    assignment_id = len(rows) + 1
+                    self.assignment_ids.setdefault(module_id, []).append(assignment_id)
+                    rows.append((assignment_id, module_id, f"Quiz {assignment_id}", None, due))
+        return rows
+
+    def questions_and_options(self) -> tuple[list[tuple], list[tuple]]:
+        questions, options = [], []
+        per_question = self.args.options_per_question
+        for course_id, module_ids in self.module_ids.items():
+            for module_id in module_ids:
+                for assignment_id in self.assignment_ids[module_id]:
+                    for _ in range(self.args.questions_per_assignment):
+                        question_id = len(questions) + 1
+                        first_option = len(options) + 1
+                        correct = first_option + self.rng.randrange(per_question)
+                        self.correct_option[question_id] = correct
+                        self.difficulty[question_id] = self.rng.uniform(0.3, 0.9)
+                        self.question_ids.setdefault(course_id, []).append(question_id)
+                        self.questions_by_assignment.setdefault(assignment_id, []).append(question_id)
+                        self.question_options[question_id] = list(range(first_option, first_option + per_question))
+                        questions.append((question_id, assignment_id, f"Synthetic question {question_id}?", "multiple_choice", correct))
+                        for k in range(per_question):
+                            options.append((first_option + k, question_id, f"Option {chr(65 + k)}"))
+        return questions, options
+
+    def responses(self) -> Iterator[tuple]:
+        """Responses from enrolled students; correctness follows ability and item difficulty.
+
+        At most one per (student, question), as the unique index on studentresponses requires.
+        """
+        students = list(self.student_courses)
+        ability = {s: self.rng.gauss(0, 0.15) for s in students}
+        answered: set[tuple[int, int]] = set()
+        for response_id in range(1, self.args.responses + 1):
+            student_id = self.rng.choice(students)
+            course_id = self.rng.choice(self.student_courses[student_id])
+            question_ids = self.question_ids.get(course_id)
+            if not question_ids:
+                continue
+            question_id = self.rng.choice(question_ids)
+            if (student_id, question_id) in answered:
+                continue
+            answered.add((student_id, question_id))
+            correct = self.correct_option[question_id]
+            if self.rng.random() < self.difficulty[question_id] + ability[student_id]:
+                answer = correct
+            else:
+                answer = self.rng.choice(self.question_options[question_id])
+            yield (response_id, course_id, question_id, student_id, str(answer), 1.0 if answer == correct else 0.0, answer == correct)
+
+    def manifest(self) -> dict:
+        return {
+            "seed": self.args.seed,
+            "sizes": {
+                "courses": self.args.courses,
+                "modules": self.args.modules,
+                "students": self.args.students,
+                "responses": self.args.responses,
+            },
+            "courses": [
+                {
+                    "course_id": course_id,
+                    "instructor_email": f"instructor{course_id}@bench.example.edu",
+                    "modules": [
+                        {
+                            "module_id": str(module_id),
+                            "assignments": [
+                                {
+                                    "assignment_id": assignment_id,
+                                    "questions": [
+                                        {"question_id": q, "options": self.question_options[q]}
+                                        for q in self.questions_by_assignment.get(assignment_id, [])
+                                    ],
+                                }
+                                for assignment_id in self.assignment_ids[module_id]
+                            ],
+                        }
+                        for module_id in self.module_ids.get(course_id, [])
+                    ],
+                }
+                for course_id in self.course_ids
+            ],
+            "students": [
+                {"student_id": s, "email": f"student{s}@bench.example.edu", "course_ids": courses}
+                for s, courses in self.student_courses.items()
+            ],
+        }
+
+
+async def copy_rows(conn: asyncpg.Connection, table: str, columns: tuple[str, ...], rows, batch_size: int = 50_000) -> int:
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await conn.copy_records_to_table(table, records=batch, columns=columns)
+            total += len(batch)
+            batch = []
+    if batch:
+        await conn.copy_records_to_table(table, records=batch, columns=columns)
+        total += len(batch)
+    return total
+
+
+async def create_schema(conn: asyncpg.Connection) -> None:
+    await conn.execute((BACKEND_DIR / "sql" / "CreateInitialTables.sql").read_text())
+
+
+async def load_dataset(conn: asyncpg.Connection, args: argparse.Namespace, verbose: bool = True) -> dict:
+    """COPY the dataset described by ``args`` into empty tables; returns the manifest."""
+    data = Dataset(args)
+    steps = [
+        ("instructors", ("instructor_id", "name", "email", "organization", "city", "profile_picture", "linkedin", "website", "biography"), data.instructors),
+        ("courses", ("course_id", "title", "description", "course_image", "enrollment_status", "enrollment_begin_date",
+                     "enrollment_end_date", "session_start_date", "session_end_date", "course_webpage", "syllabus_pdf_link", "instructor_id"), data.courses),
+        ("students", ("student_id", "name", "email", "date_of_birth", "profile_picture", "location", "number_of_logins", "last_login"), data.students),
+        ("enrollments", ("enrollment_id", "student_id", "course_id", "enrollment_date", "expiration_date"), data.enrollments),
+        ("modules", ("module_id", "course_id", "title", "description", "theory", "concept", "fun_fact", "interactive_file",
+                     "attachment_1_link", "attachment_2_link", "attachment_3_link", "video_link_1", "video_link_2",
+                     "plottingexperimentconfig", "interactiveconfig", "experiment_config"), data.modules),
+        ("assignments", ("assignment_id", "module_id", "title", "description", "due_date"), data.assignments),
+    ]
+    counts = {}
+    async with conn.transaction():
+        for table, columns, rows in steps:
+            started = time.perf_counter()
+            counts[table] = await copy_rows(conn, table, columns, rows())
+            if verbose:
+                print(f"{table:<18}{counts[table]:>10} rows  {time.perf_counter() - started:6.1f}s", flush=True)
+
+        questions, options = data.questions_and_options()
+        # questions.correct_option_id points at options, which point back at questions;
+        # neither side has a FK on correct_option_id, so plain COPY order works.
+        for table, columns, rows in (
+            ("questions", ("question_id", "assignment_id", "question_text", "question_type", "correct_option_id"), questions),
+            ("options", ("option_id", "question_id", "option_text"), options),
+            ("studentresponses", ("response_id", "course_id", "question_id", "student_id", "response", "score", "is_correct"), data.responses()),
+        ):
+            started = time.perf_counter()
+            counts[table] = await copy_rows(conn, table, columns, rows)
+            if verbose:
+                print(f"{table:<18}{counts[table]:>10} rows  {time.perf_counter() - started:6.1f}s", flush=True)
+
+        # Ids were assigned explicitly; move the sequences past them.
+        for table, column in (
+            ("instructors", "instructor_id"),
+            ("courses", "course_id"),
+            ("students", "student_id"),
+            ("enrollments", "enrollment_id"),
+            ("assignments", "assignment_id"),
+            ("questions", "question_id"),
+            ("options", "option_id"),
+            ("studentresponses", "response_id"),
+        ):
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), COALESCE(MAX({column}), 1)) FROM {table}"
+            )
+        # The totals the API keeps incrementally as responses are graded.
+        await conn.execute(
+            """
+            INSERT INTO assignment_scores (assignment_id, course_id, student_id, score, graded_responses)
+            SELECT q.assignment_id, r.course_id, r.student_id, sum(r.score), count(r.score)
+            FROM studentresponses r
+            JOIN questions q ON q.question_id = r.question_id
+            GROUP BY q.assignment_id, r.course_id, r.student_id
+            """
+        )
+    await conn.execute("ANALYZE")
+    manifest = data.manifest()
+    manifest["counts"] = counts
+    return manifest
+
+
+async def seed(args: argparse.Namespace) -> dict:
+    conn = await asyncpg.connect(**CONNECTION_KWARGS)
+    try:
+        if args.create_schema:
+            await create_schema(conn)
+        if args.reset:
+            await conn.execute(f"TRUNCATE {', '.join(SEEDED_TABLES)} RESTART IDENTITY CASCADE")
+        elif await conn.fetchval("SELECT EXISTS (SELECT 1 FROM students)"):
+            raise SystemExit("Tables already contain data; rerun with --reset to replace them")
+        return await load_dataset(conn, args)
+    finally:
+        await conn.close()
+
+
+def database_host() -> str | None:
+    if "dsn" in CONNECTION_KWARGS:
+        return urlparse(CONNECTION_KWARGS["dsn"]).hostname
+    return CONNECTION_KWARGS.get("host")
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    """Dataset size options, shared with the CRUD microbenchmarks."""
+    parser.add_argument("--seed", type=int, default=20261019)
+    parser.add_argument("--courses", type=int, default=5)
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--responses", type=int, default=1_000_000)
+    parser.add_argument("--assignments-per-module", type=int, default=2)
+    parser.add_argument("--questions-per-assignment", type=int, default=10)
+    parser.add_argument("--options-per-question", type=int, default=4)
+    parser.add_argument("--second-course-ratio", type=float, default=0.2, help="share of students enrolled in a second course")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_dataset_arguments(parser)
+    parser.add_argument("--reset", action="store_true", help="truncate the seeded tables first")
+    parser.add_argument("--create-schema", action="store_true", help="run sql/CreateInitialTables.sql first (empty database)")
+    parser.add_argument("--allow-remote", action="store_true", help="allow a database host other than localhost")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    args = parser.parse_args()
+
+    host = database_host()
+    if host not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(f"refusing to seed database host {host!r}; pass --allow-remote if this is intended")
+
+    started = time.perf_counter()
+    manifest = asyncio.run(seed(args))
+    args.manifest.parent.mkdir(parents=True, exist_ok=True)
+    args.manifest.write_text(json.dumps(manifest, indent=1))
+    print(f"seeded in {time.perf_counter() - started:.1f}s; manifest written to {args.manifest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Profile response serialization on ``GET /courses/{id}/student-results``.
+
+The endpoint is driven in-process through ``TestClient`` against a fake
+connection that returns a synthetic result set (``--students`` x
+``--questions`` rows shaped like the real query), so only grouping and
+serialization are measured. Two variants are compared:
+
+* ``response_model``: the previous definition, ``response_model=List[Dict[str, Any]]``
+  returning the list (Pydantic validation + ``jsonable_encoder`` + stdlib json);
+* ``orjson``: the current endpoint, returning ``FastJSONResponse``.
+
+    python benchmarks/serialization_benchmark.py --students 300 --questions 40
+    python benchmarks/serialization_benchmark.py --profile   # cProfile of each variant
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import os
+import pstats
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("ENVIRONMENT", "local")
+os.environ.setdefault("BACKEND_API_JWT_SECRET", "serialization-benchmark")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api.v1.endpoints import responses  # noqa: E402
+from app.core.auth import AuthenticatedActor, require_staff_actor  # noqa: E402
+from app.crud.responses import get_course_student_results  # noqa: E402
+from app.db.connection import get_db_connection  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self, rows: list[dict[str, Any]]):
+        self.rows = rows
+
+    async def fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        return self.rows
+
+
+def synthetic_rows(students: int, questions: int, modules: int = 5) -> list[dict[str, Any]]:
+    module_ids = [uuid.uuid4() for _ in range(modules)]
+    rows = []
+    for s in range(students):
+        for q in range(questions):
+            m = q % modules
+            correct = (s + q) % 3 != 0
+            rows.append({
+                "student_id": s + 1,
+                "student_name": f"Student {s + 1:04d}",
+                "student_email": f"student{s + 1}@example.edu",
+                "module_title": f"Module {m + 1}: High voltage engineering",
+                "module_id": module_ids[m],
+                "assignment_title": f"Quiz {m + 1}",
+                "question_id": q + 1,
+                "question_text": f"Question {q + 1}: what is the expected peak voltage for this configuration?",
+                "question_type": "multiple_choice",
+                "student_response": "Option A" if correct else "Option C",
+                "correct_answer_text": "Option A",
+                "is_correct": correct,
+            })
+    return rows
+
+
+def build_app(rows: list[dict[str, Any]]) -> FastAPI:
+    app = FastAPI()
+    app.include_router(responses.router, prefix="/api/v1")
+
+    # The endpoint as it was before FastJSONResponse, for comparison.
+    @app.get("/legacy/courses/{course_id}/student-results", response_model=List[Dict[str, Any]])
+    async def legacy_results(course_id: int, conn=Depends(get_db_connection)):
+        return await get_course_student_results(conn, course_id)
+
+    async def fake_connection():
+        yield FakeConnection(rows)
+
+    app.dependency_overrides[get_db_connection] = fake_connection
+    app.dependency_overrides[require_staff_actor] = lambda: AuthenticatedActor(subject="bench", email=None, roles={"admin"})
+    return app
+
+
+def measure(client: TestClient, url: str, iterations: int) -> dict[str, float]:
+    client.get(url).raise_for_status()  # warm-up
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+        size = len(response.content)
+    return {"median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000, "bytes": size}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--profile", action="store_true", help="print the top cProfile entries per variant")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.students, args.questions)
+    client = TestClient(build_app(rows))
+    variants = {
+        "response_model": "/legacy/courses/1/student-results",
+        "orjson": "/api/v1/courses/1/student-results",
+    }
+
+    print(f"{len(rows)} result rows ({args.students} students x {args.questions} questions)")
+    results = {}
+    for name, url in variants.items():
+        results[name] = measure(client, url, args.iterations)
+        r = results[name]
+        print(f"{name:<15} median {r['median_ms']:8.1f} ms   min {r['min_ms']:8.1f} ms   {r['bytes'] / 1024:8.0f} KiB")
+    speedup = results["response_model"]["median_ms"] / results["orjson"]["median_ms"]
+    print(f"speedup        {speedup:8.2f}x")
+
+    if args.profile:
+        for name, url in variants.items():
+            profiler = cProfile.Profile()
+            profiler.enable()
+            client.get(url)
+            profiler.disable()
+            print(f"\n--- {name} ---")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Time bill calculation over ``tariffs_all_india.csv`` for many consumption profiles.
+
+Random profiles are drawn as a tariff, a monthly energy in kWh and a
+connected load in kW. Three ways of pricing them are compared:
+
+* ``per_profile``: a Python loop that looks up each profile's tariff record
+  and computes its bill;
+* ``vectorized``: one ``TariffTable.bills`` call for all profiles;
+* ``endpoint``: ``POST /api/v1/tariffs/bills`` in-process through
+  ``TestClient``. This adds request parsing and JSON serialization.
+
+The two in-process variants are checked to give the same totals.
+
+    python benchmarks/tariff_bills_benchmark.py --profiles 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("ENVIRONMENT", "local")
+os.environ.setdefault("BACKEND_API_JWT_SECRET", "tariff-benchmark")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api.v1.endpoints import tariffs  # noqa: E402
+from app.core.auth import AuthenticatedActor, require_authenticated_user  # noqa: E402
+from app.services.tariffs import DEFAULT_POWER_FACTOR, TARIFF_CSV_PATH, load_tariff_table  # noqa: E402
+
+
+def per_profile(records: list[dict], ids, energy, load) -> list[float]:
+    totals = []
+    for tariff_id, kwh, kw in zip(ids.tolist(), energy.tolist(), load.tolist()):
+        tariff = records[tariff_id]
+        fixed = (
+            tariff["fixed_per_kw_month"] * kw
+            + tariff["fixed_per_kva_month"] * kw / DEFAULT_POWER_FACTOR
+            + tariff["fixed_per_connection_month"]
+        )
+        totals.append(tariff["rate_per_kwh"] * kwh + fixed)
+    return totals
+
+
+def timed(fn: Callable[[], object], iterations: int) -> float:
+    fn()  # warm-up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, default=TARIFF_CSV_PATH)
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = load_tariff_table(args.csv)
+    if table is None:
+        print(f"{args.csv} not found", file=sys.stderr)
+        return 1
+    print(f"{len(table)} tariffs parsed in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(args.seed)
+    ids = rng.integers(0, len(table), args.profiles)
+    energy = rng.uniform(0, 2000, args.profiles)
+    load = rng.uniform(1, 50, args.profiles)
+    records = table.records(np.arange(len(table)))
+
+    expected = np.array(per_profile(records, ids, energy, load))
+    actual = table.bills(ids, energy, load)["total"]
+    if not np.allclose(expected, actual):
+        print("vectorized totals differ from the per-profile loop", file=sys.stderr)
+        return 1
+
+    app = FastAPI()
+    app.include_router(tariffs.router, prefix="/api/v1")
+    app.dependency_overrides[require_authenticated_user] = lambda: AuthenticatedActor(subject="bench", email=None, roles={"student"})
+    client = TestClient(app)
+    body = {"tariff_ids": ids.tolist(), "energy_kwh": energy.tolist(), "load_kw": load.tolist()}
+
+    variants = {
+        "per_profile": lambda: per_profile(records, ids, energy, load),
+        "vectorized": lambda: table.bills(ids, energy, load),
+        "endpoint": lambda: client.post("/api/v1/tariffs/bills", json=body).raise_for_status(),
+    }
+    print(f"{args.profiles} profiles")
+    for name, fn in variants.items():
+        median_ms = timed(fn, args.iterations)
+        print(f"{name:<12} median {median_ms:9.2f} ms   {args.profiles / median_ms * 1000:12.0f} profiles/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,51 @@
 # Gunicorn configuration file
+#
+# Every setting can be overridden from the environment, so the same file serves
+# the tuned default profile and the comparisons in benchmarks/compare_serving_profiles.py.
+import gc
 import multiprocessing
+import os
 
-max_requests = 1000
-max_requests_jitter = 50
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "50"))
 
 log_file = "-"
 
-bind = "0.0.0.0:3100"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:3100")
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "app.core.uvicorn_worker.UvloopHttptoolsWorker")
+# One event loop per core is enough for I/O-bound async handlers; the old
+# 2*cpu+1 rule is for blocking sync workers.
+workers = int(os.getenv("WEB_CONCURRENCY") or os.getenv("GUNICORN_WORKERS") or multiprocessing.cpu_count())
+# Lets app/db/connection.py split DB_CONNECTION_BUDGET across the workers.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Import the app once in the master and fork workers from it. Only module-level
+# state is shared: DB pools, HTTP clients and caches are created lazily inside
+# each worker.
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+if preload_app:
+    # Without collections in the master, the preloaded objects are never
+    # touched again and stay shared copy-on-write with the workers.
+    gc.disable()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move everything imported so far into the permanent generation so the
+        # workers' collector never writes to (and un-shares) those pages.
+        gc.freeze()
+
 
-worker_class = "uvicorn.workers.UvicornWorker"
-workers = (multiprocessing.cpu_count() * 2) + 1
\ No newline at end of file
+def post_fork(server, worker):
+    gc.enable()
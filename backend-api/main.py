@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Form, Request, status, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -29,19 +29,61 @@ from app.api.v1.endpoints import (
     auth_routes,
     questions,
     responses,
+    simulations,
+    experiment_runs,
+    diagnostics,
+    jobs,
+    tariffs,
 )
 from app.api.v1.endpoints.lti_routes import router as lti_router
 from app.api.v1.endpoints.session_routes import session as session_router
+from app.services.run_logger import experiment_run_logger
+from app.services.live_results import results_hub
+from app.services.jobs import job_worker
+from app.services.tariffs import load_tariff_table
+from app.core.profiling import loop_watchdog
+from app.db.replica import STICKY_HEADER, ReadAfterWriteMiddleware, read_replica
+from app.core.metrics import (
+    ENABLE_METRICS,
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsMiddleware,
+    loop_lag_monitor,
+    render_metrics,
+)
 
 import uvicorn
 import os
+from contextlib import asynccontextmanager
 
 ENABLE_API_DOCS = os.getenv("ENABLE_API_DOCS", "false").lower() == "true"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    experiment_run_logger.start()
+    loop_lag_monitor.start()
+    loop_watchdog.start()
+    read_replica.start()
+    job_worker.start()
+    load_tariff_table()
+    try:
+        yield
+    finally:
+        # Jobs still running go back to the queue for the next worker.
+        await job_worker.stop()
+        await results_hub.stop()
+        await read_replica.stop()
+        loop_watchdog.stop()
+        await loop_lag_monitor.stop()
+        # Flush buffered experiment runs before the worker exits.
+        await experiment_run_logger.stop()
+
+
 app = FastAPI(
     docs_url="/docs" if ENABLE_API_DOCS else None,
     redoc_url="/redoc" if ENABLE_API_DOCS else None,
     openapi_url="/openapi.json" if ENABLE_API_DOCS else None,
+    lifespan=lifespan,
 )
 
 # Ensure external scheme/host are derived from X-Forwarded-* headers (Cloud Run, proxies)
@@ -69,8 +111,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Simulation-Points",
+        "X-Simulation-Original-Points",
+        "X-Simulation-Layout",
+        "X-Simulation-Metrics",
+        "Server-Timing",
+        STICKY_HEADER,
+    ],
 )
 
+if read_replica.enabled:
+    app.add_middleware(ReadAfterWriteMiddleware)
+
+# Added last so it wraps everything else and times the whole request.
+app.add_middleware(MetricsMiddleware)
+
 
 
 # Static files and templates
@@ -89,6 +145,11 @@ app.include_router(auth_routes.router, prefix="/api/v1", tags=["Auth"])
 
 app.include_router(questions.router, prefix="/api/v1", tags=["Questions"])
 app.include_router(responses.router, prefix="/api/v1", tags=["Responses"])
+app.include_router(simulations.router, prefix="/api/v1", tags=["Simulations"])
+app.include_router(experiment_runs.router, prefix="/api/v1", tags=["Experiment Runs"])
+app.include_router(diagnostics.router, prefix="/api/v1", tags=["Diagnostics"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
+app.include_router(tariffs.router, prefix="/api/v1", tags=["Tariffs"])
 app.include_router(lti_router)
 app.include_router(session_router)
 
@@ -97,6 +158,13 @@ app.include_router(session_router)
 async def health():
     return {"status": "200 ok"}
 
+
+if ENABLE_METRICS:
+    # Prometheus scrape target; keep it off the public ingress.
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 # Index and other routes
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
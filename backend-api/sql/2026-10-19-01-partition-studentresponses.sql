@@ -0,0 +1,271 @@
+-- Partition studentresponses by course.
+-- Date: 2026-10-19
+--
+-- Results, item analysis and archiving all read one course at a time. With a
+-- course_id on every response and one LIST partition per course, those
+-- queries scan a single partition instead of every semester's responses.
+--
+-- The table is rebuilt: the existing one is renamed to
+-- studentresponses_unpartitioned, a partitioned studentresponses is created
+-- with one partition per existing course, and the rows are copied across with
+-- course_id backfilled through question -> assignment -> module -> course.
+-- Responses that do not resolve to a course land in studentresponses_default.
+-- New courses get their partition from a trigger on courses.
+--
+-- Writers must supply course_id: a row is routed to its partition before any
+-- trigger runs, so it cannot be filled in afterwards. The API passes it, and
+-- submit_student_response() is replaced below to do the same.
+--
+-- Run after 2026-06-09-rbac-security-hardening.sql. Run once, in a
+-- maintenance window: the copy holds an exclusive lock on the table.
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'studentresponses'::regclass) THEN
+        RAISE EXCEPTION 'studentresponses is already partitioned';
+    END IF;
+END $$;
+
+LOCK TABLE studentresponses IN ACCESS EXCLUSIVE MODE;
+
+-- ---------------------------------------------------------------------------
+-- 1. Move the old table out of the way
+-- ---------------------------------------------------------------------------
+
+ALTER TABLE studentresponses RENAME TO studentresponses_unpartitioned;
+ALTER INDEX studentresponses_pkey RENAME TO studentresponses_unpartitioned_pkey;
+DROP INDEX IF EXISTS studentresponses_student_id_idx;
+DROP INDEX IF EXISTS studentresponses_question_id_idx;
+DROP INDEX IF EXISTS studentresponses_submitted_by_user_idx;
+DROP TRIGGER IF EXISTS studentresponses_set_updated_at ON studentresponses_unpartitioned;
+
+-- ---------------------------------------------------------------------------
+-- 2. Partitioned table
+-- ---------------------------------------------------------------------------
+
+CREATE TABLE studentresponses (
+    response_id INT NOT NULL DEFAULT nextval('studentresponses_response_id_seq'),
+    course_id INT REFERENCES courses(course_id),
+    question_id INT REFERENCES questions(question_id),
+    student_id INT REFERENCES students(student_id),
+    response TEXT,
+    submitted_by_user_id UUID,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT studentresponses_submitted_by_user_fk
+        FOREIGN KEY (submitted_by_user_id) REFERENCES users(id)
+) PARTITION BY LIST (course_id);
+
+ALTER SEQUENCE studentresponses_response_id_seq OWNED BY studentresponses.response_id;
+
+CREATE TABLE studentresponses_default PARTITION OF studentresponses DEFAULT;
+
+CREATE OR REPLACE FUNCTION create_studentresponses_partition(p_course_id INT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF studentresponses FOR VALUES IN (%s)',
+        'studentresponses_course_' || p_course_id,
+        p_course_id
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION courses_create_response_partition()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM create_studentresponses_partition(NEW.course_id);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS courses_create_response_partition ON courses;
+CREATE TRIGGER courses_create_response_partition
+AFTER INSERT ON courses
+FOR EACH ROW
+EXECUTE FUNCTION courses_create_response_partition();
+
+SELECT create_studentresponses_partition(course_id) FROM courses ORDER BY course_id;
+
+-- ---------------------------------------------------------------------------
+-- 3. Backfill
+-- ---------------------------------------------------------------------------
+
+INSERT INTO studentresponses (
+    response_id, course_id, question_id, student_id, response,
+    submitted_by_user_id, created_at, updated_at
+)
+SELECT r.response_id, m.course_id, r.question_id, r.student_id, r.response,
+       r.submitted_by_user_id, r.created_at, r.updated_at
+FROM studentresponses_unpartitioned r
+LEFT JOIN questions q ON q.question_id = r.question_id
+LEFT JOIN assignments a ON a.assignment_id = q.assignment_id
+LEFT JOIN modules m ON m.module_id = a.module_id;
+
+-- Indexes are built after the copy; creating them on the parent creates them
+-- on every partition, including ones added later.
+CREATE UNIQUE INDEX studentresponses_course_response_uidx ON studentresponses(course_id, response_id);
+CREATE INDEX studentresponses_student_id_idx ON studentresponses(student_id);
+CREATE INDEX studentresponses_question_id_idx ON studentresponses(question_id);
+CREATE INDEX studentresponses_submitted_by_user_idx ON studentresponses(submitted_by_user_id);
+
+CREATE TRIGGER studentresponses_set_updated_at
+BEFORE UPDATE ON studentresponses
+FOR EACH ROW
+EXECUTE FUNCTION set_updated_at();
+
+-- ---------------------------------------------------------------------------
+-- 4. Writers
+-- ---------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION submit_student_response(
+    p_actor_user_id UUID,
+    p_question_id INT,
+    p_response TEXT
+)
+RETURNS INT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_student_id INT;
+    v_course_id INT;
+    v_response_id INT;
+    v_existing_count BIGINT;
+BEGIN
+    SELECT s.student_id
+    INTO v_student_id
+    FROM students s
+    JOIN users u ON u.id = s.user_id
+    WHERE s.user_id = p_actor_user_id
+      AND u.is_active = TRUE;
+
+    IF v_student_id IS NULL THEN
+        RAISE EXCEPTION 'actor is not an active student'
+            USING ERRCODE = '42501';
+    END IF;
+
+    SELECT c.course_id
+    INTO v_course_id
+    FROM questions q
+    JOIN assignments a ON a.assignment_id = q.assignment_id
+    JOIN modules m ON m.module_id = a.module_id
+    JOIN courses c ON c.course_id = m.course_id
+    JOIN enrollments e ON e.course_id = c.course_id
+                      AND e.student_id = v_student_id
+                      AND e.status = 'active'
+    WHERE q.question_id = p_question_id;
+
+    IF v_course_id IS NULL THEN
+        RAISE EXCEPTION 'student is not enrolled for this question'
+            USING ERRCODE = '42501';
+    END IF;
+
+    SELECT COUNT(*), MIN(response_id)
+    INTO v_existing_count, v_response_id
+    FROM studentresponses
+    WHERE course_id = v_course_id
+      AND student_id = v_student_id
+      AND question_id = p_question_id;
+
+    IF v_existing_count > 1 THEN
+        RAISE EXCEPTION 'duplicate student responses must be cleaned before secure upsert'
+            USING ERRCODE = '23505';
+    ELSIF v_existing_count = 1 THEN
+        UPDATE studentresponses
+        SET response = p_response,
+            submitted_by_user_id = p_actor_user_id,
+            updated_at = now()
+        WHERE course_id = v_course_id
+          AND response_id = v_response_id
+        RETURNING response_id INTO v_response_id;
+    ELSE
+        INSERT INTO studentresponses (
+            course_id,
+            question_id,
+            student_id,
+            response,
+            submitted_by_user_id,
+            created_at,
+            updated_at
+        )
+        VALUES (
+            v_course_id,
+            p_question_id,
+            v_student_id,
+            p_response,
+            p_actor_user_id,
+            now(),
+            now()
+        )
+        RETURNING response_id INTO v_response_id;
+    END IF;
+
+    RETURN v_response_id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION teacher_visible_course_results(
+    p_actor_user_id UUID,
+    p_course_id INT
+)
+RETURNS TABLE (
+    course_id INT,
+    student_id INT,
+    student_name TEXT,
+    question_id INT,
+    response_id INT,
+    response TEXT,
+    submitted_at TIMESTAMPTZ
+)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT c.course_id,
+           s.student_id,
+           s.name::TEXT AS student_name,
+           q.question_id,
+           sr.response_id,
+           sr.response,
+           sr.updated_at AS submitted_at
+    FROM courses c
+    JOIN modules m ON m.course_id = c.course_id
+    JOIN assignments a ON a.module_id = m.module_id
+    JOIN questions q ON q.assignment_id = a.assignment_id
+    JOIN studentresponses sr ON sr.question_id = q.question_id
+                            AND sr.course_id = p_course_id
+    JOIN students s ON s.student_id = sr.student_id
+    WHERE c.course_id = p_course_id
+      AND (
+          EXISTS (
+              SELECT 1
+              FROM course_staff cs
+              WHERE cs.course_id = c.course_id
+                AND cs.user_id = p_actor_user_id
+                AND cs.role IN ('teacher', 'ta', 'admin')
+          )
+          OR EXISTS (
+              SELECT 1
+              FROM user_roles ur
+              WHERE ur.user_id = p_actor_user_id
+                AND ur.role_key = 'admin'
+          )
+      );
+$$;
+
+ANALYZE studentresponses;
+
+COMMIT;
+
+-- After checking the row counts match, drop the old table:
+-- SELECT (SELECT count(*) FROM studentresponses_unpartitioned) AS before,
+--        (SELECT count(*) FROM studentresponses) AS after;
+-- DROP TABLE studentresponses_unpartitioned;
@@ -0,0 +1,28 @@
+-- Archive tier for student responses of ended courses.
+-- Date: 2026-10-19
+--
+-- `python -m app.services.archive` moves a course's rows out of
+-- studentresponses into studentresponses_archive in batches and stamps
+-- courses.archived_at; `restore` moves them back. The archived row is kept
+-- whole as JSONB so the archive does not have to follow later column changes
+-- to studentresponses; jsonb_populate_record rebuilds it on restore.
+--
+-- Run after 2026-10-19-01-partition-studentresponses.sql: the archive moves
+-- rows by studentresponses.course_id, which that migration adds.
+
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS archived_at TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS studentresponses_archive (
+    response_id INT PRIMARY KEY,
+    course_id INT NOT NULL REFERENCES courses(course_id),
+    question_id INT,
+    student_id INT,
+    data JSONB NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS studentresponses_archive_course_idx
+ON studentresponses_archive(course_id);
+
+CREATE INDEX IF NOT EXISTS studentresponses_archive_student_idx
+ON studentresponses_archive(student_id);
@@ -0,0 +1,76 @@
+-- Store the chosen option of a student response as an integer.
+-- Date: 2026-10-19
+--
+-- studentresponses.response is free text. For multiple-choice questions it
+-- holds an option id, so results and item analysis joined options on
+-- response::text = option_id::text. That join cannot use an index. It also
+-- matched an option of any question that happened to have that id.
+--
+-- selected_option_id is the option of the response's own question that the
+-- response names, or NULL for free text and ids that are not one of the
+-- question's options. A BEFORE trigger derives it from response on every
+-- insert, and on updates of response or question_id. Every writer therefore
+-- fills it: the API, submit_student_response(), archive restores and COPY.
+-- Queries join options(option_id) and compare questions.correct_option_id
+-- as integers.
+--
+-- Run after 2026-10-19-01-partition-studentresponses.sql. The column, foreign
+-- key, index and trigger are created on the partitioned parent, so they apply
+-- to every partition, including ones added later. The backfill rewrites every
+-- response row; run VACUUM ANALYZE studentresponses afterwards.
+
+BEGIN;
+
+ALTER TABLE studentresponses
+    ADD COLUMN IF NOT EXISTS selected_option_id INT;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_constraint
+        WHERE conrelid = 'studentresponses'::regclass
+          AND conname = 'studentresponses_selected_option_fk'
+    ) THEN
+        ALTER TABLE studentresponses
+        ADD CONSTRAINT studentresponses_selected_option_fk
+        FOREIGN KEY (selected_option_id) REFERENCES options(option_id) ON DELETE SET NULL;
+    END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION studentresponses_set_selected_option()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.selected_option_id := (
+        SELECT o.option_id
+        FROM options o
+        WHERE o.question_id = NEW.question_id
+          AND o.option_id::text = btrim(NEW.response)
+    );
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS studentresponses_set_selected_option ON studentresponses;
+CREATE TRIGGER studentresponses_set_selected_option
+BEFORE INSERT OR UPDATE OF response, question_id ON studentresponses
+FOR EACH ROW
+EXECUTE FUNCTION studentresponses_set_selected_option();
+
+-- Backfill. This UPDATE only sets selected_option_id, so the trigger above
+-- does not fire for it.
+UPDATE studentresponses r
+SET selected_option_id = o.option_id
+FROM options o
+WHERE o.question_id = r.question_id
+  AND o.option_id::text = btrim(r.response)
+  AND r.selected_option_id IS DISTINCT FROM o.option_id;
+
+CREATE INDEX IF NOT EXISTS studentresponses_selected_option_idx ON studentresponses(selected_option_id);
+CREATE INDEX IF NOT EXISTS studentresponses_student_id_idx ON studentresponses(student_id);
+
+ANALYZE studentresponses;
+
+COMMIT;
@@ -0,0 +1,90 @@
+-- Grade responses when they are saved and keep per-assignment totals.
+-- Date: 2026-10-19
+--
+-- Correctness used to be recomputed by every results query, and free-text
+-- answers were never scored. The API now grades each response as it is saved
+-- (app/services/grading.py) and stores the score and whether the answer was
+-- correct on the response (is_correct; a question can be worth 0 points, so
+-- correctness is not read back from the score):
+--
+--   * multiple_choice: points when the response names correct_option_id,
+--     otherwise 0.
+--   * numeric: points when the number in the response is within tolerance
+--     of correct_numeric_value, otherwise 0.
+--   * anything else, or a question without a key: NULL (not graded).
+--
+-- The same statement adds the change in score to the student's row in
+-- assignment_scores, so the gradebook is an indexed read. POST
+-- /assignments/{id}/regrade recomputes both after a key changes.
+--
+-- A student has one response per question: the save is an INSERT ... ON
+-- CONFLICT on (course_id, student_id, question_id), so two first submissions
+-- cannot both insert. Duplicates left by the old read-then-insert save held
+-- the same answer (every save updated all of them); all but the newest are
+-- deleted before the unique index is built.
+--
+-- Run after 2026-10-19-03-response-selected-option.sql. Existing
+-- multiple-choice responses are graded below. Numeric questions are new, so
+-- there is nothing to backfill for them.
+
+BEGIN;
+
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS points DOUBLE PRECISION NOT NULL DEFAULT 1;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS correct_numeric_value DOUBLE PRECISION;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS numeric_abs_tolerance DOUBLE PRECISION;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS numeric_rel_tolerance DOUBLE PRECISION;
+
+ALTER TABLE studentresponses ADD COLUMN IF NOT EXISTS score DOUBLE PRECISION;
+ALTER TABLE studentresponses ADD COLUMN IF NOT EXISTS is_correct BOOLEAN;
+ALTER TABLE studentresponses ADD COLUMN IF NOT EXISTS graded_at TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS assignment_scores (
+    assignment_id INT NOT NULL REFERENCES assignments(assignment_id),
+    course_id INT NOT NULL REFERENCES courses(course_id),
+    student_id INT NOT NULL REFERENCES students(student_id),
+    score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    graded_responses INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (assignment_id, student_id)
+);
+
+CREATE INDEX IF NOT EXISTS assignment_scores_course_student_idx ON assignment_scores(course_id, student_id);
+
+DELETE FROM studentresponses r
+USING studentresponses newer
+WHERE newer.course_id = r.course_id
+  AND newer.student_id = r.student_id
+  AND newer.question_id = r.question_id
+  AND newer.response_id > r.response_id;
+
+-- On the parent, so every partition (and every one added later) gets it.
+CREATE UNIQUE INDEX IF NOT EXISTS studentresponses_course_student_question_uidx
+    ON studentresponses(course_id, student_id, question_id);
+
+-- Backfill: grade multiple-choice responses, then total them.
+UPDATE studentresponses r
+SET score = CASE WHEN r.selected_option_id = q.correct_option_id THEN q.points ELSE 0 END,
+    is_correct = r.selected_option_id IS NOT DISTINCT FROM q.correct_option_id,
+    graded_at = now()
+FROM questions q
+WHERE q.question_id = r.question_id
+  AND q.question_type = 'multiple_choice'
+  AND q.correct_option_id IS NOT NULL;
+
+INSERT INTO assignment_scores (assignment_id, course_id, student_id, score, graded_responses)
+SELECT q.assignment_id, r.course_id, r.student_id, sum(r.score), count(*)
+FROM studentresponses r
+JOIN questions q ON q.question_id = r.question_id
+WHERE r.score IS NOT NULL
+  AND r.student_id IS NOT NULL
+  AND r.course_id IS NOT NULL
+GROUP BY q.assignment_id, r.course_id, r.student_id
+ON CONFLICT (assignment_id, student_id) DO UPDATE
+SET score = EXCLUDED.score,
+    graded_responses = EXCLUDED.graded_responses,
+    updated_at = now();
+
+ANALYZE studentresponses;
+ANALYZE assignment_scores;
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Index the foreign keys walked when a module's assignments are deleted.
+-- Date: 2026-10-19
+--
+-- DELETE /modules/{module_id}/assignments/ removes assignments, questions,
+-- options, student responses and team assignments in one statement. Without
+-- these indexes each step, and each FK check on the parent rows, is a
+-- sequential scan of the child table.
+
+CREATE INDEX IF NOT EXISTS assignments_module_id_idx ON assignments(module_id);
+CREATE INDEX IF NOT EXISTS questions_assignment_id_idx ON questions(assignment_id);
+CREATE INDEX IF NOT EXISTS options_question_id_idx ON options(question_id);
+CREATE INDEX IF NOT EXISTS studentresponses_question_id_idx ON studentresponses(question_id);
+CREATE INDEX IF NOT EXISTS teamassignments_assignment_id_idx ON teamassignments(assignment_id);
+CREATE INDEX IF NOT EXISTS teamassignmentsubmissions_team_assignment_id_idx ON teamassignmentsubmissions(team_assignment_id);
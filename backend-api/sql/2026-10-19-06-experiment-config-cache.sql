@@ -0,0 +1,9 @@
+-- Store the validated, normalized experiment config on each module.
+-- Date: 2026-10-19
+--
+-- The API fills this column when a module is created or updated, when a
+-- *_config.json referenced by a module is re-uploaded, and lazily on the first
+-- read of /modules/{module_id}/experiment-config for older rows. JSON (not
+-- JSONB) keeps variable order, which drives the order of the form inputs.
+
+ALTER TABLE modules ADD COLUMN IF NOT EXISTS experiment_config JSON;
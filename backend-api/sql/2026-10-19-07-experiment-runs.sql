@@ -0,0 +1,21 @@
+-- Append-only log of parametric experiment runs for learning analytics.
+-- Date: 2026-10-19
+--
+-- Rows are written in batches with COPY by the API's in-process run logger,
+-- so the table has no update path and no triggers.
+
+CREATE TABLE IF NOT EXISTS experiment_runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    module_id UUID NOT NULL REFERENCES modules(module_id) ON DELETE CASCADE,
+    student_id INT REFERENCES students(student_id),
+    model TEXT,
+    parameters JSONB NOT NULL,
+    metrics JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS experiment_runs_module_created_idx
+ON experiment_runs(module_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS experiment_runs_student_created_idx
+ON experiment_runs(student_id, created_at DESC);
@@ -0,0 +1,44 @@
+-- Postgres-backed queue for long-running staff operations.
+-- Date: 2026-10-19
+--
+-- CSV imports, regrades and cascading deletes can outlast the proxy timeout
+-- when they run inside the request. With ?async=true their endpoints insert
+-- a row here and return its job_id. Workers (app/services/jobs.py, in the API
+-- process or `python -m app.services.jobs`) claim rows with
+-- SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can share the table.
+-- A claimed job holds a lease (locked_until), and the worker extends it while
+-- the job runs. A job whose worker died is claimed again once its lease
+-- expires. A failed attempt is retried with exponential backoff (run_after)
+-- until max_attempts. Progress and the outcome are served by GET /api/v1/jobs/{id}.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    course_id INT REFERENCES courses(course_id) ON DELETE SET NULL,
+    created_by TEXT,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by TEXT,
+    locked_until TIMESTAMPTZ,
+    progress DOUBLE PRECISION NOT NULL DEFAULT 0,
+    progress_message TEXT,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- The claim query reads the due end of one of these; both stay small
+-- because finished jobs are in neither.
+CREATE INDEX IF NOT EXISTS jobs_queued_idx ON jobs(run_after) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS jobs_running_idx ON jobs(locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS jobs_finished_idx ON jobs(finished_at) WHERE finished_at IS NOT NULL;
+
+COMMIT;
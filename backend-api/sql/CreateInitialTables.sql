@@ -35,6 +35,7 @@ CREATE TABLE Courses (
     course_webpage TEXT,
     syllabus_pdf_link TEXT,
     instructor_id INT,
+    archived_at TIMESTAMPTZ,
     FOREIGN KEY (instructor_id) REFERENCES Instructors(instructor_id)
 );
 
@@ -64,6 +65,7 @@ CREATE TABLE Modules (
     video_link_2 TEXT,
     plottingexperimentconfig TEXT,
     InteractiveConfig TEXT,
+    experiment_config JSON,
     FOREIGN KEY (course_id) REFERENCES Courses(course_id)
 );
 
@@ -82,6 +84,11 @@ CREATE TABLE Questions (
     question_text TEXT,
     question_type VARCHAR(50),
     correct_option_id INT,
+    -- Grading keys; see 2026-10-19-04-response-grading.sql.
+    points DOUBLE PRECISION NOT NULL DEFAULT 1,
+    correct_numeric_value DOUBLE PRECISION,
+    numeric_abs_tolerance DOUBLE PRECISION,
+    numeric_rel_tolerance DOUBLE PRECISION,
     FOREIGN KEY (assignment_id) REFERENCES Assignments(assignment_id)
 );
 
@@ -92,15 +99,124 @@ CREATE TABLE Options (
     FOREIGN KEY (question_id) REFERENCES Questions(question_id)
 );
 
+-- One LIST partition per course; see 2026-10-19-01-partition-studentresponses.sql.
 CREATE TABLE studentresponses (
-    response_id SERIAL PRIMARY KEY,
+    response_id SERIAL,
+    course_id INT,
     question_id INT,
     student_id INT,
     response TEXT,
+    -- Set from response by a trigger; see 2026-10-19-03-response-selected-option.sql.
+    selected_option_id INT,
+    score DOUBLE PRECISION,
+    is_correct BOOLEAN,
+    graded_at TIMESTAMPTZ,
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id),
     FOREIGN KEY (question_id) REFERENCES Questions(question_id),
+    FOREIGN KEY (student_id) REFERENCES Students(student_id),
+    CONSTRAINT studentresponses_selected_option_fk
+        FOREIGN KEY (selected_option_id) REFERENCES Options(option_id) ON DELETE SET NULL
+) PARTITION BY LIST (course_id);
+
+CREATE TABLE studentresponses_default PARTITION OF studentresponses DEFAULT;
+CREATE UNIQUE INDEX studentresponses_course_response_uidx ON studentresponses(course_id, response_id);
+CREATE UNIQUE INDEX studentresponses_course_student_question_uidx ON studentresponses(course_id, student_id, question_id);
+
+CREATE FUNCTION create_studentresponses_partition(p_course_id INT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF studentresponses FOR VALUES IN (%s)',
+        'studentresponses_course_' || p_course_id,
+        p_course_id
+    );
+END;
+$$;
+
+CREATE FUNCTION courses_create_response_partition()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM create_studentresponses_partition(NEW.course_id);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER courses_create_response_partition
+AFTER INSERT ON Courses
+FOR EACH ROW
+EXECUTE FUNCTION courses_create_response_partition();
+
+CREATE FUNCTION studentresponses_set_selected_option()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.selected_option_id := (
+        SELECT o.option_id
+        FROM options o
+        WHERE o.question_id = NEW.question_id
+          AND o.option_id::text = btrim(NEW.response)
+    );
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER studentresponses_set_selected_option
+BEFORE INSERT OR UPDATE OF response, question_id ON studentresponses
+FOR EACH ROW
+EXECUTE FUNCTION studentresponses_set_selected_option();
+
+CREATE TABLE studentresponses_archive (
+    response_id INT PRIMARY KEY,
+    course_id INT NOT NULL,
+    question_id INT,
+    student_id INT,
+    data JSONB NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id)
+);
+
+-- Running per-assignment totals of studentresponses.score, kept by the API.
+CREATE TABLE assignment_scores (
+    assignment_id INT NOT NULL,
+    course_id INT NOT NULL,
+    student_id INT NOT NULL,
+    score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    graded_responses INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (assignment_id, student_id),
+    FOREIGN KEY (assignment_id) REFERENCES Assignments(assignment_id),
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id),
     FOREIGN KEY (student_id) REFERENCES Students(student_id)
 );
 
+CREATE TABLE jobs (
+    job_id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    course_id INT,
+    created_by TEXT,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by TEXT,
+    locked_until TIMESTAMPTZ,
+    progress DOUBLE PRECISION NOT NULL DEFAULT 0,
+    progress_message TEXT,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    FOREIGN KEY (course_id) REFERENCES Courses(course_id) ON DELETE SET NULL
+);
+
 CREATE TABLE Teams (
     team_id SERIAL PRIMARY KEY,
     name VARCHAR(255),
@@ -135,3 +251,33 @@ CREATE TABLE TeamAssignmentSubmissions (
     FOREIGN KEY (team_assignment_id) REFERENCES TeamAssignments(team_assignment_id),
     FOREIGN KEY (team_id) REFERENCES Teams(team_id)
 );
+
+CREATE TABLE experiment_runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    module_id UUID NOT NULL,
+    student_id INT,
+    model TEXT,
+    parameters JSONB NOT NULL,
+    metrics JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    FOREIGN KEY (module_id) REFERENCES Modules(module_id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES Students(student_id)
+);
+
+CREATE INDEX experiment_runs_module_created_idx ON experiment_runs(module_id, created_at DESC);
+CREATE INDEX experiment_runs_student_created_idx ON experiment_runs(student_id, created_at DESC);
+
+CREATE INDEX assignments_module_id_idx ON assignments(module_id);
+CREATE INDEX questions_assignment_id_idx ON questions(assignment_id);
+CREATE INDEX options_question_id_idx ON options(question_id);
+CREATE INDEX studentresponses_question_id_idx ON studentresponses(question_id);
+CREATE INDEX studentresponses_student_id_idx ON studentresponses(student_id);
+CREATE INDEX studentresponses_selected_option_idx ON studentresponses(selected_option_id);
+CREATE INDEX teamassignments_assignment_id_idx ON teamassignments(assignment_id);
+CREATE INDEX teamassignmentsubmissions_team_assignment_id_idx ON teamassignmentsubmissions(team_assignment_id);
+CREATE INDEX studentresponses_archive_course_idx ON studentresponses_archive(course_id);
+CREATE INDEX studentresponses_archive_student_idx ON studentresponses_archive(student_id);
+CREATE INDEX assignment_scores_course_student_idx ON assignment_scores(course_id, student_id);
+CREATE INDEX jobs_queued_idx ON jobs(run_after) WHERE status = 'queued';
+CREATE INDEX jobs_running_idx ON jobs(locked_until) WHERE status = 'running';
+CREATE INDEX jobs_finished_idx ON jobs(finished_at) WHERE finished_at IS NOT NULL;
@@ -0,0 +1,180 @@
+"""Shared fixtures: a local fake OpenAI server and a clean generation service.
+
+Run from ``backend-api``::
+
+    python -m pytest -q
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import pytest
+
+os.environ.setdefault("ENVIRONMENT", "local")
+os.environ.setdefault("BACKEND_API_JWT_SECRET", "test-secret")
+
+from app.services import generation  # noqa: E402
+
+
+class FakeOpenAIServer:
+    """OpenAI-compatible ``/v1/chat/completions`` on a local port.
+
+    Every completion is ``"Variant <n>"`` with n counting upstream calls, so
+    distinct calls produce distinct variants. Streamed completions are sent as
+    ``stream_pieces`` with ``chunk_delay`` between them. Clearing ``gate`` holds
+    every request before it answers; ``delay`` slows each answer down.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.disconnects = 0
+        self.finished_streams = 0
+        self.delay = 0.0
+        self.chunk_delay = 0.0
+        self.stream_pieces: list[str] | None = None
+        self.gate = threading.Event()
+        self.gate.set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.gate.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake._lock:
+                    fake.calls += 1
+                    call = fake.calls
+                    fake.active += 1
+                    fake.max_active = max(fake.max_active, fake.active)
+                try:
+                    fake.gate.wait(timeout=30)
+                    time.sleep(fake.delay)
+                    if body.get("stream"):
+                        self._stream(call)
+                    else:
+                        self._complete(call)
+                except (BrokenPipeError, ConnectionResetError):
+                    with fake._lock:
+                        fake.disconnects += 1
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+
+            def _complete(self, call: int):
+                payload = json.dumps({
+                    "id": f"chatcmpl-{call}",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "fake",
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"Variant {call}"},
+                        "finish_reason": "stop",
+                    }],
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, call: int):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                pieces = fake.stream_pieces or ["Variant", " ", str(call)]
+                for piece in pieces:
+                    chunk = {
+                        "id": f"chatcmpl-{call}",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": "fake",
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(fake.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                with fake._lock:
+                    fake.finished_streams += 1
+
+        return Handler
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+async def async_wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_openai():
+    server = FakeOpenAIServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def generation_service(fake_openai, monkeypatch):
+    """The generation module pointed at the fake server, with empty pools and 2 slots."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", fake_openai.base_url)
+    monkeypatch.setattr(generation, "_openai_client", None)
+    monkeypatch.setattr(generation, "_generation_slots", asyncio.Semaphore(2))
+    monkeypatch.setattr(generation, "GENERATION_VARIANTS", 3)
+    monkeypatch.setattr(generation, "GENERATION_QUEUE_TIMEOUT_SECONDS", 5.0)
+    monkeypatch.setattr(generation, "GENERATION_PREFILL_ON_SAVE", True)
+    generation.generation_cache.clear()
+    generation._inflight.clear()
+    yield generation
+    generation.generation_cache.clear()
+    generation._inflight.clear()
+
+
+def set_generation_slots(monkeypatch, slots: int) -> None:
+    monkeypatch.setattr(generation, "_generation_slots", asyncio.Semaphore(slots))
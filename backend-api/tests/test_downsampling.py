@@ -0,0 +1,89 @@
+"""LTTB downsampling and the float32 waveform encoding of app/services/downsampling.py."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services.downsampling import encode_float32, lttb
+
+
+def sine(n: int = 5000):
+    x = np.linspace(0.0, 0.1, n)
+    return x, np.sin(2 * np.pi * 50 * x) + 0.1 * np.sin(2 * np.pi * 730 * x)
+
+
+@pytest.mark.parametrize("n, max_points", [(10, 10), (10, 50), (2, 3), (1, 3)])
+def test_short_series_pass_through(n, max_points):
+    x, y = np.arange(n, dtype=float), np.arange(n, dtype=float) ** 2
+    out_x, out_y = lttb(x, y, max_points)
+    assert out_x is x and out_y is y
+
+
+@pytest.mark.parametrize("max_points", [3, 4, 10, 257, 1000])
+def test_length_endpoints_and_x_order(max_points):
+    x, y = sine()
+    out_x, out_y = lttb(x, y, max_points)
+    assert len(out_x) == len(out_y) == max_points
+    assert (out_x[0], out_y[0]) == (x[0], y[0])
+    assert (out_x[-1], out_y[-1]) == (x[-1], y[-1])
+    assert np.all(np.diff(out_x) > 0)
+    # Every point is a sample of the input.
+    assert np.all(np.interp(out_x, x, y) == out_y)
+
+
+@pytest.mark.parametrize("max_points", [4, 10, 100])
+def test_global_extremes_are_kept(max_points):
+    x, y = sine()
+    out_x, out_y = lttb(x, y, max_points)
+    assert out_y.max() == y.max()
+    assert out_y.min() == y.min()
+
+
+@pytest.mark.parametrize("max_points", [4, 5, 10, 100])
+@pytest.mark.parametrize("where", [0.02, 0.5, 0.98])
+def test_both_extremes_in_one_bucket_are_kept(max_points, where):
+    # A bipolar spike: the maximum and minimum are adjacent samples, so they
+    # always share a bucket. The maximum used to overwrite the minimum's slot.
+    n = 10_000
+    x = np.arange(n, dtype=float)
+    y = np.zeros(n)
+    peak = int(n * where)
+    y[peak], y[peak + 1] = 5.0, -4.0
+    out_x, out_y = lttb(x, y, max_points)
+    assert len(out_x) == max_points
+    assert 5.0 in out_y and -4.0 in out_y
+    assert np.all(np.diff(out_x) > 0)
+
+
+def test_three_points_keep_the_maximum():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[40], y[41] = -3.0, 7.0
+    out_x, out_y = lttb(x, y, 3)
+    assert list(out_x) == [0.0, 41.0, 99.0]
+    assert out_y[1] == 7.0
+
+
+def test_too_few_points_is_an_error():
+    x, y = sine(100)
+    with pytest.raises(ValueError):
+        lttb(x, y, 2)
+
+
+def test_encode_float32_layout():
+    x = np.array([0.0, 0.5, 1.0])
+    y = np.array([-1.0, 2.5, 3.0])
+    packed = encode_float32(x, y)
+    assert len(packed) == 6 * 4
+    decoded = np.frombuffer(packed, dtype="<f4")
+    assert decoded[:3].tolist() == x.tolist()
+    assert decoded[3:].tolist() == y.tolist()
+
+
+def test_encode_float32_rejects_values_out_of_range():
+    with pytest.raises(ValueError):
+        encode_float32(np.array([0.0, 1.0]), np.array([0.0, 1e39]))
+
+
+def test_encode_float32_empty():
+    assert encode_float32(np.array([]), np.array([])) == b""
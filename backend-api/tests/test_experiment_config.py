@@ -0,0 +1,179 @@
+"""Validation and normalization of experiment configs by app/services/experiment_config.py."""
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.experiment_config import (
+    ExperimentConfigError,
+    is_experiment_config,
+    load_experiment_config,
+    normalize_experiment_config,
+    serialize_experiment_config,
+)
+from app.storage.local_storage import LocalStorage
+
+REPO = Path(__file__).resolve().parents[2]
+SHIPPED_CONFIGS = sorted(
+    [*(REPO / "content_files").glob("*/*.json"), *(REPO / "Experiment Modules").rglob("*_config.json")]
+)
+
+VALID = {
+    "variables": {
+        "chargingVoltage": {
+            "variableLabel": " Charging Voltage (Vo) ",
+            "variableDescription": "Unit: kilovolts (kV) | ",
+            "initial": 100,
+            "max": 1000,
+            "min": 0,
+        },
+        "timeStep": {"variableLabel": "Timestep", "initial": 0.01, "min": 0.001, "max": 1},
+    },
+    "output_plot": {"xAxisLabel": "Time (us)", "yAxisLabel": "Voltage (kV)", "title": "Impulse"},
+    "compute": "exp1/exp1_impulse.js",
+}
+
+
+def config(**changes) -> dict:
+    """VALID with top-level keys replaced (or removed when the value is ...)."""
+    raw = copy.deepcopy(VALID)
+    for key, value in changes.items():
+        if value is ...:
+            raw.pop(key)
+        else:
+            raw[key] = value
+    return raw
+
+
+def variable(**changes) -> dict:
+    spec = {"variableLabel": "V", "initial": 1, "min": 0, "max": 2}
+    spec.update(changes)
+    return config(variables={"v": {k: v for k, v in spec.items() if v is not ...}})
+
+
+@pytest.mark.parametrize("path", SHIPPED_CONFIGS, ids=lambda path: path.name)
+def test_shipped_configs_are_valid(path):
+    normalized = normalize_experiment_config(path.read_bytes())
+    assert (REPO / "content_files" / normalized["compute"]).is_file()
+    # Normalizing is idempotent, so stored configs revalidate unchanged.
+    assert normalize_experiment_config(serialize_experiment_config(normalized)) == normalized
+
+
+def test_normalized_form():
+    raw = config(notes="kept out of the stored config")
+    raw["output_plot"]["legend"] = True
+    raw["variables"]["timeStep"]["step"] = 0.01
+    normalized = normalize_experiment_config(json.dumps(raw).encode())
+    assert list(normalized) == ["variables", "output_plot", "compute"]
+    assert list(normalized["variables"]) == ["chargingVoltage", "timeStep"]
+    assert normalized["variables"]["chargingVoltage"] == {
+        "variableLabel": "Charging Voltage (Vo)",
+        "variableDescription": "Unit: kilovolts (kV) |",
+        "initial": 100,
+        "min": 0,
+        "max": 1000,
+    }
+    assert normalized["variables"]["timeStep"]["variableDescription"] == ""
+    assert normalized["output_plot"] == VALID["output_plot"]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    # Older configs: Windows separators, missing or null plot labels.
+    (config(compute="exp1\\exp1_impulse.js"), {"compute": "exp1/exp1_impulse.js"}),
+    (config(compute="./exp1/exp1_impulse.JS"), {"compute": "exp1/exp1_impulse.JS"}),
+    (config(output_plot={}), {"output_plot": {"xAxisLabel": "", "yAxisLabel": "", "title": ""}}),
+    (config(output_plot={"title": None}), {"output_plot": {"xAxisLabel": "", "yAxisLabel": "", "title": ""}}),
+    (variable(variableDescription=None), {"variables": {"v": {
+        "variableLabel": "V", "variableDescription": "", "initial": 1, "min": 0, "max": 2,
+    }}}),
+    (variable(initial=2.0, min=2.0, max=2.0), {"variables": {"v": {
+        "variableLabel": "V", "variableDescription": "", "initial": 2.0, "min": 2.0, "max": 2.0,
+    }}}),
+])
+def test_legacy_shapes_are_normalized(raw, expected):
+    normalized = normalize_experiment_config(raw)
+    for key, value in expected.items():
+        assert normalized[key] == value
+
+
+@pytest.mark.parametrize("raw, message", [
+    (b"", "not valid JSON"),
+    (b"{'variables': {}}", "not valid JSON"),
+    (b"\xff\xfe", "not valid JSON"),
+    ("[1, 2]", "must be a JSON object"),
+    (None, "must be a JSON object"),
+    (config(variables=...), "variables must be a non-empty object"),
+    (config(variables={}), "variables must be a non-empty object"),
+    (config(variables=[{"variableLabel": "V"}]), "variables must be a non-empty object"),
+    (config(output_plot=...), "output_plot must be an object"),
+    (config(output_plot=["x", "y"]), "output_plot must be an object"),
+    (config(output_plot={"title": 3}), "output_plot.title must be a non-empty string"),
+    (config(compute=...), "compute must be a non-empty string"),
+    (config(compute="  "), "compute must be a non-empty string"),
+    (config(compute="/srv/exp1.js"), "relative path to a .js file"),
+    (config(compute="../secrets/exp1.js"), "relative path to a .js file"),
+    (config(compute="exp1/..\\..\\exp1.js"), "relative path to a .js file"),
+    (config(compute="exp1/exp1.py"), "relative path to a .js file"),
+    (config(variables={"v": 5}), "variables.v must be an object"),
+    (variable(min=...), "variables.v.min must be a finite number"),
+    (variable(max="10"), "variables.v.max must be a finite number"),
+    (variable(initial=True), "variables.v.initial must be a finite number"),
+    (variable(initial=float("nan")), "variables.v.initial must be a finite number"),
+    (variable(max=float("inf")), "variables.v.max must be a finite number"),
+    (variable(min=3, max=2, initial=2), "variables.v.min must not exceed variables.v.max"),
+    (variable(initial=5), "variables.v.initial must lie between min and max"),
+    (variable(variableLabel=...), "variables.v.variableLabel must be a non-empty string"),
+    (variable(variableLabel=" "), "variables.v.variableLabel must be a non-empty string"),
+])
+def test_invalid_configs_are_rejected(raw, message):
+    with pytest.raises(ExperimentConfigError, match=message):
+        normalize_experiment_config(raw)
+
+
+def test_invalid_config_is_a_value_error():
+    # Callers that only catch ValueError still turn it into a client error.
+    with pytest.raises(ValueError):
+        normalize_experiment_config("{}")
+
+
+def test_compute_script_lookup():
+    seen = []
+
+    def exists(path):
+        seen.append(path)
+        return path == "exp1/exp1_impulse.js"
+
+    normalize_experiment_config(config(compute="exp1\\exp1_impulse.js"), compute_exists=exists)
+    assert seen == ["exp1/exp1_impulse.js"]
+    with pytest.raises(ExperimentConfigError, match="Compute script not found: exp1/other.js"):
+        normalize_experiment_config(config(compute="exp1/other.js"), compute_exists=exists)
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("exp1_impulse_voltage_generator_config.json", True),
+    ("EXP5_CONFIG.JSON", True),
+    ("exp2_cockroft_walton.json", False),
+    ("exp1_config.json.bak", False),
+])
+def test_is_experiment_config(filename, expected):
+    assert is_experiment_config(filename) is expected
+
+
+def test_load_from_storage(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    bucket = tmp_path / "content"
+    (bucket / "exp1").mkdir(parents=True)
+    (bucket / "exp1" / "exp1_config.json").write_text(json.dumps(VALID))
+
+    with pytest.raises(ExperimentConfigError, match="Compute script not found"):
+        load_experiment_config(storage, "content", "exp1/exp1_config.json")
+    (bucket / "exp1" / "exp1_impulse.js").write_text("window.MyLibrary = {};")
+    assert load_experiment_config(storage, "content", "exp1/exp1_config.json")["compute"] == "exp1/exp1_impulse.js"
+
+    with pytest.raises(ExperimentConfigError, match="not found"):
+        load_experiment_config(storage, "content", "exp1/missing_config.json")
+    with pytest.raises(ExperimentConfigError, match="Invalid blob path"):
+        load_experiment_config(storage, "content", "../outside_config.json")
@@ -0,0 +1,147 @@
+"""Variant pools, single-flight, concurrency cap and prefill of app/services/generation.py."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import modules
+from app.core.auth import require_authenticated_user
+from conftest import async_wait_until, set_generation_slots
+
+pytestmark = pytest.mark.anyio
+
+CONCEPT = "Ohm's law relates voltage, current and resistance."
+
+
+@pytest.fixture
+def api():
+    app = FastAPI()
+    app.include_router(modules.router, prefix="/api/v1")
+    app.dependency_overrides[require_authenticated_user] = lambda: None
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_full_pool_is_served_without_upstream_calls(generation_service, fake_openai):
+    generated = {await generation_service.generate("rephrase", CONCEPT) for _ in range(3)}
+    assert generated == {"Variant 1", "Variant 2", "Variant 3"}
+    assert fake_openai.calls == 3
+
+    served = {await generation_service.generate("rephrase", CONCEPT) for _ in range(20)}
+    assert served <= generated
+    assert fake_openai.calls == 3
+
+
+async def test_pool_is_keyed_by_template_and_normalized_text(generation_service, fake_openai):
+    await generation_service.generate("rephrase", "Ohm's   law")
+    await generation_service.generate("rephrase", "  Ohm's law\n")
+    await generation_service.generate("funfact", "Ohm's law")
+    assert generation_service.generation_cache.get(("rephrase", "Ohm's law")) == ["Variant 1", "Variant 2"]
+    assert generation_service.generation_cache.get(("funfact", "Ohm's law")) == ["Variant 3"]
+
+
+async def test_concurrent_misses_share_one_upstream_call(generation_service, fake_openai):
+    fake_openai.gate.clear()
+    tasks = [asyncio.create_task(generation_service.generate("rephrase", CONCEPT)) for _ in range(5)]
+    await async_wait_until(lambda: fake_openai.calls == 1)
+    await asyncio.sleep(0.1)
+    fake_openai.gate.set()
+
+    assert await asyncio.gather(*tasks) == ["Variant 1"] * 5
+    assert fake_openai.calls == 1
+    assert generation_service._inflight == {}
+
+
+async def test_waiters_start_their_own_call_when_the_first_caller_is_cancelled(generation_service, fake_openai):
+    fake_openai.gate.clear()
+    first = asyncio.create_task(generation_service.generate("rephrase", CONCEPT))
+    await async_wait_until(lambda: fake_openai.calls == 1)
+    second = asyncio.create_task(generation_service.generate("rephrase", CONCEPT))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    await async_wait_until(lambda: fake_openai.calls == 2)
+    fake_openai.gate.set()
+
+    assert await second == "Variant 2"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_upstream_calls_never_exceed_the_slot_count(generation_service, fake_openai, monkeypatch):
+    set_generation_slots(monkeypatch, 2)
+    fake_openai.gate.clear()
+    tasks = [asyncio.create_task(generation_service.generate("rephrase", f"text {i}")) for i in range(6)]
+    await async_wait_until(lambda: fake_openai.calls == 2)
+    await asyncio.sleep(0.2)
+    assert fake_openai.calls == 2
+    fake_openai.gate.set()
+
+    assert len(set(await asyncio.gather(*tasks))) == 6
+    assert fake_openai.max_active == 2
+    assert generation_service._generation_slots._value == 2
+
+
+async def test_no_free_slot_within_the_queue_timeout_is_503(generation_service, fake_openai, monkeypatch, api):
+    set_generation_slots(monkeypatch, 1)
+    monkeypatch.setattr(generation_service, "GENERATION_QUEUE_TIMEOUT_SECONDS", 0.2)
+    fake_openai.gate.clear()
+    holder = asyncio.create_task(generation_service.generate("rephrase", CONCEPT))
+    await async_wait_until(lambda: fake_openai.calls == 1)
+
+    async with api:
+        response = await api.post("/api/v1/funfact/", params={"text": "Ohm"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert fake_openai.calls == 1
+
+    fake_openai.gate.set()
+    assert await holder == "Variant 1"
+    assert generation_service._generation_slots._value == 1
+
+
+async def test_upstream_timeout_is_504_and_frees_the_slot(generation_service, fake_openai, monkeypatch, api):
+    monkeypatch.setattr(generation_service, "GENERATION_TIMEOUT_SECONDS", 0.2)
+    fake_openai.delay = 1.0
+
+    async with api:
+        response = await api.post("/api/v1/rephrase/", params={"text": CONCEPT})
+    assert response.status_code == 504
+    assert generation_service._generation_slots._value == 2
+    assert generation_service._inflight == {}
+    assert generation_service.generation_cache.get(generation_service.generation_cache_key("rephrase", CONCEPT)) is None
+
+
+async def test_endpoints_return_generated_text(generation_service, fake_openai, api):
+    async with api:
+        rephrased = await api.post("/api/v1/rephrase/", params={"text": CONCEPT})
+        fun_fact = await api.post("/api/v1/funfact/", params={"text": "Ohm"})
+    assert rephrased.json() == {"rephrased_text": "Variant 1"}
+    assert fun_fact.json() == {"fun_fact": "Variant 2"}
+
+
+async def test_prefill_module_fills_both_pools(generation_service, fake_openai):
+    module = SimpleNamespace(concept=CONCEPT, title="Ohm's law")
+    await generation_service.prefill_module(module)
+    assert fake_openai.calls == 6
+    assert len(generation_service.generation_cache.get(("rephrase", CONCEPT))) == 3
+    assert len(generation_service.generation_cache.get(("funfact", "Ohm's law"))) == 3
+
+    await generation_service.generate("rephrase", CONCEPT)
+    await generation_service.generate("funfact", "Ohm's law")
+    assert fake_openai.calls == 6
+
+
+async def test_prefill_module_is_skipped_without_an_api_key(generation_service, fake_openai, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY")
+    await generation_service.prefill_module(SimpleNamespace(concept=CONCEPT, title="Ohm's law"))
+    assert fake_openai.calls == 0
+
+
+async def test_prefill_module_survives_upstream_failures(generation_service, fake_openai, monkeypatch):
+    monkeypatch.setattr(generation_service, "GENERATION_TIMEOUT_SECONDS", 0.1)
+    fake_openai.delay = 0.5
+    await generation_service.prefill_module(SimpleNamespace(concept=CONCEPT, title="Ohm's law"))
+    assert generation_service._generation_slots._value == 2
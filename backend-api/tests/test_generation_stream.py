@@ -0,0 +1,121 @@
+"""SSE generation endpoints (``/rephrase/stream``, ``/funfact/stream``) against a stub OpenAI server.
+
+The API runs under uvicorn on a local port so that streaming and client
+disconnects go over a real connection.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import modules
+from app.core.auth import require_authenticated_user
+from conftest import set_generation_slots, wait_until
+
+CONCEPT = "Ohm's law relates voltage, current and resistance."
+
+
+@pytest.fixture
+def api_url(generation_service):
+    app = FastAPI()
+    app.include_router(modules.router, prefix="/api/v1")
+    app.dependency_overrides[require_authenticated_user] = lambda: None
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    wait_until(lambda: server.started)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/api/v1"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def read_events(response: httpx.Response):
+    """Yield (event, data) pairs from a server-sent event stream."""
+    event, data = None, None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+        elif not line and data is not None:
+            yield event, data
+            event, data = None, None
+
+
+def test_tokens_are_relayed_as_they_arrive_then_done(api_url, generation_service, fake_openai, monkeypatch):
+    monkeypatch.setattr(generation_service, "GENERATION_VARIANTS", 1)
+    fake_openai.stream_pieces = ["Ohm", "'s", " law"]
+    fake_openai.chunk_delay = 0.1
+
+    with httpx.Client(timeout=10) as client:
+        with client.stream("POST", f"{api_url}/rephrase/stream", params={"text": CONCEPT}) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = []
+            for event in read_events(response):
+                if not events:
+                    # The first token reaches the client while upstream is still streaming.
+                    assert fake_openai.finished_streams == 0
+                events.append(event)
+
+    assert events == [(None, {"text": "Ohm"}), (None, {"text": "'s"}), (None, {"text": " law"}), ("done", {})]
+    assert generation_service._generation_slots._value == 2
+
+    # The finished variant joined the pool and is replayed without an upstream call.
+    with httpx.Client(timeout=10) as client:
+        with client.stream("POST", f"{api_url}/rephrase/stream", params={"text": CONCEPT}) as response:
+            replayed = list(read_events(response))
+    assert replayed == [(None, {"text": "Ohm's law"}), ("done", {})]
+    assert fake_openai.calls == 1
+
+
+def test_client_disconnect_closes_upstream_and_frees_the_slot(api_url, generation_service, fake_openai):
+    fake_openai.stream_pieces = ["token "] * 500
+    fake_openai.chunk_delay = 0.01
+
+    with httpx.Client(timeout=10) as client:
+        with client.stream("POST", f"{api_url}/funfact/stream", params={"text": "Ohm"}) as response:
+            first = next(read_events(response))
+            assert first == (None, {"text": "token "})
+
+    wait_until(lambda: fake_openai.disconnects == 1)
+    wait_until(lambda: generation_service._generation_slots._value == 2)
+    assert fake_openai.finished_streams == 0
+    assert generation_service._inflight == {}
+    assert generation_service.generation_cache.get(generation_service.generation_cache_key("funfact", "Ohm")) is None
+
+
+def test_no_free_slot_is_503_before_the_stream_starts(api_url, generation_service, fake_openai, monkeypatch):
+    set_generation_slots(monkeypatch, 1)
+    monkeypatch.setattr(generation_service, "GENERATION_QUEUE_TIMEOUT_SECONDS", 0.2)
+    fake_openai.gate.clear()
+    holder: dict[str, list] = {}
+
+    def hold_the_slot():
+        with httpx.Client(timeout=10) as client:
+            with client.stream("POST", f"{api_url}/rephrase/stream", params={"text": CONCEPT}) as response:
+                holder["events"] = list(read_events(response))
+
+    thread = threading.Thread(target=hold_the_slot)
+    thread.start()
+    wait_until(lambda: fake_openai.calls == 1)
+
+    started = time.monotonic()
+    response = httpx.post(f"{api_url}/funfact/stream", params={"text": "Ohm"}, timeout=10)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert response.headers["content-type"] == "application/json"
+    assert time.monotonic() - started < 2
+    assert fake_openai.calls == 1
+
+    fake_openai.gate.set()
+    thread.join(timeout=10)
+    assert holder["events"][-1] == ("done", {})
+    assert generation_service._generation_slots._value == 1
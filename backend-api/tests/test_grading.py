@@ -0,0 +1,95 @@
+"""Grading keys and tolerances of app/services/grading.py."""
+from __future__ import annotations
+
+import pytest
+
+from app.services.grading import DEFAULT_RELATIVE_TOLERANCE, UNGRADED, Grade, grade_response, parse_number
+
+
+def choice(correct_option_id=12, points=2.0):
+    return {
+        "question_type": "multiple_choice",
+        "points": points,
+        "correct_option_id": correct_option_id,
+        "correct_numeric_value": None,
+        "numeric_abs_tolerance": None,
+        "numeric_rel_tolerance": None,
+    }
+
+
+def numeric(expected=1.0, abs_tol=None, rel_tol=None, points=1.0):
+    return {
+        "question_type": "numeric",
+        "points": points,
+        "correct_option_id": None,
+        "correct_numeric_value": expected,
+        "numeric_abs_tolerance": abs_tol,
+        "numeric_rel_tolerance": rel_tol,
+    }
+
+
+@pytest.mark.parametrize("response, expected", [
+    ("1.052", 1.052),
+    ("  1.052 pu", 1.052),
+    ("-3e2 V", -300.0),
+    ("+.5", 0.5),
+    ("7.", 7.0),
+    ("about 5", None),
+    ("", None),
+    (None, None),
+    ("1e999", None),
+])
+def test_parse_number(response, expected):
+    assert parse_number(response) == expected
+
+
+@pytest.mark.parametrize("response, grade", [
+    ("12", Grade(2.0, True)),
+    (" 12 ", Grade(2.0, True)),
+    ("13", Grade(0.0, False)),
+    ("12a", Grade(0.0, False)),
+    ("", Grade(0.0, False)),
+    (None, Grade(0.0, False)),
+])
+def test_multiple_choice(response, grade):
+    assert grade_response(choice(), response) == grade
+
+
+@pytest.mark.parametrize("key, response, correct", [
+    # Default relative tolerance when neither is set.
+    (numeric(100.0), str(100.0 * (1 + DEFAULT_RELATIVE_TOLERANCE)), True),
+    (numeric(100.0), "101.5", False),
+    # Absolute tolerance.
+    (numeric(0.0, abs_tol=0.05), "0.05", True),
+    (numeric(0.0, abs_tol=0.05), "-0.06", False),
+    # Relative tolerance is a fraction of the expected value, not of the answer.
+    (numeric(1.0, rel_tol=0.5), "1.5", True),
+    (numeric(1.0, rel_tol=0.5), "2", False),
+    (numeric(-10.0, rel_tol=0.1), "-11", True),
+    (numeric(-10.0, rel_tol=0.1), "-11.5", False),
+    # The larger of the two applies.
+    (numeric(1000.0, abs_tol=1.0, rel_tol=0.01), "1009", True),
+    (numeric(1.0, abs_tol=0.2, rel_tol=0.01), "1.15", True),
+    (numeric(1.0, abs_tol=0.2, rel_tol=0.01), "1.25", False),
+    # Units after the number are ignored; text without a number is wrong.
+    (numeric(1.052, abs_tol=0.001), "1.052 pu", True),
+    (numeric(1.052, abs_tol=0.001), "one", False),
+    (numeric(1.052, abs_tol=0.001), None, False),
+])
+def test_numeric_tolerance(key, response, correct):
+    assert grade_response(key, response) == Grade(1.0 if correct else 0.0, correct)
+
+
+def test_zero_point_question_still_records_correctness():
+    assert grade_response(choice(points=0), "12") == Grade(0.0, True)
+    assert grade_response(choice(points=0), "13") == Grade(0.0, False)
+    assert grade_response(numeric(5.0, points=0), "5") == Grade(0.0, True)
+
+
+@pytest.mark.parametrize("key", [
+    choice(correct_option_id=None),
+    numeric(expected=None),
+    {**choice(), "question_type": "text"},
+])
+def test_questions_without_a_key_are_not_graded(key):
+    assert grade_response(key, "12") is UNGRADED
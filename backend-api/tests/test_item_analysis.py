@@ -0,0 +1,131 @@
+"""Item analysis statistics of app/services/item_analysis.py."""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from app.services.item_analysis import compute_item_analysis
+
+
+def bank_rows(question_id, options, correct=None, question_type="multiple_choice"):
+    rows = [
+        {
+            "question_id": question_id,
+            "question_text": f"Q{question_id}",
+            "question_type": question_type,
+            "correct_option_id": correct,
+            "option_id": option_id,
+            "option_text": f"O{option_id}",
+        }
+        for option_id in options
+    ]
+    return rows or [{**bank_rows(question_id, [0], correct, question_type)[0], "option_id": None, "option_text": None}]
+
+
+ITEM_BANK = [
+    *bank_rows(30, [301, 302], correct=301),
+    *bank_rows(10, [101, 102], correct=101),
+    *bank_rows(20, [201, 202], correct=202),
+    *bank_rows(40, [], question_type="text"),
+]
+
+# (student, question, chosen option); 0 is a response that names no option.
+RESPONSES = [
+    (1, 10, 101), (1, 20, 202), (1, 30, 301),
+    (2, 10, 101), (2, 20, 201), (2, 30, 0),
+    (3, 10, 102), (3, 20, 202),
+    (4, 10, 102), (4, 40, 0),
+    (5, 99, 991),  # a question no longer in the assignment
+]
+
+# Students x scored questions (10, 20, 30); skipped questions score 0.
+SCORES = np.array([
+    [1, 1, 1],
+    [1, 0, 0],
+    [0, 1, 0],
+    [0, 0, 0],
+], dtype=float)
+
+
+def analyse(item_bank=ITEM_BANK, responses=RESPONSES):
+    student_ids, question_ids, option_ids = (list(column) for column in zip(*responses)) if responses else ([], [], [])
+    return compute_item_analysis(7, item_bank, student_ids, question_ids, option_ids)
+
+
+def test_small_assignment():
+    report = analyse()
+    assert report["assignment_id"] == 7
+    assert report["student_count"] == 4
+    assert report["question_count"] == 4
+    assert report["scored_question_count"] == 3
+    assert report["cronbach_alpha"] == pytest.approx(12 / 19)
+
+    by_id = {q["question_id"]: q for q in report["questions"]}
+    assert [q["question_id"] for q in report["questions"]] == [10, 20, 30, 40]
+    assert [by_id[q]["response_count"] for q in (10, 20, 30, 40)] == [4, 3, 2, 1]
+    assert [by_id[q]["difficulty"] for q in (10, 20, 30)] == pytest.approx(SCORES.mean(axis=0))
+
+    rest = SCORES.sum(axis=1, keepdims=True) - SCORES
+    expected = [np.corrcoef(SCORES[:, j], rest[:, j])[0, 1] for j in range(3)]
+    assert [by_id[q]["point_biserial"] for q in (10, 20, 30)] == pytest.approx(expected)
+
+    assert by_id[30]["options"] == [
+        {"option_id": 301, "option_text": "O301", "is_correct": True, "count": 1, "frequency": 0.5},
+        {"option_id": 302, "option_text": "O302", "is_correct": False, "count": 0, "frequency": 0.0},
+    ]
+    assert by_id[30]["unmatched_responses"] == 1
+    assert [o["count"] for o in by_id[10]["options"]] == [2, 2]
+
+
+def test_free_text_questions_are_reported_but_not_scored():
+    text = analyse()["questions"][3]
+    assert text["question_type"] == "text"
+    assert text["difficulty"] is None and text["point_biserial"] is None
+    assert text["options"] == [] and "unmatched_responses" not in text
+
+
+def test_item_without_variance_has_no_discrimination():
+    responses = [(s, q, {10: 101, 20: 202, 30: 302}[q] if s < 3 else 0) for s in (1, 2, 3) for q in (10, 20, 30)]
+    by_id = {q["question_id"]: q for q in analyse(responses=responses)["questions"]}
+    assert by_id[30]["difficulty"] == 0.0
+    assert by_id[30]["point_biserial"] is None
+
+
+@pytest.mark.parametrize("item_bank, responses", [(ITEM_BANK, []), ([], RESPONSES), ([], [])])
+def test_empty_assignment(item_bank, responses):
+    report = analyse(item_bank, responses)
+    assert report["student_count"] == 0
+    assert report["cronbach_alpha"] is None
+    assert all(q["difficulty"] is None and q["response_count"] == 0 for q in report["questions"])
+
+
+def test_large_assignment_is_vectorised():
+    # 1,000 students x 500 questions, 4 options each, every question answered.
+    rng = np.random.default_rng(30)
+    students, questions, options = 1000, 500, 4
+    option_ids = np.arange(questions * options).reshape(questions, options) + 1
+    item_bank = [
+        row
+        for q in range(questions)
+        for row in bank_rows(q + 1, option_ids[q].tolist(), correct=int(option_ids[q, 0]))
+    ]
+    ability = rng.normal(size=(students, 1))
+    correct = rng.random((students, questions)) < 1 / (1 + np.exp(-ability))
+    wrong = option_ids[np.arange(questions), rng.integers(1, options, (students, questions))]
+    chosen = np.where(correct, option_ids[:, 0], wrong)
+    student_ids = np.repeat(np.arange(students) + 1, questions)
+    question_ids = np.tile(np.arange(questions) + 1, students)
+
+    started = time.perf_counter()
+    report = compute_item_analysis(1, item_bank, student_ids.tolist(), question_ids.tolist(), chosen.ravel().tolist())
+    elapsed = time.perf_counter() - started
+
+    assert report["student_count"] == students and report["scored_question_count"] == questions
+    assert [q["difficulty"] for q in report["questions"]] == pytest.approx(correct.mean(axis=0))
+    # Every item tracks the same latent ability, so discrimination and reliability are high.
+    assert min(q["point_biserial"] for q in report["questions"]) > 0
+    assert report["cronbach_alpha"] > 0.9
+    # About 0.15 s here; the budget leaves room for slow CI machines.
+    assert elapsed < 2.0
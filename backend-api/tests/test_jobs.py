@@ -0,0 +1,102 @@
+"""Lease heartbeat and cancellation of app/services/jobs.py handlers."""
+from __future__ import annotations
+
+import asyncio
+import copy
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import jobs
+
+pytestmark = pytest.mark.anyio
+
+KIND = "test_sleep"
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    calls: list[str] = []
+    lease = {"held": True}
+    handler = {"started": asyncio.Event(), "cancelled": False, "seconds": 5.0}
+
+    @asynccontextmanager
+    async def no_database():
+        yield None
+
+    async def extend_job_lease(conn, job_id, worker_id, lease_seconds):
+        calls.append("extend")
+        return lease["held"]
+
+    async def release_job(conn, job_id, worker_id):
+        calls.append("release")
+        return True
+
+    async def complete_job(conn, job_id, worker_id, result):
+        calls.append("complete")
+        return True
+
+    async def sleep_handler(conn, ctx):
+        handler["started"].set()
+        try:
+            await asyncio.sleep(handler["seconds"])
+        except asyncio.CancelledError:
+            handler["cancelled"] = True
+            raise
+        return {"slept": handler["seconds"]}
+
+    monkeypatch.setattr(jobs, "DBConnection", no_database)
+    monkeypatch.setattr(jobs, "extend_job_lease", extend_job_lease)
+    monkeypatch.setattr(jobs, "release_job", release_job)
+    monkeypatch.setattr(jobs, "complete_job", complete_job)
+    monkeypatch.setitem(jobs.handlers, KIND, jobs.JobKind(sleep_handler, 3))
+    job_worker = jobs.JobWorker(concurrency=0, poll_seconds=1, lease_seconds=0.06)
+    job_worker.calls, job_worker.lease, job_worker.handler = calls, lease, handler
+    return job_worker
+
+
+def job() -> dict:
+    return {"job_id": 1, "kind": KIND, "attempts": 1, "max_attempts": 3}
+
+
+async def test_losing_the_lease_cancels_the_handler(worker):
+    worker.lease["held"] = False
+    await asyncio.wait_for(worker.run_job(job()), 2)
+    assert worker.handler["cancelled"]
+    assert worker.stats["lost"] == 1
+    assert worker.calls == ["extend"]
+    assert worker.running == 0
+
+
+async def test_stopping_the_worker_releases_the_job(worker):
+    running = asyncio.create_task(worker.run_job(job()))
+    await worker.handler["started"].wait()
+    running.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await running
+    assert worker.handler["cancelled"]
+    assert worker.calls[-1] == "release"
+    assert worker.stats["lost"] == 0
+
+
+async def test_held_lease_keeps_the_handler_running(worker):
+    worker.handler["seconds"] = 0.15
+    await worker.run_job(job())
+    assert not worker.handler["cancelled"]
+    assert worker.calls.count("extend") >= 2
+    assert worker.calls[-1] == "complete"
+    assert worker.stats["succeeded"] == 1
+
+
+def test_forked_workers_get_their_own_id_when_started(monkeypatch):
+    # With preload_app the master builds the singleton and each fork inherits a copy.
+    preloaded = jobs.JobWorker(concurrency=0, poll_seconds=1, lease_seconds=60)
+    children = [copy.copy(preloaded), copy.copy(preloaded)]
+    for pid, child in zip((101, 102), children):
+        monkeypatch.setattr(jobs.os, "getpid", lambda pid=pid: pid)
+        child.start()
+
+    first, second = (child.worker_id for child in children)
+    assert first != second
+    assert ":101:" in first and ":102:" in second
+    assert preloaded.worker_id == ""
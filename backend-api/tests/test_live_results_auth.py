@@ -0,0 +1,88 @@
+"""First-message authentication of the live results WebSocket."""
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from jose import jwt
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints import responses
+from app.core import auth
+from app.services import live_results
+
+URL = "/api/v1/courses/7/results/live"
+
+
+def token_for(roles: list[str]) -> str:
+    now = int(time.time())
+    claims = {"sub": "test:staff", "email": "staff@example.com", "roles": roles, "auth_method": "staff", "iat": now, "exp": now + 60}
+    return jwt.encode(claims, auth.BACKEND_API_JWT_SECRET, algorithm="HS256")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    checked = []
+
+    @asynccontextmanager
+    async def no_database():
+        yield None
+
+    async def allow(conn, actor, course_id):
+        checked.append((actor.subject, course_id))
+
+    async def serve(websocket, course_id):
+        await websocket.send_json({"type": "subscribed", "course_id": course_id})
+
+    monkeypatch.setattr(responses, "DBConnection", no_database)
+    monkeypatch.setattr(responses, "require_course_staff_access", allow)
+    monkeypatch.setattr(responses.results_hub, "serve", serve)
+    monkeypatch.setattr(live_results, "LIVE_RESULTS_AUTH_TIMEOUT_SECONDS", 0.2)
+    app = FastAPI()
+    app.include_router(responses.router, prefix="/api/v1")
+    with TestClient(app) as test_client:
+        test_client.checked = checked
+        yield test_client
+
+
+def test_token_in_the_first_message_subscribes(client):
+    with client.websocket_connect(URL) as ws:
+        ws.send_json({"type": "auth", "token": token_for(["teacher"])})
+        assert ws.receive_json() == {"type": "subscribed", "course_id": 7}
+    assert client.checked == [("test:staff", 7)]
+
+
+@pytest.mark.parametrize("message", [
+    {"type": "auth", "token": "not-a-jwt"},
+    {"type": "auth"},
+    {"type": "ping"},
+    "token",
+])
+def test_invalid_auth_message_is_closed_with_1008(client, message):
+    with client.websocket_connect(URL) as ws:
+        if isinstance(message, str):
+            ws.send_text(message)
+        else:
+            ws.send_json(message)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+    assert client.checked == []
+
+
+def test_token_in_the_query_string_is_not_accepted(client):
+    with client.websocket_connect(f"{URL}?token={token_for(['teacher'])}") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+
+def test_students_are_refused(client):
+    with client.websocket_connect(URL) as ws:
+        ws.send_json({"type": "auth", "token": token_for(["student"])})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
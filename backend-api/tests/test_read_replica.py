@@ -0,0 +1,92 @@
+"""Read routing of app/db/replica.py: route() and ReadAfterWriteMiddleware."""
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from app.db.replica import STICKY_COOKIE, STICKY_HEADER, ReadAfterWriteMiddleware, ReadReplica
+
+FRONTEND = "https://frontend.example"
+
+
+def replica(lag_seconds: float | None, pool: object | None = object()) -> ReadReplica:
+    r = ReadReplica("postgresql://replica/db", max_lag_seconds=5, check_interval_seconds=2)
+    r.lag_seconds, r.pool = lag_seconds, pool
+    return r
+
+
+@pytest.mark.parametrize("lag, pool, cookies, headers, reason", [
+    (0.0, object(), {}, {}, "replica"),
+    (5.0, object(), {}, {}, "replica"),
+    (5.1, object(), {}, {}, "lagging"),
+    (None, object(), {}, {}, "unavailable"),
+    (0.0, None, {}, {}, "unavailable"),
+    # A recent write by this client wins over every replica state.
+    (0.0, object(), {STICKY_COOKIE: "1"}, {}, "read_after_write"),
+    (0.0, object(), {}, {STICKY_HEADER: "1"}, "read_after_write"),
+    (0.0, object(), {}, {STICKY_HEADER.lower(): "1"}, "read_after_write"),
+    (None, None, {}, {STICKY_HEADER: "1"}, "read_after_write"),
+    (0.0, object(), {"other": "1"}, {"x-other": "1"}, "replica"),
+])
+def test_route(lag, pool, cookies, headers, reason):
+    r = replica(lag, pool)
+    assert r.route(cookies, Headers(headers)) == reason
+    assert r.routes == {reason: 1}
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items")
+    async def read_items():
+        return []
+
+    @app.post("/items")
+    async def add_item():
+        return {"ok": True}
+
+    @app.post("/broken")
+    async def broken():
+        raise HTTPException(status_code=422, detail="no")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[FRONTEND],
+        allow_methods=["GET", "POST"],
+        allow_headers=["*"],
+        expose_headers=[STICKY_HEADER],
+    )
+    app.add_middleware(ReadAfterWriteMiddleware, sticky_seconds=10)
+    return TestClient(app)
+
+
+def test_successful_write_marks_the_client(client):
+    response = client.post("/items", headers={"Origin": FRONTEND})
+    assert response.headers[STICKY_HEADER] == "10"
+    assert f"{STICKY_COOKIE}=1; Max-Age=10" in response.headers["set-cookie"]
+    # A cross-origin frontend can read the header, which it cannot do for the cookie.
+    assert STICKY_HEADER in response.headers["access-control-expose-headers"]
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/items"), ("POST", "/broken")])
+def test_reads_and_failed_writes_do_not(client, method, path):
+    response = client.request(method, path, headers={"Origin": FRONTEND})
+    assert STICKY_HEADER not in response.headers
+    assert "set-cookie" not in response.headers
+
+
+def test_frontend_may_send_the_header_cross_origin(client):
+    response = client.options(
+        "/items",
+        headers={
+            "Origin": FRONTEND,
+            "Access-Control-Request-Method": "GET",
+            "Access-Control-Request-Headers": STICKY_HEADER,
+        },
+    )
+    assert response.status_code == 200
+    assert STICKY_HEADER.lower() in response.headers["access-control-allow-headers"].lower()
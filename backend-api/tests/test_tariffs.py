@@ -0,0 +1,144 @@
+"""Fixed-charge parsing and bill computation of app/services/tariffs.py."""
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import pytest
+
+from app.services.tariffs import (
+    DEFAULT_TARIFF_CSV_PATH,
+    HP_TO_KW,
+    FixedCharge,
+    TariffTable,
+    parse_fixed_charge,
+)
+
+
+# Every shape of "Fixed Charge" cell in tariffs_all_india.csv.
+@pytest.mark.parametrize("text, charge", [
+    ("₹21.5/kW", FixedCharge(21.5, "kW", None)),
+    ("₹30/kW/month", FixedCharge(30.0, "kW", None)),
+    ("Rs.75/kW/month", FixedCharge(75.0, "kW", None)),
+    ("₹90/kW/month (≤25 kW)", FixedCharge(90.0, "kW", "≤25 kW")),
+    ("₹250/kVA/month", FixedCharge(250.0, "kVA", None)),
+    ("Rs.140/HP/month (below 100 HP)", FixedCharge(140 / HP_TO_KW, "kW", "below 100 HP")),
+    ("₹517/connection/month", FixedCharge(517.0, "connection", None)),
+    ("₹185/month", FixedCharge(185.0, "connection", None)),
+    ("₹30 customer charge/month", FixedCharge(30.0, "connection", None)),
+    ("MMFC ₹80/month", FixedCharge(80.0, "connection", "minimum monthly fixed charge")),
+    ("", FixedCharge(0.0, None, None)),
+    ("   ", FixedCharge(0.0, None, None)),
+    (None, FixedCharge(0.0, None, None)),
+])
+def test_parse_fixed_charge(text, charge):
+    assert parse_fixed_charge(text) == pytest.approx(charge)
+
+
+@pytest.mark.parametrize("text", [
+    "N/A",
+    "₹/kW/month",
+    "30/kW/month",
+    "₹50",
+    "₹50/kWh",
+    "₹50/kVAh/month",
+    "₹50 per unit",
+])
+def test_malformed_fixed_charge_is_an_error(text):
+    with pytest.raises(ValueError):
+        parse_fixed_charge(text)
+
+
+@pytest.fixture(scope="module")
+def table() -> TariffTable:
+    return TariffTable.from_csv(DEFAULT_TARIFF_CSV_PATH)
+
+
+def tariff(table: TariffTable, state: str, discom: str, sector: str) -> int:
+    (tariff_id,) = table.find(state, discom, sector)
+    return int(tariff_id)
+
+
+def test_bundled_csv_parses_without_fallbacks(table, caplog):
+    with caplog.at_level(logging.WARNING, logger="myapp"):
+        TariffTable.from_csv(DEFAULT_TARIFF_CSV_PATH)
+    assert caplog.records == []
+    assert len(table) == 207
+    assert set(table.fixed_charge_basis) == {"kW", "kVA", "connection", None}
+
+
+def test_find_ignores_case_and_spacing(table):
+    assert tariff(table, "  andhra   PRADESH ", "apepdcl", "industrial") == tariff(
+        table, "Andhra Pradesh", "APEPDCL", "Industrial"
+    )
+    assert len(table.find(state="Odisha", sector="Industrial")) == 4
+    assert len(table.find(state="Atlantis")) == 0
+
+
+# (state, discom, sector) of a CSV row, the profile, and the expected energy and
+# fixed charge in rupees over the billing period.
+@pytest.mark.parametrize("row, energy_kwh, load_kw, months, energy_charge, fixed_charge", [
+    # ₹21.5/kW at 2.70/kWh.
+    (("Andaman & Nicobar Islands (UT)", "EDA&N", "Residential"), 300, 4, 1, 810.0, 86.0),
+    # Rs.75/kW/month at 6.70/kWh over a quarter.
+    (("Andhra Pradesh", "APEPDCL", "Industrial"), 9000, 20, 3, 60300.0, 4500.0),
+    # ₹250/kVA/month: 9 kW at the default power factor 0.9 is 10 kVA.
+    (("Chandigarh (Union Territory)", "CPDL", "Industrial"), 1000, 9, 2, 5750.0, 5000.0),
+    # Rs.140/HP/month: 7.457 kW is 10 HP.
+    (("Karnataka", "BESCOM", "Industrial"), 500, 10 * HP_TO_KW, 1, 3050.0, 1400.0),
+    # ₹517/connection/month does not depend on the load.
+    (("Maharashtra", "Maharashtra State Electricity Distribution Company Limited", "Commercial"), 100, 50, 1, 852.0, 517.0),
+    # MMFC ₹80/month.
+    (("Odisha", "TPCODL", "Industrial"), 0, 15, 6, 0.0, 480.0),
+    # No fixed charge.
+    (("Chandigarh (Union Territory)", "CPDL", "Residential"), 200, 5, 1, 550.0, 0.0),
+])
+def test_bills_of_bundled_rows(table, row, energy_kwh, load_kw, months, energy_charge, fixed_charge):
+    bill = table.bills([tariff(table, *row)], [energy_kwh], [load_kw], months=months)
+    assert bill["energy_charge"] == pytest.approx([energy_charge])
+    assert bill["fixed_charge"] == pytest.approx([fixed_charge])
+    assert bill["total"] == pytest.approx([energy_charge + fixed_charge])
+
+
+def test_bills_broadcast_and_match_one_at_a_time(table):
+    rng = np.random.default_rng(50)
+    ids = rng.integers(0, len(table), 1000)
+    energy = rng.uniform(0, 5000, 1000)
+    load = rng.uniform(0, 50, 1000)
+    batch = table.bills(ids, energy, load, months=2, power_factor=0.8)
+    one_by_one = [table.bills([i], [e], [l], months=2, power_factor=0.8)["total"][0] for i, e, l in zip(ids, energy, load)]
+    assert batch["total"] == pytest.approx(one_by_one)
+
+    # A scalar profile is priced under every tariff.
+    assert table.bills(np.arange(len(table)), 100)["total"].shape == (len(table),)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"tariff_ids": [-1], "energy_kwh": [1]},
+    {"tariff_ids": [10_000], "energy_kwh": [1]},
+    {"tariff_ids": [0, 1], "energy_kwh": [1, 2, 3]},
+    {"tariff_ids": [0], "energy_kwh": [-1]},
+    {"tariff_ids": [0], "energy_kwh": [1], "load_kw": [-2]},
+    {"tariff_ids": [0], "energy_kwh": [1], "months": 0},
+    {"tariff_ids": [0], "energy_kwh": [1], "power_factor": 0},
+    {"tariff_ids": [0], "energy_kwh": [1], "power_factor": 1.1},
+])
+def test_invalid_bills_are_errors(table, kwargs):
+    with pytest.raises(ValueError):
+        table.bills(**kwargs)
+
+
+def test_unreadable_fixed_charge_is_logged_and_billed_as_zero(tmp_path, caplog):
+    csv_path = tmp_path / "tariffs.csv"
+    csv_path.write_text(
+        '"State","DISCOM","Sector","Category","Rate (Rs/kWh)","Fixed Charge","Incentives"\n'
+        '"X","D1","Residential","Slab-based","4.00","₹50/kWh",""\n'
+        '"X","D1","Commercial","LT","5.00","₹10/kW/month",""\n',
+        encoding="utf-8",
+    )
+    with caplog.at_level(logging.WARNING, logger="myapp"):
+        small = TariffTable.from_csv(csv_path)
+    assert "line 2" in caplog.text
+    assert small.fixed_charge_basis.tolist() == [None, "kW"]
+    assert small.fixed_charge_text[0] == "₹50/kWh"
+    assert small.bills([0, 1], [10, 10], [3, 3])["total"] == pytest.approx([40.0, 80.0])
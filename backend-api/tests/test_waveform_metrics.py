@@ -0,0 +1,125 @@
+"""Waveform metrics on analytic waveforms, and parity of the simulation models with the browser scripts."""
+from __future__ import annotations
+
+import json
+import math
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services import simulation
+from app.services.waveform_metrics import (
+    cockroft_walton_metrics,
+    ferranti_metrics,
+    impulse_metrics,
+    partial_discharge_metrics,
+    trv_metrics,
+)
+
+CONTENT_FILES = Path(__file__).resolve().parents[2] / "content_files"
+
+
+def test_standard_lightning_impulse():
+    # 1.2/50 us double exponential, normalised to a peak of 1 (IEC 60060-1).
+    t = np.linspace(0.0, 200e-6, 200_001)
+    y = 1.037 * (np.exp(-t / 68.2e-6) - np.exp(-t / 0.405e-6))
+    metrics = impulse_metrics(t, y, {})
+    assert metrics["peak_voltage"] == pytest.approx(1.0, rel=0.01)
+    assert metrics["front_time_us"] == pytest.approx(1.2, rel=0.05)
+    assert metrics["tail_time_us"] == pytest.approx(50.0, rel=0.03)
+
+
+def test_impulse_without_a_tail_in_the_window():
+    t = np.linspace(0.0, 10e-6, 10_001)
+    y = np.exp(-t / 68.2e-6) - np.exp(-t / 0.405e-6)
+    metrics = impulse_metrics(t, y, {})
+    assert metrics["front_time_us"] is not None
+    assert metrics["tail_time_us"] is None
+
+
+def test_undamped_trv_is_one_minus_cosine():
+    # Lossless RLC: u = U (1 - cos w t), peak 2U at pi / w, steepest slope U w.
+    inductance, capacitance, current = 0.005, 1e-6, 10.0
+    u_kv = current * math.sqrt(inductance / capacitance) / 1000
+    omega = 1 / math.sqrt(inductance * capacitance) / 1e6  # per us
+    t = np.linspace(0.0, 500.0, 500_001)
+    y = u_kv * (1 - np.cos(omega * t))
+    metrics = trv_metrics(t, y, {"initialCurrent": current, "inductance": inductance, "capacitance": capacitance})
+    assert metrics["peak_voltage_kv"] == pytest.approx(2 * u_kv, rel=1e-6)
+    assert metrics["time_to_peak_us"] == pytest.approx(math.pi / omega, rel=1e-4)
+    assert metrics["rate_of_rise_kv_per_us"] == pytest.approx(2 * u_kv * omega / math.pi, rel=1e-4)
+    assert metrics["max_rate_of_rise_kv_per_us"] == pytest.approx(u_kv * omega, rel=1e-4)
+    assert metrics["peak_factor"] == pytest.approx(2.0, rel=1e-6)
+
+
+def test_ferranti_rise():
+    metrics = ferranti_metrics(np.arange(101.0), np.linspace(110.0, 115.5, 101), {})
+    assert metrics == {
+        "sending_end_voltage": 110.0,
+        "receiving_end_voltage": 115.5,
+        "voltage_rise_percent": pytest.approx(5.0),
+    }
+    assert ferranti_metrics(np.arange(2.0), np.array([0.0, 1.0]), {})["voltage_rise_percent"] is None
+
+
+def test_cockroft_walton_ripple():
+    # Triangular ripple of +-2 V around 1300 V.
+    phase = (np.arange(501) * 5 / 500) % 1.0
+    y = 1300 + 2 * (1 - 2 * phase)
+    metrics = cockroft_walton_metrics(np.arange(501.0), y, {})
+    assert metrics["mean_output_voltage"] == pytest.approx(1300.0, abs=0.05)
+    assert metrics["ripple_peak_to_peak"] == pytest.approx(4.0, rel=0.01)
+
+
+def test_partial_discharge_peak_is_by_magnitude():
+    t = np.linspace(0.0, 1.0, 1001)
+    y = 0.2 * np.sin(2 * np.pi * 5 * t)
+    y[400] = -0.9
+    assert partial_discharge_metrics(t, y, {}) == {"peak_magnitude": pytest.approx(0.9), "time_of_peak": pytest.approx(0.4)}
+
+
+def initial_parameters(model: simulation.SimulationModel) -> dict[str, float]:
+    directory = CONTENT_FILES / Path(model.compute).parent
+    config = json.loads(next(directory.glob("*.json")).read_text())
+    return {name: variable["initial"] for name, variable in config["variables"].items()}
+
+
+def run_browser_script(model: simulation.SimulationModel, params: dict[str, float]) -> tuple[np.ndarray, np.ndarray]:
+    script = (CONTENT_FILES / model.compute).read_text()
+    program = f"""
+        globalThis.window = globalThis;
+        {script}
+        const result = window.MyLibrary.calculate({json.dumps(params)});
+        process.stdout.write(JSON.stringify(result));
+    """
+    output = subprocess.run(["node", "-e", program], check=True, capture_output=True, text=True, timeout=30).stdout
+    result = json.loads(output)
+    return np.asarray(result["x"], dtype=float), np.asarray(result["y"], dtype=float)
+
+
+PARITY_CASES = [
+    (name, overrides)
+    for name in sorted(simulation.SIMULATION_MODELS)
+    for overrides in ({}, {"timeStep_divisor": 1000})
+]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize("name, overrides", PARITY_CASES)
+def test_models_match_the_browser_scripts(name, overrides):
+    model = simulation.get_simulation_model(name)
+    params = initial_parameters(model)
+    if "timeStep_divisor" in overrides:
+        if "timeStep" not in params:
+            pytest.skip(f"{name} has a fixed grid")
+        # Far more than 10,000 steps: both sides must stop at the same cap.
+        params["timeStep"] = params["timeStep"] / overrides["timeStep_divisor"]
+
+    js_x, js_y = run_browser_script(model, params)
+    x, y = simulation.run_simulation(name, params)
+    assert len(x) == len(js_x)
+    np.testing.assert_allclose(x, js_x, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(y, js_y, rtol=1e-6, atol=1e-9 * max(np.abs(js_y).max(), 1.0))
@@ -5,7 +5,7 @@ import axios from 'axios';
 import LineGraphModal from './LineGraphModal';
 import { API_URL } from "../env";
 
-const ExperimentFormParameteric = ({ url }) => {
+const ExperimentFormParameteric = ({ url, moduleId }) => {
   const [config, setConfig] = useState(null);
   const [variables, setVariables] = useState({});
   const [chartData, setChartData] = useState({ xAxis: [], yAxis: [] });
@@ -21,8 +21,23 @@ const ExperimentFormParameteric = ({ url }) => {
 
   const apiUrl = API_URL;
 
+  const fetchValidatedConfig = async () => {
+    // The backend validates the config on upload/save and serves it pre-normalized.
+    const configResponse = await axios.get(`${apiUrl}/modules/${moduleId}/experiment-config`);
+    return configResponse.data;
+  };
+
   const fetchConfig = async () => {
     try {
+      if (moduleId) {
+        const configData = await fetchValidatedConfig();
+        setConfig(configData);
+        const scriptUrlResponse = await axios.get(`${apiUrl}/generate-signed-url/?blob_name=${configData.compute}`);
+        await loadScript(scriptUrlResponse.data.url, 'compute-module-script');
+        setComputeModuleLoaded(true);
+        return;
+      }
+
       console.log('Fetching signed URL...');
       const signedUrlResponse = await axios.get(`${apiUrl}/generate-signed-url/?blob_name=${url}`);
       const signedUrl = signedUrlResponse.data.url;
@@ -85,7 +100,7 @@ const ExperimentFormParameteric = ({ url }) => {
 
   useEffect(() => {
     fetchConfig();
-  }, [url]);
+  }, [url, moduleId]);
 
   useEffect(() => {
     
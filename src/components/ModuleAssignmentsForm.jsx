@@ -6,6 +6,7 @@ import { Textarea } from './textarea';
 import {  Text } from './text';
 import { Radio, RadioField } from './radio';
 import { API_URL } from "../env";
+import { noteReadAfterWrite, readAfterWriteHeaders } from "../readAfterWrite";
 
 const apiUrl = API_URL;
 
@@ -25,7 +26,7 @@ export default function ModuleAssignmentsForm ( {moduleID} ){
     const fetchData = async () => {
       try {
         const response = await fetch(`${apiUrl}/modules/${moduleID}/assignments`, {
-          headers: authHeaders(),
+          headers: { ...authHeaders(), ...readAfterWriteHeaders() },
         });
         if (!response.ok) {
           throw new Error('Network response was not ok');
@@ -108,6 +109,7 @@ export default function ModuleAssignmentsForm ( {moduleID} ){
                 if (!response.ok) {
                     throw new Error(`HTTP error! Status: ${response.status}`);
                 }
+                noteReadAfterWrite(response.headers);
 
             } catch (error) {
                 console.error('There was a problem saving the response:', error);
@@ -6,6 +6,7 @@ import { MsalProvider } from "@azure/msal-react";
 import { App } from "./App";
 import { LTIProvider } from "./contexts/LTIContext";
 import { msalConfig } from "./authConfig";
+import "./readAfterWrite";
 import "./index.css";
 
 const msalInstance = new PublicClientApplication(msalConfig);
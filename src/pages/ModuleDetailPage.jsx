@@ -40,6 +40,38 @@ function classNames(...classes) {
     return classes.filter(Boolean).join(' ');
 }
 
+// POSTs to one of the /stream generation endpoints and calls onText with the
+// accumulated text after every server-sent event.
+async function streamGeneratedText(path, text, onText) {
+    const response = await fetch(`${apiUrl}${path}?${new URLSearchParams({ text })}`, {
+        method: 'POST',
+        headers: { Authorization: axios.defaults.headers.common.Authorization || '' },
+    });
+    if (!response.ok || !response.body) {
+        throw new Error(`Generation request failed (${response.status})`);
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let generated = '';
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const event of events) {
+            const type = event.match(/^event: (.*)$/m)?.[1];
+            const data = JSON.parse(event.match(/^data: (.*)$/m)?.[1] || '{}');
+            if (type === 'error') throw new Error(data.detail);
+            if (type === 'done') return generated.trim();
+            generated += data.text || '';
+            onText(generated);
+        }
+    }
+    return generated.trim();
+}
+
 export default function ModuleDetailPage() {
     const { moduleID } = useParams();
     const [module, setModule] = useState(null);
@@ -65,15 +97,18 @@ export default function ModuleDetailPage() {
         if (rephraseCount >= 5) return;
 
         setIsRephrasing(true);
+        const originalConcept = module.concept;
+        setModule({ ...module, concept: '' });
         try {
-            const response = await axios.post(`${apiUrl}/rephrase/`, null, {
-                params: { text: module.concept }
-            });
-            setModule({ ...module, concept: response.data.rephrased_text });
+            const rephrased = await streamGeneratedText('/rephrase/stream', originalConcept, (partial) =>
+                setModule((current) => ({ ...current, concept: partial }))
+            );
+            setModule((current) => ({ ...current, concept: rephrased }));
             setRephraseCount(rephraseCount + 1);
             triggerConfetti();
         } catch (error) {
             console.error('Error rephrasing concept', error);
+            setModule((current) => ({ ...current, concept: originalConcept }));
             alert("Error rephrasing concept", error);
         } finally {
             setIsRephrasing(false);
@@ -86,10 +121,10 @@ export default function ModuleDetailPage() {
         setIsFunFactFinding(true);
         setModule({ ...module, fun_fact: '' });
         try {
-            const response = await axios.post(`${apiUrl}/funfact/`, null, {
-                params: { text: module.title }
-            });
-            setModule({ ...module, fun_fact: response.data.fun_fact });
+            const funFact = await streamGeneratedText('/funfact/stream', module.title, (partial) =>
+                setModule((current) => ({ ...current, fun_fact: partial }))
+            );
+            setModule((current) => ({ ...current, fun_fact: funFact }));
             setFunFactCount(funfactCount + 1);
             triggerConfetti();
         } catch (error) {
@@ -279,7 +314,7 @@ export default function ModuleDetailPage() {
                             Experiment
                         </h5>
                         <div className="exp">
-                            <ExperimentFormParameteric url={module.plottingexperimentconfig}/>
+                            <ExperimentFormParameteric url={module.plottingexperimentconfig} moduleId={moduleID}/>
                             </div>
                         </Card>
                             </Tab.Panel>
@@ -303,7 +338,7 @@ export default function ModuleDetailPage() {
                                         )}
                                     </div>
 
-                                    {isRephrasing ? (
+                                    {isRephrasing && !module?.concept ? (
                                         <Spinner />
                                     ) : (
                                         <p className="mt-4 font-normal text-gray-700 dark:text-gray-400 text-base">
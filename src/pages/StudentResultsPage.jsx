@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useCallback, useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import {
   ArrowLeftIcon,
@@ -14,6 +14,55 @@ import { API_URL } from "../env";
 
 const apiUrl = API_URL;
 
+// Fold one live result event into the grouped results from
+// /courses/{id}/student-results. Returns a new array; the event's question
+// replaces the student's earlier answer or is added to its module.
+function applyResultEvent(results, event) {
+  const index = results.findIndex((s) => s.student_id === event.student_id);
+  const previous =
+    index >= 0
+      ? results[index]
+      : {
+          student_id: event.student_id,
+          student_name: event.student_name,
+          student_email: event.student_email,
+          modules: [],
+          total_questions: 0,
+          correct_answers: 0,
+        };
+  const student = { ...previous, modules: [...previous.modules] };
+  let moduleIndex = student.modules.findIndex((m) => m.module_title === event.module_title);
+  if (moduleIndex < 0) {
+    student.modules.push({ module_title: event.module_title, questions: [], total: 0, correct: 0 });
+    moduleIndex = student.modules.length - 1;
+  }
+  const module = { ...student.modules[moduleIndex], questions: [...student.modules[moduleIndex].questions] };
+  const question = {
+    question_id: event.question_id,
+    question_text: event.question_text,
+    student_response: event.student_response,
+    correct_answer: event.correct_answer,
+    is_correct: event.is_correct,
+    score: event.score,
+  };
+  const questionIndex = module.questions.findIndex((q) => q.question_id === event.question_id);
+  const wasCorrect = questionIndex >= 0 && module.questions[questionIndex].is_correct ? 1 : 0;
+  const correctChange = (event.is_correct ? 1 : 0) - wasCorrect;
+  if (questionIndex >= 0) {
+    module.questions[questionIndex] = question;
+  } else {
+    module.questions.push(question);
+    module.total += 1;
+    student.total_questions += 1;
+  }
+  module.correct += correctChange;
+  student.correct_answers += correctChange;
+  student.modules[moduleIndex] = module;
+  return index >= 0
+    ? results.map((s, i) => (i === index ? student : s))
+    : [...results, student];
+}
+
 export default function StudentResultsPage() {
   const { courseId } = useParams();
   const navigate = useNavigate();
@@ -23,16 +72,24 @@ export default function StudentResultsPage() {
   const [expandedStudent, setExpandedStudent] = useState(null);
   const [expandedQuiz, setExpandedQuiz] = useState(null);
 
+  const fetchResults = useCallback(async () => {
+    try {
+      const resultsRes = await axios.get(`${apiUrl}/courses/${courseId}/student-results`);
+      setResults(resultsRes.data);
+    } catch (err) {
+      console.error("Error fetching results:", err);
+    }
+  }, [courseId]);
+
   useEffect(() => {
     const fetchData = async () => {
       setLoading(true);
       try {
-        const [courseRes, resultsRes] = await Promise.all([
+        const [courseRes] = await Promise.all([
           axios.get(`${apiUrl}/courses/${courseId}`),
-          axios.get(`${apiUrl}/courses/${courseId}/student-results`),
+          fetchResults(),
         ]);
         setCourse(courseRes.data);
-        setResults(resultsRes.data);
       } catch (err) {
         console.error("Error fetching results:", err);
       } finally {
@@ -40,7 +97,53 @@ export default function StudentResultsPage() {
       }
     };
     fetchData();
-  }, [courseId]);
+  }, [courseId, fetchResults]);
+
+  // Live updates: the server pushes changed answers as students submit, so
+  // the page never has to be refreshed during a lab. A "resync" (after a
+  // regrade or a dropped server connection) reloads the results once.
+  useEffect(() => {
+    const token = (axios.defaults.headers.common.Authorization || "").replace(/^Bearer\s+/i, "");
+    if (!apiUrl || !token) return undefined;
+    // The token goes in the first message, not the URL, so it stays out of
+    // server and proxy access logs.
+    const wsUrl = `${apiUrl.replace(/^http/, "ws")}/courses/${courseId}/results/live`;
+    let socket;
+    let retryTimer;
+    let retryDelay = 1000;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(wsUrl);
+      socket.onopen = () => socket.send(JSON.stringify({ type: "auth", token }));
+      socket.onmessage = (message) => {
+        const data = JSON.parse(message.data);
+        if (data.type === "subscribed") {
+          retryDelay = 1000;
+        } else if (data.type === "results") {
+          setResults((current) => data.events.reduce(applyResultEvent, current));
+        } else if (data.type === "resync") {
+          fetchResults();
+        }
+      };
+      socket.onclose = (event) => {
+        // 1008: not allowed to watch this course; retrying will not help.
+        if (closed || event.code === 1008) return;
+        retryTimer = setTimeout(() => {
+          fetchResults();
+          connect();
+        }, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket.close();
+    };
+  }, [courseId, fetchResults]);
 
   const toggleStudent = (studentId) => {
     setExpandedStudent(expandedStudent === studentId ? null : studentId);
@@ -0,0 +1,40 @@
+import axios from "axios";
+
+// After a write the API answers with "X-DB-Read-Primary: <seconds>". Sending
+// "X-DB-Read-Primary: 1" for that long makes the API serve our reads from the
+// primary database rather than a read replica that may not have the write yet
+// (see backend-api/app/db/replica.py). A header is used because the API is
+// usually on another origin, where cookies are not sent.
+const HEADER = "X-DB-Read-Primary";
+const STORAGE_KEY = "db_read_primary_until";
+
+const primaryUntil = () => Number(sessionStorage.getItem(STORAGE_KEY)) || 0;
+
+export const readAfterWriteHeaders = () =>
+  Date.now() < primaryUntil() ? { [HEADER]: "1" } : {};
+
+// Call with the response headers (axios headers object or fetch Headers).
+export const noteReadAfterWrite = (headers) => {
+  const value = typeof headers?.get === "function" ? headers.get(HEADER) : headers?.[HEADER.toLowerCase()];
+  const seconds = Number(value);
+  if (seconds > 0) {
+    sessionStorage.setItem(STORAGE_KEY, String(Math.max(primaryUntil(), Date.now() + seconds * 1000)));
+  }
+};
+
+axios.interceptors.request.use((config) => {
+  const headers = readAfterWriteHeaders();
+  if (headers[HEADER]) {
+    config.headers = config.headers || {};
+    config.headers[HEADER] = headers[HEADER];
+  }
+  return config;
+});
+
+axios.interceptors.response.use(
+  (response) => {
+    noteReadAfterWrite(response.headers);
+    return response;
+  },
+  (error) => Promise.reject(error),
+);